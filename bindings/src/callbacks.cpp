@@ -17,7 +17,9 @@ void init_callbacks(py::module_ &m) {
 
     py::class_<MeetingServiceEventCallbacks>(m, "MeetingServiceEventCallbacks")
         .def(py::init<>())
-        .def_readwrite("onStatusChangedCallback", &MeetingServiceEventCallbacks::onStatusChangedCallback);
+        .def_readwrite("onStatusChangedCallback", &MeetingServiceEventCallbacks::onStatusChangedCallback)
+        .def_readwrite("onStatisticsWarningCallback", &MeetingServiceEventCallbacks::onStatisticsWarningCallback)
+        .def_readwrite("onUserNetworkStatusChangedCallback", &MeetingServiceEventCallbacks::onUserNetworkStatusChangedCallback);
 
     py::class_<ParticipantsCtrlEventCallbacks>(m, "ParticipantsCtrlEventCallbacks")
         .def(py::init<>())
@@ -28,6 +30,7 @@ void init_callbacks(py::module_ &m) {
         .def(py::init<>())
         .def_readwrite("onSharingStatusChangedCallback", &SharingCtrlEventCallbacks::onSharingStatusChangedCallback);
     
-    // Note: ZoomSDKSharingSourceInfo and SharingStatus enum are already bound in sharing_binding.cpp
+    // Note: ZoomSDKSharingSourceInfo and SharingStatus enum are already bound in sharing_binding.cpp,
+    // the network quality enums in meeting_service_binding.cpp
     // No need to bind them here to avoid duplicates
 }
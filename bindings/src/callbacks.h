@@ -42,19 +42,27 @@ public:
 class MeetingServiceEventCallbacks : public IMeetingServiceEvent {
 public:
     std::function<void(MeetingStatus, int)> onStatusChangedCallback;
+    std::function<void(StatisticsWarningType)> onStatisticsWarningCallback;
+    std::function<void(MeetingComponentType, ConnectionQuality, unsigned int, bool)> onUserNetworkStatusChangedCallback;
 
     void onMeetingStatusChanged(MeetingStatus status, int iResult = 0) override {
         if (onStatusChangedCallback) onStatusChangedCallback(status, iResult);
     }
 
+    void onMeetingStatisticsWarningNotification(StatisticsWarningType type) override {
+        if (onStatisticsWarningCallback) onStatisticsWarningCallback(type);
+    }
+
+    void onUserNetworkStatusChanged(MeetingComponentType type, ConnectionQuality level, unsigned int userId, bool uplink) override {
+        if (onUserNetworkStatusChangedCallback) onUserNetworkStatusChangedCallback(type, level, userId, uplink);
+    }
+
     // Required implementations - only methods that exist in IMeetingServiceEvent
-    void onMeetingStatisticsWarningNotification(StatisticsWarningType type) override {}
     void onMeetingParameterNotification(const MeetingParameter* meeting_param) override {}
     void onSuspendParticipantsActivities() override {}
     void onAICompanionActiveChangeNotice(bool bActive) override {}
     void onMeetingTopicChanged(const zchar_t* sTopic) override {}
     void onMeetingFullToWatchLiveStream(const zchar_t* sLiveStreamUrl) override {}
-    void onUserNetworkStatusChanged(MeetingComponentType type, ConnectionQuality level, unsigned int userId, bool uplink) override {}
 #ifdef WIN32
     void onAppSignalPanelUpdated(IMeetingAppSignalHandler* pHandler) override {}
 #endif
@@ -21,6 +21,30 @@ void init_meeting_service_binding(py::module_ &m) {
         .value("MEETING_STATUS_UNKNOWN", MEETING_STATUS_UNKNOWN)
         .export_values();
 
+    // Network quality enums (onUserNetworkStatusChanged, onMeetingStatisticsWarningNotification)
+    py::enum_<MeetingComponentType>(m, "MeetingComponentType")
+        .value("MeetingComponentType_Def", MeetingComponentType_Def)
+        .value("MeetingComponentType_AUDIO", MeetingComponentType_AUDIO)
+        .value("MeetingComponentType_VIDEO", MeetingComponentType_VIDEO)
+        .value("MeetingComponentType_SHARE", MeetingComponentType_SHARE)
+        .export_values();
+
+    py::enum_<ConnectionQuality>(m, "ConnectionQuality")
+        .value("Conn_Quality_Unknown", Conn_Quality_Unknown)
+        .value("Conn_Quality_Very_Bad", Conn_Quality_Very_Bad)
+        .value("Conn_Quality_Bad", Conn_Quality_Bad)
+        .value("Conn_Quality_Not_Good", Conn_Quality_Not_Good)
+        .value("Conn_Quality_Normal", Conn_Quality_Normal)
+        .value("Conn_Quality_Good", Conn_Quality_Good)
+        .value("Conn_Quality_Excellent", Conn_Quality_Excellent)
+        .export_values();
+
+    py::enum_<StatisticsWarningType>(m, "StatisticsWarningType")
+        .value("Statistics_Warning_None", Statistics_Warning_None)
+        .value("Statistics_Warning_Network_Quality_Bad", Statistics_Warning_Network_Quality_Bad)
+        .value("Statistics_Warning_Busy_System", Statistics_Warning_Busy_System)
+        .export_values();
+
     // Bind JoinParam4WithoutLogin struct
     py::class_<JoinParam4WithoutLogin>(m, "JoinParam4WithoutLogin")
         .def(py::init<>())
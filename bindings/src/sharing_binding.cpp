@@ -27,6 +27,12 @@ void init_sharing_binding(py::module_ &m) {
         .value("Sharing_Resume", Sharing_Resume)
         .export_values();
     
+    // Bind AudioShareMode enum (computer sound shared in mono or stereo)
+    py::enum_<AudioShareMode>(m, "AudioShareMode")
+        .value("AudioShareMode_Mono", AudioShareMode_Mono)
+        .value("AudioShareMode_Stereo", AudioShareMode_Stereo)
+        .export_values();
+
     // Bind ZoomSDKSharingSourceInfo struct
     py::class_<ZoomSDKSharingSourceInfo>(m, "ZoomSDKSharingSourceInfo")
         .def(py::init<>())
@@ -41,6 +47,18 @@ void init_sharing_binding(py::module_ &m) {
         .def("StopShare", [](IMeetingShareController& self) {
             return self.StopShare();
         }, "Stop sharing")
+        .def("EnableShareComputerSound", [](IMeetingShareController& self, bool bEnable) {
+            return self.EnableShareComputerSound(bEnable);
+        }, py::arg("bEnable"), "Share computer sound with the next share")
+        .def("EnableShareComputerSoundWhenSharing", [](IMeetingShareController& self, bool bEnable) {
+            return self.EnableShareComputerSoundWhenSharing(bEnable);
+        }, py::arg("bEnable"), "Share computer sound in the current share")
+        .def("SetAudioShareMode", [](IMeetingShareController& self, AudioShareMode mode) {
+            return self.SetAudioShareMode(mode);
+        }, py::arg("mode"), "Mono or stereo computer sound")
+        .def("EnableOptimizeForFullScreenVideoClip", [](IMeetingShareController& self, bool bEnable) {
+            return self.EnableOptimizeForFullScreenVideoClip(bEnable);
+        }, py::arg("bEnable"), "Optimize the share for video clips")
         .def("SetEvent", [](IMeetingShareController& self, SharingCtrlEventCallbacks* pEvent) {
             return self.SetEvent(pEvent);
         }, py::arg("pEvent"), "Set event callbacks");
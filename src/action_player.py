@@ -1,102 +1,119 @@
 """
-Input handler for user preferences - Replays mouse actions with WindMouse algorithm
+Input handler for user preferences - Replays mouse actions with natural movement
 """
 
 import asyncio
 import math
 import random
-import time
-from typing import List, Dict, Optional, Literal
-import pyautogui
-
-# Disable pyautogui failsafe
-pyautogui.FAILSAFE = False
+from typing import Any, List, Dict, Optional, Literal, Tuple
+from .config import default_config, ReplayConfig
+from .clock import Clock, SYSTEM_CLOCK, VirtualClock
+from .screen_backend import ScreenBackend, DryRunBackend, create_screen_backend, signatures_match
+from .display_topology import DisplayTopology
+from .motion import MotionModel, Point, create_configured_motion_model, fitts_duration_ms, step_count
 
 MouseAction = Dict[str, any]  # type: ignore
 
 
+def compile_plan(actions: List[MouseAction], topology: Optional[DisplayTopology] = None) -> List[MouseAction]:
+    """
+    Reduce a recording to the click actions to replay, sorted by time. With
+    a topology, monitor-relative clicks are translated to screen positions.
+    Without one they are placed on the primary monitor, whose origin is
+    (0, 0); 'monitor' is kept so the plan can still be translated later
+    (e.g. by each kiosk of a fleet), and assumed_primary() lists the clicks
+    that were recorded on another monitor.
+    """
+    click_actions = [a for a in actions if a.get('type') in ('click', 'doubleclick')]
+    if topology:
+        translated = []
+        for action in click_actions:
+            if 'monitor' in action:
+                action = dict(action)
+                action['x'], action['y'] = topology.to_absolute(action.pop('monitor'), action['x'], action['y'])
+            translated.append(action)
+        click_actions = translated
+    return sorted(click_actions, key=lambda a: a.get('time', 0))
+
+
+def assumed_primary(plan: List[MouseAction]) -> List[Tuple[int, int, int]]:
+    """(monitor, x, y) of the clicks of an untranslated plan recorded on a monitor other than the primary"""
+    return [(a['monitor'], a['x'], a['y']) for a in plan if a.get('monitor', 0) != 0]
+
+
 class ActionPlayer:
     """Replays mouse actions with natural movement"""
 
-    def __init__(self):
+    def __init__(self, config: Optional[ReplayConfig] = None, backend: Optional[ScreenBackend] = None,
+                 clock: Clock = SYSTEM_CLOCK, topology: Optional[DisplayTopology] = None):
+        self.config = config or dict(default_config["replay"])
+        self.backend = backend or create_screen_backend()
+        self.clock = clock
+        # Layout for monitor-relative recordings
+        self.topology = topology
         self.is_playing = False
         self.playback_speed = 1.0
+        self.last_stats: Dict[str, Any] = {}
+        # Per-action timings of the last play
+        self.last_timeline: List[Dict[str, Any]] = []
 
-    async def wind_mouse(
-        self,
-        start_x: float,
-        start_y: float,
-        dest_x: float,
-        dest_y: float,
-        G_0: float = 12.0,
-        W_0: float = 5.0,
-        M_0: float = 25.0,
-        D_0: float = 12.0
-    ) -> None:
+    async def move_cursor(self, start: Point, end: Point, model: MotionModel) -> int:
         """
-        WindMouse algorithm for natural mouse movement
-        G_0 - magnitude of the gravitational force
-        W_0 - magnitude of the wind force fluctuations
-        M_0 - maximum step size (velocity clip threshold)
-        D_0 - distance where wind behavior changes from random to damped
+        Move the cursor along the model's path, in the time given by Fitts' law.
+        Returns the number of cursor updates.
         """
-        sqrt3 = math.sqrt(3)
-        sqrt5 = math.sqrt(5)
-
-        current_x = start_x
-        current_y = start_y
-        v_x = 0.0
-        v_y = 0.0
-        W_x = 0.0
-        W_y = 0.0
-        start_x_pos = start_x
-        start_y_pos = start_y
-        M_0_current = M_0
-
-        while True:
-            dist = math.hypot(dest_x - start_x_pos, dest_y - start_y_pos)
-            if dist < 1:
-                break
-
-            W_mag = min(W_0, dist)
-            if dist >= D_0:
-                W_x = W_x / sqrt3 + (2 * random.random() - 1) * W_mag / sqrt5
-                W_y = W_y / sqrt3 + (2 * random.random() - 1) * W_mag / sqrt5
-            else:
-                W_x /= sqrt3
-                W_y /= sqrt3
-                if M_0_current < 3:
-                    M_0_current = random.random() * 3 + 3
-                else:
-                    M_0_current /= sqrt5
-
-            v_x += W_x + G_0 * (dest_x - start_x_pos) / dist
-            v_y += W_y + G_0 * (dest_y - start_y_pos) / dist
-            v_mag = math.hypot(v_x, v_y)
-
-            if v_mag > M_0_current:
-                v_clip = M_0_current / 2 + random.random() * M_0_current / 2
-                v_x = (v_x / v_mag) * v_clip
-                v_y = (v_y / v_mag) * v_clip
-
-            start_x_pos += v_x
-            start_y_pos += v_y
-            move_x = round(start_x_pos)
-            move_y = round(start_y_pos)
-
-            if current_x != move_x or current_y != move_y:
-                pyautogui.moveTo(move_x, move_y)
-                current_x = move_x
-                current_y = move_y
-
-                # Variable delay based on velocity (lower = faster cursor)
-                base_delay = 0.4
-                velocity_factor = min(1.0, v_mag / M_0_current)
-                delay = base_delay * (1.0 - velocity_factor * 0.3) + random.random() * 0.1
-                await asyncio.sleep(max(0.0002, delay / 1000.0))
+        distance = math.hypot(end[0] - start[0], end[1] - start[1])
+        duration_ms = fitts_duration_ms(
+            distance,
+            self.config["targetWidthPx"],
+            self.config["fittsInterceptMs"],
+            self.config["fittsSlopeMs"],
+            self.config["maxMoveMs"]
+        ) / self.playback_speed
+        steps = step_count(duration_ms, self.config["sampleRateHz"])
+        interval = duration_ms / steps / 1000.0
+
+        started = self.clock.monotonic()
+        last = (round(start[0]), round(start[1]))
+        moves = 0
+        for i, (x, y) in enumerate(model.path(start, end, steps), 1):
+            point = (round(x), round(y))
+            if point != last:
+                self.backend.move_to(*point)
+                last = point
+                moves += 1
+            # Sleep to an absolute schedule so the move cannot take longer than planned
+            delay = started + i * interval - self.clock.monotonic()
+            if delay > 0:
+                await self.clock.sleep(delay)
+            if not self.is_playing:
+                return moves
 
         # Ensure final position is exact
-        pyautogui.moveTo(int(dest_x), int(dest_y))
+        if last != (int(end[0]), int(end[1])):
+            self.backend.move_to(int(end[0]), int(end[1]))
+            moves += 1
+        return moves
+
+    async def wait_until_ready(self, action: MouseAction) -> Optional[bool]:
+        """
+        Wait until the screen around the click target matches the signature
+        captured when it was recorded. Returns None if the action has no
+        signature (or waiting is disabled), else whether it matched in time.
+        """
+        signature = action.get('signature')
+        if not signature or not self.config["waitForUi"]:
+            return None
+
+        deadline = self.clock.monotonic() + self.config["readyTimeoutMs"] / 1000.0
+        while self.is_playing:
+            current = self.backend.signature_at(action['x'], action['y'], signature['size'])
+            if signatures_match(signature, current, self.config["maxHashDistance"]):
+                return True
+            if self.clock.monotonic() >= deadline:
+                return False
+            await self.clock.sleep(self.config["pollIntervalMs"] / 1000.0)
+        return False
 
     async def play_actions(self, actions: List[MouseAction]) -> None:
         """Apply user preferences"""
@@ -106,61 +123,103 @@ class ActionPlayer:
         if not actions or len(actions) == 0:
             return
 
+        if self.backend is None:
+            raise RuntimeError('pyautogui not available')
+
         self.is_playing = True
+        started = self.clock.monotonic()
+        stats = {'actions': 0, 'gated': 0, 'readyTimeouts': 0, 'waitedMs': 0.0, 'moves': 0}
+        timeline: List[Dict[str, Any]] = []
+        model = create_configured_motion_model(
+            self.config["motionModel"],
+            self.config["motionParams"],
+            self.config["motionProfile"],
+            self.config["motionProfilesPath"]
+        )
 
         try:
-            # Filter to only process clicks
-            click_actions = [a for a in actions if a.get('type') in ('click', 'doubleclick')]
+            # Only clicks are replayed, in time order
+            sorted_actions = compile_plan(actions, self.topology)
+            if not self.topology:
+                stats['assumedPrimary'] = len(assumed_primary(sorted_actions))
 
-            if len(click_actions) == 0:
+            if len(sorted_actions) == 0:
                 return
 
-            # Sort actions by time
-            sorted_actions = sorted(click_actions, key=lambda a: a.get('time', 0))
-
             previous_time = 0
 
             for action in sorted_actions:
                 if not self.is_playing:
                     break
 
-                delay = action.get('time', 0) - previous_time
+                action_started = self.clock.monotonic()
+                entry = {'type': action.get('type'), 'x': action['x'], 'y': action['y'],
+                         'atMs': round((action_started - started) * 1000, 1), 'moves': 0}
+                timeline.append(entry)
+
+                # Actions with a pixel signature wait for the UI instead of the recorded think-time
+                gated = bool(action.get('signature')) and self.config["waitForUi"]
+                delay = 0 if gated else action.get('time', 0) - previous_time
                 if delay > 0:
                     wait_ms = delay / self.playback_speed
                     chunk = 50
                     left = wait_ms
                     while left > 0 and self.is_playing:
-                        await asyncio.sleep(min(chunk, left) / 1000.0)
+                        await self.clock.sleep(min(chunk, left) / 1000.0)
                         left -= chunk
+                entry['delayMs'] = round((self.clock.monotonic() - action_started) * 1000, 1)
                 if not self.is_playing:
                     break
 
                 # Move directly to the recorded click position (no center/top waypoints)
-                current_pos = pyautogui.position()
-                if current_pos.x != action['x'] or current_pos.y != action['y']:
-                    await self.wind_mouse(current_pos.x, current_pos.y, action['x'], action['y'])
+                move_started = self.clock.monotonic()
+                current_x, current_y = self.backend.position()
+                if current_x != action['x'] or current_y != action['y']:
+                    entry['moves'] = await self.move_cursor((current_x, current_y), (action['x'], action['y']), model)
+                    stats['moves'] += entry['moves']
+                entry['moveMs'] = round((self.clock.monotonic() - move_started) * 1000, 1)
+                if not self.is_playing:
+                    break
+
+                # Hovering the target like at recording time, wait for it to look the same
+                wait_started = self.clock.monotonic()
+                ready = await self.wait_until_ready(action)
+                entry['waitMs'] = round((self.clock.monotonic() - wait_started) * 1000, 1)
+                if ready is not None:
+                    stats['gated'] += 1
+                    stats['waitedMs'] += entry['waitMs']
+                    if not ready and self.is_playing:
+                        stats['readyTimeouts'] += 1
+                        print(f'[ActionPlayer] Target at ({action["x"]}, {action["y"]}) not ready after '
+                              f'{self.config["readyTimeoutMs"]}ms, clicking anyway')
                 if not self.is_playing:
                     break
 
                 # Small random delay before click
-                await asyncio.sleep(random.random() * 0.01 + 0.005)
+                await self.clock.sleep(random.random() * 0.01 + 0.005)
                 if not self.is_playing:
                     break
 
                 # Execute the click
                 button = action.get('button', 'left')
                 if action.get('type') == 'click':
-                    pyautogui.click(action['x'], action['y'], button=button)
+                    self.backend.click(action['x'], action['y'], button=button)
                 elif action.get('type') == 'doubleclick':
-                    pyautogui.click(action['x'], action['y'], button=button)
-                    await asyncio.sleep(random.random() * 0.03 + 0.03)
-                    pyautogui.click(action['x'], action['y'], button=button)
+                    self.backend.click(action['x'], action['y'], button=button)
+                    await self.clock.sleep(random.random() * 0.03 + 0.03)
+                    self.backend.click(action['x'], action['y'], button=button)
 
+                stats['actions'] += 1
+                entry['totalMs'] = round((self.clock.monotonic() - action_started) * 1000, 1)
                 previous_time = action.get('time', 0)
         except Exception as e:
             raise e
         finally:
             self.is_playing = False
+            stats['durationMs'] = round((self.clock.monotonic() - started) * 1000, 1)
+            stats['waitedMs'] = round(stats['waitedMs'], 1)
+            self.last_stats = stats
+            self.last_timeline = timeline
 
     def stop(self) -> None:
         """Stop execution (if in progress)"""
@@ -173,3 +232,94 @@ class ActionPlayer:
     def set_playback_speed(self, speed: float) -> None:
         """Set execution speed multiplier"""
         self.playback_speed = max(0.1, min(5.0, speed))
+
+
+async def dry_run(actions: List[MouseAction], config: ReplayConfig, screen: Tuple[int, int],
+                  seed: int = 0) -> Dict[str, Any]:
+    """
+    Play a recording against a virtual cursor and clock, with the same
+    scheduling and motion code as live replay, and report how long it would
+    take. Targets are assumed to look ready at once; worstCaseMs adds the
+    ready timeout for every gated action.
+    """
+    plan = compile_plan(actions)
+    width, height = screen
+    backend = DryRunBackend(width, height, {(a['x'], a['y']): a['signature'] for a in plan if a.get('signature')})
+    player = ActionPlayer(config, backend, VirtualClock())
+    player.set_playback_speed(config["playbackSpeed"])
+
+    # Jitter and wind are random; a fixed seed makes reports reproducible
+    state = random.getstate()
+    random.seed(seed)
+    try:
+        await player.play_actions(actions)
+    finally:
+        random.setstate(state)
+
+    stats = player.last_stats
+    return {
+        **stats,
+        'worstCaseMs': round(stats.get('durationMs', 0) + stats.get('gated', 0) * config["readyTimeoutMs"], 1),
+        'offScreenTargets': [(a['x'], a['y']) for a in plan if not (0 <= a['x'] < width and 0 <= a['y'] < height)],
+        'offScreenMoves': len(backend.out_of_bounds),
+        # A dry run has no display layout
+        'assumedPrimaryTargets': assumed_primary(plan),
+        'timeline': player.last_timeline,
+    }
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+    import sys
+    from pathlib import Path
+    from .config import find_config_path, read_config
+    parser = argparse.ArgumentParser(description='Dry-run a recording and estimate its replay duration')
+    parser.add_argument('recordings', nargs='*', type=Path, default=[Path('user-prefs.json')])
+    parser.add_argument('--screen', default='1920x1080', help='screen size the kiosks run at')
+    parser.add_argument('--max-ms', type=float, default=0,
+                        help='fail if the predicted duration exceeds this (0 = no limit)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help='print the reports as JSON')
+    args = parser.parse_args()
+
+    config_path = find_config_path()
+    replay = read_config(config_path)["replay"] if config_path.exists() else dict(default_config["replay"])
+    screen = tuple(int(v) for v in args.screen.lower().split('x'))
+
+    # Exit code: 0 ok, 1 off-screen targets or too slow, 2 unreadable recording
+    exit_code = 0
+    for path in args.recordings:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                recording = json.load(f)
+        except Exception as e:
+            print(f'{path}: {e}')
+            exit_code = 2
+            continue
+
+        report = asyncio.run(dry_run(recording, replay, screen, args.seed))
+        failed = bool(report['offScreenTargets']) or (args.max_ms > 0 and report['durationMs'] > args.max_ms)
+        if failed:
+            exit_code = max(exit_code, 1)
+
+        if args.json:
+            print(json.dumps({'recording': str(path), 'ok': not failed, **report}))
+            continue
+        print(f'{path}: {report["actions"]} actions, predicted {report["durationMs"] / 1000:.2f}s '
+              f'(worst case {report["worstCaseMs"] / 1000:.2f}s), {report["moves"]} cursor moves, '
+              f'{report["gated"]} gated')
+        for i, entry in enumerate(report['timeline'], 1):
+            print(f'  {i:3d} {entry["type"]:<11} ({entry["x"]}, {entry["y"]}) at {entry["atMs"]:.0f}ms: '
+                  f'delay {entry.get("delayMs", 0):.0f} move {entry.get("moveMs", 0):.0f} '
+                  f'wait {entry.get("waitMs", 0):.0f} total {entry.get("totalMs", 0):.0f}ms, '
+                  f'{entry["moves"]} moves')
+        for x, y in report['offScreenTargets']:
+            print(f'  target ({x}, {y}) is off a {screen[0]}x{screen[1]} screen')
+        for monitor, x, y in report['assumedPrimaryTargets']:
+            print(f'  target ({x}, {y}) was recorded on monitor {monitor}, placed on the primary monitor')
+        if report['offScreenMoves']:
+            print(f'  {report["offScreenMoves"]} cursor positions left the screen on the way')
+        if args.max_ms > 0 and report['durationMs'] > args.max_ms:
+            print(f'  predicted duration exceeds {args.max_ms:.0f}ms')
+    sys.exit(exit_code)
@@ -2,10 +2,17 @@
 User preferences handler - Records mouse clicks for replay
 """
 
+import asyncio
 import json
 from pathlib import Path
 from typing import Optional, List, Dict, Literal
-from pynput import mouse
+try:
+    from pynput import mouse
+except Exception as e:
+    print(f'[ActionRecorder] Warning: pynput not available, capture disabled: {e}')
+    mouse = None
+from .screen_backend import ScreenBackend, create_screen_backend
+from .display_topology import DisplayTopology
 
 
 MouseAction = Dict[str, any]  # type: ignore
@@ -14,11 +21,19 @@ MouseAction = Dict[str, any]  # type: ignore
 class ActionRecorder:
     """Records mouse clicks for replay"""
 
-    def __init__(self):
+    def __init__(self, signature_size: int = 24, backend: Optional[ScreenBackend] = None,
+                 topology: Optional[DisplayTopology] = None):
+        # Side of the square captured around each click target (0 = none)
+        self.signature_size = signature_size
+        self.backend = backend or create_screen_backend()
+        # With a topology, clicks are stored relative to their monitor
+        self.topology = topology
         self.recording: List[MouseAction] = []
         self.start_time: float = 0.0
         self._is_recording: bool = False
-        self.listener: Optional[mouse.Listener] = None
+        self.listener: Optional['mouse.Listener'] = None
+        # Clicks are handed to this loop, so the capture does not run in the input hook
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
         self.recording_path = Path.cwd() / 'user-prefs.json'
 
     @property
@@ -31,24 +46,29 @@ class ActionRecorder:
         """Set recording state"""
         self._is_recording = value
 
-    def start_recording(self) -> None:
-        """Start capturing input"""
+    def start_recording(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """Start capturing input; clicks are recorded on loop if given"""
         if self.is_recording:
             return
 
+        if mouse is None:
+            print('[ActionRecorder] Cannot capture: pynput not available')
+            return
+
         self.recording = []
         import time
         self.start_time = time.time()
+        self.loop = loop
         self._is_recording = True
 
-        def on_click(x: float, y: float, button: mouse.Button, pressed: bool) -> None:
+        def on_click(x: float, y: float, button: 'mouse.Button', pressed: bool) -> None:
             if not self.is_recording or not pressed:
                 return
 
             button_str = 'left' if button == mouse.Button.left else \
                         'right' if button == mouse.Button.right else 'middle'
 
-            self.record_click(int(x), int(y), button_str, 'click')
+            self.on_listener_click(int(x), int(y), button_str)
 
         self.listener = mouse.Listener(on_click=on_click)
         self.listener.start()
@@ -74,6 +94,17 @@ class ActionRecorder:
         except Exception:
             return False
 
+    def on_listener_click(self, x: int, y: int, button: Literal['left', 'right', 'middle']) -> None:
+        """
+        Called on the mouse listener thread. Capturing the signature there
+        would hold up the system's input hook (and with it every click), so
+        the click is recorded on the event loop instead.
+        """
+        if self.loop and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.record_click, x, y, button, 'click')
+        else:
+            self.record_click(x, y, button, 'click')
+
     def has_recording(self) -> bool:
         """Check if preferences exist"""
         return self.recording_path.exists()
@@ -120,4 +151,14 @@ class ActionRecorder:
             'button': button
         }
 
+        # What the target looked like, so replay can wait until the UI is ready
+        if self.backend and self.signature_size > 0:
+            signature = self.backend.signature_at(x, y, self.signature_size)
+            if signature:
+                click_action['signature'] = signature
+
+        if self.topology:
+            monitor, click_action['x'], click_action['y'] = self.topology.to_relative(x, y)
+            click_action['monitor'] = monitor
+
         self.recording.append(click_action)
@@ -0,0 +1,208 @@
+"""
+Zoom Kiosk - Adaptive Timeouts
+
+Learns how long the auth, join and share phases take on this kiosk and
+derives per-phase timeouts from a high percentile of the observed
+latencies. Samples are persisted so learned values survive restarts;
+new samples only mark the store dirty and are written a few seconds later
+in a worker thread, and once more at shutdown (flush).
+"""
+
+import asyncio
+import json
+import math
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from .config import TimeoutsConfig
+from .clock import Clock, SYSTEM_CLOCK
+
+
+class Phase:
+    # Reported by ZoomService's 'phase' event only; no timeout is learned for it
+    INIT = 'init'
+    AUTH = 'auth'
+    JOIN = 'join'
+    SHARE = 'share'
+
+
+# Per-phase (default, floor, ceiling) in milliseconds.
+# The default is used until enough samples have been observed.
+PHASE_LIMITS: Dict[str, Tuple[float, float, float]] = {
+    Phase.AUTH: (10000, 3000, 30000),
+    Phase.JOIN: (20000, 5000, 60000),
+    Phase.SHARE: (3000, 500, 10000),
+}
+
+# Bounds for the delay before re-initializing after a failed auth
+RETRY_DELAY_FLOOR_MS = 1000
+RETRY_DELAY_CEILING_MS = 5000
+
+# Delay between the first unsaved sample and writing the store
+SAVE_DELAY_S = 5.0
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples"""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class AdaptiveTimeouts:
+    """Records phase latencies and derives timeouts from them"""
+
+    def __init__(self, config: TimeoutsConfig, store_path: Optional[Path] = None,
+                 clock: Clock = SYSTEM_CLOCK):
+        self.config = config
+        self.clock = clock
+        self.store_path = store_path or (Path(config["storePath"]) if config["storePath"]
+                                         else Path.cwd() / 'phase-timings.json')
+        self.samples: Dict[str, List[float]] = {phase: [] for phase in PHASE_LIMITS}
+        self._started: Dict[str, float] = {}
+        self.dirty = False
+        self._save_handle: Optional[asyncio.TimerHandle] = None
+        self.pending_write: Optional[asyncio.Future] = None
+        # Background and shutdown writes share the temp file
+        self._write_lock = threading.Lock()
+        self.load()
+
+    def start(self, phase: str) -> None:
+        """Mark the start of a phase"""
+        self._started[phase] = self.clock.monotonic()
+
+    def finish(self, phase: str) -> Optional[float]:
+        """Mark the successful end of a phase and record its latency"""
+        started = self._started.pop(phase, None)
+        if started is None:
+            return None
+        duration_ms = (self.clock.monotonic() - started) * 1000
+        self.record(phase, duration_ms)
+        return duration_ms
+
+    def cancel(self, phase: str) -> None:
+        """Forget a phase start without recording anything"""
+        self._started.pop(phase, None)
+
+    def record_timeout(self, phase: str) -> None:
+        """
+        Record that a phase timed out. The timeout is stored as a (censored)
+        sample so a site that is slower than the learned timeout pushes the
+        timeout up instead of timing out forever.
+        """
+        self._started.pop(phase, None)
+        self.record(phase, self.get_timeout_ms(phase))
+
+    def record(self, phase: str, duration_ms: float) -> None:
+        """Record an observed phase latency"""
+        if phase not in self.samples:
+            return
+        history = self.samples[phase]
+        history.append(round(duration_ms, 1))
+        del history[:-self.config["historySize"]]
+        self._mark_dirty()
+
+    def seed(self, samples: Dict[str, List[float]]) -> None:
+        """Adopt samples (e.g. from a session checkpoint) for phases still lacking history"""
+        seeded = False
+        for phase, history in samples.items():
+            if phase in self.samples and len(self.samples[phase]) < self.config["minSamples"] and history:
+                self.samples[phase] = [float(v) for v in history][-self.config["historySize"]:]
+                seeded = True
+        if seeded:
+            self._mark_dirty()
+
+    def get_timeout_ms(self, phase: str) -> float:
+        """Get the timeout for a phase in milliseconds"""
+        default, floor, ceiling = PHASE_LIMITS[phase]
+        history = self.samples.get(phase, [])
+        if len(history) < self.config["minSamples"]:
+            return default
+        learned = percentile(history, self.config["percentile"]) * self.config["margin"]
+        return max(floor, min(ceiling, learned))
+
+    def get_timeout(self, phase: str) -> float:
+        """Get the timeout for a phase in seconds"""
+        return self.get_timeout_ms(phase) / 1000.0
+
+    def get_retry_delay(self, phase: str) -> float:
+        """Get the delay in seconds before retrying a failed phase"""
+        history = self.samples.get(phase, [])
+        if len(history) < self.config["minSamples"]:
+            return RETRY_DELAY_CEILING_MS / 1000.0
+        typical = percentile(history, 50)
+        return max(RETRY_DELAY_FLOOR_MS, min(RETRY_DELAY_CEILING_MS, typical)) / 1000.0
+
+    def load(self) -> None:
+        """Load persisted samples"""
+        try:
+            if not self.store_path.exists():
+                return
+            with open(self.store_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for phase, history in data.get('phases', {}).items():
+                if phase in self.samples:
+                    self.samples[phase] = [float(v) for v in history][-self.config["historySize"]:]
+        except Exception as e:
+            print(f'[AdaptiveTimeouts] Could not load {self.store_path}: {e}')
+
+    def _mark_dirty(self) -> None:
+        self.dirty = True
+        if self._save_handle:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop to stall (tools, tests): write now
+            self.flush()
+            return
+        self._save_handle = loop.call_later(SAVE_DELAY_S, self._save_in_background)
+
+    def _save_in_background(self) -> None:
+        self._save_handle = None
+        if not self.dirty:
+            return
+        # Serialized on the loop thread, so the worker never sees samples change
+        data = self._serialize()
+        self.dirty = False
+        self.pending_write = asyncio.get_running_loop().run_in_executor(None, self._write, data)
+
+    def flush(self) -> None:
+        """Write unsaved samples now (e.g. at shutdown)"""
+        if self._save_handle:
+            self._save_handle.cancel()
+            self._save_handle = None
+        if self.dirty:
+            self.dirty = False
+            self._write(self._serialize())
+
+    def save(self) -> None:
+        """Persist samples (atomic replace)"""
+        self.dirty = False
+        self._write(self._serialize())
+
+    def _serialize(self) -> str:
+        return json.dumps({'version': 1, 'phases': self.samples})
+
+    def _write(self, data: str) -> None:
+        try:
+            with self._write_lock:
+                # Per-process temp name: supervised kiosks may share one store
+                tmp_path = self.store_path.with_suffix(f'{self.store_path.suffix}.{os.getpid()}.tmp')
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(data)
+                os.replace(tmp_path, self.store_path)
+        except Exception as e:
+            print(f'[AdaptiveTimeouts] Could not save {self.store_path}: {e}')
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """Get current timeouts and sample counts per phase"""
+        return {
+            phase: {
+                'samples': len(history),
+                'timeoutMs': round(self.get_timeout_ms(phase), 1),
+                'p50Ms': round(percentile(history, 50), 1) if history else 0.0,
+            }
+            for phase, history in self.samples.items()
+        }
@@ -0,0 +1,315 @@
+"""
+Zoom Kiosk - Callback Trace
+
+Records every SDK callback that reaches ZoomService (auth result,
+meeting status, user join/left, sharing status, network quality and
+statistics warnings) with its arrival time
+and arguments, one compact JSON array per line:
+
+    [1234.5, "status", [3, 0]]
+
+A "service" line marks each new ZoomService instance; "self" and
+"participants" record the local user id and who is already there once
+in a meeting. A trace that grows past maxBytes, or
+one left by the previous run, is moved to <path>.1; a trace started by
+rotation repeats these lines first, so it can be replayed on its own.
+
+Traces can be replayed into a fresh ZoomService on the simulated SDK, in
+real time or in virtual time (same ordering and spacing, no waiting), to
+reproduce production callback orderings and to benchmark the handlers.
+"""
+
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, IO, List, Optional
+from .clock import Clock, SYSTEM_CLOCK
+from .config import CallbackTraceConfig, KioskConfig
+
+TRACE_VERSION = 1
+
+# Meeting status value for "in meeting" (same in the SDK and the simulator)
+STATUS_INMEETING = 3
+
+
+def _encode(value: Any) -> Any:
+    """Reduce an SDK callback argument to plain JSON"""
+    if value is None or isinstance(value, (bool, str, float)):
+        return value
+    if isinstance(value, int):
+        return int(value)
+    if hasattr(value, 'GetCount') and hasattr(value, 'GetItem'):
+        return [int(value.GetItem(i)) for i in range(value.GetCount())]
+    if isinstance(value, (list, tuple)):
+        return [_encode(item) for item in value]
+    if hasattr(value, 'status'):
+        return {'userid': int(getattr(value, 'userid', 0)), 'status': int(value.status)}
+    return str(value)
+
+
+class CallbackTraceRecorder:
+    """Appends SDK callbacks to a trace file"""
+
+    def __init__(self, config: CallbackTraceConfig, path: Optional[Path] = None, clock: Clock = SYSTEM_CLOCK):
+        self.config = config
+        self.path = path or (Path(config["path"]) if config["path"]
+                             else Path.cwd() / 'callback-trace.jsonl')
+        self.clock = clock
+        self.started = clock.monotonic()
+        self.service: Optional[Any] = None
+        self.events = 0
+        self._file: Optional[IO] = None
+        self._rotating = False
+        self._open()
+
+    def _open(self) -> None:
+        try:
+            if self.events == 0 and self.path.exists() and self.path.stat().st_size > 0:
+                # Keep the previous run's trace (e.g. the one that ended in a crash)
+                os.replace(self.path, self._rotated_path())
+            self._file = open(self.path, 'w', encoding='utf-8')
+            self._file.write(json.dumps({'version': TRACE_VERSION, 'pid': os.getpid(), 'startedAt': time.time()}) + '\n')
+            self._file.flush()
+            self.started = self.clock.monotonic()
+            print(f'[CallbackTrace] Recording SDK callbacks to {self.path}')
+        except OSError as e:
+            print(f'[CallbackTrace] Could not open {self.path}: {e}')
+            self._file = None
+
+    def _write(self, name: str, args: List[Any]) -> None:
+        if not self._file:
+            return
+        elapsed_ms = round((self.clock.monotonic() - self.started) * 1000, 1)
+        try:
+            self._file.write(json.dumps([elapsed_ms, name, args], separators=(',', ':')) + '\n')
+            # Flushed per line so the trace survives a crash
+            self._file.flush()
+            self.events += 1
+            if self._file.tell() >= self.config["maxBytes"] and not self._rotating:
+                self._rotate()
+        except (OSError, TypeError, ValueError) as e:
+            print(f'[CallbackTrace] Stopped recording: {e}')
+            self.close()
+
+    def _rotated_path(self) -> Path:
+        return self.path.with_suffix(f'{self.path.suffix}.1')
+
+    def _rotate(self) -> None:
+        self.close()
+        os.replace(self.path, self._rotated_path())
+        self._open()
+        # Replays skip everything before a service line; restate where the kiosk is
+        self._rotating = True
+        try:
+            if self.service:
+                self._write('service', [])
+                if getattr(self.service, 'is_in_meeting', False):
+                    self._write_meeting()
+        finally:
+            self._rotating = False
+
+    def attach(self, service: Any) -> None:
+        """Start tracing a new ZoomService instance"""
+        self.service = service
+        self._write('service', [])
+
+    def record(self, name: str, *args: Any) -> None:
+        """Record one callback as it arrives"""
+        if name == 'status' and args and args[0] == STATUS_INMEETING:
+            self._write_meeting()
+        self._write(name, [_encode(arg) for arg in args])
+
+    def _write_meeting(self) -> None:
+        """
+        Replays need to know which participant is the kiosk itself and who
+        was already in the meeting (no join callbacks are fired for them)
+        """
+        ctrl = self.service.participants_ctrl if self.service else None
+        if not ctrl:
+            return
+        # Tracing must never break the callback it records
+        try:
+            myself = ctrl.GetMySelfUser()
+            if myself:
+                self._write('self', [int(myself.GetUserID())])
+        except Exception as e:
+            print(f'[CallbackTrace] Could not get the local user: {e}')
+        try:
+            self._write('participants', [_encode(ctrl.GetParticipantsList())])
+        except Exception as e:
+            print(f'[CallbackTrace] Could not get the participants: {e}')
+
+    def close(self) -> None:
+        """Stop recording"""
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+def load_trace(path: Path) -> List[List[Any]]:
+    """Read a trace file: the events after the header line"""
+    with open(path, 'r', encoding='utf-8') as f:
+        header = json.loads(f.readline())
+        if header.get('version') != TRACE_VERSION:
+            raise ValueError(f'unsupported trace version {header.get("version")}')
+        return [json.loads(line) for line in f if line.strip()]
+
+
+async def replay_trace(events: List[List[Any]], config: KioskConfig, speed: float = 1.0,
+                       burst: bool = False) -> Dict[str, Any]:
+    """
+    Feed a trace into ZoomService instances running on the simulated SDK.
+    The simulator is muted, so the only callbacks are the ones in the trace;
+    its meeting state is kept in step with the trace so SDK queries made by
+    the handlers (participants, myself) answer as they did in production.
+    Events are spaced as recorded, divided by speed; burst delivers them
+    back to back to measure handler throughput.
+    """
+    from . import simulated_sdk
+    from .zoom_service import ZoomService, get_sdk
+    if get_sdk() is not simulated_sdk:
+        raise RuntimeError('trace replay needs the simulated SDK (ZOOM_KIOSK_SDK=simulated)')
+
+    simulated_sdk.simulator = simulator = simulated_sdk.Simulator()
+    simulator.mute_callbacks = True
+    self_user_id = simulated_sdk.Simulator.SELF_USER_ID
+
+    service: Optional[ZoomService] = None
+    emitted: Dict[str, int] = {}
+    handler_s: Dict[str, float] = {}
+    counts: Dict[str, int] = {}
+    max_handler_s = 0.0
+    started = SYSTEM_CLOCK.monotonic()
+    real_started = time.perf_counter()
+
+    def count_emit(event: str):
+        return lambda *args: emitted.__setitem__(event, emitted.get(event, 0) + 1)
+
+    try:
+        for at_ms, name, args in events:
+            if not burst:
+                delay = started + at_ms / 1000.0 / speed - SYSTEM_CLOCK.monotonic()
+                if delay > 0:
+                    await SYSTEM_CLOCK.sleep(delay)
+
+            if name == 'service':
+                if service:
+                    service.stop_upgrade()
+                service = ZoomService(config)
+                for event in service._callbacks:
+                    service.on(event, count_emit(event))
+                # As KioskApp does: join once authenticated
+                service.on('initialized', lambda s=service: asyncio.create_task(s.start_meeting()))
+                if burst:
+                    await service.initialize()
+                else:
+                    asyncio.create_task(service.initialize())
+                    await asyncio.sleep(0)
+                continue
+            if name == 'self':
+                simulated_sdk.Simulator.SELF_USER_ID = args[0]
+                continue
+            if name == 'participants':
+                simulator.participants = [uid for uid in args[0] or []
+                                          if uid != simulated_sdk.Simulator.SELF_USER_ID]
+                continue
+            if service is None:
+                continue
+
+            # Keep the simulator's meeting state in step with the trace
+            if name == 'status':
+                simulator.status = simulated_sdk.MeetingStatus(args[0])
+                if args[0] in (simulated_sdk.MeetingStatus.MEETING_STATUS_FAILED,
+                               simulated_sdk.MeetingStatus.MEETING_STATUS_ENDED):
+                    simulator.participants = []
+                    simulator.is_sharing = False
+            elif name == 'userJoin':
+                simulator.participants += [uid for uid in args[0] or []
+                                           if uid != simulated_sdk.Simulator.SELF_USER_ID
+                                           and uid not in simulator.participants]
+            elif name == 'userLeft':
+                simulator.participants = [uid for uid in simulator.participants if uid not in (args[0] or [])]
+            elif name == 'share':
+                share = args[0] or {}
+                if share.get('userid') == simulated_sdk.Simulator.SELF_USER_ID:
+                    simulator.is_sharing = share.get('status') == simulated_sdk.SharingStatus.Sharing_Self_Send_Begin
+                args = [simulated_sdk.ZoomSDKSharingSourceInfo(share.get('userid', 0),
+                                                               simulated_sdk.SharingStatus(share.get('status', 0)))]
+
+            handler = {
+                'auth': service._on_auth_result,
+                'status': service._on_meeting_status_changed,
+                'userJoin': service._on_user_join,
+                'userLeft': service._on_user_left,
+                'share': service._on_sharing_status_changed,
+                'network': service._on_network_status_changed,
+                'statsWarning': service._on_statistics_warning,
+            }.get(name)
+            if handler is None:
+                continue
+            handler_started = time.perf_counter()
+            try:
+                handler(*args)
+            except Exception as e:
+                print(f'[CallbackTrace] Handler for {name} raised: {e}')
+            elapsed = time.perf_counter() - handler_started
+            counts[name] = counts.get(name, 0) + 1
+            handler_s[name] = handler_s.get(name, 0.0) + elapsed
+            max_handler_s = max(max_handler_s, elapsed)
+            # Let tasks started by the handler run, as the message pump would
+            await asyncio.sleep(0)
+
+        handled = sum(counts.values())
+        real_s = time.perf_counter() - real_started
+        return {
+            'events': len(events),
+            'handled': handled,
+            'callbacks': counts,
+            'handlerMeanUs': {name: round(handler_s[name] / counts[name] * 1e6, 1) for name in counts},
+            'handlerMaxUs': round(max_handler_s * 1e6, 1),
+            'handlerThroughput': round(handled / sum(handler_s.values())) if handler_s else 0,
+            'emitted': emitted,
+            'traceMs': events[-1][0] if events else 0,
+            'replayMs': round((SYSTEM_CLOCK.monotonic() - started) * 1000, 1),
+            'realMs': round(real_s * 1000, 1),
+            'final': {
+                'inMeeting': bool(service and service.is_in_meeting),
+                'sharing': bool(service and service.is_sharing),
+                'participants': service.participant_count if service else 0,
+                'status': service.current_status if service else '',
+            },
+        }
+    finally:
+        if service:
+            service.stop_upgrade()
+        simulated_sdk.Simulator.SELF_USER_ID = self_user_id
+
+
+if __name__ == '__main__':
+    import argparse
+    import contextlib
+    import io
+    from .clock import run_virtual
+    parser = argparse.ArgumentParser(description='Replay a recorded SDK callback trace into ZoomService')
+    parser.add_argument('trace', type=Path, nargs='?', default=Path('callback-trace.jsonl'))
+    parser.add_argument('--speed', type=float, default=1.0, help='real-time speed factor')
+    parser.add_argument('--fast', action='store_true',
+                        help='replay in virtual time: recorded spacing, no waiting')
+    parser.add_argument('--burst', action='store_true',
+                        help='deliver callbacks back to back to benchmark the handlers')
+    parser.add_argument('--quiet', action='store_true', help='hide the service log')
+    args = parser.parse_args()
+
+    # Must be chosen before the Zoom service is imported
+    os.environ['ZOOM_KIOSK_SDK'] = 'simulated'
+    from .config import load_config
+
+    trace = load_trace(args.trace)
+    output = contextlib.redirect_stdout(io.StringIO()) if args.quiet else contextlib.nullcontext()
+    with output:
+        config = load_config()
+        replay = replay_trace(trace, config, args.speed, args.burst)
+        report = run_virtual(replay) if args.fast or args.burst else asyncio.run(replay)
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,121 @@
+"""
+Zoom Kiosk - Clock
+
+Time source for code that waits. The system clock follows the running
+event loop, so everything built on it runs in virtual time on a
+VirtualTimeEventLoop: the loop jumps straight to the next timer whenever
+all tasks are sleeping, and an hour of backoffs and timeouts takes
+milliseconds. VirtualClock is a simpler stand-in for a single task that
+owns all the waiting (replay dry runs).
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable, TypeVar
+
+T = TypeVar('T')
+
+
+class Clock:
+    """Monotonic time and sleeping, in seconds"""
+
+    def monotonic(self) -> float:
+        try:
+            return asyncio.get_running_loop().time()
+        except RuntimeError:
+            return time.monotonic()
+
+    async def sleep(self, seconds: float) -> None:
+        await asyncio.sleep(seconds)
+
+
+class VirtualClock(Clock):
+    """
+    Time only moves when the owner sleeps: sleep advances the clock at once
+    and just yields to the event loop. Suits a single task being simulated.
+    """
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.now += max(0.0, seconds)
+        await asyncio.sleep(0)
+
+
+SYSTEM_CLOCK = Clock()
+
+
+async def wait_until(predicate: Callable[[], bool], timeout: float, interval: float = 0.5,
+                     clock: Clock = SYSTEM_CLOCK) -> bool:
+    """Poll predicate every interval seconds; False if it is still false after timeout"""
+    deadline = clock.monotonic() + timeout
+    while not predicate():
+        if clock.monotonic() >= deadline:
+            return False
+        await clock.sleep(interval)
+    return True
+
+
+class _VirtualSelector:
+    """Wraps the loop's selector: instead of blocking until the next timer, skip ahead to it"""
+
+    def __init__(self, selector, loop: 'VirtualTimeEventLoop'):
+        self._selector = selector
+        self._loop = loop
+
+    def select(self, timeout=None):
+        events = self._selector.select(0)
+        if events or timeout == 0:
+            return events
+        if timeout is None:
+            # Nothing scheduled: only I/O or another thread can wake the loop
+            return self._selector.select(None)
+        self._loop.advance(timeout)
+        return []
+
+    def __getattr__(self, name):
+        return getattr(self._selector, name)
+
+
+class VirtualTimeEventLoop(asyncio.SelectorEventLoop):
+    """
+    Event loop whose time() is virtual. Ready callbacks and I/O run as
+    usual; when the loop would otherwise wait for a timer, time advances to
+    it instantly. Work done in other threads still takes real time, so
+    simulated code should not depend on it.
+    """
+
+    def __init__(self, start: float = 0.0):
+        super().__init__()
+        self._virtual_now = start
+        self._selector = _VirtualSelector(self._selector, self)
+
+    def time(self) -> float:
+        return self._virtual_now
+
+    def advance(self, seconds: float) -> None:
+        """Move virtual time forward"""
+        self._virtual_now += max(0.0, seconds)
+
+
+def run_virtual(main: Awaitable[T]) -> T:
+    """Run a coroutine to completion on a fresh VirtualTimeEventLoop"""
+    loop = VirtualTimeEventLoop()
+    try:
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(main)
+    finally:
+        try:
+            # Like asyncio.run: cancel whatever the coroutine left running
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
@@ -4,9 +4,10 @@ Zoom Kiosk - Configuration Module
 Handles loading and validation of configuration from config.json
 """
 
+import copy
 import json
 from pathlib import Path
-from typing import TypedDict, Optional
+from typing import TypedDict, Optional, List, Dict, Any
 import os
 
 
@@ -30,12 +31,207 @@ class RemoteControlConfig(TypedDict):
     enableClipboard: bool
 
 
+class ReplayConfig(TypedDict):
+    playbackSpeed: float
+    # Wait for the recorded pixel signature around each target before clicking
+    waitForUi: bool
+    signatureSize: int
+    readyTimeoutMs: int
+    pollIntervalMs: int
+    maxHashDistance: int
+    # Cursor movement: path model and Fitts' law timing
+    motionModel: str
+    motionParams: Dict[str, Any]
+    # Named profile from motionProfilesPath, overrides motionModel/motionParams
+    motionProfile: str
+    motionProfilesPath: str
+    fittsInterceptMs: float
+    fittsSlopeMs: float
+    targetWidthPx: int
+    maxMoveMs: int
+    sampleRateHz: int
+    # Record clicks relative to the monitor they were made on
+    monitorRelative: bool
+
+
 class RecoveryConfig(TypedDict):
     maxRetries: int
     initialBackoffMs: int
     maxBackoffMs: int
 
 
+class ShareHealthConfig(TypedDict):
+    maxRestartAttempts: int
+    initialBackoffMs: int
+    maxBackoffMs: int
+    tooFrequentBackoffMs: int
+    notShareSenderBackoffMs: int
+    confirmTimeoutMs: int
+
+
+class TimeoutsConfig(TypedDict):
+    percentile: float
+    margin: float
+    minSamples: int
+    historySize: int
+    storePath: str
+
+
+class ReconnectLimiterConfig(TypedDict):
+    type: str
+    maxConcurrent: int
+    lockDir: str
+    coordinatorHost: str
+    coordinatorPort: int
+    acquireTimeoutMs: int
+    pollIntervalMs: int
+
+
+class ReachabilityConfig(TypedDict):
+    enabled: bool
+    targets: List[str]
+    probeIntervalMs: int
+    probeTimeoutMs: int
+    waitForConnectivity: bool
+
+
+class StandbyConfig(TypedDict):
+    heartbeatIntervalMs: int
+    heartbeatTimeoutMs: int
+    failoverAfterRecoveringMs: int
+    respawnBackoffMs: int
+    # Each of the two kiosk processes keeps its state in its own directory below this
+    stateDir: str
+
+
+class StatusBlockConfig(TypedDict):
+    enabled: bool
+    path: str
+    updateIntervalMs: int
+
+
+class FleetConfig(TypedDict):
+    count: int
+    idPrefix: str
+    stateDir: str
+    # Per-kiosk overrides, e.g. [{"id": "lobby", "zoom": {"displayName": "LOBBY"}}]
+    kiosks: List[Dict[str, Any]]
+    heartbeatIntervalMs: int
+    heartbeatTimeoutMs: int
+    restartInitialBackoffMs: int
+    restartMaxBackoffMs: int
+    stableAfterMs: int
+    startStaggerMs: int
+    statusIntervalMs: int
+
+
+class MockUpgradeConfig(TypedDict):
+    enabled: bool
+    initialBackoffMs: int
+    maxBackoffMs: int
+
+
+class CheckpointConfig(TypedDict):
+    enabled: bool
+    path: str
+    resumeWindowMs: int
+    refreshIntervalMs: int
+
+
+class ConfigReloadConfig(TypedDict):
+    enabled: bool
+    pollIntervalMs: int
+    debounceMs: int
+
+
+class CallbackTraceConfig(TypedDict):
+    enabled: bool
+    path: str
+    # Start a new file (keeping one previous) once the trace reaches this size
+    maxBytes: int
+
+
+class NetworkQualityConfig(TypedDict):
+    # Rolling window the quality metrics are computed over
+    windowMs: int
+    # Samples kept per component and direction
+    bufferSize: int
+    # A component is degraded when its time-weighted uplink level over the window falls below this
+    # (SDK ConnectionQuality: 1 very bad, 2 bad, 3 not good, 4 normal, 5 good, 6 excellent)
+    degradedBelow: float
+    # The SDK reports changes only: a level counts once levels have been known this long
+    minSpanMs: int
+    # Re-evaluated this often without new reports
+    recheckMs: int
+
+
+class SharePolicyConfig(TypedDict):
+    enabled: bool
+    # Components whose uplink quality decides (worst mean wins)
+    components: List[str]
+    # Reduce the share below this mean uplink quality, restore at or above restoreAbove
+    reduceBelow: float
+    restoreAbove: float
+    # Minimum time between two switches
+    holdMs: int
+    # Re-evaluated this often without new quality reports
+    recheckMs: int
+    # Settings turned off while reduced
+    dropComputerSound: bool
+    dropStereo: bool
+    dropVideoOptimization: bool
+
+
+class PerfHistoryConfig(TypedDict):
+    enabled: bool
+    # SQLite database; empty for perf-history.sqlite3 in the state directory
+    path: str
+    # Timings are written in one transaction once this many are queued, or every flushIntervalMs
+    batchSize: int
+    flushIntervalMs: int
+    # Raw timings older than this are compacted into daily percentiles
+    rawRetentionDays: int
+    # Daily percentiles and sessions older than this are deleted
+    rollupRetentionDays: int
+
+
+class ControlPlaneConfig(TypedDict):
+    enabled: bool
+    host: str
+    port: int
+    # When set, required as "Authorization: Bearer <token>" (or ?token= for WebSockets)
+    token: str
+    # The status snapshot is also refreshed this often, for metrics that drift without an event
+    snapshotIntervalMs: int
+    # Concurrent event stream (WebSocket) clients
+    maxClients: int
+    # Web page origins (e.g. "http://dashboard.local:8080") allowed to open the event stream
+    allowedOrigins: List[str]
+
+
+class ProfilerConfig(TypedDict):
+    # Start sampling at startup (otherwise F11 or the control plane start it)
+    enabled: bool
+    # Stop after this long when started at startup; 0 runs until stopped or shutdown
+    durationMs: int
+    intervalMs: int
+    # The sampling interval doubles whenever one sample costs more than this share of it
+    maxOverheadPct: float
+    topN: int
+    # Output directory; empty for the state directory
+    path: str
+
+
+class ShutdownConfig(TypedDict):
+    # Longest any one shutdown phase may take before the kiosk moves on without it
+    phaseTimeoutMs: int
+    # Whole shutdown; phases not finished by then are abandoned
+    deadlineMs: int
+    # Exit the process if shutdown is still stuck (e.g. in an SDK call) this long after the deadline
+    forceExit: bool
+    forceExitGraceMs: int
+
+
 class KioskModeConfig(TypedDict):
     showTrayIcon: bool
     minimizeToTray: bool
@@ -45,7 +241,25 @@ class KioskConfig(TypedDict):
     zoom: ZoomConfig
     screen: ScreenConfig
     remoteControl: RemoteControlConfig
+    replay: ReplayConfig
     recovery: RecoveryConfig
+    shareHealth: ShareHealthConfig
+    timeouts: TimeoutsConfig
+    reconnectLimiter: ReconnectLimiterConfig
+    reachability: ReachabilityConfig
+    standby: StandbyConfig
+    statusBlock: StatusBlockConfig
+    checkpoint: CheckpointConfig
+    mockUpgrade: MockUpgradeConfig
+    fleet: FleetConfig
+    configReload: ConfigReloadConfig
+    callbackTrace: CallbackTraceConfig
+    networkQuality: NetworkQualityConfig
+    sharePolicy: SharePolicyConfig
+    perfHistory: PerfHistoryConfig
+    controlPlane: ControlPlaneConfig
+    profiler: ProfilerConfig
+    shutdown: ShutdownConfig
     kiosk: KioskModeConfig
 
 
@@ -68,11 +282,157 @@ default_config: KioskConfig = {
         "autoAccept": True,
         "enableClipboard": True
     },
+    "replay": {
+        "playbackSpeed": 1.0,
+        "waitForUi": True,
+        "signatureSize": 24,
+        "readyTimeoutMs": 5000,
+        "pollIntervalMs": 50,
+        "maxHashDistance": 6,
+        "motionModel": "windmouse",
+        "motionParams": {},
+        "motionProfile": "",
+        "motionProfilesPath": "motion-profiles.json",
+        "fittsInterceptMs": 50,
+        "fittsSlopeMs": 120,
+        "targetWidthPx": 24,
+        "maxMoveMs": 800,
+        "sampleRateHz": 120,
+        "monitorRelative": True
+    },
     "recovery": {
         "maxRetries": 10,
         "initialBackoffMs": 1000,
         "maxBackoffMs": 30000
     },
+    "shareHealth": {
+        "maxRestartAttempts": 5,
+        "initialBackoffMs": 100,
+        "maxBackoffMs": 2000,
+        "tooFrequentBackoffMs": 300,
+        "notShareSenderBackoffMs": 1000,
+        "confirmTimeoutMs": 3000
+    },
+    "timeouts": {
+        "percentile": 95,
+        "margin": 1.5,
+        "minSamples": 5,
+        "historySize": 50,
+        "storePath": ""
+    },
+    "reconnectLimiter": {
+        "type": "none",
+        "maxConcurrent": 2,
+        "lockDir": "",
+        "coordinatorHost": "127.0.0.1",
+        "coordinatorPort": 47800,
+        "acquireTimeoutMs": 60000,
+        "pollIntervalMs": 250
+    },
+    "reachability": {
+        "enabled": True,
+        # Defaults to the SDK web domain used by InitSDK
+        "targets": ["https://www.zoom.us"],
+        "probeIntervalMs": 1000,
+        "probeTimeoutMs": 2000,
+        # Hold a retry (up to recovery.maxBackoffMs) while no target answers
+        "waitForConnectivity": True
+    },
+    "standby": {
+        "heartbeatIntervalMs": 500,
+        "heartbeatTimeoutMs": 3000,
+        "failoverAfterRecoveringMs": 20000,
+        "respawnBackoffMs": 1000,
+        "stateDir": "standby-state"
+    },
+    "statusBlock": {
+        "enabled": True,
+        "path": "",
+        "updateIntervalMs": 250
+    },
+    "checkpoint": {
+        "enabled": True,
+        "path": "",
+        "resumeWindowMs": 120000,
+        "refreshIntervalMs": 15000
+    },
+    "mockUpgrade": {
+        "enabled": True,
+        "initialBackoffMs": 2000,
+        "maxBackoffMs": 60000
+    },
+    "fleet": {
+        "count": 1,
+        "idPrefix": "kiosk",
+        "stateDir": "fleet-state",
+        "kiosks": [],
+        "heartbeatIntervalMs": 1000,
+        "heartbeatTimeoutMs": 5000,
+        "restartInitialBackoffMs": 1000,
+        "restartMaxBackoffMs": 60000,
+        "stableAfterMs": 60000,
+        "startStaggerMs": 100,
+        "statusIntervalMs": 5000
+    },
+    "configReload": {
+        "enabled": True,
+        "pollIntervalMs": 1000,
+        "debounceMs": 500
+    },
+    "callbackTrace": {
+        "enabled": False,
+        "path": "",
+        "maxBytes": 10485760
+    },
+    "networkQuality": {
+        "windowMs": 60000,
+        "bufferSize": 64,
+        "degradedBelow": 3.0,
+        "minSpanMs": 10000,
+        "recheckMs": 5000
+    },
+    "sharePolicy": {
+        "enabled": True,
+        "components": ["share", "audio"],
+        "reduceBelow": 3.0,
+        "restoreAbove": 4.0,
+        "holdMs": 30000,
+        "recheckMs": 5000,
+        "dropComputerSound": True,
+        "dropStereo": True,
+        "dropVideoOptimization": True
+    },
+    "perfHistory": {
+        "enabled": True,
+        "path": "",
+        "batchSize": 50,
+        "flushIntervalMs": 2000,
+        "rawRetentionDays": 30,
+        "rollupRetentionDays": 365
+    },
+    "controlPlane": {
+        "enabled": False,
+        "host": "127.0.0.1",
+        "port": 8765,
+        "token": "",
+        "snapshotIntervalMs": 1000,
+        "maxClients": 16,
+        "allowedOrigins": []
+    },
+    "profiler": {
+        "enabled": False,
+        "durationMs": 0,
+        "intervalMs": 10,
+        "maxOverheadPct": 3.0,
+        "topN": 25,
+        "path": ""
+    },
+    "shutdown": {
+        "phaseTimeoutMs": 3000,
+        "deadlineMs": 10000,
+        "forceExit": True,
+        "forceExitGraceMs": 2000
+    },
     "kiosk": {
         "showTrayIcon": True,
         "minimizeToTray": True
@@ -97,31 +457,66 @@ def find_config_path() -> Path:
     return possible_paths[0]
 
 
+def read_config(config_path: Path) -> KioskConfig:
+    """Read, merge with defaults and validate a config file. Raises on errors."""
+    with open(config_path, 'r', encoding='utf-8') as f:
+        user_config = json.load(f)
+
+    # Deep merge with defaults
+    config: KioskConfig = {
+        "zoom": {**default_config["zoom"], **(user_config.get("zoom", {}))},
+        "screen": {**default_config["screen"], **(user_config.get("screen", {}))},
+        "remoteControl": {**default_config["remoteControl"], **(user_config.get("remoteControl", {}))},
+        "replay": {**default_config["replay"], **(user_config.get("replay", {}))},
+        "recovery": {**default_config["recovery"], **(user_config.get("recovery", {}))},
+        "shareHealth": {**default_config["shareHealth"], **(user_config.get("shareHealth", {}))},
+        "timeouts": {**default_config["timeouts"], **(user_config.get("timeouts", {}))},
+        "reconnectLimiter": {**default_config["reconnectLimiter"], **(user_config.get("reconnectLimiter", {}))},
+        "reachability": {**default_config["reachability"], **(user_config.get("reachability", {}))},
+        "standby": {**default_config["standby"], **(user_config.get("standby", {}))},
+        "statusBlock": {**default_config["statusBlock"], **(user_config.get("statusBlock", {}))},
+        "checkpoint": {**default_config["checkpoint"], **(user_config.get("checkpoint", {}))},
+        "mockUpgrade": {**default_config["mockUpgrade"], **(user_config.get("mockUpgrade", {}))},
+        "fleet": {**default_config["fleet"], **(user_config.get("fleet", {}))},
+        "configReload": {**default_config["configReload"], **(user_config.get("configReload", {}))},
+        "callbackTrace": {**default_config["callbackTrace"], **(user_config.get("callbackTrace", {}))},
+        "networkQuality": {**default_config["networkQuality"], **(user_config.get("networkQuality", {}))},
+        "sharePolicy": {**default_config["sharePolicy"], **(user_config.get("sharePolicy", {}))},
+        "perfHistory": {**default_config["perfHistory"], **(user_config.get("perfHistory", {}))},
+        "controlPlane": {**default_config["controlPlane"], **(user_config.get("controlPlane", {}))},
+        "profiler": {**default_config["profiler"], **(user_config.get("profiler", {}))},
+        "shutdown": {**default_config["shutdown"], **(user_config.get("shutdown", {}))},
+        "kiosk": {**default_config["kiosk"], **(user_config.get("kiosk", {}))}
+    }
+
+    validate_config(config)
+    return config
+
+
 def load_config() -> KioskConfig:
     """Load configuration from file"""
     config_path = find_config_path()
 
     try:
         if config_path.exists():
-            with open(config_path, 'r', encoding='utf-8') as f:
-                user_config = json.load(f)
-
-            # Deep merge with defaults
-            config: KioskConfig = {
-                "zoom": {**default_config["zoom"], **(user_config.get("zoom", {}))},
-                "screen": {**default_config["screen"], **(user_config.get("screen", {}))},
-                "remoteControl": {**default_config["remoteControl"], **(user_config.get("remoteControl", {}))},
-                "recovery": {**default_config["recovery"], **(user_config.get("recovery", {}))},
-                "kiosk": {**default_config["kiosk"], **(user_config.get("kiosk", {}))}
-            }
-
-            validate_config(config)
-            return config
+            return read_config(config_path)
     except Exception as e:
         print(f"Error loading config: {e}")
 
     print("Warning: Using default configuration. Please edit config.json with your Zoom SDK credentials.")
-    return default_config
+    # Copy so config reloads applied in place never change the defaults
+    return copy.deepcopy(default_config)
+
+
+def diff_config(old: KioskConfig, new: KioskConfig) -> Dict[str, List[str]]:
+    """Get the changed keys per config section"""
+    changes: Dict[str, List[str]] = {}
+    for section, values in new.items():
+        previous = old.get(section, {})
+        keys = [key for key in values if previous.get(key) != values[key]]
+        if keys:
+            changes[section] = keys
+    return changes
 
 
 def validate_config(config: KioskConfig) -> None:
@@ -141,10 +536,110 @@ def validate_config(config: KioskConfig) -> None:
         config["screen"]["monitorIndex"] = 0
         warnings.append("Invalid monitor index, defaulting to 0")
 
+    if not 0.1 <= config["replay"]["playbackSpeed"] <= 5.0:
+        config["replay"]["playbackSpeed"] = max(0.1, min(5.0, config["replay"]["playbackSpeed"]))
+        warnings.append("Replay playback speed out of range (0.1-5.0), clamped")
+
+    if not 0 <= config["replay"]["maxHashDistance"] <= 64:
+        config["replay"]["maxHashDistance"] = 6
+        warnings.append("Invalid replay max hash distance (0-64), defaulting to 6")
+
+    if config["replay"]["sampleRateHz"] < 1:
+        config["replay"]["sampleRateHz"] = 120
+        warnings.append("Invalid replay sample rate, defaulting to 120Hz")
+
     if config["recovery"]["maxRetries"] < 1:
         config["recovery"]["maxRetries"] = 1
         warnings.append("Invalid max retries, defaulting to 1")
 
+    if config["shareHealth"]["maxRestartAttempts"] < 1:
+        config["shareHealth"]["maxRestartAttempts"] = 1
+        warnings.append("Invalid share restart attempts, defaulting to 1")
+
+    if not 50 <= config["timeouts"]["percentile"] <= 100:
+        config["timeouts"]["percentile"] = 95
+        warnings.append("Invalid timeout percentile, defaulting to 95")
+
+    if config["timeouts"]["margin"] <= 0:
+        config["timeouts"]["margin"] = 1.5
+        warnings.append("Invalid timeout margin, defaulting to 1.5")
+
+    if config["timeouts"]["historySize"] < config["timeouts"]["minSamples"]:
+        config["timeouts"]["historySize"] = max(config["timeouts"]["minSamples"], 1)
+        warnings.append("Timeout history size smaller than min samples, adjusted")
+
+    if config["reconnectLimiter"]["maxConcurrent"] < 1:
+        config["reconnectLimiter"]["maxConcurrent"] = 1
+        warnings.append("Invalid reconnect limiter concurrency, defaulting to 1")
+
+    if config["statusBlock"]["updateIntervalMs"] < 10:
+        config["statusBlock"]["updateIntervalMs"] = 10
+        warnings.append("Status block update interval too small, defaulting to 10ms")
+
+    if config["checkpoint"]["refreshIntervalMs"] >= config["checkpoint"]["resumeWindowMs"]:
+        config["checkpoint"]["refreshIntervalMs"] = max(config["checkpoint"]["resumeWindowMs"] // 4, 1)
+        warnings.append("Checkpoint refresh interval must be shorter than the resume window, adjusted")
+
+    if config["mockUpgrade"]["maxBackoffMs"] < config["mockUpgrade"]["initialBackoffMs"]:
+        config["mockUpgrade"]["maxBackoffMs"] = config["mockUpgrade"]["initialBackoffMs"]
+        warnings.append("Mock upgrade max backoff smaller than initial backoff, adjusted")
+
+    if config["fleet"]["count"] < 0:
+        config["fleet"]["count"] = 0
+        warnings.append("Invalid fleet count, defaulting to 0")
+
+    if config["fleet"]["heartbeatTimeoutMs"] <= config["fleet"]["heartbeatIntervalMs"]:
+        config["fleet"]["heartbeatTimeoutMs"] = config["fleet"]["heartbeatIntervalMs"] * 5
+        warnings.append("Fleet heartbeat timeout must exceed the interval, adjusted")
+
+    if config["networkQuality"]["bufferSize"] < 2:
+        config["networkQuality"]["bufferSize"] = 2
+        warnings.append("Invalid network quality buffer size, defaulting to 2")
+
+    if not 0 <= config["networkQuality"]["minSpanMs"] <= config["networkQuality"]["windowMs"]:
+        config["networkQuality"]["minSpanMs"] = min(10000, config["networkQuality"]["windowMs"])
+        warnings.append("Network quality min span must be within the window, adjusted")
+
+    if config["networkQuality"]["recheckMs"] < 100:
+        config["networkQuality"]["recheckMs"] = 100
+        warnings.append("Network quality recheck interval too short, defaulting to 100ms")
+
+    if config["sharePolicy"]["restoreAbove"] < config["sharePolicy"]["reduceBelow"]:
+        config["sharePolicy"]["restoreAbove"] = config["sharePolicy"]["reduceBelow"]
+        warnings.append("Share policy restore threshold below the reduce threshold, adjusted")
+
+    if config["sharePolicy"]["recheckMs"] < 100:
+        config["sharePolicy"]["recheckMs"] = 100
+        warnings.append("Share policy recheck interval too short, defaulting to 100ms")
+
+    if config["perfHistory"]["batchSize"] < 1:
+        config["perfHistory"]["batchSize"] = 1
+        warnings.append("Invalid performance history batch size, defaulting to 1")
+
+    if config["perfHistory"]["rollupRetentionDays"] < config["perfHistory"]["rawRetentionDays"]:
+        config["perfHistory"]["rollupRetentionDays"] = config["perfHistory"]["rawRetentionDays"]
+        warnings.append("Performance history rollups must be kept at least as long as raw timings, adjusted")
+
+    if not 0 <= config["controlPlane"]["port"] <= 65535:
+        config["controlPlane"]["port"] = default_config["controlPlane"]["port"]
+        warnings.append("Invalid control plane port, using default")
+
+    if config["controlPlane"]["snapshotIntervalMs"] < 100:
+        config["controlPlane"]["snapshotIntervalMs"] = 100
+        warnings.append("Control plane snapshot interval too small, defaulting to 100ms")
+
+    if config["profiler"]["intervalMs"] < 1:
+        config["profiler"]["intervalMs"] = 1
+        warnings.append("Profiler interval too small, defaulting to 1ms")
+
+    if config["shutdown"]["phaseTimeoutMs"] < 100:
+        config["shutdown"]["phaseTimeoutMs"] = 100
+        warnings.append("Shutdown phase timeout too small, defaulting to 100ms")
+
+    if config["shutdown"]["deadlineMs"] < config["shutdown"]["phaseTimeoutMs"]:
+        config["shutdown"]["deadlineMs"] = config["shutdown"]["phaseTimeoutMs"]
+        warnings.append("Shutdown deadline must be at least the phase timeout, adjusted")
+
     if warnings:
         print("Configuration warnings:")
         for w in warnings:
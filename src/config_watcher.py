@@ -0,0 +1,84 @@
+"""
+Zoom Kiosk - Config Watcher
+
+Polls config.json for changes (mtime and size only, no reads while the
+file is unchanged) and hands a freshly loaded config to a callback once
+the file has stopped changing for the debounce period.
+"""
+
+import asyncio
+import os
+import time
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+from .config import read_config, KioskConfig, ConfigReloadConfig
+from .task_supervisor import TaskSupervisor
+
+
+class ConfigWatcher:
+    """Detects config file changes and reloads them"""
+
+    def __init__(self, config: ConfigReloadConfig, path: Path,
+                 on_change: Callable[[KioskConfig], None], tasks: Optional[TaskSupervisor] = None):
+        self.config = config
+        self.path = path
+        self.on_change = on_change
+        self.tasks = tasks or TaskSupervisor()
+        self._applied = self._signature()
+        self._pending: Optional[Tuple[int, int]] = None
+        self._pending_since = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def _signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def start(self) -> None:
+        """Start watching"""
+        if self._task is None:
+            self._task = self.tasks.spawn(self._run(), 'poll', 'configWatcher')
+            print(f'[ConfigWatcher] Watching {self.path}')
+
+    def stop(self) -> None:
+        """Stop watching"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.config["pollIntervalMs"] / 1000.0)
+            self.check()
+
+    def check(self) -> bool:
+        """Poll once; returns True if a new config was applied"""
+        signature = self._signature()
+        if signature is None or signature == self._applied:
+            self._pending = None
+            return False
+
+        now = time.monotonic()
+        if signature != self._pending:
+            # Still being written (or first sighting): wait for it to settle
+            self._pending = signature
+            self._pending_since = now
+            return False
+        if (now - self._pending_since) * 1000 < self.config["debounceMs"]:
+            return False
+
+        self._applied = signature
+        self._pending = None
+        try:
+            new_config = read_config(self.path)
+        except Exception as e:
+            print(f'[ConfigWatcher] Ignoring invalid config change: {e}')
+            return False
+
+        try:
+            self.on_change(new_config)
+        except Exception as e:
+            print(f'[ConfigWatcher] Error applying config change: {e}')
+        return True
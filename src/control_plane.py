@@ -0,0 +1,463 @@
+"""
+Zoom Kiosk - Control Plane
+
+Localhost HTTP/WebSocket API for dashboards and operators:
+
+    GET  /status          kiosk status (JSON, ETag / If-None-Match)
+    GET  /events          WebSocket: lifecycle events and status changes
+    POST /replay          re-apply the recorded preferences
+    POST /reconnect       leave and rejoin the meeting
+    POST /share/restart   stop and start the screen share
+    POST /stop            shut the kiosk down
+    POST /profile/start   start the sampling profiler
+    POST /profile/stop    stop it and write the profile
+
+Status reads never reach the Zoom service: the kiosk status is encoded
+into an immutable snapshot when the service or the recovery watchdog
+reports a change (and at snapshotIntervalMs for drifting metrics), and
+every GET /status returns those bytes as they are. Any number of
+dashboards polling costs the SDK thread nothing.
+
+Standard library only (asyncio streams); one request per connection.
+Listening on localhost, requests must name a localhost Host (so a web
+page cannot reach the API through DNS rebinding). Commands are refused
+when they carry an Origin header, which only browsers send, and the event
+stream only accepts web pages from allowedOrigins.
+
+    python -m src.control_plane status
+    python -m src.control_plane events
+    python -m src.control_plane reconnect --port 8765 --token secret
+"""
+
+import asyncio
+import base64
+import functools
+import hashlib
+import hmac
+import json
+import struct
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple, TYPE_CHECKING
+from urllib.parse import parse_qs, urlsplit
+from .clock import Clock, SYSTEM_CLOCK
+from .config import ControlPlaneConfig
+from .task_supervisor import TaskSupervisor
+
+if TYPE_CHECKING:
+    # Imported lazily so the client CLI does not load the SDK
+    from .zoom_service import ZoomService
+
+# ZoomService events streamed to WebSocket clients
+LIFECYCLE_EVENTS = ('initialized', 'meetingJoined', 'disconnected', 'sharingStarted', 'sharingStopped',
+                    'otherParticipantPresent', 'phase', 'error')
+
+WEBSOCKET_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+OPCODE_TEXT = 0x1
+OPCODE_CLOSE = 0x8
+OPCODE_PING = 0x9
+OPCODE_PONG = 0xA
+
+MAX_REQUEST_BYTES = 8192
+REQUEST_TIMEOUT_S = 5.0
+# Messages queued per WebSocket client; a client this far behind is disconnected
+CLIENT_QUEUE_SIZE = 256
+
+# Listening on one of these, requests must also be addressed to one of them
+LOCAL_HOSTS = ('127.0.0.1', 'localhost', '::1')
+
+REASONS = {200: 'OK', 202: 'Accepted', 304: 'Not Modified', 400: 'Bad Request', 401: 'Unauthorized',
+           403: 'Forbidden', 404: 'Not Found', 405: 'Method Not Allowed', 503: 'Service Unavailable'}
+
+
+class StatusSnapshot:
+    """One published kiosk status; the JSON body is encoded once and never changes"""
+
+    __slots__ = ('version', 'published_at', 'body', 'etag')
+
+    def __init__(self, version: int, body: bytes):
+        self.version = version
+        self.published_at = time.time()
+        self.body = body
+        self.etag = f'"{version}"'
+
+
+class ControlPlane:
+    """Serves published status snapshots and forwards commands to the kiosk"""
+
+    def __init__(self, config: ControlPlaneConfig, status: Callable[[], Dict[str, Any]],
+                 commands: Dict[str, Callable[[], Awaitable[None]]], clock: Clock = SYSTEM_CLOCK,
+                 tasks: Optional[TaskSupervisor] = None):
+        self.config = config
+        self.status = status
+        # Command name (path without the leading slash) -> coroutine function
+        self.commands = commands
+        self.clock = clock
+        self.tasks = tasks or TaskSupervisor(clock)
+        self.snapshot = StatusSnapshot(0, b'{}')
+        self.zoom_service: Optional['ZoomService'] = None
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.refresh_task: Optional[asyncio.Task] = None
+        self.clients: Set[asyncio.Queue] = set()
+        self.connections: Set[asyncio.Task] = set()
+        self.requests = 0
+        self._handlers: Dict[str, Callable] = {}
+        self._publish_scheduled = False
+
+    async def start(self) -> None:
+        """Listen on the configured address and start refreshing the snapshot"""
+        self.publish()
+        try:
+            self.server = await asyncio.start_server(self._handle, self.config["host"], self.config["port"])
+        except OSError as e:
+            print(f'[ControlPlane] Cannot listen on {self.config["host"]}:{self.config["port"]}: {e}')
+            return
+        if self.config["host"] not in LOCAL_HOSTS and not self.config["token"]:
+            print('[ControlPlane] Warning: listening beyond localhost without a token')
+        self.refresh_task = self.tasks.spawn(self._refresh_loop(), 'refresh', 'controlPlane', self)
+        print(f'[ControlPlane] Listening on http://{self.config["host"]}:{self.config["port"]}')
+
+    async def stop(self) -> None:
+        """Stop listening and disconnect the event stream clients"""
+        if self.refresh_task and not self.refresh_task.done():
+            self.refresh_task.cancel()
+        self.refresh_task = None
+        if self.server:
+            self.server.close()
+        for queue in list(self.clients):
+            self._close_client(queue)
+        if self.connections:
+            # Event streams send their close frame; anything else still open is cut off
+            _, pending = await asyncio.wait(self.connections, timeout=1.0)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        if self.server:
+            await self.server.wait_closed()
+            self.server = None
+        self.detach()
+
+    def attach(self, zoom_service: 'ZoomService') -> None:
+        """Stream the lifecycle events of a (new) ZoomService instance"""
+        self.detach()
+        self.zoom_service = zoom_service
+        self._handlers = {event: functools.partial(self.on_event, event) for event in LIFECYCLE_EVENTS}
+        for event, handler in self._handlers.items():
+            zoom_service.on(event, handler)
+
+    def detach(self) -> None:
+        """Stop streaming the current ZoomService instance"""
+        if self.zoom_service:
+            for event, handler in self._handlers.items():
+                self.zoom_service.off(event, handler)
+            self.zoom_service = None
+        self._handlers = {}
+
+    def on_event(self, event: str, *args: Any) -> None:
+        """A kiosk state change: stream it and republish the status"""
+        self.broadcast({'type': 'event', 'event': event, 'args': list(args), 'at': time.time()})
+        self.changed()
+
+    def changed(self) -> None:
+        """
+        Republish the status soon. Called from SDK callbacks, so the snapshot
+        is built once after the callback returns, however many changes came in.
+        """
+        if self._publish_scheduled:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.publish()
+            return
+        self._publish_scheduled = True
+        loop.call_soon(self._scheduled_publish)
+
+    def _scheduled_publish(self) -> None:
+        self._publish_scheduled = False
+        self.publish()
+
+    def publish(self) -> None:
+        """Encode the current status; a new version only if it changed"""
+        try:
+            body = json.dumps(self.status(), separators=(',', ':'), default=str).encode('utf-8')
+        except Exception as e:
+            print(f'[ControlPlane] Could not build status: {e}')
+            return
+        if body == self.snapshot.body:
+            return
+        self.snapshot = StatusSnapshot(self.snapshot.version + 1, body)
+        if self.clients:
+            self._send_all(b'{"type":"status","version":%d,"status":%s}' % (self.snapshot.version, body))
+
+    def broadcast(self, message: Dict[str, Any]) -> None:
+        """Send a message to every event stream client"""
+        if self.clients:
+            self._send_all(json.dumps(message, separators=(',', ':'), default=str).encode('utf-8'))
+
+    def _send_all(self, payload: bytes) -> None:
+        frame = _frame(OPCODE_TEXT, payload)
+        for queue in list(self.clients):
+            try:
+                queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                print('[ControlPlane] Event client too slow, disconnecting it')
+                self._close_client(queue)
+
+    def _close_client(self, queue: asyncio.Queue) -> None:
+        self.clients.discard(queue)
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+    async def _refresh_loop(self) -> None:
+        """Pick up values that drift without an event (quality metrics, ages)"""
+        while True:
+            await self.clock.sleep(self.config["snapshotIntervalMs"] / 1000.0)
+            self.publish()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.requests += 1
+        task = asyncio.current_task()
+        self.connections.add(task)
+        try:
+            request = await asyncio.wait_for(_read_request(reader), REQUEST_TIMEOUT_S)
+            if request is None:
+                await _respond(writer, 400, {'error': 'malformed request'})
+                return
+            method, target, headers = request
+            url = urlsplit(target)
+            if self.config["host"] in LOCAL_HOSTS and _host_name(headers.get('host', '')) not in LOCAL_HOSTS:
+                await _respond(writer, 403, {'error': 'not addressed to localhost'})
+                return
+            if not self._authorized(headers, parse_qs(url.query)):
+                await _respond(writer, 401, {'error': 'missing or wrong token'})
+                return
+            if url.path == '/status':
+                if method != 'GET':
+                    await _respond(writer, 405, {'error': 'use GET'})
+                    return
+                snapshot = self.snapshot
+                if headers.get('if-none-match') == snapshot.etag:
+                    await _respond(writer, 304, None, {'ETag': snapshot.etag})
+                else:
+                    await _respond_raw(writer, 200, snapshot.body, {'ETag': snapshot.etag})
+            elif url.path == '/events':
+                await self._stream_events(reader, writer, headers)
+            elif url.path.lstrip('/') in self.commands:
+                if method != 'POST':
+                    await _respond(writer, 405, {'error': 'use POST'})
+                    return
+                if 'origin' in headers:
+                    # Sent by browsers; a page the operator has open must not be able to stop the kiosk
+                    await _respond(writer, 403, {'error': 'commands are not accepted from web pages'})
+                    return
+                command = url.path.lstrip('/')
+                self.tasks.spawn(self._run_command(command), command, 'controlPlane')
+                await _respond(writer, 202, {'accepted': command})
+            else:
+                await _respond(writer, 404, {'error': f'no such endpoint: {url.path}'})
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except asyncio.CancelledError:
+            # Shutting down; this is the connection's own task, nothing above it to tell
+            pass
+        except Exception as e:
+            print(f'[ControlPlane] Error handling request: {e}')
+        finally:
+            self.connections.discard(task)
+            writer.close()
+
+    def _authorized(self, headers: Dict[str, str], query: Dict[str, Any]) -> bool:
+        token = self.config["token"]
+        if not token:
+            return True
+        # Browsers cannot set headers on a WebSocket, hence the query parameter
+        given = headers.get('authorization', '').removeprefix('Bearer ').strip() or query.get('token', [''])[0]
+        return hmac.compare_digest(given.encode(), token.encode())
+
+    async def _run_command(self, command: str) -> None:
+        print(f'[ControlPlane] Command: {command}')
+        self.broadcast({'type': 'command', 'command': command, 'at': time.time()})
+        try:
+            await self.commands[command]()
+        except Exception as e:
+            print(f'[ControlPlane] Command {command} failed: {e}')
+            self.broadcast({'type': 'commandFailed', 'command': command, 'error': str(e), 'at': time.time()})
+
+    async def _stream_events(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                             headers: Dict[str, str]) -> None:
+        key = headers.get('sec-websocket-key')
+        if headers.get('upgrade', '').lower() != 'websocket' or not key:
+            await _respond(writer, 400, {'error': 'WebSocket upgrade required'})
+            return
+        if 'origin' in headers and headers['origin'] not in self.config["allowedOrigins"]:
+            # Any page the operator has open could otherwise follow the kiosk's status
+            await _respond(writer, 403, {'error': f'origin not allowed: {headers["origin"]}'})
+            return
+        if len(self.clients) >= self.config["maxClients"]:
+            await _respond(writer, 503, {'error': 'too many event clients'})
+            return
+        accept = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()).decode()
+        writer.write(('HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n'
+                      f'Sec-WebSocket-Accept: {accept}\r\n\r\n').encode())
+
+        queue: asyncio.Queue = asyncio.Queue(CLIENT_QUEUE_SIZE)
+        # Every client starts from the current status
+        snapshot = self.snapshot
+        queue.put_nowait(_frame(OPCODE_TEXT, b'{"type":"status","version":%d,"status":%s}'
+                                % (snapshot.version, snapshot.body)))
+        self.clients.add(queue)
+        receiver = self.tasks.spawn(self._receive(reader, queue), 'receive', 'controlPlane', self)
+        try:
+            while True:
+                frame = await queue.get()
+                if frame is None:
+                    break
+                writer.write(frame)
+                await writer.drain()
+            writer.write(_frame(OPCODE_CLOSE, struct.pack('!H', 1000)))
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.discard(queue)
+            receiver.cancel()
+
+    async def _receive(self, reader: asyncio.StreamReader, queue: asyncio.Queue) -> None:
+        """Answer pings and notice when the client goes away; clients have nothing else to say"""
+        try:
+            while True:
+                opcode, payload = await _read_frame(reader)
+                if opcode == OPCODE_PING:
+                    queue.put_nowait(_frame(OPCODE_PONG, payload))
+                elif opcode == OPCODE_CLOSE:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.QueueFull):
+            pass
+        if queue in self.clients:
+            self._close_client(queue)
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str]]]:
+    """Request line and headers (lower-case names); bodies are not used"""
+    try:
+        head = await reader.readuntil(b'\r\n\r\n')
+    except asyncio.LimitOverrunError:
+        return None
+    if len(head) > MAX_REQUEST_BYTES:
+        return None
+    lines = head.decode('latin-1').split('\r\n')
+    parts = lines[0].split(' ')
+    if len(parts) != 3:
+        return None
+    headers = {}
+    for line in lines[1:]:
+        name, sep, value = line.partition(':')
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+    return parts[0].upper(), parts[1], headers
+
+
+def _host_name(host: str) -> str:
+    """Host header without the port ('[::1]:8765' -> '::1')"""
+    if host.count(':') > 1 and not host.startswith('['):
+        # Bare IPv6 address
+        return host.lower()
+    try:
+        return urlsplit(f'//{host}').hostname or ''
+    except ValueError:
+        return ''
+
+
+async def _respond(writer: asyncio.StreamWriter, status: int, body: Optional[Dict[str, Any]],
+                   headers: Optional[Dict[str, str]] = None) -> None:
+    await _respond_raw(writer, status, json.dumps(body).encode('utf-8') if body is not None else b'', headers)
+
+
+async def _respond_raw(writer: asyncio.StreamWriter, status: int, body: bytes,
+                       headers: Optional[Dict[str, str]] = None) -> None:
+    lines = [f'HTTP/1.1 {status} {REASONS.get(status, "")}', 'Connection: close', 'Cache-Control: no-cache']
+    if body:
+        lines += ['Content-Type: application/json', f'Content-Length: {len(body)}']
+    else:
+        lines.append('Content-Length: 0')
+    lines += [f'{name}: {value}' for name, value in (headers or {}).items()]
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+    await writer.drain()
+
+
+def _frame(opcode: int, payload: bytes) -> bytes:
+    """One final, unmasked (server to client) WebSocket frame"""
+    length = len(payload)
+    if length < 126:
+        return struct.pack('!BB', 0x80 | opcode, length) + payload
+    if length < 1 << 16:
+        return struct.pack('!BBH', 0x80 | opcode, 126, length) + payload
+    return struct.pack('!BBQ', 0x80 | opcode, 127, length) + payload
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> Tuple[int, bytes]:
+    """Opcode and (unmasked) payload of the next WebSocket frame"""
+    first, second = await reader.readexactly(2)
+    length = second & 0x7F
+    if length == 126:
+        length = struct.unpack('!H', await reader.readexactly(2))[0]
+    elif length == 127:
+        length = struct.unpack('!Q', await reader.readexactly(8))[0]
+    if length > MAX_REQUEST_BYTES * 128:
+        raise ConnectionError('frame too large')
+    key = await reader.readexactly(4) if second & 0x80 else b''
+    payload = await reader.readexactly(length)
+    if key:
+        payload = bytes(b ^ key[i % 4] for i, b in enumerate(payload))
+    return first & 0x0F, payload
+
+
+async def _client(host: str, port: int, token: str, command: str) -> None:
+    """Minimal client for the CLI"""
+    reader, writer = await asyncio.open_connection(host, port)
+    auth = f'Authorization: Bearer {token}\r\n' if token else ''
+    if command == 'events':
+        key = base64.b64encode(hashlib.sha1(str(time.time()).encode()).digest()[:16]).decode()
+        writer.write((f'GET /events HTTP/1.1\r\nHost: {host}\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n'
+                      f'Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n{auth}\r\n').encode())
+        head = await reader.readuntil(b'\r\n\r\n')
+        if b' 101 ' not in head.split(b'\r\n')[0]:
+            print(head.decode('latin-1').strip())
+            return
+        while True:
+            opcode, payload = await _read_frame(reader)
+            if opcode == OPCODE_CLOSE:
+                return
+            if opcode == OPCODE_TEXT:
+                print(payload.decode('utf-8'), flush=True)
+    else:
+        method, path = ('GET', '/status') if command == 'status' else ('POST', '/' + command)
+        writer.write(f'{method} {path} HTTP/1.1\r\nHost: {host}\r\n{auth}Content-Length: 0\r\n\r\n'.encode())
+        response = await reader.read()
+        head, _, body = response.partition(b'\r\n\r\n')
+        status_line = head.split(b'\r\n')[0].decode('latin-1')
+        if command == 'status' and b' 200 ' in head.split(b'\r\n')[0]:
+            print(json.dumps(json.loads(body), indent=2))
+        else:
+            print(status_line, body.decode('utf-8'))
+    writer.close()
+
+
+if __name__ == '__main__':
+    import argparse
+    from .config import default_config
+    defaults = default_config['controlPlane']
+    parser = argparse.ArgumentParser(description='Talk to a running kiosk\'s control plane')
+    parser.add_argument('command', choices=['status', 'events', 'replay', 'reconnect', 'share/restart', 'stop',
+                                            'profile/start', 'profile/stop'])
+    parser.add_argument('--host', default=defaults['host'])
+    parser.add_argument('--port', type=int, default=defaults['port'])
+    parser.add_argument('--token', default='')
+    args = parser.parse_args()
+    try:
+        asyncio.run(_client(args.host, args.port, args.token, args.command))
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f'[ControlPlane] Cannot reach {args.host}:{args.port}: {e}')
@@ -0,0 +1,226 @@
+"""
+Zoom Kiosk - Display Topology
+
+Enumerates the monitors once and caches the layout until Windows reports
+a display change (WM_DISPLAYCHANGE, caught by a hidden window serviced by
+the main thread's message pump). The cached layout resolves
+screen.monitorIndex to the device name StartMonitorShare expects and
+translates monitor-relative recording coordinates to screen positions.
+
+Index 0 is always the primary monitor; the others follow left to right,
+then top to bottom.
+"""
+
+import sys
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+Monitor = Dict[str, Any]
+
+WM_DISPLAYCHANGE = 0x007E
+MONITORINFOF_PRIMARY = 0x1
+
+
+def _ordered(monitors: List[Monitor]) -> List[Monitor]:
+    """Primary first, then left to right, top to bottom; index set accordingly"""
+    monitors = sorted(monitors, key=lambda m: (not m['primary'], m['left'], m['top']))
+    for index, monitor in enumerate(monitors):
+        monitor['index'] = index
+    return monitors
+
+
+def _enumerate_windows() -> List[Monitor]:
+    import ctypes
+    from ctypes import wintypes
+
+    class MONITORINFOEXW(ctypes.Structure):
+        _fields_ = [('cbSize', wintypes.DWORD), ('rcMonitor', wintypes.RECT), ('rcWork', wintypes.RECT),
+                    ('dwFlags', wintypes.DWORD), ('szDevice', wintypes.WCHAR * 32)]
+
+    MONITORENUMPROC = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HMONITOR, wintypes.HDC,
+                                         ctypes.POINTER(wintypes.RECT), wintypes.LPARAM)
+    user32 = ctypes.windll.user32
+    monitors: List[Monitor] = []
+
+    def on_monitor(hmonitor, hdc, rect, data):
+        info = MONITORINFOEXW()
+        info.cbSize = ctypes.sizeof(MONITORINFOEXW)
+        if user32.GetMonitorInfoW(hmonitor, ctypes.byref(info)):
+            r = info.rcMonitor
+            monitors.append({
+                # The SDK's monitor id is the GDI device name, e.g. \\.\DISPLAY2
+                'id': info.szDevice,
+                'left': r.left,
+                'top': r.top,
+                'width': r.right - r.left,
+                'height': r.bottom - r.top,
+                'primary': bool(info.dwFlags & MONITORINFOF_PRIMARY),
+            })
+        return True
+
+    user32.EnumDisplayMonitors(None, None, MONITORENUMPROC(on_monitor), 0)
+    return monitors
+
+
+def _enumerate_primary() -> List[Monitor]:
+    """Elsewhere only the primary screen is known (through the screen backend)"""
+    from .screen_backend import create_screen_backend
+    backend = create_screen_backend()
+    if backend is None:
+        return []
+    width, height = backend.size()
+    return [{'id': '', 'left': 0, 'top': 0, 'width': width, 'height': height, 'primary': True}]
+
+
+def enumerate_monitors() -> List[Monitor]:
+    """The current monitors, in any order"""
+    return _enumerate_windows() if sys.platform == 'win32' else _enumerate_primary()
+
+
+class _DisplayChangeWindow:
+    """Hidden top-level window whose only job is receiving WM_DISPLAYCHANGE"""
+
+    CLASS_NAME = 'ZoomKioskDisplayWatcher'
+
+    def __init__(self, on_change: Callable[[], None]):
+        import ctypes
+        from ctypes import wintypes
+        self._user32 = user32 = ctypes.windll.user32
+        LRESULT = ctypes.c_ssize_t
+        WNDPROC = ctypes.WINFUNCTYPE(LRESULT, wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM)
+
+        class WNDCLASSW(ctypes.Structure):
+            _fields_ = [('style', wintypes.UINT), ('lpfnWndProc', WNDPROC), ('cbClsExtra', ctypes.c_int),
+                        ('cbWndExtra', ctypes.c_int), ('hInstance', wintypes.HINSTANCE), ('hIcon', wintypes.HICON),
+                        ('hCursor', wintypes.HANDLE), ('hbrBackground', wintypes.HBRUSH),
+                        ('lpszMenuName', wintypes.LPCWSTR), ('lpszClassName', wintypes.LPCWSTR)]
+
+        # Handles are pointer sized; the default int restype would truncate them on 64-bit
+        kernel32 = ctypes.windll.kernel32
+        kernel32.GetModuleHandleW.argtypes = [wintypes.LPCWSTR]
+        kernel32.GetModuleHandleW.restype = wintypes.HMODULE
+        user32.DefWindowProcW.argtypes = [wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM]
+        user32.DefWindowProcW.restype = LRESULT
+        user32.RegisterClassW.argtypes = [ctypes.POINTER(WNDCLASSW)]
+        user32.RegisterClassW.restype = wintypes.ATOM
+        user32.CreateWindowExW.argtypes = [wintypes.DWORD, wintypes.LPCWSTR, wintypes.LPCWSTR, wintypes.DWORD,
+                                           ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                                           wintypes.HWND, wintypes.HMENU, wintypes.HINSTANCE, wintypes.LPVOID]
+        user32.CreateWindowExW.restype = wintypes.HWND
+        user32.DestroyWindow.argtypes = [wintypes.HWND]
+        user32.DestroyWindow.restype = wintypes.BOOL
+
+        def window_proc(hwnd, msg, wparam, lparam):
+            if msg == WM_DISPLAYCHANGE:
+                on_change()
+            return user32.DefWindowProcW(hwnd, msg, wparam, lparam)
+
+        # Kept referenced for as long as the window exists
+        self._proc = WNDPROC(window_proc)
+        instance = kernel32.GetModuleHandleW(None)
+        window_class = WNDCLASSW()
+        window_class.lpfnWndProc = self._proc
+        window_class.hInstance = instance
+        window_class.lpszClassName = self.CLASS_NAME
+        # Fails harmlessly if a previous watcher already registered the class
+        user32.RegisterClassW(ctypes.byref(window_class))
+        self.hwnd = user32.CreateWindowExW(0, self.CLASS_NAME, self.CLASS_NAME, 0, 0, 0, 0, 0,
+                                           None, None, instance, None)
+        if not self.hwnd:
+            raise OSError(f'CreateWindowExW failed: {ctypes.GetLastError()}')
+
+    def close(self) -> None:
+        if self.hwnd:
+            self._user32.DestroyWindow(self.hwnd)
+            self.hwnd = None
+
+
+class DisplayTopology:
+    """Cached monitor layout"""
+
+    def __init__(self, enumerate: Callable[[], List[Monitor]] = enumerate_monitors):
+        self._enumerate = enumerate
+        self.monitors: Optional[List[Monitor]] = None
+        self.refreshes = 0
+        self.display_changes = 0
+        self._window: Optional[_DisplayChangeWindow] = None
+
+    def get_monitors(self) -> List[Monitor]:
+        """The cached layout, enumerated on first use or after a display change"""
+        if self.monitors is None:
+            self.refresh()
+        return self.monitors
+
+    def refresh(self) -> None:
+        """Enumerate the monitors now"""
+        try:
+            monitors = _ordered(self._enumerate())
+        except Exception as e:
+            print(f'[Display] Could not enumerate monitors: {e}')
+            monitors = []
+        self.refreshes += 1
+        self.monitors = monitors
+        layout = ', '.join(f'{m["index"]}: {m["width"]}x{m["height"]}+{m["left"]}+{m["top"]}' for m in monitors)
+        print(f'[Display] {len(monitors)} monitor(s): {layout}')
+
+    def invalidate(self) -> None:
+        """Forget the layout; the next lookup enumerates again"""
+        self.display_changes += 1
+        self.monitors = None
+
+    def watch(self) -> None:
+        """Invalidate on display changes (Windows; needs the message loop running on this thread)"""
+        if sys.platform != 'win32' or self._window:
+            return
+        try:
+            self._window = _DisplayChangeWindow(self.invalidate)
+        except Exception as e:
+            print(f'[Display] Cannot watch for display changes: {e}')
+
+    def stop(self) -> None:
+        """Stop watching for display changes"""
+        if self._window:
+            self._window.close()
+            self._window = None
+
+    def monitor(self, index: int) -> Optional[Monitor]:
+        """Monitor by index, None if there is no such monitor"""
+        monitors = self.get_monitors()
+        return monitors[index] if 0 <= index < len(monitors) else None
+
+    def share_id(self, index: int) -> Optional[str]:
+        """StartMonitorShare argument for a monitor index; None shares the primary monitor"""
+        monitor = self.monitor(index)
+        if monitor is None:
+            if index != 0:
+                print(f'[Display] No monitor {index}, sharing the primary monitor')
+            return None
+        return None if monitor['primary'] or not monitor['id'] else monitor['id']
+
+    def to_relative(self, x: int, y: int) -> Tuple[int, int, int]:
+        """(monitor index, x, y) of a screen position; positions off every monitor count as on the primary"""
+        for monitor in self.get_monitors():
+            if (monitor['left'] <= x < monitor['left'] + monitor['width']
+                    and monitor['top'] <= y < monitor['top'] + monitor['height']):
+                return monitor['index'], x - monitor['left'], y - monitor['top']
+        primary = self.monitor(0)
+        if primary:
+            return 0, x - primary['left'], y - primary['top']
+        return 0, x, y
+
+    def to_absolute(self, index: int, x: int, y: int) -> Tuple[int, int]:
+        """Screen position of a monitor-relative point; a missing monitor maps to the primary"""
+        monitor = self.monitor(index) or self.monitor(0)
+        if monitor is None:
+            return x, y
+        return monitor['left'] + x, monitor['top'] + y
+
+    def get_state(self) -> Dict[str, Any]:
+        """Layout and refresh counts"""
+        monitors = self.monitors or []
+        return {
+            'monitors': [{key: m[key] for key in ('index', 'width', 'height', 'left', 'top', 'primary')}
+                         for m in monitors],
+            'refreshes': self.refreshes,
+            'displayChanges': self.display_changes,
+            'watching': self._window is not None,
+        }
@@ -0,0 +1,274 @@
+"""
+Zoom Kiosk - Fleet Supervisor
+
+Runs many kiosk instances from one host. Each kiosk is a KioskApp in its
+own process with its own state directory and log file; the supervisor
+restarts failed kiosks with exponential backoff and aggregates their
+heartbeats into a periodic summary and fleet-status.json.
+
+Config and the compiled replay plan are loaded once here and handed to
+every kiosk as read-only assets.
+
+Run with:  python -m src.fleet [--count N] [--sdk simulated]
+"""
+
+import copy
+import json
+import os
+import sys
+import time
+from multiprocessing.connection import wait
+from pathlib import Path
+from typing import Optional, List, Dict, Any
+from .config import load_config, KioskConfig
+from .kiosk_process import KioskProcess, Role
+
+# WaitForMultipleObjects handles at most 64 objects per call
+WINDOWS_WAIT_LIMIT = 60
+
+
+class FleetMember:
+    """Supervisor-side bookkeeping for one kiosk across restarts"""
+
+    def __init__(self, kiosk_id: str, options: Dict[str, Any], initial_backoff_ms: float):
+        self.kiosk_id = kiosk_id
+        self.options = options
+        self.process: Optional[KioskProcess] = None
+        self.restarts = 0
+        self.backoff_ms = initial_backoff_ms
+        self.restart_at = 0.0
+        self.last_failure: Optional[str] = None
+        # Share downtime of previous incarnations, so restarts do not reset the totals
+        self.past_downtime_ms = 0.0
+        self.past_loss_count = 0
+
+
+class FleetSupervisor:
+    """Launches, restarts and monitors a fleet of kiosk processes"""
+
+    def __init__(self, config: KioskConfig, count: Optional[int] = None):
+        self.config = config
+        self.fleet = config["fleet"]
+        self.heartbeat_interval = self.fleet["heartbeatIntervalMs"] / 1000.0
+        self.state_dir = Path(self.fleet["stateDir"]).resolve()
+        self.replay_plan = self._compile_replay_plan()
+        self.members = self._build_members(self.fleet["count"] if count is None else count)
+        self.running = False
+        self.started_at = 0.0
+        self.last_summary = 0.0
+
+    def _compile_replay_plan(self) -> Optional[List[Dict[str, Any]]]:
+        """Load and compile the recorded preferences once for the whole fleet"""
+        # Imported here so spawned kiosks re-importing this module stay quiet
+        from .action_recorder import ActionRecorder
+        from .action_player import compile_plan
+
+        actions = ActionRecorder().load_recording()
+        if not actions:
+            return None
+        plan = compile_plan(actions)
+        print(f'[Fleet] Compiled replay plan with {len(plan)} actions')
+        return plan
+
+    def _build_members(self, count: int) -> List[FleetMember]:
+        """Create per-kiosk options from the shared config and overrides"""
+        overrides = self.fleet["kiosks"]
+        count = max(count, len(overrides))
+        base = {k: v for k, v in self.config.items() if k != 'fleet'}
+        members = []
+
+        for index in range(count):
+            override = overrides[index] if index < len(overrides) else {}
+            kiosk_id = override.get('id') or f'{self.fleet["idPrefix"]}-{index + 1:02d}'
+
+            kiosk_config = copy.deepcopy(base)
+            if count > 1:
+                kiosk_config["zoom"]["displayName"] = f'{base["zoom"]["displayName"]} ({kiosk_id})'
+            for section, values in override.items():
+                if section in kiosk_config and isinstance(values, dict):
+                    kiosk_config[section] = {**kiosk_config[section], **values}
+
+            kiosk_dir = self.state_dir / kiosk_id
+            options = {
+                'kioskId': kiosk_id,
+                'role': Role.ACTIVE,
+                'heartbeatIntervalMs': self.fleet["heartbeatIntervalMs"],
+                'config': kiosk_config,
+                'replayPlan': self.replay_plan,
+                'stateDir': str(kiosk_dir),
+                'logPath': str(kiosk_dir / 'kiosk.log'),
+            }
+            members.append(FleetMember(kiosk_id, options, self.fleet["restartInitialBackoffMs"]))
+        return members
+
+    def _start(self, member: FleetMember) -> None:
+        Path(member.options['stateDir']).mkdir(parents=True, exist_ok=True)
+        member.process = KioskProcess(member.options)
+
+    def _on_failure(self, member: FleetMember, reason: str) -> None:
+        """Stop a failed kiosk and schedule its restart"""
+        kiosk = member.process
+        uptime_ms = (time.monotonic() - kiosk.started_at) * 1000
+        share = kiosk.status.get('shareHealth', {})
+        member.past_downtime_ms += share.get('totalDowntimeMs', 0.0)
+        member.past_loss_count += share.get('lossCount', 0)
+        kiosk.stop(grace=0.5)
+        member.process = None
+        member.last_failure = reason
+
+        # A kiosk that ran long enough is considered healthy again: back off from scratch
+        if uptime_ms >= self.fleet["stableAfterMs"]:
+            member.backoff_ms = self.fleet["restartInitialBackoffMs"]
+        member.restart_at = time.monotonic() + member.backoff_ms / 1000.0
+        print(f'[Fleet] {member.kiosk_id} failed: {reason}; restarting in {member.backoff_ms / 1000.0:.1f}s')
+        member.backoff_ms = min(member.backoff_ms * 2, self.fleet["restartMaxBackoffMs"])
+
+    def _poll(self) -> None:
+        """Collect heartbeats for up to one heartbeat interval"""
+        by_conn = {m.process.conn: m.process for m in self.members if m.process}
+        if not by_conn:
+            time.sleep(self.heartbeat_interval)
+            return
+
+        conns = list(by_conn)
+        if sys.platform == 'win32' and len(conns) > WINDOWS_WAIT_LIMIT:
+            # Wait on each chunk in turn, splitting the interval between them
+            chunks = [conns[i:i + WINDOWS_WAIT_LIMIT] for i in range(0, len(conns), WINDOWS_WAIT_LIMIT)]
+            ready = []
+            for chunk in chunks:
+                ready.extend(wait(chunk, timeout=self.heartbeat_interval / len(chunks)))
+        else:
+            ready = wait(conns, timeout=self.heartbeat_interval)
+
+        for conn in ready:
+            by_conn[conn].drain()
+
+    def get_summary(self) -> Dict[str, Any]:
+        """Aggregate health and metrics across the fleet"""
+        summary = {
+            'kiosks': len(self.members),
+            'alive': 0,
+            'ready': 0,
+            'inMeeting': 0,
+            'sharing': 0,
+            'recovering': 0,
+            'degraded': 0,
+            'restarting': 0,
+            'restarts': 0,
+            'totalRssMb': 0.0,
+            'shareLossCount': 0,
+            'shareDowntimeMs': 0.0,
+            'uptimeSec': round(time.monotonic() - self.started_at, 1),
+        }
+        members = {}
+
+        for member in self.members:
+            kiosk = member.process
+            status = kiosk.status if kiosk else {}
+            share = status.get('shareHealth', {})
+            summary['restarts'] += member.restarts
+            summary['shareLossCount'] += member.past_loss_count + share.get('lossCount', 0)
+            summary['shareDowntimeMs'] += member.past_downtime_ms + share.get('totalDowntimeMs', 0.0)
+            if not kiosk:
+                summary['restarting'] += 1
+            else:
+                summary['alive'] += 1
+                summary['ready'] += int(bool(status.get('ready')))
+                summary['inMeeting'] += int(bool(status.get('inMeeting')))
+                summary['sharing'] += int(bool(status.get('sharing')))
+                summary['recovering'] += int(status.get('recoveryState') == 'recovering')
+                summary['degraded'] += int(bool(status.get('degraded', {}).get('degraded')))
+                summary['totalRssMb'] += (status.get('maxRssKb') or 0) / 1024.0
+
+            members[member.kiosk_id] = {
+                'pid': kiosk.process.pid if kiosk else None,
+                'restarts': member.restarts,
+                'lastFailure': member.last_failure,
+                'heartbeatAgeMs': round((time.monotonic() - kiosk.last_heartbeat) * 1000) if kiosk else None,
+                **{k: v for k, v in status.items() if k not in ('type', 'kioskId')},
+            }
+
+        summary['totalRssMb'] = round(summary['totalRssMb'], 1)
+        summary['shareDowntimeMs'] = round(summary['shareDowntimeMs'], 1)
+        summary['members'] = members
+        return summary
+
+    def _report(self) -> None:
+        """Print a summary line and write fleet-status.json"""
+        summary = self.get_summary()
+        print(f'[Fleet] alive {summary["alive"]}/{summary["kiosks"]}, ready {summary["ready"]}, '
+              f'in meeting {summary["inMeeting"]}, sharing {summary["sharing"]}, '
+              f'recovering {summary["recovering"]}, degraded {summary["degraded"]}, restarting {summary["restarting"]}, '
+              f'restarts {summary["restarts"]}, rss {summary["totalRssMb"]}MB, '
+              f'share downtime {summary["shareDowntimeMs"] / 1000.0:.1f}s')
+
+        status_path = self.state_dir / 'fleet-status.json'
+        try:
+            tmp_path = status_path.with_suffix('.json.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(summary, f, indent=2)
+            os.replace(tmp_path, status_path)
+        except Exception as e:
+            print(f'[Fleet] Could not write {status_path}: {e}')
+
+    def run(self) -> None:
+        """Run until interrupted"""
+        self.running = True
+        self.started_at = time.monotonic()
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        print(f'[Fleet] Starting {len(self.members)} kiosks (state in {self.state_dir})')
+
+        try:
+            # Stagger start-up so SDK init and auth do not all hit at once
+            for member in self.members:
+                self._start(member)
+                time.sleep(self.fleet["startStaggerMs"] / 1000.0)
+
+            while self.running:
+                self._poll()
+                now = time.monotonic()
+
+                for member in self.members:
+                    if member.process:
+                        reason = member.process.failure_reason(self.fleet["heartbeatTimeoutMs"])
+                        if reason:
+                            self._on_failure(member, reason)
+                    elif now >= member.restart_at:
+                        member.restarts += 1
+                        self._start(member)
+
+                if (now - self.last_summary) * 1000 >= self.fleet["statusIntervalMs"]:
+                    self.last_summary = now
+                    self._report()
+        except KeyboardInterrupt:
+            print('\n[Fleet] Interrupted')
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        """Stop all kiosks"""
+        self.running = False
+        kiosks = [m.process for m in self.members if m.process]
+        # Ask everyone first so shutdowns overlap instead of running one by one
+        for kiosk in kiosks:
+            kiosk.send('shutdown')
+        for kiosk in kiosks:
+            kiosk.stop()
+        for member in self.members:
+            member.process = None
+        print('[Fleet] Stopped')
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Run a fleet of kiosks on this host')
+    parser.add_argument('--count', type=int, default=None,
+                        help='number of kiosks to run (default: fleet.count from config.json)')
+    parser.add_argument('--sdk', choices=['real', 'simulated'], default='real',
+                        help="SDK to use in the kiosk processes ('simulated' runs anywhere)")
+    args = parser.parse_args()
+    if args.sdk == 'simulated':
+        # Inherited by the spawned kiosk processes
+        os.environ['ZOOM_KIOSK_SDK'] = 'simulated'
+
+    FleetSupervisor(load_config(), args.count).run()
@@ -0,0 +1,196 @@
+"""
+Zoom Kiosk - Kiosk Process
+
+Runs a KioskApp in a child process that reports heartbeats to a
+supervisor over a pipe and accepts simple commands ('promote',
+'shutdown'). Used by the hot-standby supervisor (standby.py) and the
+fleet supervisor (fleet.py).
+"""
+
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+from multiprocessing.connection import Connection
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None
+
+
+class Role:
+    ACTIVE = 'active'
+    STANDBY = 'standby'
+
+
+def _max_rss_kb() -> Optional[int]:
+    """Peak resident memory of this process in KB, if the platform reports it"""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux kilobytes
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+
+def kiosk_worker(conn: Connection, options: Dict[str, Any]) -> None:
+    """
+    Process entry point. Options:
+      kioskId, role, heartbeatIntervalMs - required
+      enableShortcuts - register F9/F10 once active (default: False)
+      config      - KioskConfig to use (default: load_config())
+      replayPlan  - pre-compiled replay plan shared by the supervisor
+      stateDir    - directory for this kiosk's learned state
+      logPath     - file to redirect this kiosk's output to
+    """
+    if options.get('logPath'):
+        log = open(options['logPath'], 'a', encoding='utf-8', buffering=1)
+        sys.stdout = log
+        sys.stderr = log
+    try:
+        asyncio.run(_run_worker(conn, options))
+    except KeyboardInterrupt:
+        pass
+
+
+async def _run_worker(conn: Connection, options: Dict[str, Any]) -> None:
+    """Run the kiosk alongside the heartbeat/command loop"""
+    from .config import load_config, find_config_path
+    from .main import KioskApp
+
+    role = options['role']
+    state_dir = Path(options['stateDir']) if options.get('stateDir') else None
+    if state_dir:
+        state_dir.mkdir(parents=True, exist_ok=True)
+
+    # Kiosks loading config.json themselves also watch it for changes;
+    # a config handed over by the supervisor is fixed for the process lifetime
+    config_path = None
+    if not options.get('config'):
+        config_path = find_config_path()
+        if not config_path.exists():
+            config_path = None
+
+    app = KioskApp(
+        options.get('config') or load_config(),
+        kiosk_id=options['kioskId'],
+        auto_join=role == Role.ACTIVE,
+        enable_shortcuts=options.get('enableShortcuts', False),
+        replay_plan=options.get('replayPlan'),
+        state_dir=state_dir,
+        config_path=config_path
+    )
+    kiosk_task = asyncio.create_task(app.run())
+    heartbeat_task = asyncio.create_task(
+        _heartbeat_loop(conn, app, options['heartbeatIntervalMs'] / 1000.0))
+
+    await asyncio.wait([kiosk_task, heartbeat_task], return_when=asyncio.FIRST_COMPLETED)
+    if not kiosk_task.done():
+        kiosk_task.cancel()
+        try:
+            await kiosk_task
+        except asyncio.CancelledError:
+            pass
+
+
+async def _heartbeat_loop(conn: Connection, app: Any, interval: float) -> None:
+    """Send heartbeats and handle supervisor commands"""
+    counter = 0
+    while True:
+        while conn.poll():
+            command = conn.recv()
+            if command == 'promote':
+                await app.promote()
+            elif command == 'shutdown':
+                return
+
+        counter += 1
+        try:
+            conn.send({
+                'type': 'heartbeat',
+                'pid': os.getpid(),
+                'counter': counter,
+                'maxRssKb': _max_rss_kb(),
+                **app.get_status(),
+            })
+        except (BrokenPipeError, OSError):
+            # Supervisor is gone; shut down rather than linger as an unsupervised kiosk
+            return
+        await asyncio.sleep(interval)
+
+
+class KioskProcess:
+    """Supervisor-side handle for one kiosk process"""
+
+    def __init__(self, options: Dict[str, Any]):
+        ctx = multiprocessing.get_context('spawn')
+        self.conn, child_conn = ctx.Pipe()
+        self.options = options
+        self.kiosk_id = options['kioskId']
+        self.role = options['role']
+        self.started_at = time.monotonic()
+        self.last_heartbeat = self.started_at
+        self.status: Dict[str, Any] = {}
+        self.recovering_since: Optional[float] = None
+        self.process = ctx.Process(target=kiosk_worker, args=(child_conn, options),
+                                   name=f'{self.kiosk_id}-{self.role}', daemon=False)
+        self.process.start()
+        child_conn.close()
+
+    def on_message(self, message: Dict[str, Any]) -> None:
+        """Record a heartbeat"""
+        now = time.monotonic()
+        self.last_heartbeat = now
+        self.status = message
+        if message.get('recoveryState') == 'recovering':
+            if self.recovering_since is None:
+                self.recovering_since = now
+        else:
+            self.recovering_since = None
+
+    def drain(self) -> None:
+        """Read all pending heartbeats"""
+        try:
+            while self.conn.poll():
+                self.on_message(self.conn.recv())
+        except (EOFError, OSError):
+            # Process is gone; failure_reason will notice
+            pass
+
+    def failure_reason(self, heartbeat_timeout_ms: float,
+                       failover_after_recovering_ms: Optional[float] = None) -> Optional[str]:
+        """Why this kiosk should be considered failed, or None if it is healthy"""
+        now = time.monotonic()
+        if not self.process.is_alive():
+            return f'process exited (code {self.process.exitcode})'
+        if (now - self.last_heartbeat) * 1000 > heartbeat_timeout_ms:
+            return f'no heartbeat for {now - self.last_heartbeat:.1f}s'
+        if self.status.get('recoveryState') == 'failed':
+            return 'recovery failed'
+        if failover_after_recovering_ms is not None and self.recovering_since is not None and \
+                (now - self.recovering_since) * 1000 > failover_after_recovering_ms:
+            return f'recovering for {now - self.recovering_since:.1f}s'
+        return None
+
+    def send(self, command: str) -> None:
+        try:
+            self.conn.send(command)
+        except (BrokenPipeError, OSError):
+            pass
+
+    def stop(self, grace: float = 2.0) -> None:
+        """Ask the kiosk to shut down, terminate it if it does not"""
+        if self.process.is_alive():
+            self.send('shutdown')
+            self.process.join(grace)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(grace)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
@@ -6,13 +6,38 @@ Console-based Python application for automated Zoom Kiosk mode.
 
 import asyncio
 import sys
-from typing import Optional
-from pynput import keyboard
-from .config import load_config, KioskConfig
-from .zoom_service import ZoomService
+import time
+from pathlib import Path
+from typing import Coroutine, Optional, List
+try:
+    from pynput import keyboard
+except Exception as e:
+    # No input hooks available (e.g. headless Linux running the simulated SDK)
+    print(f'[Keyboard] Warning: pynput not available, shortcuts disabled: {e}')
+    keyboard = None
+from .config import load_config, find_config_path, diff_config, KioskConfig
+from .config_watcher import ConfigWatcher
+from .zoom_service import ZoomService, get_sdk
 from .recovery import RecoveryWatchdog
+from .share_health import ShareHealthMonitor
+from .adaptive_timeouts import AdaptiveTimeouts
+from .reconnect_limiter import create_reconnect_limiter
+from .reachability import ReachabilityProber
+from .status_block import StatusBlockWriter
+from .session_checkpoint import SessionCheckpoint
+from .callback_trace import CallbackTraceRecorder
+from .network_quality import NetworkQualityMonitor
+from .share_policy import SharePolicy
+from .display_topology import DisplayTopology
+from .perf_history import PerfHistory
+from .control_plane import ControlPlane
+from .profiler import SamplingProfiler
+from .task_supervisor import TaskSupervisor
+from .shutdown import ShutdownOrchestrator
 from .action_recorder import ActionRecorder
-from .action_player import ActionPlayer
+from .action_player import ActionPlayer, MouseAction
+from .screen_backend import ScreenBackend
+from .clock import Clock, SYSTEM_CLOCK
 
 # Import Windows message loop (only on Windows)
 if sys.platform == 'win32':
@@ -24,216 +49,706 @@ else:
     def stop_message_loop():
         pass
 
-# Global state
-zoom_service: Optional[ZoomService] = None
-recovery_watchdog: Optional[RecoveryWatchdog] = None
-action_recorder: Optional[ActionRecorder] = None
-action_player: Optional[ActionPlayer] = None
-config: Optional[KioskConfig] = None
-other_participant_poll_task: Optional[asyncio.Task] = None
-keyboard_listener: Optional[keyboard.Listener] = None
-
 
 def print_status(message: str) -> None:
     """Print status message"""
     print(f'[Status] {message}')
 
 
-async def replay_remote_control_setup() -> None:
-    """Replay recorded mouse actions to apply preferences"""
-    if not action_recorder or not action_player:
-        return
-
-    actions = action_recorder.load_recording()
-    if not actions:
-        print_status('No preferences recorded')
-        return
-
-    print_status('Applying preferences...')
-    try:
-        await action_player.play_actions(actions)
-        print_status('Preferences applied successfully')
-    except Exception as e:
-        print(f'[Error] Failed to apply preferences: {e}')
-
-
-async def start_meeting() -> None:
-    """Start the meeting"""
-    if not zoom_service:
-        return
-
-    try:
-        await zoom_service.start_meeting()
-    except Exception as e:
-        print(f'[Error] Failed to start meeting: {e}')
-        print_status(f'Error: {e}')
+# Config sections that can be changed while in a meeting. Components read
+# these on each use; anything else needs a restart (and hence a rejoin).
+HOT_RELOAD_SECTIONS = ('screen', 'remoteControl', 'replay', 'recovery', 'shareHealth')
+
+# Read by ActionRecorder when it is created
+RECORDER_SETTINGS = ('signatureSize', 'monitorRelative')
+
+
+class KioskApp:
+    """
+    One kiosk: owns the Zoom service and every component around it.
+
+    auto_join=False makes a standby kiosk that initializes and authenticates
+    but waits for promote() before joining (see standby.py). A pre-compiled
+    replay_plan and state_dir let a supervisor share read-only assets between
+    kiosks while keeping learned state per kiosk (see fleet.py).
+    """
+
+    def __init__(self, config: KioskConfig, kiosk_id: str = 'kiosk', auto_join: bool = True,
+                 enable_shortcuts: bool = True, replay_plan: Optional[List[MouseAction]] = None,
+                 state_dir: Optional[Path] = None, config_path: Optional[Path] = None,
+                 clock: Clock = SYSTEM_CLOCK):
+        self.config = config
+        self.clock = clock
+        self.kiosk_id = kiosk_id
+        self.auto_join = auto_join
+        self.enable_shortcuts = enable_shortcuts
+        self.replay_plan = replay_plan
+
+        # Every background task of this kiosk; a replaced ZoomService's tasks are cancelled with it
+        self.tasks = TaskSupervisor(clock)
+
+        self.zoom_service: Optional[ZoomService] = None
+        self.other_participant_poll_task: Optional[asyncio.Task] = None
+        self.keyboard_listener: Optional['keyboard.Listener'] = None
+        # The loop run() is on; listener threads hand their work to it
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Initialize components
+        self.display_topology = DisplayTopology()
+        self.action_recorder = self._create_action_recorder()
+        # Set when replay settings change during a capture; the next capture gets a new recorder
+        self.recorder_outdated = False
+        self.action_player = ActionPlayer(config['replay'], clock=clock, topology=self.display_topology)
+        self.action_player.set_playback_speed(config['replay']['playbackSpeed'])
+
+        self.adaptive_timeouts = AdaptiveTimeouts(
+            config['timeouts'],
+            state_dir / 'phase-timings.json' if state_dir else None,
+            clock
+        )
+
+        self.recovery_watchdog = RecoveryWatchdog(
+            config['recovery'],
+            self.reconnect_meeting,
+            self.adaptive_timeouts,
+            create_reconnect_limiter(config['reconnectLimiter']),
+            config['reconnectLimiter']['acquireTimeoutMs'] / 1000.0,
+            ReachabilityProber(config['reachability'], clock) if config['reachability']['enabled'] else None,
+            clock,
+            self.tasks
+        )
+
+        self.share_health_monitor = ShareHealthMonitor(
+            config['shareHealth'],
+            self.on_disconnected,
+            self.adaptive_timeouts,
+            clock,
+            self.tasks
+        )
+
+        self.network_quality = NetworkQualityMonitor(config['networkQuality'], clock, self.tasks)
+        self.share_policy = SharePolicy(config['sharePolicy'], config['screen'], self.network_quality, clock,
+                                        self.tasks)
+
+        self.status_block: Optional[StatusBlockWriter] = None
+        if config['statusBlock']['enabled']:
+            self.status_block = StatusBlockWriter(
+                config['statusBlock'],
+                self.get_status,
+                state_dir / 'kiosk-status.bin' if state_dir else None,
+                self.tasks
+            )
+
+        # Session checkpoint; resume holds the previous session if this start resumes it
+        self.checkpoint: Optional[SessionCheckpoint] = None
+        self.resume: Optional[dict] = None
+        if config['checkpoint']['enabled']:
+            self.checkpoint = SessionCheckpoint(
+                config['checkpoint'],
+                state_dir / 'session-checkpoint.json' if state_dir else None
+            )
+            # A standby never was in the meeting; whatever the file says belongs to another process
+            if auto_join:
+                self.resume = self.checkpoint.load_resumable(config['zoom']['pmi'])
+            if self.resume:
+                age = time.time() - self.resume.get('updatedAt', 0)
+                print(f'[Checkpoint] Resuming session in meeting {self.resume["meetingId"]} '
+                      f'(last seen {age:.0f}s ago, preferences applied: {self.resume.get("prefsApplied", False)})')
+                # Pre-warm timeouts with what the previous process learned
+                self.adaptive_timeouts.seed(self.resume.get('timings', {}))
+
+        self.callback_trace: Optional[CallbackTraceRecorder] = None
+        if config['callbackTrace']['enabled']:
+            self.callback_trace = CallbackTraceRecorder(
+                config['callbackTrace'],
+                state_dir / 'callback-trace.jsonl' if state_dir and not config['callbackTrace']['path'] else None,
+                clock
+            )
+
+        # Longitudinal phase timings; the session starts in run()
+        self.perf_history: Optional[PerfHistory] = None
+        self.run_started: Optional[float] = None
+        self.disconnected_at: Optional[float] = None
+        if config['perfHistory']['enabled']:
+            self.perf_history = PerfHistory(
+                config['perfHistory'],
+                state_dir / 'perf-history.sqlite3' if state_dir else None,
+                kiosk_id
+            )
+            self.recovery_watchdog.on_attempt_finished = self.on_recovery_attempt_finished
+
+        # Set to leave the main loop and shut down; the report says how the shutdown went
+        self.stopping = False
+        self.shutdown_report: Optional[dict] = None
+
+        # On-demand stack sampling (F11, control plane or profiler.enabled)
+        self.profiler = SamplingProfiler(config['profiler'], None if config['profiler']['path'] else state_dir)
+
+        # Localhost API; status reads are served from snapshots published on change
+        self.control_plane: Optional[ControlPlane] = None
+        if config['controlPlane']['enabled']:
+            self.control_plane = ControlPlane(
+                config['controlPlane'],
+                self.get_status,
+                {
+                    'replay': self.replay_preferences,
+                    'reconnect': self.reconnect_meeting,
+                    'share/restart': self.restart_share,
+                    'stop': self.request_stop,
+                    'profile/start': self.start_profiler,
+                    'profile/stop': self.stop_profiler,
+                },
+                clock,
+                self.tasks
+            )
+            self.recovery_watchdog.on_state_changed = self.on_recovery_state_changed
+
+        self.config_watcher: Optional[ConfigWatcher] = None
+        if config_path and config['configReload']['enabled']:
+            self.config_watcher = ConfigWatcher(config['configReload'], config_path, self.apply_config,
+                                                self.tasks)
+
+    def apply_config(self, new_config: KioskConfig) -> None:
+        """Apply a reloaded config without leaving the meeting"""
+        changes = diff_config(self.config, new_config)
+        if not changes:
+            return
+
+        for section, keys in changes.items():
+            if section not in HOT_RELOAD_SECTIONS:
+                print(f'[Config] {section} changed ({", ".join(keys)}); takes effect after restart')
+                continue
+            # Update in place: components hold references to their section
+            self.config[section].update(new_config[section])
+            print(f'[Config] Applied {section}: {", ".join(keys)}')
+
+        if 'screen' in changes and self.zoom_service:
+            # The service copied the settings when it was created; push them to it and the running share
+            self.zoom_service.set_share_settings(**self.share_policy.settings())
+        if 'replay' in changes:
+            self.action_player.set_playback_speed(self.config['replay']['playbackSpeed'])
+            if any(key in RECORDER_SETTINGS for key in changes['replay']):
+                if self.action_recorder.is_recording:
+                    self.recorder_outdated = True
+                    print('[Config] Capture settings apply from the next capture')
+                else:
+                    self.action_recorder = self._create_action_recorder(self.action_recorder.backend)
+        if 'recovery' in changes:
+            self.recovery_watchdog.on_config_changed()
+
+    def _create_action_recorder(self, backend: Optional[ScreenBackend] = None) -> ActionRecorder:
+        replay = self.config['replay']
+        return ActionRecorder(replay['signatureSize'], backend,
+                              topology=self.display_topology if replay['monitorRelative'] else None)
+
+    def has_replay_plan(self) -> bool:
+        """Check if there are preferences to replay"""
+        return self.replay_plan is not None or self.action_recorder.has_recording()
+
+    async def replay_remote_control_setup(self) -> None:
+        """Replay recorded mouse actions to apply preferences"""
+        actions = self.replay_plan if self.replay_plan is not None else self.action_recorder.load_recording()
+        if not actions:
+            print_status('No preferences recorded')
+            return
+
+        print_status('Applying preferences...')
+        started = self.clock.monotonic()
+        try:
+            await self.action_player.play_actions(actions)
+            print_status('Preferences applied successfully')
+            self.record_timing('replay', started)
+            if self.checkpoint:
+                self.checkpoint.update(prefsApplied=True)
+        except Exception as e:
+            print(f'[Error] Failed to apply preferences: {e}')
+            self.record_timing('replay', started, 'failed')
+
+    async def replay_preferences(self) -> None:
+        """Apply the recorded preferences again (control plane)"""
+        if not self.zoom_service or not self.zoom_service.is_in_meeting:
+            raise RuntimeError('not in a meeting')
+        await self.replay_remote_control_setup()
+
+    async def restart_share(self) -> None:
+        """Stop and start the screen share (control plane)"""
+        service = self.zoom_service
+        if not service or not service.is_in_meeting:
+            raise RuntimeError('not in a meeting')
+        if service.stop_screen_share() is not None:
+            # Let the SDK report the end of the share before starting again
+            await self.clock.sleep(1.0)
+        if not service.is_sharing:
+            await service.start_screen_share()
+
+    async def start_profiler(self) -> None:
+        """Start sampling (control plane)"""
+        if not self.profiler.start():
+            raise RuntimeError('profiler already running')
+
+    async def stop_profiler(self) -> None:
+        """Stop sampling and write the profile off the event loop (control plane)"""
+        if not self.profiler.is_running:
+            raise RuntimeError('profiler not running')
+        await asyncio.to_thread(self.profiler.stop)
+
+    def toggle_profiler(self) -> None:
+        """Start sampling, or stop and write the profile off the event loop (F11)"""
+        if self.profiler.is_running:
+            print_status('Stopping profiler...')
+            self.tasks.spawn(asyncio.to_thread(self.profiler.stop), 'stopProfiler', 'kiosk')
+        else:
+            print_status('Starting profiler...')
+            self.profiler.start()
 
+    async def request_stop(self) -> None:
+        """Leave the main loop; the kiosk cleans up and run() returns"""
+        print_status('Stop requested')
+        self.stopping = True
 
-async def reconnect_meeting() -> None:
-    """Reconnect to meeting"""
-    global zoom_service
+    async def start_meeting(self) -> None:
+        """Start the meeting"""
+        if not self.zoom_service:
+            return
 
-    print_status('Reconnecting...')
-    if zoom_service:
         try:
-            await zoom_service.leave_meeting()
-            await asyncio.sleep(1)
-        except Exception:
-            pass
-
-    # Reinitialize
-    await initialize_zoom(force_reload=True)
-
+            await self.zoom_service.start_meeting()
+        except Exception as e:
+            print(f'[Error] Failed to start meeting: {e}')
+            print_status(f'Error: {e}')
+
+    def spawn(self, coro: Coroutine, name: str) -> asyncio.Task:
+        """Run a background task for the current meeting; cancelled when the ZoomService is replaced"""
+        return self.tasks.spawn(coro, name, 'kiosk', self.zoom_service)
+
+    def on_initialized(self) -> None:
+        """Handle SDK initialized (authenticated) event"""
+        # After an upgrade from mock mode, stop waiting on the simulated meeting
+        if self.other_participant_poll_task:
+            self.other_participant_poll_task.cancel()
+            self.other_participant_poll_task = None
+        if self.auto_join:
+            self.spawn(self.start_meeting(), 'startMeeting')
+        else:
+            print_status('Standby: SDK ready, waiting for promotion')
+
+    async def promote(self) -> None:
+        """Promote a standby kiosk to active: join and share now"""
+        if self.auto_join:
+            return
+        self.auto_join = True
+        print_status('Promoted to active')
+        if self.enable_shortcuts:
+            self.setup_keyboard_shortcuts()
+        if self.control_plane and not self.control_plane.server:
+            await self.control_plane.start()
+        # If the SDK is not ready yet, on_initialized joins as soon as it is
+        if self.zoom_service and self.zoom_service.is_initialized and not self.zoom_service.is_in_meeting:
+            await self.start_meeting()
+
+    async def reconnect_meeting(self) -> None:
+        """Reconnect to meeting"""
+        print_status('Reconnecting...')
+        if self.zoom_service:
+            try:
+                await self.zoom_service.leave_meeting()
+                await self.clock.sleep(1)
+            except Exception:
+                pass
 
-async def initialize_zoom(force_reload: bool = False) -> None:
-    """Initialize Zoom SDK and start meeting"""
-    global zoom_service, recovery_watchdog, action_recorder, action_player, config
+        # Reinitialize
+        await self.initialize_zoom(force_reload=True)
 
-    if not config:
-        print('[Error] Config not loaded')
-        return
+    async def initialize_zoom(self, force_reload: bool = False) -> None:
+        """Initialize Zoom SDK and start meeting"""
+        try:
+            print_status('Initializing Zoom SDK...')
 
-    try:
-        print_status('Initializing Zoom SDK...')
+            # Nothing of the previous service may keep running in the background
+            # (upgrade loop, delayed share starts, auth retries, replays for its meeting)
+            if self.zoom_service:
+                self.zoom_service.stop_upgrade()
+                self.tasks.cancel_scope(self.zoom_service)
 
-        zoom_service = ZoomService(config)
+            zoom_service = ZoomService(self.config, self.adaptive_timeouts, self.clock, self.callback_trace,
+                                       self.display_topology, self.tasks)
+            self.zoom_service = zoom_service
 
-        # Set up event handlers
-        zoom_service.on('initialized', lambda: asyncio.create_task(start_meeting()))
+            # Set up event handlers
+            zoom_service.on('initialized', self.on_initialized)
 
-        zoom_service.on('meetingJoined', on_meeting_joined)
+            zoom_service.on('meetingJoined', self.on_meeting_joined)
 
-        zoom_service.on('sharingStarted', on_sharing_started)
+            zoom_service.on('sharingStarted', self.on_sharing_started)
 
-        zoom_service.on('disconnected', on_disconnected)
+            zoom_service.on('disconnected', self.on_disconnected)
 
-        zoom_service.on('error', lambda error: print_status(f'Error: {error}'))
+            zoom_service.on('error', lambda error: print_status(f'Error: {error}'))
 
-        # Initialize SDK
-        await zoom_service.initialize(force_reload)
+            if self.perf_history:
+                zoom_service.on('phase', self.perf_history.record)
 
-    except Exception as e:
-        print(f'[Error] Failed to initialize Zoom: {e}')
-        print_status(f'Error: {e}')
+            if self.control_plane:
+                self.control_plane.attach(zoom_service)
 
+            # Restart the screen share in place if it drops mid-meeting
+            self.share_health_monitor.attach(zoom_service)
 
-def on_meeting_joined() -> None:
-    """Handle meeting joined event"""
-    global other_participant_poll_task
+            # Rolling connection quality from the SDK's network callbacks
+            self.network_quality.attach(zoom_service)
 
-    print_status('Meeting joined, setting up remote control...')
-    if recovery_watchdog:
-        recovery_watchdog.on_connected()
+            # Lighter share settings while the uplink is poor
+            if self.config['sharePolicy']['enabled']:
+                self.share_policy.attach(zoom_service)
 
-    if not action_recorder or not action_player:
-        return
+            # Initialize SDK
+            await zoom_service.initialize(force_reload)
 
-    if action_recorder.has_recording():
-        other_count = zoom_service.get_other_participant_count() if zoom_service else 0
-        if other_count > 0:
-            print_status('Applying preferences...')
-            asyncio.create_task(replay_remote_control_setup())
-        else:
-            print_status('Waiting for another participant to apply preferences...')
-            applied = False
-
-            async def do_apply() -> None:
-                nonlocal applied
-                global other_participant_poll_task
-                if applied:
-                    return
-                applied = True
-                if other_participant_poll_task:
-                    other_participant_poll_task.cancel()
-                    other_participant_poll_task = None
+        except Exception as e:
+            print(f'[Error] Failed to initialize Zoom: {e}')
+            print_status(f'Error: {e}')
+
+    def on_meeting_joined(self) -> None:
+        """Handle meeting joined event"""
+        print_status('Meeting joined, setting up remote control...')
+        self.recovery_watchdog.on_connected()
+
+        resume, self.resume = self.resume, None
+        if self.checkpoint:
+            self.checkpoint.update(
+                meetingId=self.config['zoom']['pmi'],
+                # Still the same meeting session when resuming
+                joinedAt=resume['joinedAt'] if resume else time.time(),
+                prefsApplied=bool(resume and resume.get('prefsApplied')),
+                inMeeting=True,
+                recoveryState=self.recovery_watchdog.get_state(),
+                timings=self.adaptive_timeouts.samples
+            )
+
+        if resume and resume.get('sharing') and self.zoom_service:
+            # We were sharing before the restart: share again without waiting for participants
+            print_status('Resuming screen share...')
+            self.spawn(self.zoom_service.start_screen_share(), 'resumeShare')
+
+        if resume and resume.get('prefsApplied'):
+            print_status('Preferences already applied in this meeting, skipping replay')
+        elif self.has_replay_plan():
+            other_count = self.zoom_service.get_other_participant_count() if self.zoom_service else 0
+            if other_count > 0:
                 print_status('Applying preferences...')
-                await replay_remote_control_setup()
-
-            if zoom_service:
-                zoom_service.once('otherParticipantPresent', lambda: asyncio.create_task(do_apply()))
+                self.spawn(self.replay_remote_control_setup(), 'replay')
+            else:
+                print_status('Waiting for another participant to apply preferences...')
+                applied = False
 
-            # Fallback: poll in case join callback is not fired
-            async def poll_participants() -> None:
-                nonlocal applied
-                while not applied:
-                    await asyncio.sleep(2)
+                async def do_apply() -> None:
+                    nonlocal applied
                     if applied:
-                        break
-                    if zoom_service:
-                        n = zoom_service.get_other_participant_count()
-                        if n > 0:
-                            await do_apply()
+                        return
+                    applied = True
+                    if self.other_participant_poll_task:
+                        self.other_participant_poll_task.cancel()
+                        self.other_participant_poll_task = None
+                    print_status('Applying preferences...')
+                    await self.replay_remote_control_setup()
+
+                if self.zoom_service:
+                    self.zoom_service.once('otherParticipantPresent', lambda: self.spawn(do_apply(), 'replay'))
+
+                # Fallback: poll in case join callback is not fired
+                async def poll_participants() -> None:
+                    nonlocal applied
+                    while not applied:
+                        await self.clock.sleep(2)
+                        if applied:
                             break
+                        if self.zoom_service:
+                            n = self.zoom_service.get_other_participant_count()
+                            if n > 0:
+                                await do_apply()
+                                break
 
-            other_participant_poll_task = asyncio.create_task(poll_participants())
-    else:
-        print('\n========================================')
-        print('  KEYBOARD SHORTCUTS')
-        print('========================================')
-        print('  F9  - Start/Stop capturing')
-        print('  F10 - Force stop capturing')
-        print('')
-        print('To capture preferences:')
-        print('  1. Press F9 to start capturing')
-        print('  2. Navigate to menu and configure settings')
-        print('  3. Press F9 again to stop capturing')
-        print('========================================\n')
-
-
-def on_sharing_started() -> None:
-    """Handle sharing started event"""
-    print_status('Screen sharing active')
-
-
-def on_disconnected(reason: str) -> None:
-    """Handle disconnected event"""
-    global other_participant_poll_task
-
-    print(f'[Diagnostic] on_disconnected called: reason={reason}')
-
-    if other_participant_poll_task:
-        other_participant_poll_task.cancel()
-        other_participant_poll_task = None
-
-    if action_player:
-        action_player.stop()
-
-    print_status(f'Disconnected: {reason}')
-    if recovery_watchdog:
-        recovery_watchdog.on_disconnected()
-
-
-def on_key_press(key: keyboard.Key) -> None:
-    """Handle keyboard shortcuts"""
-    try:
-        if key == keyboard.Key.f9:
-            if action_recorder:
-                if action_recorder.is_recording:
+                self.other_participant_poll_task = self.spawn(poll_participants(), 'pollParticipants')
+        else:
+            print('\n========================================')
+            print('  KEYBOARD SHORTCUTS')
+            print('========================================')
+            print('  F9  - Start/Stop capturing')
+            print('  F10 - Force stop capturing')
+            print('  F11 - Start/Stop the profiler')
+            print('')
+            print('To capture preferences:')
+            print('  1. Press F9 to start capturing')
+            print('  2. Navigate to menu and configure settings')
+            print('  3. Press F9 again to stop capturing')
+            print('========================================\n')
+
+    def on_sharing_started(self) -> None:
+        """Handle sharing started event"""
+        print_status('Screen sharing active')
+        if self.run_started is not None:
+            # Only the first share of the run: start to screen on the far end
+            self.record_timing('timeToShare', self.run_started)
+            self.run_started = None
+        if self.disconnected_at is not None:
+            self.record_timing('recovery', self.disconnected_at)
+            self.disconnected_at = None
+        self.recovery_watchdog.on_sharing_restored()
+        if self.checkpoint:
+            self.checkpoint.update(sharing=True, recoveryState=self.recovery_watchdog.get_state())
+
+    def on_disconnected(self, reason: str) -> None:
+        """Handle disconnected event"""
+        print(f'[Diagnostic] on_disconnected called: reason={reason}')
+
+        if self.other_participant_poll_task:
+            self.other_participant_poll_task.cancel()
+            self.other_participant_poll_task = None
+
+        self.action_player.stop()
+
+        print_status(f'Disconnected: {reason}')
+        if self.disconnected_at is None:
+            # Outage measured from the first disconnect until sharing again
+            self.disconnected_at = self.clock.monotonic()
+        self.recovery_watchdog.on_disconnected()
+        if self.checkpoint and self.checkpoint.data:
+            self.checkpoint.update(inMeeting=False, sharing=False,
+                                   recoveryState=self.recovery_watchdog.get_state())
+
+    def record_timing(self, phase: str, started: float, outcome: str = 'ok', attempt: int = 0) -> None:
+        """Add a phase that started at started (clock time) to the performance history"""
+        if self.perf_history:
+            self.perf_history.record(phase, (self.clock.monotonic() - started) * 1000, outcome, attempt)
+
+    def on_recovery_attempt_finished(self, attempt: int, outcome: str, duration_ms: float) -> None:
+        """Add a finished recovery attempt to the performance history"""
+        if self.perf_history:
+            self.perf_history.record('recoveryAttempt', duration_ms, outcome, attempt)
+
+    def on_recovery_state_changed(self, old: str, new: str) -> None:
+        """Stream recovery state changes and republish the status"""
+        if self.control_plane:
+            self.control_plane.on_event('recoveryState', old, new)
+
+    def on_key_press(self, key: 'keyboard.Key') -> None:
+        """Handle keyboard shortcuts"""
+        try:
+            if key == keyboard.Key.f9:
+                if self.action_recorder.is_recording:
                     print_status('Stopping capture...')
-                    if action_recorder.stop_recording():
+                    if self.action_recorder.stop_recording():
+                        # Replay the new recording from now on
+                        self.replay_plan = None
                         print_status('Preferences saved')
                     else:
                         print_status('Failed to save preferences')
                 else:
                     print_status('Starting capture...')
-                    action_recorder.start_recording()
+                    if self.recorder_outdated:
+                        self.action_recorder = self._create_action_recorder(self.action_recorder.backend)
+                        self.recorder_outdated = False
+                    self.action_recorder.start_recording(self.loop)
                     print_status('Capture active - click to record preferences')
 
-        elif key == keyboard.Key.f10:
-            if action_recorder and action_recorder.is_recording:
-                print_status('Force stopping capture...')
-                action_recorder.stop_recording()
-    except AttributeError:
-        pass
-
+            elif key == keyboard.Key.f10:
+                if self.action_recorder.is_recording:
+                    print_status('Force stopping capture...')
+                    self.action_recorder.stop_recording()
 
-def setup_keyboard_shortcuts() -> None:
-    """Set up global keyboard shortcuts"""
-    global keyboard_listener
+            elif key == keyboard.Key.f11:
+                # This is the keyboard hook's thread: a slow hook is dropped by Windows
+                if self.loop:
+                    self.loop.call_soon_threadsafe(self.toggle_profiler)
+        except AttributeError:
+            pass
 
-    keyboard_listener = keyboard.Listener(on_press=on_key_press)
-    keyboard_listener.start()
-    print('[Keyboard] Shortcuts registered (F9/F10)')
+    def setup_keyboard_shortcuts(self) -> None:
+        """Set up global keyboard shortcuts"""
+        if keyboard is None or self.keyboard_listener:
+            return
+
+        self.keyboard_listener = keyboard.Listener(on_press=self.on_key_press)
+        self.keyboard_listener.start()
+        print('[Keyboard] Shortcuts registered (F9/F10/F11)')
+
+    def get_status(self) -> dict:
+        """Get current kiosk status"""
+        service = self.zoom_service
+        return {
+            'kioskId': self.kiosk_id,
+            'role': 'active' if self.auto_join else 'standby',
+            'ready': bool(service and service.is_initialized),
+            'mockMode': bool(service and service.use_mock_mode),
+            'inMeeting': bool(service and service.is_in_meeting),
+            'sharing': bool(service and service.is_sharing),
+            'participantCount': service.participant_count if service else 0,
+            'lastErrorCode': service.last_error_code if service else 0,
+            'recoveryState': self.recovery_watchdog.get_state(),
+            'retryCount': self.recovery_watchdog.get_retry_count(),
+            'shareHealth': self.share_health_monitor.get_metrics(),
+            'networkQuality': self.network_quality.get_metrics(),
+            'sharePolicy': self.share_policy.get_state(),
+            'display': self.display_topology.get_state(),
+            'perfHistory': self.perf_history.get_stats() if self.perf_history else {},
+            'profiler': self.profiler.get_state(),
+            'tasks': self.tasks.get_stats(),
+            'degraded': service.get_degraded_metrics() if service else {},
+        }
+
+    async def run(self) -> None:
+        """Run the kiosk until interrupted or cancelled"""
+        # Install exception hook for diagnostics (catches main-thread exceptions)
+        sys.excepthook = _log_exception
+        self.loop = asyncio.get_running_loop()
+        self.loop.set_exception_handler(_task_exception_handler)
+
+        # Start Windows message loop (required for SDK callbacks)
+        if sys.platform == 'win32':
+            start_message_loop()
+            # Re-enumerate monitors when the display layout changes
+            self.display_topology.watch()
+
+        # Set up keyboard shortcuts
+        if self.enable_shortcuts and self.auto_join:
+            self.setup_keyboard_shortcuts()
+
+        # Start recovery watchdog
+        self.recovery_watchdog.start()
+
+        # New session in the performance history
+        self.run_started = self.clock.monotonic()
+        if self.perf_history:
+            self.perf_history.start_session(_sdk_version())
+
+        # Publish liveness for external monitors
+        if self.status_block:
+            self.status_block.start()
+
+        # Pick up config.json edits without restarting
+        if self.config_watcher:
+            self.config_watcher.start()
+
+        # A standby leaves the port to the active kiosk until it is promoted
+        if self.control_plane and self.auto_join:
+            await self.control_plane.start()
+
+        if self.config['profiler']['enabled']:
+            self.profiler.start(self.config['profiler']['durationMs'] / 1000.0 or None)
+
+        # Initialize Zoom
+        await self.initialize_zoom()
+
+        # Keep running
+        try:
+            while not self.stopping:
+                await self.clock.sleep(1)
+                if self.checkpoint:
+                    self.checkpoint.refresh()
+        except KeyboardInterrupt:
+            print('\n[Shutdown] Interrupted by user (Ctrl+C)')
+        except SystemExit as e:
+            print(f'\n[Diagnostic] SystemExit in main loop: code={e.code}')
+            print('[Diagnostic] May indicate external process termination (e.g. SentinelOne, script)')
+        except Exception as e:
+            print(f'\n[Diagnostic] Exception in main loop: {type(e).__name__}: {e}')
+            import traceback
+            traceback.print_exc()
+        finally:
+            print('[Diagnostic] Entering cleanup (finally block)')
+            await self.cleanup()
+
+    async def cleanup(self) -> None:
+        """Tear down in dependency order, independent phases in parallel, within the shutdown deadline"""
+        print('[Shutdown] Cleaning up...')
+        shutdown = ShutdownOrchestrator(self.config['shutdown'], self.clock)
+        shutdown.add('input', self._stop_input)
+        # A profile still running is written before the kiosk goes away
+        shutdown.add('profiler', self._stop_profiler_on_shutdown)
+        # Nothing may react to leaving the meeting by reconnecting or restarting the share
+        shutdown.add('monitors', self._stop_monitors)
+        shutdown.add('leave', self._leave_meeting, after=('monitors',))
+        shutdown.add('checkpoint', self._close_checkpoint, after=('leave',))
+        shutdown.add('callbackTrace', self._close_callback_trace, after=('leave',))
+        # Timings learned since the last background write
+        shutdown.add('timeouts', self.adaptive_timeouts.flush, after=('leave',))
+        # Write the remaining timings and close the session (joins the writer thread)
+        shutdown.add('perfHistory', self._close_perf_history, after=('leave',))
+        shutdown.add('controlPlane', self._stop_control_plane, after=('leave',))
+        shutdown.add('tasks', self._cancel_tasks, after=('monitors', 'leave', 'controlPlane'))
+        # SDK callbacks of the leave still need the message pump
+        shutdown.add('messageLoop', self._stop_message_loop, after=('leave', 'tasks'))
+        # Marked cleanly stopped once everything else is done
+        shutdown.add('statusBlock', self._stop_status_block, after=tuple(shutdown.phases))
+        await shutdown.run()
+        self.shutdown_report = shutdown.report()
+        print('[Shutdown] Cleanup complete')
+
+    def _stop_input(self) -> None:
+        if self.keyboard_listener:
+            self.keyboard_listener.stop()
+        if self.config_watcher:
+            self.config_watcher.stop()
+
+    async def _stop_profiler_on_shutdown(self) -> None:
+        if self.profiler.is_running:
+            await asyncio.to_thread(self.profiler.stop)
+
+    def _stop_monitors(self) -> None:
+        if self.other_participant_poll_task and not self.other_participant_poll_task.done():
+            self.other_participant_poll_task.cancel()
+        self.recovery_watchdog.stop()
+        self.share_health_monitor.stop()
+        self.network_quality.detach()
+        self.share_policy.detach()
+        self.display_topology.stop()
+
+    async def _leave_meeting(self) -> None:
+        if self.zoom_service:
+            self.zoom_service.stop_upgrade()
+            await self.zoom_service.leave_meeting()
+
+    def _close_checkpoint(self) -> None:
+        # Left cleanly: the next start joins a fresh session
+        if self.checkpoint and self.checkpoint.data:
+            self.checkpoint.update(inMeeting=False, sharing=False, recoveryState='idle')
+
+    def _close_callback_trace(self) -> None:
+        if self.callback_trace:
+            self.callback_trace.close()
+
+    async def _close_perf_history(self) -> None:
+        if self.perf_history:
+            await asyncio.to_thread(self.perf_history.end_session)
+
+    async def _stop_control_plane(self) -> None:
+        if self.control_plane:
+            await self.control_plane.stop()
+
+    async def _cancel_tasks(self) -> None:
+        # Half the phase timeout, leaving the rest to report which tasks did not stop
+        stuck = await self.tasks.cancel_all(self.config['shutdown']['phaseTimeoutMs'] / 2000.0)
+        if stuck:
+            raise RuntimeError(f'still running: {", ".join(stuck)}')
+
+    async def _stop_message_loop(self) -> None:
+        if sys.platform == 'win32':
+            stop_message_loop()
+            # Give the message loop task time to cancel
+            await self.clock.sleep(0.1)
+
+    def _stop_status_block(self) -> None:
+        if self.status_block:
+            self.status_block.stop()
+
+
+def _sdk_version() -> str:
+    """Version of the loaded Zoom SDK, empty if unknown"""
+    sdk = get_sdk()
+    try:
+        return str(sdk.GetSDKVersion()) if sdk and hasattr(sdk, 'GetSDKVersion') else ''
+    except Exception:
+        return ''
 
 
 def _log_exception(exc_type, exc_val, exc_tb):
@@ -244,31 +759,22 @@ def _log_exception(exc_type, exc_val, exc_tb):
         traceback.print_exception(exc_type, exc_val, exc_tb)
 
 
-async def main() -> None:
-    """Main entry point"""
-    global config, recovery_watchdog, action_recorder, action_player
-
-    # Install exception hook for diagnostics (catches main-thread exceptions)
-    sys.excepthook = _log_exception
+def _task_exception_handler(loop, context):
+    """Log asyncio task exceptions (e.g. from callbacks that use create_task)"""
+    exc = context.get('exception')
+    if exc:
+        print(f'[Diagnostic] Async task exception: {type(exc).__name__}: {exc}')
+        import traceback
+        traceback.print_exception(type(exc), exc, exc.__traceback__)
+    else:
+        print(f'[Diagnostic] Async context: {context}')
 
-    # Log asyncio task exceptions (e.g. from callbacks that use create_task)
-    def _task_exception_handler(loop, context):
-        exc = context.get('exception')
-        if exc:
-            print(f'[Diagnostic] Async task exception: {type(exc).__name__}: {exc}')
-            import traceback
-            traceback.print_exception(type(exc), exc, exc.__traceback__)
-        else:
-            print(f'[Diagnostic] Async context: {context}')
-    asyncio.get_running_loop().set_exception_handler(_task_exception_handler)
 
+async def main() -> None:
+    """Main entry point"""
     print('Zoom Kiosk - Python Edition')
     print('=' * 40)
 
-    # Start Windows message loop (required for SDK callbacks)
-    if sys.platform == 'win32':
-        start_message_loop()
-
     # Load configuration
     try:
         config = load_config()
@@ -277,92 +783,5 @@ async def main() -> None:
         print(f'[Error] Failed to load config: {e}')
         sys.exit(1)
 
-    # Initialize components
-    action_recorder = ActionRecorder()
-    action_player = ActionPlayer()
-
-    recovery_watchdog = RecoveryWatchdog(
-        config['recovery'],
-        reconnect_meeting
-    )
-
-    # Set up keyboard shortcuts
-    setup_keyboard_shortcuts()
-
-    # Start recovery watchdog
-    recovery_watchdog.start()
-
-    # Initialize Zoom
-    await initialize_zoom()
-
-    # Keep running
-    try:
-        while True:
-            await asyncio.sleep(1)
-    except KeyboardInterrupt:
-        print('\n[Shutdown] Interrupted by user (Ctrl+C)')
-    except SystemExit as e:
-        print(f'\n[Diagnostic] SystemExit in main loop: code={e.code}')
-        print('[Diagnostic] May indicate external process termination (e.g. SentinelOne, script)')
-    except Exception as e:
-        print(f'\n[Diagnostic] Exception in main loop: {type(e).__name__}: {e}')
-        import traceback
-        traceback.print_exc()
-    finally:
-        print('[Diagnostic] Entering cleanup (finally block)')
-        await cleanup()
-
-
-async def cleanup() -> None:
-    """Cleanup resources"""
-    global keyboard_listener, zoom_service, recovery_watchdog, other_participant_poll_task
-
-    print('[Shutdown] Cleaning up...')
-
-    # Cancel any pending async tasks first
-    if other_participant_poll_task and not other_participant_poll_task.done():
-        other_participant_poll_task.cancel()
-        try:
-            await other_participant_poll_task
-        except asyncio.CancelledError:
-            pass
-
-    # Stop keyboard listener
-    if keyboard_listener:
-        keyboard_listener.stop()
-
-    # Stop recovery watchdog
-    if recovery_watchdog:
-        recovery_watchdog.stop()
-
-    # Leave meeting if in one
-    if zoom_service:
-        try:
-            await zoom_service.leave_meeting()
-        except Exception as e:
-            print(f'[Shutdown] Error leaving meeting: {e}')
-
-    # Stop Windows message loop (this cancels its task)
-    if sys.platform == 'win32':
-        stop_message_loop()
-        # Give the message loop task time to cancel
-        await asyncio.sleep(0.1)
-
-    # Cancel all remaining tasks (except the current one)
-    loop = asyncio.get_event_loop()
-    current_task = asyncio.current_task(loop)
-    pending_tasks = [task for task in asyncio.all_tasks(loop)
-                     if not task.done() and task is not current_task]
-    if pending_tasks:
-        print(f'[Shutdown] Cancelling {len(pending_tasks)} pending tasks...')
-        for task in pending_tasks:
-            task.cancel()
-
-        # Wait for tasks to complete cancellation
-        if pending_tasks:
-            try:
-                await asyncio.gather(*pending_tasks, return_exceptions=True)
-            except Exception:
-                pass
-
-    print('[Shutdown] Cleanup complete')
+    config_path = find_config_path()
+    await KioskApp(config, config_path=config_path if config_path.exists() else None).run()
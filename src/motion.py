@@ -0,0 +1,228 @@
+"""
+Zoom Kiosk - Motion Models
+
+Cursor path generators for preference replay. Every model produces a
+fixed number of points for a move; the player spaces them evenly over a
+duration given by Fitts' law, so a move takes about as long as a person
+would need regardless of screen size, and the number of cursor updates
+follows a target sample rate instead of the distance in pixels.
+
+Named profiles (a model plus its parameters, e.g. produced by the
+motion_tuner tool) can be loaded from a profiles file.
+"""
+
+import json
+import math
+import random
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+Point = Tuple[float, float]
+
+
+def fitts_duration_ms(distance: float, target_width: float, a_ms: float, b_ms: float,
+                      max_ms: float) -> float:
+    """Movement time by Fitts' law (Shannon form): a + b * log2(D / W + 1)"""
+    if distance <= 0:
+        return 0.0
+    return min(max_ms, a_ms + b_ms * math.log2(distance / max(1.0, target_width) + 1))
+
+
+def step_count(duration_ms: float, sample_rate_hz: float) -> int:
+    """Number of cursor updates for a move of the given duration"""
+    return max(1, math.ceil(duration_ms * sample_rate_hz / 1000.0))
+
+
+def minimum_jerk(t: float) -> float:
+    """Minimum-jerk position profile: 0 -> 1 with zero velocity and acceleration at both ends"""
+    return t * t * t * (10 - 15 * t + 6 * t * t)
+
+
+def resample(raw: List[Point], steps: int) -> List[Point]:
+    """
+    Spread a tick-based trajectory evenly over steps points, keeping its own
+    speed profile; the last point is exactly the trajectory's end
+    """
+    last = len(raw) - 1
+    if last < 1:
+        return [raw[-1]] * steps
+    points = []
+    for i in range(1, steps + 1):
+        pos = i * last / steps
+        j = min(int(pos), last - 1)
+        frac = pos - j
+        (x0, y0), (x1, y1) = raw[j], raw[j + 1]
+        points.append((x0 + (x1 - x0) * frac, y0 + (y1 - y0) * frac))
+    points[-1] = raw[-1]
+    return points
+
+
+class MotionModel(ABC):
+    """Generates the points of a cursor move"""
+
+    name = ''
+
+    @abstractmethod
+    def path(self, start: Point, end: Point, steps: int, rng: Optional[random.Random] = None) -> List[Point]:
+        """steps points after start, the last one exactly at end; randomness from rng (default: random)"""
+
+
+class WindMouseModel(MotionModel):
+    """
+    WindMouse: the cursor is pulled towards the target (gravity) and pushed
+    around by a random wind that dies down near it.
+    gravity     - magnitude of the gravitational force
+    wind        - magnitude of the wind force fluctuations
+    max_step    - maximum step size (velocity clip threshold)
+    damped_distance - distance where wind behavior changes from random to damped
+    """
+
+    name = 'windmouse'
+
+    def __init__(self, gravity: float = 12.0, wind: float = 5.0, max_step: float = 25.0,
+                 damped_distance: float = 12.0):
+        self.gravity = gravity
+        self.wind = wind
+        self.max_step = max_step
+        self.damped_distance = damped_distance
+
+    def trajectory(self, start: Point, end: Point, max_ticks: int = 10000,
+                   rng: Optional[random.Random] = None) -> List[Point]:
+        """The raw WindMouse trajectory, one point per simulation tick"""
+        rng = rng or random
+        sqrt3 = math.sqrt(3)
+        sqrt5 = math.sqrt(5)
+        x, y = start
+        dest_x, dest_y = end
+        v_x = v_y = w_x = w_y = 0.0
+        max_step = self.max_step
+        points = [start]
+
+        for _ in range(max_ticks):
+            dist = math.hypot(dest_x - x, dest_y - y)
+            if dist < 1:
+                break
+
+            w_mag = min(self.wind, dist)
+            if dist >= self.damped_distance:
+                w_x = w_x / sqrt3 + (2 * rng.random() - 1) * w_mag / sqrt5
+                w_y = w_y / sqrt3 + (2 * rng.random() - 1) * w_mag / sqrt5
+            else:
+                w_x /= sqrt3
+                w_y /= sqrt3
+                if max_step < 3:
+                    max_step = rng.random() * 3 + 3
+                else:
+                    max_step /= sqrt5
+
+            v_x += w_x + self.gravity * (dest_x - x) / dist
+            v_y += w_y + self.gravity * (dest_y - y) / dist
+            v_mag = math.hypot(v_x, v_y)
+            if v_mag > max_step:
+                v_clip = max_step / 2 + rng.random() * max_step / 2
+                v_x = (v_x / v_mag) * v_clip
+                v_y = (v_y / v_mag) * v_clip
+
+            x += v_x
+            y += v_y
+            points.append((x, y))
+
+        points.append(end)
+        return points
+
+    def path(self, start: Point, end: Point, steps: int, rng: Optional[random.Random] = None) -> List[Point]:
+        return resample(self.trajectory(start, end, rng=rng), steps)
+
+
+class MinimumJerkModel(MotionModel):
+    """Straight line with a smooth bell-shaped speed profile"""
+
+    name = 'minimumjerk'
+
+    def path(self, start: Point, end: Point, steps: int, rng: Optional[random.Random] = None) -> List[Point]:
+        (x0, y0), (x1, y1) = start, end
+        points = []
+        for i in range(1, steps + 1):
+            s = minimum_jerk(i / steps)
+            points.append((x0 + (x1 - x0) * s, y0 + (y1 - y0) * s))
+        return points
+
+
+class BezierModel(MotionModel):
+    """
+    Cubic Bezier curve bowing to a random side, traversed with a
+    minimum-jerk profile. curvature is the control point offset as a
+    fraction of the distance.
+    """
+
+    name = 'bezier'
+
+    def __init__(self, curvature: float = 0.2):
+        self.curvature = curvature
+
+    def path(self, start: Point, end: Point, steps: int, rng: Optional[random.Random] = None) -> List[Point]:
+        rng = rng or random
+        (x0, y0), (x3, y3) = start, end
+        dx, dy = x3 - x0, y3 - y0
+        # Unit normal scaled by distance: offset both control points to the same side
+        nx, ny = -dy, dx
+        side = rng.choice((-1, 1))
+        o1 = side * self.curvature * rng.uniform(0.5, 1.0)
+        o2 = side * self.curvature * rng.uniform(0.5, 1.0)
+        x1, y1 = x0 + dx / 3 + nx * o1, y0 + dy / 3 + ny * o1
+        x2, y2 = x0 + 2 * dx / 3 + nx * o2, y0 + 2 * dy / 3 + ny * o2
+
+        points = []
+        for i in range(1, steps + 1):
+            u = minimum_jerk(i / steps)
+            v = 1 - u
+            points.append((
+                v * v * v * x0 + 3 * v * v * u * x1 + 3 * v * u * u * x2 + u * u * u * x3,
+                v * v * v * y0 + 3 * v * v * u * y1 + 3 * v * u * u * y2 + u * u * u * y3,
+            ))
+        return points
+
+
+MOTION_MODELS = {
+    WindMouseModel.name: WindMouseModel,
+    MinimumJerkModel.name: MinimumJerkModel,
+    BezierModel.name: BezierModel,
+}
+
+
+def create_motion_model(name: str, params: Dict[str, Any] = None) -> MotionModel:
+    """Create a motion model by name, falling back to WindMouse"""
+    model_class = MOTION_MODELS.get(name)
+    if model_class is None:
+        print(f'[Motion] Unknown motion model "{name}", using {WindMouseModel.name}')
+        model_class = WindMouseModel
+    try:
+        return model_class(**(params or {}))
+    except TypeError as e:
+        print(f'[Motion] Invalid parameters for {model_class.name}: {e}')
+        return model_class()
+
+
+def load_motion_profile(path: Path, name: str) -> Optional[Dict[str, Any]]:
+    """Get a named profile ({"model": ..., "params": {...}}) from a profiles file"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            profiles = json.load(f).get('profiles', {})
+    except Exception as e:
+        print(f'[Motion] Could not load motion profiles from {path}: {e}')
+        return None
+    profile = profiles.get(name)
+    if profile is None:
+        print(f'[Motion] No motion profile "{name}" in {path}')
+    return profile
+
+
+def create_configured_motion_model(model: str, params: Dict[str, Any], profile: str = '',
+                                   profiles_path: str = '') -> MotionModel:
+    """Create the model named by a profile if one is set, else the given model"""
+    if profile:
+        loaded = load_motion_profile(Path(profiles_path), profile)
+        if loaded is not None:
+            return create_motion_model(loaded.get('model', WindMouseModel.name), loaded.get('params'))
+    return create_motion_model(model, params)
@@ -0,0 +1,240 @@
+"""
+Zoom Kiosk - Motion Tuner
+
+Offline search for WindMouse parameters. Simulates the trajectory
+generator over the moves in recorded user-prefs.json files, scores each
+parameter set on how quickly the cursor reaches the target and how
+natural the path looks, and saves the best one as a named profile that
+replay can use (replay.motionProfile).
+
+Move durations are fixed by Fitts' law, so the parameters decide the
+path shape within that time: how early the cursor arrives at the
+target, straightness, overshoot, smoothness and whether there are
+enough trajectory ticks for the sample rate.
+
+    python -m src.motion_tuner user-prefs.json --name fast --objective fast
+"""
+
+import json
+import math
+import os
+import random
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+from .config import ReplayConfig
+from .motion import Point, WindMouseModel, fitts_duration_ms, resample, step_count
+
+# Search ranges per WindMouse parameter
+PARAM_RANGES = {
+    'gravity': (2.0, 24.0),
+    'wind': (0.0, 12.0),
+    'max_step': (4.0, 60.0),
+    'damped_distance': (2.0, 40.0),
+}
+
+# Path efficiency (straight distance / path length) of human pointing moves
+NATURAL_EFFICIENCY = (0.85, 0.98)
+
+# (time weight, naturalness weight)
+OBJECTIVES = {
+    'balanced': (1.0, 1.0),
+    'fast': (2.0, 0.5),
+    'natural': (0.5, 2.0),
+}
+
+MAX_TICKS = 2000
+
+Move = Tuple[Point, Point]
+
+
+def load_corpus(paths: List[Path], screen: Tuple[int, int]) -> List[Move]:
+    """Moves between consecutive clicks of each recording, the first one from the screen centre"""
+    from .action_player import compile_plan
+    moves: List[Move] = []
+    for path in paths:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                actions = compile_plan(json.load(f))
+        except Exception as e:
+            print(f'[MotionTuner] Skipping {path}: {e}')
+            continue
+        previous = (screen[0] / 2, screen[1] / 2)
+        for action in actions:
+            target = (float(action['x']), float(action['y']))
+            if target != previous:
+                moves.append((previous, target))
+            previous = target
+    return moves
+
+
+def measure_move(model: WindMouseModel, start: Point, end: Point,
+                 replay: ReplayConfig, rng: random.Random) -> Dict[str, float]:
+    """Metrics of one simulated move, sampled the way the player samples it"""
+    distance = math.hypot(end[0] - start[0], end[1] - start[1])
+    duration_ms = fitts_duration_ms(distance, replay["targetWidthPx"], replay["fittsInterceptMs"],
+                                    replay["fittsSlopeMs"], replay["maxMoveMs"])
+    steps = step_count(duration_ms, replay["sampleRateHz"])
+    raw = model.trajectory(start, end, MAX_TICKS, rng)
+    ticks = len(raw) - 1
+    points = [start] + resample(raw, steps)
+
+    ux, uy = (end[0] - start[0]) / distance, (end[1] - start[1]) / distance
+    radius = replay["targetWidthPx"] / 2
+    acquired = steps
+    length = overshoot = jerk = 0.0
+    for i in range(1, len(points)):
+        x, y = points[i]
+        px, py = points[i - 1]
+        length += math.hypot(x - px, y - py)
+        overshoot = max(overshoot, (x - start[0]) * ux + (y - start[1]) * uy - distance)
+        if acquired == steps and math.hypot(end[0] - x, end[1] - y) <= radius:
+            acquired = i
+        if i >= 2:
+            qx, qy = points[i - 2]
+            jerk += math.hypot(x - 2 * px + qx, y - 2 * py + qy)
+
+    return {
+        'durationMs': duration_ms,
+        'acquireMs': duration_ms * acquired / steps,
+        'efficiency': distance / length if length else 1.0,
+        'overshootPx': overshoot,
+        # Mean change of the step vector relative to the mean step length
+        'jerk': jerk / max(1, steps - 1) / (distance / steps),
+        'tickRatio': ticks / steps,
+        'stalled': 1.0 if ticks >= MAX_TICKS else 0.0,
+    }
+
+
+def evaluate(params: Dict[str, float], moves: List[Move], replay: ReplayConfig,
+             repeats: int, seed: int) -> Dict[str, float]:
+    """Mean metrics over the corpus; the same seed gives every candidate the same wind"""
+    rng = random.Random(seed)
+    model = WindMouseModel(**params)
+    totals: Dict[str, float] = {}
+    for _ in range(repeats):
+        for start, end in moves:
+            for key, value in measure_move(model, start, end, replay, rng).items():
+                totals[key] = totals.get(key, 0.0) + value
+    count = repeats * len(moves)
+    metrics = {key: value / count for key, value in totals.items()}
+    metrics['replayMs'] = totals['durationMs'] / repeats
+    return metrics
+
+
+def score(metrics: Dict[str, float], objective: str, replay: ReplayConfig) -> float:
+    """Lower is better"""
+    time_weight, natural_weight = OBJECTIVES[objective]
+    low, high = NATURAL_EFFICIENCY
+    efficiency = metrics['efficiency']
+    unnatural = (
+        max(0.0, low - efficiency, efficiency - high) * 10
+        + metrics['overshootPx'] / replay["targetWidthPx"]
+        + metrics['jerk']
+        # Fewer ticks than samples: the path degrades to a few straight segments
+        + max(0.0, 0.5 - metrics['tickRatio']) * 2
+    )
+    arrival = metrics['acquireMs'] / metrics['durationMs'] if metrics['durationMs'] else 0.0
+    return time_weight * arrival + natural_weight * unnatural + metrics['stalled'] * 100
+
+
+def search(moves: List[Move], replay: ReplayConfig, objective: str, trials: int,
+           repeats: int, seed: int) -> Tuple[Dict[str, float], Dict[str, float], float]:
+    """Random search over the parameter ranges, then a local refinement of the best"""
+    rng = random.Random(seed)
+    best = {name: float(value) for name, value in vars(WindMouseModel()).items()}
+    best_metrics = evaluate(best, moves, replay, repeats, seed)
+    best_score = score(best_metrics, objective, replay)
+
+    def consider(candidate: Dict[str, float]) -> None:
+        nonlocal best, best_metrics, best_score
+        metrics = evaluate(candidate, moves, replay, repeats, seed)
+        candidate_score = score(metrics, objective, replay)
+        if candidate_score < best_score:
+            best, best_metrics, best_score = candidate, metrics, candidate_score
+
+    for _ in range(trials):
+        consider({name: rng.uniform(low, high) for name, (low, high) in PARAM_RANGES.items()})
+
+    scale = 0.2
+    for _ in range(max(1, trials // 10)):
+        name = rng.choice(list(PARAM_RANGES))
+        low, high = PARAM_RANGES[name]
+        candidate = dict(best)
+        candidate[name] = max(low, min(high, best[name] + rng.gauss(0, scale * (high - low))))
+        consider(candidate)
+        scale = max(0.02, scale * 0.9)
+
+    return best, best_metrics, best_score
+
+
+def save_profile(path: Path, name: str, profile: Dict[str, Any]) -> None:
+    """Add or replace a profile in the profiles file (atomic replace)"""
+    profiles: Dict[str, Any] = {}
+    if path.exists():
+        with open(path, 'r', encoding='utf-8') as f:
+            profiles = json.load(f).get('profiles', {})
+    profiles[name] = profile
+    tmp_path = path.with_suffix(f'{path.suffix}.{os.getpid()}.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'profiles': profiles}, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _format(metrics: Dict[str, float]) -> str:
+    return (f'arrive {metrics["acquireMs"]:.0f}/{metrics["durationMs"]:.0f}ms '
+            f'efficiency {metrics["efficiency"]:.3f} overshoot {metrics["overshootPx"]:.1f}px '
+            f'jerk {metrics["jerk"]:.3f} ticks/sample {metrics["tickRatio"]:.2f}')
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+    from .config import find_config_path, read_config, default_config
+    parser = argparse.ArgumentParser(description='Tune WindMouse parameters on recorded moves')
+    parser.add_argument('recordings', nargs='*', type=Path, default=[Path('user-prefs.json')],
+                        help='user-prefs.json files to take moves from')
+    parser.add_argument('--name', default='tuned', help='profile name to save')
+    parser.add_argument('--objective', choices=sorted(OBJECTIVES), default='balanced')
+    parser.add_argument('--trials', type=int, default=200, help='random search candidates')
+    parser.add_argument('--repeats', type=int, default=3, help='simulations per move')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--screen', default='1920x1080', help='screen size for the first move of each recording')
+    parser.add_argument('--out', type=Path, default=Path('motion-profiles.json'), help='profiles file')
+    parser.add_argument('--dry-run', action='store_true', help='print the result without saving it')
+    args = parser.parse_args()
+
+    # Timing settings come from config.json so the simulation matches replay
+    config_path = find_config_path()
+    replay = read_config(config_path)["replay"] if config_path.exists() else default_config["replay"]
+    screen_w, screen_h = (int(v) for v in args.screen.lower().split('x'))
+
+    moves = load_corpus(args.recordings, (screen_w, screen_h))
+    if not moves:
+        print('[MotionTuner] No moves found in the recordings')
+        sys.exit(2)
+    print(f'[MotionTuner] {len(moves)} moves from {len(args.recordings)} recording(s), '
+          f'objective {args.objective}, {args.trials} trials')
+
+    started = time.monotonic()
+    baseline = {name: float(value) for name, value in vars(WindMouseModel()).items()}
+    baseline_metrics = evaluate(baseline, moves, replay, args.repeats, args.seed)
+    params, metrics, best_score = search(moves, replay, args.objective, args.trials, args.repeats, args.seed)
+    params = {name: round(value, 2) for name, value in params.items()}
+
+    print(f'[MotionTuner] Default: score {score(baseline_metrics, args.objective, replay):.3f} '
+          f'{_format(baseline_metrics)}')
+    print(f'[MotionTuner] Best:    score {best_score:.3f} {_format(metrics)}')
+    print(f'[MotionTuner] Parameters: {params} ({time.monotonic() - started:.1f}s)')
+
+    if not args.dry_run:
+        save_profile(args.out, args.name, {
+            'model': WindMouseModel.name,
+            'params': params,
+            'objective': args.objective,
+            'moves': len(moves),
+            'metrics': {key: round(value, 3) for key, value in metrics.items()},
+            'createdAt': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        })
+        print(f'[MotionTuner] Saved profile "{args.name}" to {args.out}; '
+              f'set replay.motionProfile to "{args.name}" to use it')
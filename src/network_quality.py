@@ -0,0 +1,243 @@
+"""
+Zoom Kiosk - Network Quality
+
+Aggregates the SDK's network status and statistics warning callbacks
+into rolling-window quality metrics per meeting component (audio, video,
+share) and direction, so a degrading uplink shows up as a trend before
+the meeting drops. Samples live in fixed-size ring buffers: recording
+one is O(1) and nothing grows over a long session.
+
+The SDK reports a level only when it changes, so a level holds until the
+next report: degradation is decided on the time-weighted mean level over
+the window, and re-checked every recheckMs as well as on each report, so
+a level that stays bad counts as bad without further reports.
+"""
+
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, TYPE_CHECKING, Tuple
+from .clock import Clock, SYSTEM_CLOCK
+from .config import NetworkQualityConfig
+from .task_supervisor import TaskSupervisor
+
+if TYPE_CHECKING:
+    # Imported lazily so CLIs can pick the SDK (simulated) before the service loads
+    from .zoom_service import ZoomService
+
+# SDK MeetingComponentType values (0 is the default/unknown component)
+COMPONENTS = {1: 'audio', 2: 'video', 3: 'share'}
+
+# SDK ConnectionQuality values
+QUALITY_UNKNOWN = 0
+QUALITY_BAD = 2
+
+# SDK StatisticsWarningType values
+WARNINGS = {1: 'networkQualityBad', 2: 'busySystem'}
+
+
+class RingBuffer:
+    """Last `size` timestamped samples; the oldest is overwritten"""
+
+    __slots__ = ('size', 'times', 'values', 'next', 'count')
+
+    def __init__(self, size: int):
+        self.size = size
+        self.times = [0.0] * size
+        self.values = [0] * size
+        self.next = 0
+        self.count = 0
+
+    def append(self, at: float, value: int) -> None:
+        self.times[self.next] = at
+        self.values[self.next] = value
+        self.next = (self.next + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+    def since(self, cutoff: float) -> List[int]:
+        """Values recorded after cutoff, oldest first"""
+        values = []
+        for i in range(self.count):
+            index = (self.next - self.count + i) % self.size
+            if self.times[index] > cutoff:
+                values.append(self.values[index])
+        return values
+
+    def window(self, cutoff: float) -> List[Tuple[float, int]]:
+        """(time, value) recorded after cutoff, oldest first, preceded by the last one before it (still in effect)"""
+        samples: List[Tuple[float, int]] = []
+        for i in range(self.count):
+            index = (self.next - self.count + i) % self.size
+            if self.times[index] > cutoff:
+                samples.append((self.times[index], self.values[index]))
+            else:
+                samples = [(self.times[index], self.values[index])]
+        return samples
+
+    def latest(self) -> Optional[Tuple[float, int]]:
+        if not self.count:
+            return None
+        index = (self.next - 1) % self.size
+        return self.times[index], self.values[index]
+
+
+def summarize(values: List[int]) -> Dict[str, Any]:
+    """Window statistics of quality levels; trend < 0 means getting worse"""
+    if not values:
+        return {'samples': 0}
+    half = len(values) // 2
+    older, newer = values[:half], values[half:]
+    return {
+        'samples': len(values),
+        'latest': values[-1],
+        'mean': round(sum(values) / len(values), 2),
+        'worst': min(values),
+        'badPct': round(100.0 * sum(1 for v in values if v <= QUALITY_BAD) / len(values), 1),
+        'trend': round(sum(newer) / len(newer) - sum(older) / len(older), 2) if older else 0.0,
+    }
+
+
+def time_weighted_mean(samples: List[Tuple[float, int]], cutoff: float, now: float) -> Tuple[Optional[float], float]:
+    """
+    Mean level over [cutoff, now] when each level holds until the next one
+    (None before the first), and the seconds that were covered by a level
+    """
+    total = covered = 0.0
+    for i, (at, value) in enumerate(samples):
+        start = max(at, cutoff)
+        end = samples[i + 1][0] if i + 1 < len(samples) else now
+        if end > start:
+            total += value * (end - start)
+            covered += end - start
+    return (total / covered if covered else None), covered
+
+
+class NetworkQualityMonitor:
+    """
+    Rolling quality metrics of the kiosk's own connection. Emits 'degraded'
+    and 'recovered' (component, metrics) when a component's time-weighted
+    uplink level crosses config degradedBelow.
+    """
+
+    def __init__(self, config: NetworkQualityConfig, clock: Clock = SYSTEM_CLOCK,
+                 tasks: Optional[TaskSupervisor] = None):
+        self.config = config
+        self.clock = clock
+        self.tasks = tasks or TaskSupervisor(clock)
+        self.zoom_service: Optional['ZoomService'] = None
+        self.recheck_task: Optional[asyncio.Task] = None
+        self.buffers: Dict[Tuple[str, str], RingBuffer] = {
+            (component, direction): RingBuffer(config["bufferSize"])
+            for component in COMPONENTS.values() for direction in ('uplink', 'downlink')
+        }
+        self.warnings = RingBuffer(config["bufferSize"])
+        self.degraded: Dict[str, bool] = {component: False for component in COMPONENTS.values()}
+        self.reports = 0
+        self.other_reports = 0
+        self.warning_count = 0
+        self._callbacks: Dict[str, List[Callable]] = {'degraded': [], 'recovered': []}
+
+    def on(self, event: str, callback: Callable) -> None:
+        """Register event callback"""
+        if event in self._callbacks:
+            self._callbacks[event].append(callback)
+
+    def emit(self, event: str, *args: Any) -> None:
+        for callback in self._callbacks.get(event, []):
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f'[NetworkQuality] Error in {event} callback: {e}')
+
+    def attach(self, zoom_service: 'ZoomService') -> None:
+        """Follow the network callbacks of a (new) ZoomService instance"""
+        self.detach()
+        self.zoom_service = zoom_service
+        zoom_service.on('networkQuality', self.on_network_quality)
+        zoom_service.on('statisticsWarning', self.on_statistics_warning)
+        self.recheck_task = self.tasks.spawn(self._recheck_loop(), 'recheck', 'networkQuality', zoom_service)
+
+    def detach(self) -> None:
+        """Stop following the current ZoomService instance"""
+        if self.recheck_task and not self.recheck_task.done():
+            self.recheck_task.cancel()
+        self.recheck_task = None
+        if self.zoom_service:
+            self.zoom_service.off('networkQuality', self.on_network_quality)
+            self.zoom_service.off('statisticsWarning', self.on_statistics_warning)
+            self.zoom_service = None
+
+    def on_network_quality(self, component: int, level: int, user_id: int, uplink: bool, is_self: bool) -> None:
+        """Record one network status report"""
+        name = COMPONENTS.get(component)
+        if name is None or level == QUALITY_UNKNOWN:
+            return
+        if not is_self:
+            # Other participants' connections are outside the kiosk's control
+            self.other_reports += 1
+            return
+        self.reports += 1
+        self.buffers[(name, 'uplink' if uplink else 'downlink')].append(self.clock.monotonic(), level)
+        if uplink:
+            self._update_degraded(name)
+
+    def on_statistics_warning(self, warning: int) -> None:
+        """Record an SDK statistics warning"""
+        if warning not in WARNINGS:
+            return
+        self.warning_count += 1
+        self.warnings.append(self.clock.monotonic(), warning)
+        print(f'[NetworkQuality] SDK warning: {WARNINGS[warning]}')
+
+    def _cutoff(self) -> float:
+        return self.clock.monotonic() - self.config["windowMs"] / 1000.0
+
+    async def _recheck_loop(self) -> None:
+        while True:
+            await self.clock.sleep(self.config["recheckMs"] / 1000.0)
+            for component in COMPONENTS.values():
+                self._update_degraded(component)
+
+    def uplink_level(self, component: str) -> Optional[float]:
+        """Time-weighted uplink level over the window, None until a level has held for minSpanMs"""
+        level, covered = time_weighted_mean(self.buffers[(component, 'uplink')].window(self._cutoff()),
+                                            self._cutoff(), self.clock.monotonic())
+        if covered < self.config["minSpanMs"] / 1000.0:
+            return None
+        return level
+
+    def _update_degraded(self, component: str) -> None:
+        level = self.uplink_level(component)
+        if level is None:
+            return
+        degraded = level < self.config["degradedBelow"]
+        if degraded != self.degraded[component]:
+            self.degraded[component] = degraded
+            metrics = {**summarize(self.buffers[(component, 'uplink')].since(self._cutoff())),
+                       'level': round(level, 2)}
+            print(f'[NetworkQuality] {component} uplink {"degraded" if degraded else "recovered"}: '
+                  f'level {metrics["level"]} over the window, trend {metrics.get("trend", 0.0)}')
+            self.emit('degraded' if degraded else 'recovered', component, metrics)
+
+    def get_component(self, component: str) -> Dict[str, Any]:
+        """Window metrics of one component"""
+        cutoff = self._cutoff()
+        level = self.uplink_level(component)
+        return {
+            'uplink': summarize(self.buffers[(component, 'uplink')].since(cutoff)),
+            'downlink': summarize(self.buffers[(component, 'downlink')].since(cutoff)),
+            'uplinkLevel': round(level, 2) if level is not None else None,
+            'degraded': self.degraded[component],
+        }
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Window metrics of all components and recent SDK warnings"""
+        recent = self.warnings.since(self._cutoff())
+        latest = self.warnings.latest()
+        return {
+            **{component: self.get_component(component) for component in COMPONENTS.values()},
+            'warnings': {name: recent.count(value) for value, name in WARNINGS.items()},
+            'lastWarning': WARNINGS[latest[1]] if latest else '',
+            'lastWarningAgeMs': round((self.clock.monotonic() - latest[0]) * 1000) if latest else None,
+            'totalWarnings': self.warning_count,
+            'reports': self.reports,
+            'otherReports': self.other_reports,
+        }
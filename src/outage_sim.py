@@ -0,0 +1,198 @@
+"""
+Zoom Kiosk - Outage Simulation
+
+Runs a whole kiosk (KioskApp on the simulated SDK) through a network
+outage in virtual time: the meeting drops, authentication fails with a
+network error for the length of the outage, and the kiosk has to find
+its way back into the meeting and resume sharing. An hour-long outage
+takes well under a second, so recovery policies can be swept.
+
+    python -m src.outage_sim --outage 3600 --max-retries 10,100 --max-backoff-ms 30000,120000
+"""
+
+import asyncio
+import contextlib
+import copy
+import io
+import itertools
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Dict, List, TypeVar
+from .clock import run_virtual, SYSTEM_CLOCK, wait_until
+from .config import KioskConfig, default_config
+
+T = TypeVar('T')
+
+
+def simulation_config(recovery: Dict[str, Any]) -> KioskConfig:
+    """Default config with the given recovery policy and nothing that touches the outside world"""
+    config = copy.deepcopy(default_config)
+    config['zoom'].update({'sdkKey': 'simulated', 'sdkSecret': 'simulated-sdk-secret-for-outage-tests', 'pmi': '123456789'})
+    config['recovery'].update(recovery)
+    config['reachability']['enabled'] = False
+    config['statusBlock']['enabled'] = False
+    config['checkpoint']['enabled'] = False
+    config['configReload']['enabled'] = False
+    config['perfHistory']['enabled'] = False
+    # Runs in-process: a stuck shutdown is a finding, not a reason to exit
+    config['shutdown']['forceExit'] = False
+    return config
+
+
+async def run_scenario(app: Any, scenario: Awaitable[T]) -> T:
+    """
+    Run the kiosk in this task until scenario finishes, then stop it and
+    return the scenario's result. Raises RuntimeError if the kiosk stops
+    on its own first.
+    """
+    app_task = asyncio.current_task()
+    app_running = True
+
+    async def drive() -> T:
+        try:
+            return await scenario
+        finally:
+            # The scenario stops the kiosk by cancelling its task
+            if app_running:
+                app_task.cancel()
+
+    result = asyncio.create_task(drive())
+    try:
+        await app.run()
+    except asyncio.CancelledError:
+        pass
+    app_running = False
+    if not result.done():
+        result.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await result
+        raise RuntimeError('kiosk stopped before the scenario finished')
+    return result.result()
+
+
+async def simulate_outage(config: KioskConfig, outage_s: float, limit_s: float) -> Dict[str, Any]:
+    """
+    Join and share, drop the meeting for outage_s seconds, then wait up to
+    limit_s for the share to come back. Times are in virtual seconds.
+    """
+    from . import simulated_sdk
+    from .main import KioskApp
+
+    # Fresh simulated SDK state for every run
+    simulated_sdk.simulator = simulator = simulated_sdk.Simulator()
+    counts = {'reconnects': 0, 'sdkInits': 0}
+    init_sdk = simulated_sdk.InitSDK
+
+    def counted_init(param: Any) -> Any:
+        counts['sdkInits'] += 1
+        return init_sdk(param)
+
+    simulated_sdk.InitSDK = counted_init
+    try:
+        with tempfile.TemporaryDirectory() as state_dir:
+            app = KioskApp(config, enable_shortcuts=False, replay_plan=[], state_dir=Path(state_dir))
+            reconnect = app.recovery_watchdog.reconnect_callback
+
+            async def counted_reconnect() -> None:
+                counts['reconnects'] += 1
+                await reconnect()
+
+            app.recovery_watchdog.reconnect_callback = counted_reconnect
+
+            def sharing() -> bool:
+                return bool(app.zoom_service and app.zoom_service.is_sharing and not app.zoom_service.use_mock_mode)
+
+            async def scenario() -> Dict[str, Any]:
+                if not await wait_until(sharing, 120):
+                    return {'recovered': False, 'error': 'never started sharing'}
+
+                dropped_at = SYSTEM_CLOCK.monotonic()
+                simulator.auth_result = simulated_sdk.AuthResult.AUTHRET_NETWORKISSUE
+                simulator.end_meeting(failed=True)
+                await SYSTEM_CLOCK.sleep(outage_s)
+                simulator.auth_result = simulated_sdk.AuthResult.AUTHRET_SUCCESS
+                restored_at = SYSTEM_CLOCK.monotonic()
+
+                recovered = await wait_until(sharing, limit_s)
+                now = SYSTEM_CLOCK.monotonic()
+                return {
+                    'recovered': recovered,
+                    # Time the kiosk stayed down after the network came back
+                    'recoveryDelayS': round(now - restored_at, 1) if recovered else None,
+                    'downtimeS': round(now - dropped_at, 1) if recovered else None,
+                    'recoveryState': app.recovery_watchdog.get_state(),
+                    **counts,
+                }
+
+            return await run_scenario(app, scenario())
+    finally:
+        simulated_sdk.InitSDK = init_sdk
+
+
+def run_policy(recovery: Dict[str, Any], outage_s: float, limit_s: float, seeds: List[int],
+               verbose: bool = False) -> List[Dict[str, Any]]:
+    """Simulate the outage once per seed with a recovery policy"""
+    results = []
+    # Backoff jitter comes from the global generator; seed it per run and leave it as it was
+    state = random.getstate()
+    try:
+        for seed in seeds:
+            random.seed(seed)
+            output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+            with output:
+                results.append(run_virtual(simulate_outage(simulation_config(recovery), outage_s, limit_s)))
+    finally:
+        random.setstate(state)
+    return results
+
+
+def _parse_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(',') if v]
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+    parser = argparse.ArgumentParser(description='Sweep recovery policies over a simulated network outage')
+    parser.add_argument('--outage', type=float, default=3600, help='outage length in seconds')
+    parser.add_argument('--limit', type=float, default=3600,
+                        help='how long to wait for recovery after the outage, in seconds')
+    parser.add_argument('--max-retries', type=_parse_list, default=[default_config['recovery']['maxRetries']])
+    parser.add_argument('--initial-backoff-ms', type=_parse_list,
+                        default=[default_config['recovery']['initialBackoffMs']])
+    parser.add_argument('--max-backoff-ms', type=_parse_list, default=[default_config['recovery']['maxBackoffMs']])
+    parser.add_argument('--seeds', type=int, default=3, help='runs per policy')
+    parser.add_argument('--verbose', action='store_true', help='show the kiosk log')
+    parser.add_argument('--json', action='store_true', help='print one JSON line per policy')
+    args = parser.parse_args()
+
+    # Must be chosen before the Zoom service is imported
+    os.environ['ZOOM_KIOSK_SDK'] = 'simulated'
+
+    started = time.monotonic()
+    for max_retries, initial_ms, max_ms in itertools.product(
+            args.max_retries, args.initial_backoff_ms, args.max_backoff_ms):
+        policy = {'maxRetries': max_retries, 'initialBackoffMs': initial_ms, 'maxBackoffMs': max_ms}
+        results = run_policy(policy, args.outage, args.limit, list(range(args.seeds)), args.verbose)
+        delays = [r['recoveryDelayS'] for r in results if r['recovered']]
+        summary = {
+            **policy,
+            'runs': len(results),
+            'recovered': len(delays),
+            'meanRecoveryDelayS': round(sum(delays) / len(delays), 1) if delays else None,
+            'maxRecoveryDelayS': max(delays) if delays else None,
+            'meanReconnects': round(sum(r.get('reconnects', 0) for r in results) / len(results), 1),
+            'meanSdkInits': round(sum(r.get('sdkInits', 0) for r in results) / len(results), 1),
+        }
+        if args.json:
+            print(json.dumps({**summary, 'results': results}))
+        else:
+            delay = (f'recovery delay mean {summary["meanRecoveryDelayS"]}s max {summary["maxRecoveryDelayS"]}s'
+                     if delays else 'never recovered')
+            print(f'maxRetries {max_retries:>4} backoff {initial_ms}-{max_ms}ms: '
+                  f'recovered {len(delays)}/{len(results)}, {delay}, '
+                  f'{summary["meanReconnects"]} reconnects, {summary["meanSdkInits"]} SDK inits')
+    print(f'[OutageSim] Done in {time.monotonic() - started:.2f}s')
@@ -0,0 +1,493 @@
+"""
+Zoom Kiosk - Performance History
+
+Keeps a longitudinal record of how long this kiosk takes to get going
+and to recover, in a local SQLite database: one row per session (with
+the SDK version) and one per timed phase (init, auth, join, share,
+replay, time to share, each recovery attempt) with its outcome.
+
+Recording never blocks the event loop: timings are queued and a
+background thread owns the connection, writing them in one transaction
+per batch. Raw timings older than rawRetentionDays are compacted into
+daily percentiles per phase, SDK version and outcome, so a year of
+history stays small.
+
+    python -m src.perf_history state/perf-history.sqlite3 --since 30d --by week
+    python -m src.perf_history --phase timeToShare --by version
+    python -m src.perf_history --sessions 20
+"""
+
+import itertools
+import os
+import queue
+import re
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from .adaptive_timeouts import percentile
+from .config import PerfHistoryConfig
+
+SCHEMA_VERSION = 1
+
+# Percentiles kept per daily rollup and reported by the CLI
+PERCENTILES = (50, 90, 95, 99)
+
+# Timings queued beyond this are dropped rather than growing without bound
+MAX_PENDING = 10000
+
+COMPACT_INTERVAL_S = 24 * 3600
+DAY_S = 24 * 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    kiosk TEXT NOT NULL,
+    pid INTEGER,
+    sdk_version TEXT NOT NULL DEFAULT '',
+    started_at REAL NOT NULL,
+    ended_at REAL,
+    outcome TEXT,
+    timings INTEGER,
+    time_to_share_ms REAL,
+    recovery_attempts INTEGER,
+    recovery_failures INTEGER
+);
+CREATE INDEX IF NOT EXISTS sessions_started ON sessions (kiosk, started_at);
+CREATE TABLE IF NOT EXISTS timings (
+    session_id TEXT NOT NULL,
+    at REAL NOT NULL,
+    phase TEXT NOT NULL,
+    duration_ms REAL NOT NULL,
+    outcome TEXT NOT NULL,
+    attempt INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS timings_phase_at ON timings (phase, at);
+CREATE INDEX IF NOT EXISTS timings_session ON timings (session_id);
+CREATE TABLE IF NOT EXISTS daily (
+    day TEXT NOT NULL,
+    kiosk TEXT NOT NULL,
+    sdk_version TEXT NOT NULL,
+    phase TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    p50_ms REAL, p90_ms REAL, p95_ms REAL, p99_ms REAL, max_ms REAL,
+    PRIMARY KEY (day, kiosk, sdk_version, phase, outcome)
+);
+"""
+
+
+def _summary(condition: str = '') -> Dict[str, str]:
+    """
+    Session summary columns as expressions adding the session's timings
+    (optionally only those matching condition) to what is already summed up
+    """
+    timings = f'FROM timings t WHERE t.session_id = sessions.id{condition}'
+    return {
+        'timings': f'COALESCE(timings, 0) + (SELECT COUNT(*) {timings})',
+        'time_to_share_ms': f"COALESCE(time_to_share_ms, (SELECT MIN(t.duration_ms) {timings} "
+                            f"AND t.phase = 'timeToShare' AND t.outcome = 'ok'))",
+        'recovery_attempts': f"COALESCE(recovery_attempts, 0) + (SELECT COUNT(*) {timings} "
+                             f"AND t.phase = 'recoveryAttempt')",
+        'recovery_failures': f"COALESCE(recovery_failures, 0) + (SELECT COUNT(*) {timings} "
+                             f"AND t.phase = 'recoveryAttempt' AND t.outcome != 'ok')",
+    }
+
+
+def _assignments(condition: str = '') -> str:
+    return ', '.join(f'{column} = {expression}' for column, expression in _summary(condition).items())
+
+
+START_SESSION = ('INSERT INTO sessions (id, kiosk, pid, sdk_version, started_at) '
+                 'VALUES (:id, :kiosk, :pid, :sdk_version, :started_at)')
+
+# Sessions of this kiosk that never ended and whose process is gone (crash, power loss)
+OPEN_SESSIONS = 'SELECT id, pid FROM sessions WHERE kiosk = :kiosk AND ended_at IS NULL AND id != :id'
+CLOSE_UNCLEAN = (
+    "UPDATE sessions SET outcome = 'unclean', "
+    'ended_at = COALESCE((SELECT MAX(at) FROM timings WHERE session_id = sessions.id), started_at), '
+    f'{_assignments()} WHERE id = :id')
+
+END_SESSION = f'UPDATE sessions SET ended_at = :ended_at, outcome = :outcome, {_assignments()} WHERE id = :id'
+
+INSERT_TIMING = 'INSERT INTO timings (session_id, at, phase, duration_ms, outcome, attempt) VALUES (?, ?, ?, ?, ?, ?)'
+
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    """Whether a process with this pid is running (a hot standby shares the kiosk id)"""
+    if not pid:
+        return False
+    if sys.platform == 'win32':
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        kernel32.OpenProcess.restype = ctypes.c_void_p
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        code = ctypes.c_ulong()
+        kernel32.GetExitCodeProcess(ctypes.c_void_p(handle), ctypes.byref(code))
+        kernel32.CloseHandle(ctypes.c_void_p(handle))
+        return code.value == 259  # STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def close_unclean(conn: sqlite3.Connection, kiosk: str, session_id: str) -> int:
+    """Close sessions of kiosk whose process is gone as 'unclean'; returns how many"""
+    stale = [{'id': id} for id, pid in conn.execute(OPEN_SESSIONS, {'kiosk': kiosk, 'id': session_id})
+             if not _pid_alive(pid)]
+    with conn:
+        conn.executemany(CLOSE_UNCLEAN, stale)
+    return len(stale)
+
+
+def connect(path: Path) -> sqlite3.Connection:
+    """Open (and if needed create) a history database"""
+    conn = sqlite3.connect(str(path), timeout=5.0)
+    # Freed pages are returned by compaction; only takes effect on a new database
+    conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+    # Readers (the CLI) never block the kiosk's writes
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('PRAGMA synchronous = NORMAL')
+    conn.executescript(SCHEMA)
+    conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+    return conn
+
+
+def compact(conn: sqlite3.Connection, raw_retention_days: int, rollup_retention_days: int,
+            now: Optional[float] = None) -> int:
+    """
+    Fold raw timings of whole UTC days older than the raw retention into
+    daily percentiles and drop expired rollups and sessions. Returns the
+    number of raw timings compacted.
+    """
+    now = time.time() if now is None else now
+    raw_cutoff = (now - raw_retention_days * DAY_S) // DAY_S * DAY_S
+    rollup_cutoff = (now - rollup_retention_days * DAY_S) // DAY_S * DAY_S
+
+    groups: Dict[Tuple[str, str, str, str, str], List[float]] = {}
+    rows = conn.execute(
+        "SELECT date(t.at, 'unixepoch'), COALESCE(s.kiosk, ''), COALESCE(s.sdk_version, ''), t.phase, t.outcome, "
+        't.duration_ms FROM timings t LEFT JOIN sessions s ON s.id = t.session_id WHERE t.at < ?', (raw_cutoff,))
+    for day, kiosk, version, phase, outcome, duration_ms in rows:
+        groups.setdefault((day, kiosk, version, phase, outcome), []).append(duration_ms)
+
+    with conn:
+        # Sessions still running keep summing up: add what is about to be deleted
+        conn.execute(f'UPDATE sessions SET {_assignments(" AND t.at < :cutoff")} WHERE ended_at IS NULL '
+                     'AND id IN (SELECT session_id FROM timings WHERE at < :cutoff)', {'cutoff': raw_cutoff})
+        conn.executemany(
+            'INSERT OR REPLACE INTO daily (day, kiosk, sdk_version, phase, outcome, count, '
+            'p50_ms, p90_ms, p95_ms, p99_ms, max_ms) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            [(*key, len(values), *(round(percentile(values, p), 1) for p in PERCENTILES), max(values))
+             for key, values in groups.items()])
+        compacted = conn.execute('DELETE FROM timings WHERE at < ?', (raw_cutoff,)).rowcount
+        conn.execute("DELETE FROM daily WHERE day < date(?, 'unixepoch')", (rollup_cutoff,))
+        conn.execute('DELETE FROM sessions WHERE started_at < ?', (rollup_cutoff,))
+    conn.execute('PRAGMA incremental_vacuum')
+    return compacted
+
+
+class PerfHistory:
+    """Records session and phase timings to SQLite from a background writer thread"""
+
+    def __init__(self, config: PerfHistoryConfig, path: Optional[Path] = None, kiosk_id: str = 'kiosk'):
+        self.config = config
+        self.path = path or (Path(config["path"]) if config["path"]
+                             else Path.cwd() / 'perf-history.sqlite3')
+        self.kiosk_id = kiosk_id
+        self.session_id: Optional[str] = None
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0
+        self.compacted = 0
+        self._queue: 'queue.Queue[Optional[Tuple[str, Any]]]' = queue.Queue(MAX_PENDING)
+        self._thread: Optional[threading.Thread] = None
+
+    def start_session(self, sdk_version: str = '') -> None:
+        """Start the writer and record a new session"""
+        if self._thread:
+            return
+        self.session_id = uuid.uuid4().hex
+        self._put(START_SESSION, {'id': self.session_id, 'kiosk': self.kiosk_id, 'pid': os.getpid(),
+                                  'sdk_version': sdk_version, 'started_at': time.time()})
+        self._thread = threading.Thread(target=self._run, name='perf-history', daemon=True)
+        self._thread.start()
+
+    def record(self, phase: str, duration_ms: float, outcome: str = 'ok', attempt: int = 0) -> None:
+        """Queue one phase timing of the current session"""
+        if self.session_id is None:
+            return
+        self._put(INSERT_TIMING, (self.session_id, time.time(), phase, round(duration_ms, 1), outcome, attempt))
+
+    def end_session(self, outcome: str = 'stopped') -> None:
+        """Close the session, write what is queued and stop the writer"""
+        if not self._thread:
+            return
+        self._put(END_SESSION, {'id': self.session_id, 'ended_at': time.time(), 'outcome': outcome})
+        try:
+            self._queue.put(None, timeout=1.0)
+        except queue.Full:
+            pass
+        self._thread.join(timeout=5.0)
+        if self._thread.is_alive():
+            print('[PerfHistory] Writer did not finish in time, some timings may be lost')
+        self._thread = None
+        self.session_id = None
+
+    def _put(self, sql: str, params: Any) -> None:
+        try:
+            self._queue.put_nowait((sql, params))
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        try:
+            conn = connect(self.path)
+        except sqlite3.Error as e:
+            print(f'[PerfHistory] Could not open {self.path}: {e}')
+            self.errors += 1
+            # Keep draining so recording stays cheap
+            while self._queue.get() is not None:
+                self.dropped += 1
+            return
+
+        print(f'[PerfHistory] Recording timings to {self.path}')
+        try:
+            close_unclean(conn, self.kiosk_id, self.session_id)
+        except sqlite3.Error as e:
+            self.errors += 1
+            print(f'[PerfHistory] Could not close previous sessions: {e}')
+        self._compact(conn)
+        last_compaction = time.monotonic()
+        flush_interval = self.config["flushIntervalMs"] / 1000.0
+        batch: List[Tuple[str, Any]] = []
+        deadline = time.monotonic() + flush_interval
+        stopping = False
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                if item is None:
+                    stopping = True
+                else:
+                    batch.append(item)
+            except queue.Empty:
+                pass
+            if batch and (stopping or len(batch) >= self.config["batchSize"] or time.monotonic() >= deadline):
+                self._write(conn, batch)
+                batch = []
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + flush_interval
+            if time.monotonic() - last_compaction >= COMPACT_INTERVAL_S:
+                self._compact(conn)
+                last_compaction = time.monotonic()
+        conn.close()
+
+    def _write(self, conn: sqlite3.Connection, batch: List[Tuple[str, Any]]) -> None:
+        """Write a batch in one transaction, consecutive inserts as one executemany"""
+        try:
+            with conn:
+                for sql, items in itertools.groupby(batch, key=lambda item: item[0]):
+                    conn.executemany(sql, [params for _, params in items])
+            self.written += len(batch)
+        except sqlite3.Error as e:
+            self.errors += 1
+            self.dropped += len(batch)
+            print(f'[PerfHistory] Could not write {len(batch)} record(s): {e}')
+
+    def _compact(self, conn: sqlite3.Connection) -> None:
+        try:
+            compacted = compact(conn, self.config["rawRetentionDays"], self.config["rollupRetentionDays"])
+        except sqlite3.Error as e:
+            self.errors += 1
+            print(f'[PerfHistory] Compaction failed: {e}')
+            return
+        if compacted:
+            self.compacted += compacted
+            print(f'[PerfHistory] Compacted {compacted} timing(s) into daily percentiles')
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Writer counters"""
+        return {
+            'sessionId': self.session_id,
+            'written': self.written,
+            'pending': self._queue.qsize(),
+            'dropped': self.dropped,
+            'errors': self.errors,
+            'compacted': self.compacted,
+        }
+
+
+def parse_duration(text: str) -> float:
+    """'90m', '12h', '30d', '2w' in seconds"""
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)([mhdw])', text.strip())
+    if not match:
+        raise ValueError(f'invalid duration: {text!r} (expected e.g. 90m, 12h, 30d, 2w)')
+    return float(match.group(1)) * {'m': 60, 'h': 3600, 'd': DAY_S, 'w': 7 * DAY_S}[match.group(2)]
+
+
+# Group key expressions over raw timings (t, s) and daily rollups (d)
+GROUPS = {
+    'hour': ("strftime('%Y-%m-%d %H:00', t.at, 'unixepoch')", None),
+    'day': ("date(t.at, 'unixepoch')", 'd.day'),
+    'week': ("strftime('%Y-W%W', t.at, 'unixepoch')", "strftime('%Y-W%W', d.day)"),
+    'version': ("COALESCE(s.sdk_version, '')", 'd.sdk_version'),
+    'all': ("'all'", "'all'"),
+}
+
+
+def query_percentiles(conn: sqlite3.Connection, since_s: float, group_by: str = 'day',
+                      phases: Optional[List[str]] = None, kiosk: Optional[str] = None,
+                      now: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    Percentiles of successful phase durations per group and phase over the
+    last since_s seconds, with the share of attempts that did not succeed.
+    Groups that include compacted days combine the daily percentiles
+    weighted by count and are flagged approximate.
+    """
+    now = time.time() if now is None else now
+    since = now - since_s
+    raw_key, daily_key = GROUPS[group_by]
+    where, params = ['t.at >= ?'], [since]
+    if phases:
+        where.append(f'phase IN ({", ".join("?" * len(phases))})')
+        params += phases
+    if kiosk:
+        where.append('s.kiosk = ?')
+        params.append(kiosk)
+
+    groups: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    def group(key: str, phase: str) -> Dict[str, Any]:
+        return groups.setdefault((key, phase), {'ok': [], 'rollups': [], 'outcomes': {}})
+
+    rows = conn.execute(
+        f'SELECT {raw_key}, t.phase, t.outcome, t.duration_ms FROM timings t '
+        f'LEFT JOIN sessions s ON s.id = t.session_id WHERE {" AND ".join(where)}', params)
+    for key, phase, outcome, duration_ms in rows:
+        entry = group(key, phase)
+        entry['outcomes'][outcome] = entry['outcomes'].get(outcome, 0) + 1
+        if outcome == 'ok':
+            entry['ok'].append(duration_ms)
+
+    if daily_key:
+        where[0] = "d.day >= date(?, 'unixepoch')"
+        rows = conn.execute(
+            f'SELECT {daily_key}, d.phase, d.outcome, d.count, d.p50_ms, d.p90_ms, d.p95_ms, d.p99_ms, d.max_ms '
+            f'FROM daily d WHERE {" AND ".join(where).replace("s.kiosk", "d.kiosk")}', params)
+        for key, phase, outcome, count, *stats in rows:
+            entry = group(key, phase)
+            entry['outcomes'][outcome] = entry['outcomes'].get(outcome, 0) + count
+            if outcome == 'ok':
+                entry['rollups'].append((count, stats))
+
+    results = []
+    for (key, phase), entry in sorted(groups.items()):
+        total = sum(entry['outcomes'].values())
+        ok, rollups = entry['ok'], entry['rollups']
+        result: Dict[str, Any] = {
+            'group': key,
+            'phase': phase,
+            'count': total,
+            'okCount': len(ok) + sum(count for count, _ in rollups),
+            'failedPct': round(100.0 * (total - entry['outcomes'].get('ok', 0)) / total, 1),
+            'outcomes': entry['outcomes'],
+            'approximate': bool(rollups),
+        }
+        if result['okCount']:
+            # Raw samples count as one more (exact) rollup of the group
+            parts = list(rollups)
+            if ok:
+                parts.append((len(ok), [percentile(ok, p) for p in PERCENTILES] + [max(ok)]))
+            weight = sum(count for count, _ in parts)
+            for i, p in enumerate(PERCENTILES):
+                result[f'p{p}Ms'] = round(sum(count * stats[i] for count, stats in parts) / weight, 1)
+            result['maxMs'] = max(stats[-1] for _, stats in parts)
+        results.append(result)
+    return results
+
+
+def recent_sessions(conn: sqlite3.Connection, limit: int, kiosk: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Summaries of the latest sessions; sessions still running are summed up from their timings so far"""
+    columns = ', '.join(f'CASE WHEN ended_at IS NULL THEN {expression} ELSE {column} END'
+                        for column, expression in _summary().items())
+    where, params = ('WHERE kiosk = :kiosk', {'kiosk': kiosk}) if kiosk else ('', {})
+    rows = conn.execute(
+        f'SELECT id, kiosk, sdk_version, started_at, ended_at, outcome, {columns} '
+        f'FROM sessions {where} ORDER BY started_at DESC LIMIT :limit', {**params, 'limit': limit})
+    return [{
+        'id': row[0],
+        'kiosk': row[1],
+        'sdkVersion': row[2],
+        'startedAt': row[3],
+        'durationS': round(row[4] - row[3]) if row[4] else None,
+        'outcome': row[5] or 'running',
+        'timings': row[6],
+        'timeToShareMs': row[7],
+        'recoveryAttempts': row[8],
+        'recoveryFailures': row[9],
+    } for row in rows]
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+    parser = argparse.ArgumentParser(description='Query the kiosk performance history')
+    parser.add_argument('db', type=Path, nargs='?', default=Path('perf-history.sqlite3'))
+    parser.add_argument('--since', default='30d', help='time window, e.g. 12h, 30d, 8w (default 30d)')
+    parser.add_argument('--by', choices=list(GROUPS), default='day', help='group percentiles by (default day)')
+    parser.add_argument('--phase', action='append', help='only this phase (repeatable)')
+    parser.add_argument('--kiosk', help='only sessions of this kiosk id')
+    parser.add_argument('--sessions', type=int, metavar='N', help='list the latest N sessions instead')
+    parser.add_argument('--compact', action='store_true', help='run retention/compaction with the configured limits')
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    if not args.db.exists():
+        parser.error(f'{args.db} does not exist')
+    conn = connect(args.db)
+
+    if args.compact:
+        from .config import load_config
+        history_config = load_config()['perfHistory']
+        count = compact(conn, history_config["rawRetentionDays"], history_config["rollupRetentionDays"])
+        print(f'[PerfHistory] Compacted {count} timing(s)')
+    elif args.sessions:
+        sessions = recent_sessions(conn, args.sessions, args.kiosk)
+        if args.json:
+            print(json.dumps(sessions, indent=2))
+        for s in [] if args.json else sessions:
+            started = time.strftime('%Y-%m-%d %H:%M', time.localtime(s['startedAt']))
+            share = f'{s["timeToShareMs"]:.0f}ms' if s['timeToShareMs'] is not None else '-'
+            duration = f'{s["durationS"]}s' if s['durationS'] is not None else '-'
+            print(f'{started}  {s["kiosk"]:<10} sdk {s["sdkVersion"] or "?":<12} {s["outcome"]:<9} {duration:>8}  '
+                  f'time to share {share:>8}  recoveries {s["recoveryAttempts"]} ({s["recoveryFailures"]} failed)')
+    else:
+        try:
+            since_s = parse_duration(args.since)
+        except ValueError as e:
+            parser.error(str(e))
+        results = query_percentiles(conn, since_s, args.by, args.phase, args.kiosk)
+        if args.json:
+            print(json.dumps(results, indent=2))
+        elif not results:
+            print(f'No timings in the last {args.since}')
+        else:
+            print(f'{args.by:<16} {"phase":<16} {"count":>6} {"fail%":>6} '
+                  + ' '.join(f'{f"p{p}":>8}' for p in PERCENTILES) + f' {"max":>8}')
+            for r in results:
+                stats = ' '.join(f'{r[f"p{p}Ms"]:>8.0f}' if f'p{p}Ms' in r else f'{"-":>8}' for p in PERCENTILES)
+                stats += f' {r["maxMs"]:>8.0f}' if 'maxMs' in r else f' {"-":>8}'
+                print(f'{r["group"]:<16} {r["phase"]:<16} {r["count"]:>6} {r["failedPct"]:>6.1f} {stats}'
+                      f'{"  ~" if r["approximate"] else ""}')
+            if any(r['approximate'] for r in results):
+                print('~ includes compacted days: percentiles are count-weighted averages of daily percentiles')
+    conn.close()
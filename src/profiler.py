@@ -0,0 +1,240 @@
+"""
+Zoom Kiosk - Sampling Profiler
+
+Shows where Python time goes in a running kiosk. A background thread
+samples the stack of every thread (event loop and message pump, pynput
+listeners, writer threads) at a fixed interval; the samples are written
+as collapsed stacks, one "thread;outer;...;inner count" line per distinct
+stack, ready for flamegraph.pl or speedscope, together with a top-N
+summary of the busiest functions.
+
+Sampling is wall-clock: idle threads show up waiting (e.g. in select).
+The sampler measures its own cost and doubles the interval whenever a
+sample takes more than maxOverheadPct of it, so it is safe to leave
+running during a live meeting.
+
+Start and stop with F11, the control plane (POST /profile/start,
+/profile/stop) or profiler.enabled at startup.
+
+    python -m src.profiler profile-20250101-120000.folded --top 30
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from .config import ProfilerConfig
+
+# Distinct stacks kept; samples of further new stacks are only counted
+MAX_STACKS = 50000
+MAX_INTERVAL_S = 1.0
+
+
+def _label(code: Any) -> str:
+    """Frame label: qualified function name and the file's last two path parts"""
+    path = code.co_filename.replace('\\', '/').split('/')
+    name = getattr(code, 'co_qualname', code.co_name)
+    return f'{name} ({"/".join(path[-2:])})'
+
+
+class SamplingProfiler:
+    """Periodic all-thread stack sampler writing collapsed stacks"""
+
+    def __init__(self, config: ProfilerConfig, output_dir: Optional[Path] = None):
+        self.config = config
+        self.output_dir = output_dir or (Path(config["path"]) if config["path"] else Path.cwd())
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.dropped = 0
+        self.interval_s = config["intervalMs"] / 1000.0
+        self.sampling_s = 0.0
+        self.started_at: Optional[float] = None
+        self.elapsed_s = 0.0
+        self.backoffs = 0
+        self.last_output: Optional[Path] = None
+        self._labels: Dict[Any, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stop_lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None
+
+    def start(self, duration_s: Optional[float] = None) -> bool:
+        """Start sampling, for duration_s seconds or until stop()"""
+        if self._thread:
+            return False
+        self.stacks = Counter()
+        self.samples = 0
+        self.dropped = 0
+        self.sampling_s = 0.0
+        self.backoffs = 0
+        self.interval_s = self.config["intervalMs"] / 1000.0
+        self.started_at = time.perf_counter()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(duration_s,), name='profiler', daemon=True)
+        self._thread.start()
+        until = f'for {duration_s:.0f}s' if duration_s else 'until stopped'
+        print(f'[Profiler] Sampling all threads every {self.interval_s * 1000:.0f}ms {until}')
+        return True
+
+    def stop(self) -> Optional[Path]:
+        """Stop sampling and write the profile; returns the collapsed stacks file"""
+        # Both the caller and a sampler whose duration ran out may stop; one of them writes
+        with self._stop_lock:
+            thread, self._thread = self._thread, None
+        if not thread:
+            return None
+        self._stop.set()
+        if thread is not threading.current_thread():
+            thread.join(timeout=2.0)
+        return self._finish()
+
+    def toggle(self) -> None:
+        """Start, or stop and write the profile"""
+        if self.is_running:
+            self.stop()
+        else:
+            self.start()
+
+    def _run(self, duration_s: Optional[float]) -> None:
+        own = threading.get_ident()
+        max_overhead = self.config["maxOverheadPct"] / 100.0
+        deadline = time.perf_counter() + duration_s if duration_s else None
+        while not self._stop.wait(self.interval_s):
+            began = time.perf_counter()
+            self._sample(own)
+            spent = time.perf_counter() - began
+            self.sampling_s += spent
+            if spent > self.interval_s * max_overhead and self.interval_s < MAX_INTERVAL_S:
+                # Sampling got expensive (many threads or deep stacks): sample less often
+                self.interval_s = min(self.interval_s * 2, MAX_INTERVAL_S)
+                self.backoffs += 1
+            if deadline and time.perf_counter() >= deadline:
+                break
+        if not self._stop.is_set():
+            # Ran out its duration: write the profile from here
+            self.stop()
+
+    def _sample(self, own: int) -> None:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        with self._lock:
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                codes = []
+                while frame is not None:
+                    codes.append(frame.f_code)
+                    frame = frame.f_back
+                key = (names.get(ident, str(ident)), tuple(reversed(codes)))
+                if key in self.stacks or len(self.stacks) < MAX_STACKS:
+                    self.stacks[key] += 1
+                else:
+                    self.dropped += 1
+            self.samples += 1
+
+    def _collapsed(self) -> List[Tuple[str, int]]:
+        """(thread;outer;...;inner, count), most frequent first"""
+        lines = []
+        with self._lock:
+            for (thread, codes), count in self.stacks.most_common():
+                frames = []
+                for code in codes:
+                    label = self._labels.get(code)
+                    if label is None:
+                        label = self._labels[code] = _label(code)
+                    frames.append(label)
+                lines.append((';'.join([thread.replace(';', ':')] + frames), count))
+        return lines
+
+    def _finish(self) -> Optional[Path]:
+        self.elapsed_s = time.perf_counter() - (self.started_at or time.perf_counter())
+        collapsed = self._collapsed()
+        overhead = 100.0 * self.sampling_s / self.elapsed_s if self.elapsed_s else 0.0
+        header = (f'{self.samples} samples over {self.elapsed_s:.1f}s, final interval '
+                  f'{self.interval_s * 1000:.0f}ms, sampling overhead {overhead:.2f}%'
+                  + (f', {self.dropped} samples of new stacks dropped' if self.dropped else ''))
+        summary = '\n'.join([header, ''] + summarize(collapsed, self.config["topN"]))
+        print(f'[Profiler] {header}')
+        if not collapsed:
+            return None
+
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        path = self.output_dir / f'profile-{stamp}.folded'
+        try:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.writelines(f'{stack} {count}\n' for stack, count in collapsed)
+            os.replace(tmp_path, path)
+            path.with_suffix('.txt').write_text(summary + '\n', encoding='utf-8')
+        except OSError as e:
+            print(f'[Profiler] Could not write profile: {e}')
+            return None
+        self.last_output = path
+        print(f'[Profiler] Wrote {path} and {path.with_suffix(".txt").name}')
+        print(summary)
+        return path
+
+    def get_state(self) -> Dict[str, Any]:
+        """Whether sampling and how much"""
+        return {
+            'running': self.is_running,
+            'samples': self.samples,
+            'intervalMs': round(self.interval_s * 1000, 1),
+            'backoffs': self.backoffs,
+            'lastOutput': str(self.last_output) if self.last_output else '',
+        }
+
+
+def summarize(collapsed: List[Tuple[str, int]], top_n: int) -> List[str]:
+    """Top functions by own samples (innermost frame) and by total samples (anywhere on the stack)"""
+    own: Counter = Counter()
+    total: Counter = Counter()
+    threads: Counter = Counter()
+    for stack, count in collapsed:
+        thread, *frames = stack.split(';')
+        threads[thread] += count
+        if frames:
+            own[frames[-1]] += count
+        for frame in set(frames):
+            total[frame] += count
+    samples = sum(threads.values()) or 1
+
+    def table(title: str, counter: Counter) -> List[str]:
+        return [title] + [f'{100.0 * count / samples:6.1f}% {count:>8}  {frame}'
+                          for frame, count in counter.most_common(top_n)] + ['']
+
+    return (table('Threads (share of all thread samples):', threads)
+            + table(f'Top {top_n} by own samples:', own)
+            + table(f'Top {top_n} by total samples:', total))
+
+
+def load_collapsed(path: Path) -> List[Tuple[str, int]]:
+    """Read a collapsed stacks file"""
+    lines = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            stack, _, count = line.rstrip('\n').rpartition(' ')
+            if stack and count.isdigit():
+                lines.append((stack, int(count)))
+    return lines
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Summarize a collapsed stacks profile')
+    parser.add_argument('profile', type=Path)
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--thread', help='only stacks of threads whose name contains this')
+    args = parser.parse_args()
+
+    stacks = load_collapsed(args.profile)
+    if args.thread:
+        stacks = [(stack, count) for stack, count in stacks if args.thread in stack.split(';', 1)[0]]
+    print('\n'.join(summarize(stacks, args.top)))
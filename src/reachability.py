@@ -0,0 +1,74 @@
+"""
+Zoom Kiosk - Reachability Prober
+
+Cheap connectivity checks used before heavyweight SDK recovery attempts.
+Targets are URLs:
+- tcp://host:port      succeeds when a TCP connection can be opened
+- http(s)://host[:port][/path]  succeeds on any HTTP response to a HEAD request
+"""
+
+import asyncio
+import ssl
+from typing import List, Optional, Tuple
+from urllib.parse import urlsplit
+from .clock import Clock, SYSTEM_CLOCK
+from .config import ReachabilityConfig
+
+
+def parse_target(target: str) -> Tuple[str, str, int, str]:
+    """Split a probe target into (scheme, host, port, path)"""
+    parts = urlsplit(target if '://' in target else f'tcp://{target}')
+    scheme = parts.scheme.lower()
+    default_port = {'http': 80, 'https': 443}.get(scheme, 443)
+    return scheme, parts.hostname or '', parts.port or default_port, parts.path or '/'
+
+
+class ReachabilityProber:
+    """Probes configured targets to tell whether the network is usable"""
+
+    def __init__(self, config: ReachabilityConfig, clock: Clock = SYSTEM_CLOCK):
+        self.config = config
+        self.clock = clock
+        self.targets: List[Tuple[str, str, int, str]] = [parse_target(t) for t in config["targets"]]
+        self.probe_timeout = config["probeTimeoutMs"] / 1000.0
+        self.probe_interval = config["probeIntervalMs"] / 1000.0
+        self.last_result: Optional[bool] = None
+        self.last_probe_time = 0.0
+
+    async def _probe(self, scheme: str, host: str, port: int, path: str) -> bool:
+        """Probe a single target"""
+        writer: Optional[asyncio.StreamWriter] = None
+        try:
+            ssl_ctx = ssl.create_default_context() if scheme == 'https' else None
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(host, port, ssl=ssl_ctx), self.probe_timeout)
+            if scheme in ('http', 'https'):
+                writer.write(f'HEAD {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n'.encode())
+                await writer.drain()
+                status_line = await asyncio.wait_for(reader.readline(), self.probe_timeout)
+                return status_line.startswith(b'HTTP/')
+            return True
+        except (OSError, asyncio.TimeoutError, ssl.SSLError):
+            return False
+        finally:
+            if writer:
+                writer.close()
+
+    async def is_reachable(self) -> bool:
+        """True if any target answers"""
+        if not self.targets:
+            return True
+        results = await asyncio.gather(*(self._probe(*target) for target in self.targets))
+        self.last_result = any(results)
+        self.last_probe_time = self.clock.monotonic()
+        return self.last_result
+
+    async def wait_until_reachable(self, timeout: float) -> bool:
+        """Probe every probe interval until a target answers or timeout seconds have passed"""
+        deadline = self.clock.monotonic() + timeout
+        while not await self.is_reachable():
+            remaining = deadline - self.clock.monotonic()
+            if remaining <= 0:
+                return False
+            await self.clock.sleep(min(self.probe_interval, remaining))
+        return True
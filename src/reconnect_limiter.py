@@ -0,0 +1,235 @@
+"""
+Zoom Kiosk - Reconnect Limiter
+
+Caps how many kiosk processes run the heavyweight reconnect sequence
+(CleanUPSDK / InitSDK / SDKAuth) at the same time, so a network or Zoom
+blip does not turn into a retry storm across a site.
+
+Limiters are pluggable:
+- 'file': a pool of lock files on the local machine; a held lock is one
+  reconnect token and the OS releases it if the process dies
+- 'coordinator': tokens handed out over TCP by a coordinator process
+  (see serve_coordinator for a local stand-in)
+"""
+
+import asyncio
+import random
+from abc import ABC, abstractmethod
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional, List, IO
+from .config import ReconnectLimiterConfig
+
+if sys.platform == 'win32':
+    import msvcrt
+else:
+    import fcntl
+
+
+class ReconnectLimiter(ABC):
+    """Hands out a limited number of concurrent reconnect tokens"""
+
+    @abstractmethod
+    async def acquire(self, timeout: float) -> bool:
+        """Wait for a token. Returns False if none became available in time."""
+
+    @abstractmethod
+    async def release(self) -> None:
+        """Return the token held by this process"""
+
+
+def _try_lock(f: IO) -> bool:
+    """Try to take an exclusive, non-blocking lock on an open file"""
+    try:
+        if sys.platform == 'win32':
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+def _unlock(f: IO) -> None:
+    """Release a lock taken by _try_lock"""
+    try:
+        if sys.platform == 'win32':
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    except OSError:
+        pass
+
+
+class FileLockLimiter(ReconnectLimiter):
+    """Token pool backed by one lock file per token in a shared directory"""
+
+    def __init__(self, lock_dir: Path, max_concurrent: int, poll_interval: float = 0.25):
+        self.lock_dir = lock_dir
+        self.max_concurrent = max_concurrent
+        self.poll_interval = poll_interval
+        self.held: Optional[IO] = None
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
+
+    def _try_acquire_slot(self) -> bool:
+        """Try every slot once, in random order to spread contention"""
+        slots: List[int] = list(range(self.max_concurrent))
+        random.shuffle(slots)
+        for slot in slots:
+            f = open(self.lock_dir / f'slot-{slot}.lock', 'a+b')
+            if _try_lock(f):
+                self.held = f
+                return True
+            f.close()
+        return False
+
+    async def acquire(self, timeout: float) -> bool:
+        if self.held:
+            return True
+        deadline = time.monotonic() + timeout
+        while True:
+            if self._try_acquire_slot():
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            # Jittered polling so waiting kiosks do not wake in lockstep
+            await asyncio.sleep(self.poll_interval * (0.5 + random.random()))
+
+    async def release(self) -> None:
+        if self.held:
+            _unlock(self.held)
+            self.held.close()
+            self.held = None
+
+
+class CoordinatorLimiter(ReconnectLimiter):
+    """
+    Token pool managed by a coordinator over TCP. Protocol is line based:
+    the client sends 'ACQUIRE', the coordinator answers 'OK' once a token is
+    free; the token is returned when the connection closes.
+    """
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def acquire(self, timeout: float) -> bool:
+        if self.writer:
+            return True
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            print(f'[ReconnectLimiter] Coordinator unreachable: {e}')
+            return False
+        try:
+            writer.write(b'ACQUIRE\n')
+            await writer.drain()
+            line = await asyncio.wait_for(reader.readline(), timeout)
+            if line.strip() == b'OK':
+                self.writer = writer
+                return True
+        except (OSError, asyncio.TimeoutError):
+            pass
+        writer.close()
+        return False
+
+    async def release(self) -> None:
+        if self.writer:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+            self.writer = None
+
+
+async def serve_coordinator(host: str, port: int, max_concurrent: int) -> asyncio.AbstractServer:
+    """Run a stand-in coordinator handing out max_concurrent tokens"""
+    tokens = asyncio.Semaphore(max_concurrent)
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        acquired = False
+        try:
+            if (await reader.readline()).strip() != b'ACQUIRE':
+                return
+            await tokens.acquire()
+            acquired = True
+            writer.write(b'OK\n')
+            await writer.drain()
+            # Hold the token until the client disconnects
+            await reader.read()
+        except OSError:
+            pass
+        finally:
+            if acquired:
+                tokens.release()
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+def create_reconnect_limiter(config: ReconnectLimiterConfig) -> Optional[ReconnectLimiter]:
+    """Create the limiter selected in config, or None if disabled"""
+    limiter_type = config["type"]
+    if limiter_type == 'file':
+        lock_dir = Path(config["lockDir"]) if config["lockDir"] else \
+            Path(tempfile.gettempdir()) / 'zoom-kiosk-reconnect'
+        return FileLockLimiter(lock_dir, config["maxConcurrent"], config["pollIntervalMs"] / 1000.0)
+    if limiter_type == 'coordinator':
+        return CoordinatorLimiter(config["coordinatorHost"], config["coordinatorPort"])
+    if limiter_type not in ('', 'none'):
+        print(f'[ReconnectLimiter] Unknown limiter type: {limiter_type}, reconnects are not limited')
+    return None
+
+
+def _demo_worker(lock_dir: str, max_concurrent: int, hold: float, current, peak, use_limiter: bool) -> None:
+    """One simulated kiosk: take a token, 'reconnect' for hold seconds, release"""
+    async def run() -> None:
+        limiter = FileLockLimiter(Path(lock_dir), max_concurrent, 0.02) if use_limiter else None
+        if limiter:
+            await limiter.acquire(60.0)
+        with current.get_lock():
+            current.value += 1
+            peak.value = max(peak.value, current.value)
+        await asyncio.sleep(hold)
+        with current.get_lock():
+            current.value -= 1
+        if limiter:
+            await limiter.release()
+    asyncio.run(run())
+
+
+def _demo(processes: int, max_concurrent: int, hold: float) -> None:
+    """Start many local processes reconnecting at once and report peak concurrency"""
+    import multiprocessing
+
+    for use_limiter in (False, True):
+        current = multiprocessing.Value('i', 0)
+        peak = multiprocessing.Value('i', 0)
+        lock_dir = tempfile.mkdtemp(prefix='zoom-kiosk-reconnect-demo-')
+        started = time.monotonic()
+        workers = [multiprocessing.Process(target=_demo_worker,
+                                           args=(lock_dir, max_concurrent, hold, current, peak, use_limiter))
+                   for _ in range(processes)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        label = f'limited to {max_concurrent}' if use_limiter else 'unlimited'
+        print(f'{label}: peak concurrent reconnects={peak.value}, '
+              f'all done in {time.monotonic() - started:.2f}s')
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Measure peak reconnect concurrency across local processes')
+    parser.add_argument('--processes', type=int, default=20)
+    parser.add_argument('--max-concurrent', type=int, default=2)
+    parser.add_argument('--hold', type=float, default=0.2, help='Seconds each simulated reconnect takes')
+    args = parser.parse_args()
+    _demo(args.processes, args.max_concurrent, args.hold)
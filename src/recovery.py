@@ -7,8 +7,13 @@ after network disconnections or meeting failures.
 
 import asyncio
 import random
-from typing import Callable, Awaitable
+from typing import Callable, Awaitable, Optional
 from .config import RecoveryConfig
+from .clock import Clock, SYSTEM_CLOCK
+from .adaptive_timeouts import AdaptiveTimeouts, Phase
+from .reconnect_limiter import ReconnectLimiter
+from .reachability import ReachabilityProber
+from .task_supervisor import TaskSupervisor
 
 
 class RecoveryState:
@@ -21,21 +26,58 @@ class RecoveryState:
 class RecoveryWatchdog:
     """Recovery Watchdog class with exponential backoff retry logic"""
 
-    def __init__(self, config: RecoveryConfig, reconnect_callback: Callable[[], Awaitable[None]]):
+    def __init__(self, config: RecoveryConfig, reconnect_callback: Callable[[], Awaitable[None]],
+                 timeouts: Optional[AdaptiveTimeouts] = None,
+                 limiter: Optional[ReconnectLimiter] = None,
+                 limiter_timeout: float = 60.0,
+                 prober: Optional[ReachabilityProber] = None,
+                 clock: Clock = SYSTEM_CLOCK, tasks: Optional[TaskSupervisor] = None):
         self.config = config
         self.reconnect_callback = reconnect_callback
-        self.state = RecoveryState.IDLE
+        self.timeouts = timeouts
+        # Optional cross-process cap on concurrent reconnects
+        self.limiter = limiter
+        self.limiter_timeout = limiter_timeout
+        # Held from the start of an attempt until it has joined or failed
+        self.token_held = False
+        # Optional connectivity check consulted before each attempt
+        self.prober = prober
+        self.clock = clock
+        self.tasks = tasks or TaskSupervisor(clock)
+        # Called with (old, new) whenever the recovery state changes
+        self.on_state_changed: Optional[Callable[[str, str], None]] = None
+        self._state = RecoveryState.IDLE
         self.retry_count = 0
+        self.last_backoff = 0.0
         self.retry_task: asyncio.Task | None = None
+        # Called with (attempt, outcome, duration_ms) when a recovery attempt ends:
+        # 'ok', 'failed', 'timeout', 'superseded' (new disconnect) or 'cancelled'
+        self.on_attempt_finished: Optional[Callable[[int, str, float], None]] = None
+        self.attempt_started: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    @state.setter
+    def state(self, state: str) -> None:
+        old, self._state = self._state, state
+        if old != state and self.on_state_changed:
+            try:
+                self.on_state_changed(old, state)
+            except Exception as e:
+                print(f'[RecoveryWatchdog] Error reporting state change: {e}')
 
     def start(self) -> None:
         """Start monitoring for disconnections"""
         self.state = RecoveryState.MONITORING
         self.retry_count = 0
+        self.last_backoff = 0.0
         print('[RecoveryWatchdog] Started monitoring')
 
     def stop(self) -> None:
         """Stop the watchdog"""
+        self._finish_attempt('cancelled')
         self.state = RecoveryState.IDLE
         self._clear_timers()
         print('[RecoveryWatchdog] Stopped')
@@ -45,13 +87,16 @@ class RecoveryWatchdog:
         # If already recovering, reset and start fresh recovery
         if self.state == RecoveryState.RECOVERING:
             print('[RecoveryWatchdog] New disconnect detected during recovery, resetting and starting fresh')
+            self._finish_attempt('superseded')
             self._clear_timers()
             self.retry_count = 0
+            self.last_backoff = 0.0
 
         # If in failed state, reset to allow new recovery attempts
         if self.state == RecoveryState.FAILED:
             print('[RecoveryWatchdog] Reset from failed state, starting new recovery')
             self.retry_count = 0
+            self.last_backoff = 0.0
 
         print('[RecoveryWatchdog] Disconnection detected, starting recovery')
         self.state = RecoveryState.RECOVERING
@@ -60,8 +105,10 @@ class RecoveryWatchdog:
     def on_connected(self) -> None:
         """Called when successfully reconnected"""
         print('[RecoveryWatchdog] Connection restored')
+        self._finish_attempt('ok')
         self.state = RecoveryState.MONITORING
         self.retry_count = 0
+        self.last_backoff = 0.0
         self._clear_timers()
 
     def on_sharing_restored(self) -> None:
@@ -70,6 +117,14 @@ class RecoveryWatchdog:
         self.state = RecoveryState.MONITORING
         self.retry_count = 0
 
+    def on_config_changed(self) -> None:
+        """Re-check limits after the recovery config was reloaded"""
+        if self.state == RecoveryState.FAILED and self.retry_count < self.config["maxRetries"]:
+            # Raised maxRetries: keep going instead of staying failed
+            print('[RecoveryWatchdog] Retry limit raised, resuming recovery')
+            self.state = RecoveryState.RECOVERING
+            self._schedule_retry()
+
     def _schedule_retry(self) -> None:
         """Schedule a retry attempt with exponential backoff"""
         if self.retry_count >= self.config["maxRetries"]:
@@ -78,30 +133,60 @@ class RecoveryWatchdog:
             return
 
         backoff = self._calculate_backoff()
-        print(f'[RecoveryWatchdog] Scheduling retry {self.retry_count + 1}/{self.config["maxRetries"]} in {backoff}ms')
+        print(f'[RecoveryWatchdog] Scheduling retry {self.retry_count + 1}/{self.config["maxRetries"]} in {backoff:.0f}ms')
 
         async def retry_task():
-            await asyncio.sleep(backoff / 1000.0)
+            if self.prober and self.prober.config["waitForConnectivity"] and not await self.prober.is_reachable():
+                # Reconnecting cannot succeed while the network is down: wait for it to come
+                # back, but no longer than the longest backoff, since the probe targets can
+                # be down (or blocked) while Zoom itself is reachable
+                limit = self.config["maxBackoffMs"] / 1000.0
+                print(f'[RecoveryWatchdog] Network unreachable, waiting up to {limit:.0f}s for connectivity...')
+                started = self.clock.monotonic()
+                if await self.prober.wait_until_reachable(limit):
+                    print(f'[RecoveryWatchdog] Connectivity restored after '
+                          f'{self.clock.monotonic() - started:.1f}s, retrying now')
+                else:
+                    print('[RecoveryWatchdog] Still unreachable, retrying anyway')
+            else:
+                await self.clock.sleep(backoff / 1000.0)
             await self._attempt_recovery()
 
-        self.retry_task = asyncio.create_task(retry_task())
+        self.retry_task = self.tasks.spawn(retry_task(), 'retry', 'recovery', self)
 
     def _calculate_backoff(self) -> float:
-        """Calculate exponential backoff delay"""
-        exponential_delay = self.config["initialBackoffMs"] * (2 ** self.retry_count)
-        jitter = random.random() * 1000  # Add random jitter up to 1 second
-        return min(exponential_delay + jitter, self.config["maxBackoffMs"])
+        """
+        Calculate backoff delay with decorrelated jitter: each delay is drawn
+        uniformly between the initial backoff and three times the previous
+        delay, so kiosks that lost the connection together spread out instead
+        of retrying in lockstep.
+        """
+        base = self.config["initialBackoffMs"]
+        upper = max(base, self.last_backoff * 3)
+        self.last_backoff = min(self.config["maxBackoffMs"], random.uniform(base, upper))
+        return self.last_backoff
 
     async def _attempt_recovery(self) -> None:
         """Attempt to recover the connection"""
+        if self.limiter and not self.token_held:
+            if not await self.limiter.acquire(self.limiter_timeout):
+                # Not counted as an attempt: the site is busy reconnecting, try again later
+                print('[RecoveryWatchdog] No reconnect token available in time, backing off')
+                self._schedule_retry()
+                return
+            self.token_held = True
+
         self.retry_count += 1
+        self.attempt_started = self.clock.monotonic()
         print(f'[RecoveryWatchdog] Attempting recovery (attempt {self.retry_count})')
 
         try:
             await self.reconnect_callback()
             # Success - the callback will trigger on_connected via event
+            self._arm_connect_deadline()
         except Exception as e:
             print(f'[RecoveryWatchdog] Recovery attempt failed: {e}')
+            self._finish_attempt('failed')
 
             if self.retry_count < self.config["maxRetries"]:
                 self._schedule_retry()
@@ -109,6 +194,45 @@ class RecoveryWatchdog:
                 self.state = RecoveryState.FAILED
                 print('[RecoveryWatchdog] All recovery attempts exhausted')
 
+    def _arm_connect_deadline(self) -> None:
+        """
+        Give the reconnect as long as auth and join usually take on this kiosk;
+        if on_connected has not been called by then, move on to the next retry.
+        """
+        if not self.timeouts or self.state != RecoveryState.RECOVERING:
+            return
+
+        deadline = self.timeouts.get_timeout(Phase.AUTH) + self.timeouts.get_timeout(Phase.JOIN)
+
+        async def deadline_task():
+            await self.clock.sleep(deadline)
+            if self.state != RecoveryState.RECOVERING:
+                return
+            print(f'[RecoveryWatchdog] Not connected within {deadline:.1f}s of recovery attempt {self.retry_count}')
+            self._finish_attempt('timeout')
+            self._schedule_retry()
+
+        self.retry_task = self.tasks.spawn(deadline_task(), 'connectDeadline', 'recovery', self)
+
+    def _finish_attempt(self, outcome: str) -> None:
+        """Report how the recovery attempt in progress ended and return its reconnect token"""
+        self._release_token()
+        if self.attempt_started is None:
+            return
+        duration_ms = (self.clock.monotonic() - self.attempt_started) * 1000
+        self.attempt_started = None
+        if self.on_attempt_finished:
+            try:
+                self.on_attempt_finished(self.retry_count, outcome, duration_ms)
+            except Exception as e:
+                print(f'[RecoveryWatchdog] Error reporting recovery attempt: {e}')
+
+    def _release_token(self) -> None:
+        if not self.token_held:
+            return
+        self.token_held = False
+        self.tasks.spawn(self.limiter.release(), 'releaseToken', 'recovery')
+
     def _clear_timers(self) -> None:
         """Clear all timers"""
         if self.retry_task and not self.retry_task.done():
@@ -129,7 +253,9 @@ class RecoveryWatchdog:
 
     def reset(self) -> None:
         """Reset and restart recovery attempts"""
+        self._finish_attempt('cancelled')
         self._clear_timers()
         self.retry_count = 0
+        self.last_backoff = 0.0
         self.state = RecoveryState.MONITORING
         print('[RecoveryWatchdog] Reset, ready for new recovery cycle')
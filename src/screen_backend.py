@@ -0,0 +1,232 @@
+"""
+Zoom Kiosk - Screen Backend
+
+Cursor, click and screen-capture operations used by preference recording
+and replay, behind a small interface so replay can run against a fake
+in-memory screen (any platform, no display needed).
+
+Also computes pixel signatures: a 64-bit average hash plus mean luminance
+of the region around a click target, compared by Hamming distance so
+small rendering differences still match.
+"""
+
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import pyautogui
+    # Disable pyautogui failsafe
+    pyautogui.FAILSAFE = False
+except Exception as e:
+    # No display to drive (e.g. headless Linux running the simulated SDK)
+    print(f'[ScreenBackend] Warning: pyautogui not available, replay disabled: {e}')
+    pyautogui = None
+
+# Signature grid: GRID x GRID cells -> 64-bit hash
+GRID = 8
+# Uniform regions hash to the same bits; the mean luminance tells them apart
+MAX_MEAN_DIFFERENCE = 24
+
+
+class ScreenBackend(ABC):
+    """Cursor, click and capture operations"""
+
+    @abstractmethod
+    def size(self) -> Tuple[int, int]:
+        """Screen width and height"""
+
+    @abstractmethod
+    def position(self) -> Tuple[int, int]:
+        """Cursor position"""
+
+    @abstractmethod
+    def move_to(self, x: int, y: int) -> None:
+        """Move the cursor"""
+
+    @abstractmethod
+    def click(self, x: int, y: int, button: str = 'left') -> None:
+        """Click at a point"""
+
+    @abstractmethod
+    def grab(self, left: int, top: int, width: int, height: int) -> bytes:
+        """Capture a region as packed RGB bytes"""
+
+    def signature_at(self, x: int, y: int, size: int) -> Optional[Dict[str, Any]]:
+        """Signature of the size x size region centred on (x, y), clipped to the screen"""
+        screen_w, screen_h = self.size()
+        left = max(0, min(x - size // 2, screen_w - 1))
+        top = max(0, min(y - size // 2, screen_h - 1))
+        width = min(size, screen_w - left)
+        height = min(size, screen_h - top)
+        try:
+            pixels = self.grab(left, top, width, height)
+        except Exception as e:
+            print(f'[ScreenBackend] Capture failed: {e}')
+            return None
+        return {**compute_signature(pixels, width, height), 'size': size}
+
+
+class PyAutoGuiBackend(ScreenBackend):
+    """The real screen, through pyautogui"""
+
+    def size(self) -> Tuple[int, int]:
+        width, height = pyautogui.size()
+        return width, height
+
+    def position(self) -> Tuple[int, int]:
+        pos = pyautogui.position()
+        return pos.x, pos.y
+
+    def move_to(self, x: int, y: int) -> None:
+        pyautogui.moveTo(x, y)
+
+    def click(self, x: int, y: int, button: str = 'left') -> None:
+        pyautogui.click(x, y, button=button)
+
+    def grab(self, left: int, top: int, width: int, height: int) -> bytes:
+        return pyautogui.screenshot(region=(left, top, width, height)).convert('RGB').tobytes()
+
+
+class FakeScreenBackend(ScreenBackend):
+    """
+    In-memory screen for tests and dry runs. Regions can be painted now or
+    after a delay (to mimic a menu that takes time to appear); moves and
+    clicks are recorded instead of performed.
+    """
+
+    def __init__(self, width: int = 1920, height: int = 1080):
+        self.width = width
+        self.height = height
+        self.pixels = bytearray(width * height * 3)
+        self.cursor = (0, 0)
+        self.move_count = 0
+        self.clicks: List[Tuple[int, int, str]] = []
+        # (due time, left, top, width, height, color)
+        self._scheduled: List[Tuple[float, int, int, int, int, Tuple[int, int, int]]] = []
+
+    def fill(self, left: int, top: int, width: int, height: int,
+             color: Tuple[int, int, int], delay: float = 0.0) -> None:
+        """Paint a rectangle, optionally delay seconds from now"""
+        if delay > 0:
+            self._scheduled.append((time.monotonic() + delay, left, top, width, height, color))
+            return
+        x0, x1 = max(0, left), min(self.width, left + width)
+        if x1 <= x0:
+            return
+        row = bytes(color) * (x1 - x0)
+        for y in range(max(0, top), min(self.height, top + height)):
+            start = (y * self.width + x0) * 3
+            self.pixels[start:start + len(row)] = row
+
+    def _apply_scheduled(self) -> None:
+        now = time.monotonic()
+        due = [s for s in self._scheduled if s[0] <= now]
+        if due:
+            self._scheduled = [s for s in self._scheduled if s[0] > now]
+            for _, left, top, width, height, color in due:
+                self.fill(left, top, width, height, color)
+
+    def size(self) -> Tuple[int, int]:
+        return self.width, self.height
+
+    def position(self) -> Tuple[int, int]:
+        return self.cursor
+
+    def move_to(self, x: int, y: int) -> None:
+        self.cursor = (x, y)
+        self.move_count += 1
+
+    def click(self, x: int, y: int, button: str = 'left') -> None:
+        self.cursor = (x, y)
+        self.clicks.append((x, y, button))
+
+    def grab(self, left: int, top: int, width: int, height: int) -> bytes:
+        self._apply_scheduled()
+        out = bytearray()
+        for y in range(top, top + height):
+            start = (y * self.width + left) * 3
+            out += self.pixels[start:start + width * 3]
+        return bytes(out)
+
+
+class DryRunBackend(ScreenBackend):
+    """
+    Virtual screen for replay dry runs: tracks the cursor, counts moves,
+    records points off the screen and answers signature checks with the
+    recorded signatures (the UI is assumed to be ready at once). Captures
+    are blank frames.
+    """
+
+    def __init__(self, width: int, height: int, signatures: Optional[Dict[Tuple[int, int], Dict[str, Any]]] = None,
+                 cursor: Optional[Tuple[int, int]] = None):
+        self.width = width
+        self.height = height
+        self.signatures = signatures or {}
+        self.cursor = cursor or (width // 2, height // 2)
+        self.move_count = 0
+        self.clicks: List[Tuple[int, int, str]] = []
+        self.out_of_bounds: List[Tuple[int, int]] = []
+
+    def _track(self, x: int, y: int) -> None:
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            self.out_of_bounds.append((x, y))
+        self.cursor = (x, y)
+
+    def size(self) -> Tuple[int, int]:
+        return self.width, self.height
+
+    def position(self) -> Tuple[int, int]:
+        return self.cursor
+
+    def move_to(self, x: int, y: int) -> None:
+        self._track(x, y)
+        self.move_count += 1
+
+    def click(self, x: int, y: int, button: str = 'left') -> None:
+        self._track(x, y)
+        self.clicks.append((x, y, button))
+
+    def grab(self, left: int, top: int, width: int, height: int) -> bytes:
+        # No pixels to capture: a blank (black) frame of the requested size
+        return bytes(width * height * 3)
+
+    def signature_at(self, x: int, y: int, size: int) -> Optional[Dict[str, Any]]:
+        return self.signatures.get((x, y))
+
+
+def compute_signature(pixels: bytes, width: int, height: int) -> Dict[str, Any]:
+    """Average hash and mean luminance of a packed RGB region"""
+    sums = [0] * (GRID * GRID)
+    counts = [0] * (GRID * GRID)
+    total = 0
+    i = 0
+    for y in range(height):
+        row = (y * GRID // height) * GRID
+        for x in range(width):
+            luma = (pixels[i] * 299 + pixels[i + 1] * 587 + pixels[i + 2] * 114) // 1000
+            cell = row + x * GRID // width
+            sums[cell] += luma
+            counts[cell] += 1
+            total += luma
+            i += 3
+
+    mean = total / max(1, width * height)
+    bits = 0
+    for cell in range(GRID * GRID):
+        average = sums[cell] / counts[cell] if counts[cell] else mean
+        bits = (bits << 1) | (1 if average > mean else 0)
+    return {'hash': f'{bits:016x}', 'mean': int(mean)}
+
+
+def signatures_match(expected: Dict[str, Any], actual: Optional[Dict[str, Any]], max_distance: int) -> bool:
+    """Whether a captured signature is close enough to the recorded one"""
+    if not actual:
+        return False
+    distance = bin(int(expected['hash'], 16) ^ int(actual['hash'], 16)).count('1')
+    return distance <= max_distance and abs(expected['mean'] - actual['mean']) <= MAX_MEAN_DIFFERENCE
+
+
+def create_screen_backend() -> Optional[ScreenBackend]:
+    """The real screen backend, or None if pyautogui is not available"""
+    return PyAutoGuiBackend() if pyautogui is not None else None
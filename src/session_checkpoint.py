@@ -0,0 +1,79 @@
+"""
+Zoom Kiosk - Session Checkpoint
+
+Keeps a small, atomically written record of the current meeting session
+(meeting id, join time, whether preferences were applied, recovery state
+and learned timings). After an unclean restart, startup consults it to
+skip steps already done in that meeting, such as replaying preferences.
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+from .config import CheckpointConfig
+
+CHECKPOINT_VERSION = 1
+
+
+class SessionCheckpoint:
+    """Persists meeting session progress for fast resume"""
+
+    def __init__(self, config: CheckpointConfig, path: Optional[Path] = None):
+        self.config = config
+        self.path = path or (Path(config["path"]) if config["path"]
+                             else Path.cwd() / 'session-checkpoint.json')
+        self.data: Dict[str, Any] = {}
+        self.last_saved = 0.0
+
+    def load_resumable(self, meeting_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the previous session if this start is a resume: the process went
+        away while in the same meeting, recently enough that the meeting is
+        likely still the same session.
+        """
+        try:
+            if not self.path.exists():
+                return None
+            with open(self.path, 'r', encoding='utf-8') as f:
+                previous = json.load(f)
+        except Exception as e:
+            print(f'[Checkpoint] Could not load {self.path}: {e}')
+            return None
+
+        if previous.get('version') != CHECKPOINT_VERSION or previous.get('meetingId') != meeting_id:
+            return None
+        if not previous.get('inMeeting'):
+            # Left the meeting cleanly; the next join starts a fresh session
+            return None
+        age_ms = (time.time() - previous.get('updatedAt', 0)) * 1000
+        if age_ms > self.config["resumeWindowMs"]:
+            return None
+        return previous
+
+    def update(self, **fields: Any) -> None:
+        """Merge fields into the checkpoint and write it if anything changed"""
+        changed = {k: v for k, v in fields.items() if self.data.get(k) != v}
+        if not changed and self.data:
+            return
+        self.data.update(changed)
+        self.save()
+
+    def refresh(self) -> None:
+        """Re-save periodically while in a meeting so the resume window stays open"""
+        if self.data.get('inMeeting') and \
+                (time.monotonic() - self.last_saved) * 1000 >= self.config["refreshIntervalMs"]:
+            self.save()
+
+    def save(self) -> None:
+        """Write the checkpoint (atomic replace)"""
+        self.last_saved = time.monotonic()
+        data = {**self.data, 'version': CHECKPOINT_VERSION, 'pid': os.getpid(), 'updatedAt': time.time()}
+        try:
+            tmp_path = self.path.with_suffix(f'{self.path.suffix}.{os.getpid()}.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f'[Checkpoint] Could not save {self.path}: {e}')
@@ -0,0 +1,175 @@
+"""
+Zoom Kiosk - Share Health Monitor
+
+Watches screen sharing while in a meeting and restarts it as soon as it
+drops, escalating to meeting-level recovery only when the share cannot
+be restored.
+"""
+
+import asyncio
+from typing import Callable, Optional, Dict, Any
+from .config import ShareHealthConfig
+from .adaptive_timeouts import AdaptiveTimeouts, Phase
+from .clock import Clock, SYSTEM_CLOCK
+from .zoom_service import ZoomService, get_sdk
+from .task_supervisor import TaskSupervisor
+
+
+class ShareHealthMonitor:
+    """Restarts a lost screen share with short, error-aware backoff"""
+
+    def __init__(self, config: ShareHealthConfig, escalate_callback: Callable[[str], None],
+                 timeouts: Optional[AdaptiveTimeouts] = None, clock: Clock = SYSTEM_CLOCK,
+                 tasks: Optional[TaskSupervisor] = None):
+        self.config = config
+        self.escalate_callback = escalate_callback
+        self.timeouts = timeouts
+        self.clock = clock
+        self.tasks = tasks or TaskSupervisor(clock)
+        self.zoom_service: Optional[ZoomService] = None
+        self.restart_task: Optional[asyncio.Task] = None
+        self.share_confirmed: Optional[asyncio.Event] = None
+        self.lost_at: Optional[float] = None
+
+        # Share downtime metrics
+        self.loss_count = 0
+        self.restored_count = 0
+        self.escalation_count = 0
+        self.restart_attempts = 0
+        self.last_downtime_ms = 0.0
+        self.max_downtime_ms = 0.0
+        self.total_downtime_ms = 0.0
+
+    def attach(self, zoom_service: ZoomService) -> None:
+        """Watch sharing events of a (new) ZoomService instance"""
+        self.detach()
+        self.zoom_service = zoom_service
+        zoom_service.on('sharingStarted', self.on_sharing_started)
+        zoom_service.on('sharingStopped', self.on_sharing_stopped)
+        zoom_service.on('disconnected', self.on_disconnected)
+
+    def detach(self) -> None:
+        """Stop watching the current ZoomService instance"""
+        self._cancel_restart()
+        if self.zoom_service:
+            self.zoom_service.off('sharingStarted', self.on_sharing_started)
+            self.zoom_service.off('sharingStopped', self.on_sharing_stopped)
+            self.zoom_service.off('disconnected', self.on_disconnected)
+            self.zoom_service = None
+        self.lost_at = None
+
+    def stop(self) -> None:
+        """Stop the monitor"""
+        self.detach()
+        print('[ShareHealth] Stopped')
+
+    def on_sharing_stopped(self) -> None:
+        """Called when our share ends while we are still in the meeting"""
+        if not self.zoom_service or not self.zoom_service.is_in_meeting:
+            return
+
+        if self.zoom_service.get_other_participant_count() == 0:
+            print('[ShareHealth] Share ended with nobody watching, not restarting')
+            return
+
+        if self.lost_at is None:
+            self.lost_at = self.clock.monotonic()
+            self.loss_count += 1
+
+        if self.restart_task and not self.restart_task.done():
+            return
+
+        print('[ShareHealth] Share lost, restarting...')
+        self.restart_task = self.tasks.spawn(self._restart_share(), 'restartShare', 'shareHealth', self)
+
+    def on_sharing_started(self) -> None:
+        """Called when our share (re)starts"""
+        if self.share_confirmed:
+            self.share_confirmed.set()
+
+        if self.lost_at is None:
+            return
+
+        downtime_ms = (self.clock.monotonic() - self.lost_at) * 1000
+        self.lost_at = None
+        self.restored_count += 1
+        self.last_downtime_ms = downtime_ms
+        self.max_downtime_ms = max(self.max_downtime_ms, downtime_ms)
+        self.total_downtime_ms += downtime_ms
+        print(f'[ShareHealth] Share restored after {downtime_ms:.0f}ms')
+
+    def on_disconnected(self, reason: str = '') -> None:
+        """Meeting-level recovery takes over; drop any pending share restart"""
+        self._cancel_restart()
+        self.lost_at = None
+
+    async def _restart_share(self) -> None:
+        """Restart StartMonitorShare until the share is confirmed or attempts run out"""
+        backoff_ms = self.config["initialBackoffMs"]
+
+        for attempt in range(1, self.config["maxRestartAttempts"] + 1):
+            service = self.zoom_service
+            if not service or not service.is_in_meeting:
+                return
+            if service.is_sharing:
+                return
+
+            self.restart_attempts += 1
+            self.share_confirmed = asyncio.Event()
+            result = await service.start_screen_share()
+            sdk = get_sdk()
+
+            if result is None:
+                # Nothing to do (left meeting or already sharing)
+                return
+            elif result == sdk.SDKError.SDKERR_SUCCESS:
+                try:
+                    await asyncio.wait_for(self.share_confirmed.wait(), self._get_confirm_timeout())
+                    return
+                except asyncio.TimeoutError:
+                    print(f'[ShareHealth] Share start not confirmed (attempt {attempt})')
+                    if self.timeouts:
+                        self.timeouts.record_timeout(Phase.SHARE)
+                delay_ms = backoff_ms
+            elif result == sdk.SDKError.SDKERR_TOO_FREQUENT_CALL:
+                delay_ms = max(backoff_ms, self.config["tooFrequentBackoffMs"])
+            elif result == sdk.SDKError.SDKERR_MEETING_NOT_SHARE_SENDER:
+                delay_ms = max(backoff_ms, self.config["notShareSenderBackoffMs"])
+            else:
+                delay_ms = backoff_ms
+
+            print(f'[ShareHealth] Restart attempt {attempt}/{self.config["maxRestartAttempts"]} '
+                  f'failed ({result}), retrying in {delay_ms}ms')
+            await self.clock.sleep(delay_ms / 1000.0)
+            backoff_ms = min(backoff_ms * 2, self.config["maxBackoffMs"])
+
+        service = self.zoom_service
+        if service and service.is_in_meeting and not service.is_sharing:
+            self.escalation_count += 1
+            print('[ShareHealth] Could not restore share, escalating to meeting recovery')
+            self.escalate_callback('Screen share could not be restored')
+
+    def _get_confirm_timeout(self) -> float:
+        """Get how long to wait for the share start to be confirmed, in seconds"""
+        if self.timeouts:
+            return self.timeouts.get_timeout(Phase.SHARE)
+        return self.config["confirmTimeoutMs"] / 1000.0
+
+    def _cancel_restart(self) -> None:
+        """Cancel a pending restart"""
+        if self.restart_task and not self.restart_task.done():
+            self.restart_task.cancel()
+        self.restart_task = None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get share downtime metrics"""
+        return {
+            'lossCount': self.loss_count,
+            'restoredCount': self.restored_count,
+            'escalationCount': self.escalation_count,
+            'restartAttempts': self.restart_attempts,
+            'lastDowntimeMs': round(self.last_downtime_ms, 1),
+            'maxDowntimeMs': round(self.max_downtime_ms, 1),
+            'totalDowntimeMs': round(self.total_downtime_ms, 1),
+            'isShareLost': self.lost_at is not None
+        }
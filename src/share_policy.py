@@ -0,0 +1,242 @@
+"""
+Zoom Kiosk - Share Policy
+
+Adapts the screen share to the kiosk's uplink. While the uplink is
+healthy the share uses the configured settings (screen section); when
+the mean uplink quality of the watched components drops below
+reduceBelow, or the SDK warns about bad network quality, the expensive
+settings (computer sound, stereo, video optimisation) are switched off
+and only restored once the quality is back above restoreAbove. The gap
+between the two thresholds and a minimum hold time between switches
+keep the share from flapping. The SDK reports quality only when it
+changes, so besides on every report the policy re-evaluates every
+recheckMs: a level that stays low (or recovers) switches the share once
+it has moved the time-weighted level and the hold time has passed.
+Without any quality level (uplink reports sparse or missing), a share
+reduced by an SDK warning is restored once holdMs passes without another
+warning.
+
+    python -m src.share_policy --levels 6,5,2,1,1,2,3,5,6,6,6,6 --interval 10
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
+from .clock import Clock, SYSTEM_CLOCK
+from .config import ScreenConfig, SharePolicyConfig
+from .network_quality import NetworkQualityMonitor
+from .task_supervisor import TaskSupervisor
+
+if TYPE_CHECKING:
+    # Imported lazily so CLIs can pick the SDK (simulated) before the service loads
+    from .zoom_service import ZoomService
+
+# SDK StatisticsWarningType value for bad network quality
+WARNING_NETWORK_QUALITY_BAD = 1
+
+FULL = 'full'
+REDUCED = 'reduced'
+
+
+class SharePolicy:
+    """Switches the share between the configured and a reduced set of settings"""
+
+    def __init__(self, config: SharePolicyConfig, screen: ScreenConfig, quality: NetworkQualityMonitor,
+                 clock: Clock = SYSTEM_CLOCK, tasks: Optional[TaskSupervisor] = None):
+        self.config = config
+        self.screen = screen
+        self.quality = quality
+        self.clock = clock
+        self.tasks = tasks or TaskSupervisor(clock)
+        self.zoom_service: Optional['ZoomService'] = None
+        self.recheck_task: Optional[asyncio.Task] = None
+        self.level = FULL
+        self.changed_at: Optional[float] = None
+        self.warned_at: Optional[float] = None
+        self.last_reason = ''
+        self.changes = 0
+        self.suppressed = 0
+
+    def attach(self, zoom_service: 'ZoomService') -> None:
+        """Drive the share settings of a (new) ZoomService instance"""
+        self.detach()
+        self.zoom_service = zoom_service
+        zoom_service.on('networkQuality', self.on_network_quality)
+        zoom_service.on('statisticsWarning', self.on_statistics_warning)
+        # A new service starts from the configured settings; keep the current level
+        zoom_service.set_share_settings(**self.settings())
+        self.recheck_task = self.tasks.spawn(self._recheck_loop(), 'recheck', 'sharePolicy', zoom_service)
+
+    def detach(self) -> None:
+        """Stop driving the current ZoomService instance"""
+        if self.recheck_task and not self.recheck_task.done():
+            self.recheck_task.cancel()
+        self.recheck_task = None
+        if self.zoom_service:
+            self.zoom_service.off('networkQuality', self.on_network_quality)
+            self.zoom_service.off('statisticsWarning', self.on_statistics_warning)
+            self.zoom_service = None
+
+    def settings(self) -> Dict[str, bool]:
+        """Share settings for the current level"""
+        settings = {
+            'shareComputerSound': self.screen['shareComputerSound'],
+            'stereoAudio': self.screen['stereoAudio'],
+            'optimizeForVideo': self.screen['optimizeForVideo'],
+        }
+        if self.level == REDUCED:
+            if self.config["dropComputerSound"]:
+                settings['shareComputerSound'] = False
+            if self.config["dropStereo"]:
+                settings['stereoAudio'] = False
+            if self.config["dropVideoOptimization"]:
+                settings['optimizeForVideo'] = False
+        return settings
+
+    def uplink_quality(self) -> Optional[float]:
+        """Lowest time-weighted uplink level over the watched components, None until one is known"""
+        levels = [self.quality.uplink_level(component) for component in self.config["components"]]
+        known = [level for level in levels if level is not None]
+        return round(min(known), 2) if known else None
+
+    def on_network_quality(self, component: int, level: int, user_id: int, uplink: bool, is_self: bool) -> None:
+        if is_self and uplink:
+            self.evaluate()
+
+    def on_statistics_warning(self, warning: int) -> None:
+        if warning == WARNING_NETWORK_QUALITY_BAD:
+            self.warned_at = self.clock.monotonic()
+            self._switch(REDUCED, 'SDK network quality warning')
+
+    async def _recheck_loop(self) -> None:
+        while True:
+            await self.clock.sleep(self.config["recheckMs"] / 1000.0)
+            self.evaluate()
+
+    def evaluate(self) -> None:
+        """Switch level if the uplink quality crossed a threshold"""
+        quality = self.uplink_quality()
+        if quality is None:
+            # Nothing to judge the uplink by: do not stay reduced on a warning that is not repeated
+            if (self.level == REDUCED and self.warned_at is not None
+                    and self.clock.monotonic() - self.warned_at >= self.config["holdMs"] / 1000.0):
+                self._switch(FULL, 'no network quality warning or level since the last warning')
+            return
+        if self.level == FULL and quality < self.config["reduceBelow"]:
+            self._switch(REDUCED, f'uplink quality {quality}')
+        elif self.level == REDUCED and quality >= self.config["restoreAbove"]:
+            self._switch(FULL, f'uplink quality {quality}')
+
+    def _switch(self, level: str, reason: str) -> None:
+        if level == self.level:
+            return
+        now = self.clock.monotonic()
+        if self.changed_at is not None and now - self.changed_at < self.config["holdMs"] / 1000.0:
+            self.suppressed += 1
+            return
+        self.level = level
+        self.changed_at = now
+        self.last_reason = reason
+        self.changes += 1
+        settings = self.settings()
+        print(f'[SharePolicy] {level} share ({reason}): {settings}')
+        if self.zoom_service:
+            self.zoom_service.set_share_settings(**settings)
+
+    def get_state(self) -> Dict[str, Any]:
+        """Current level and switch counts"""
+        return {
+            'level': self.level,
+            'changes': self.changes,
+            'suppressed': self.suppressed,
+            'lastReason': self.last_reason,
+            'lastChangeAgeMs': round((self.clock.monotonic() - self.changed_at) * 1000)
+            if self.changed_at is not None else None,
+            'settings': self.settings(),
+        }
+
+
+async def simulate_policy(config: Any, levels: List[int], interval_s: float) -> List[Dict[str, Any]]:
+    """
+    Run a kiosk on the simulated SDK with the given uplink quality level for
+    share and audio in each interval while sharing, and record what the
+    SDK's share settings were at the start of each interval. Like the SDK,
+    a level is only reported when it changes.
+    """
+    import tempfile
+    from pathlib import Path
+    from . import simulated_sdk
+    from .clock import wait_until
+    from .main import KioskApp
+    from .outage_sim import run_scenario
+
+    simulated_sdk.simulator = simulator = simulated_sdk.Simulator()
+    with tempfile.TemporaryDirectory() as state_dir:
+        app = KioskApp(config, enable_shortcuts=False, replay_plan=[], state_dir=Path(state_dir))
+        timeline: List[Dict[str, Any]] = []
+
+        async def scenario() -> None:
+            if not await wait_until(lambda: bool(app.zoom_service and app.zoom_service.is_sharing), 120):
+                raise RuntimeError('never started sharing')
+            started = SYSTEM_CLOCK.monotonic()
+            reported = None
+            for level in levels:
+                if level != reported:
+                    for component in (simulated_sdk.MeetingComponentType.MeetingComponentType_SHARE,
+                                      simulated_sdk.MeetingComponentType.MeetingComponentType_AUDIO):
+                        simulator.network_status(component, simulated_sdk.ConnectionQuality(level))
+                    reported = level
+                timeline.append({
+                    'atS': round(SYSTEM_CLOCK.monotonic() - started, 1),
+                    'level': level,
+                    'policy': app.share_policy.level,
+                    'computerSound': simulator.share_computer_sound,
+                    'stereo': simulator.audio_share_mode == simulated_sdk.AudioShareMode.AudioShareMode_Stereo,
+                    'optimizeForVideo': simulator.optimize_for_video,
+                })
+                await SYSTEM_CLOCK.sleep(interval_s)
+
+        await run_scenario(app, scenario())
+        return timeline
+
+
+if __name__ == '__main__':
+    import argparse
+    import contextlib
+    import io
+    import json
+    import os
+    parser = argparse.ArgumentParser(description='Run the share policy against simulated uplink quality')
+    parser.add_argument('--levels', default='6,5,3,2,1,1,2,3,4,5,5,6,6,6',
+                        help='uplink quality per interval (1 very bad to 6 excellent)')
+    parser.add_argument('--interval', type=float, default=10, help='seconds between reports')
+    parser.add_argument('--reduce-below', type=float)
+    parser.add_argument('--restore-above', type=float)
+    parser.add_argument('--hold-ms', type=int)
+    parser.add_argument('--verbose', action='store_true', help='show the kiosk log')
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    # Must be chosen before the Zoom service is imported
+    os.environ['ZOOM_KIOSK_SDK'] = 'simulated'
+    from .clock import run_virtual
+    from .outage_sim import simulation_config
+
+    config = simulation_config({})
+    for key, value in (('reduceBelow', args.reduce_below), ('restoreAbove', args.restore_above),
+                       ('holdMs', args.hold_ms)):
+        if value is not None:
+            config['sharePolicy'][key] = value
+
+    real_started = time.monotonic()
+    output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with output:
+        timeline = run_virtual(simulate_policy(config, [int(v) for v in args.levels.split(',') if v], args.interval))
+    if args.json:
+        print(json.dumps(timeline, indent=2))
+    else:
+        for entry in timeline:
+            print(f'{entry["atS"]:>7.1f}s quality {entry["level"]}: {entry["policy"]:<7} '
+                  f'computer sound {entry["computerSound"]}, stereo {entry["stereo"]}, '
+                  f'video optimisation {entry["optimizeForVideo"]}')
+    print(f'[SharePolicy] Done in {time.monotonic() - real_started:.2f}s')
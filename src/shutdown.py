@@ -0,0 +1,174 @@
+"""
+Zoom Kiosk - Shutdown Orchestrator
+
+Runs the kiosk's teardown as named phases with dependencies: a phase
+starts as soon as every phase it comes after has ended, so independent
+phases (stopping the monitors, writing the profile, closing the control
+plane) run in parallel. Each phase has a deadline and the whole shutdown
+has one; a phase that runs over is abandoned and its dependents go ahead
+without it. The report lists every phase with its outcome and duration.
+
+A phase stuck in a synchronous call (e.g. an SDK call on the event loop
+thread) cannot be interrupted from the loop. For that case the
+orchestrator arms a watchdog thread that, with forceExit, ends the
+process once the deadline plus a grace period has passed in real time.
+"""
+
+import asyncio
+import inspect
+import os
+import sys
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from .clock import Clock, SYSTEM_CLOCK
+from .config import ShutdownConfig
+
+# Exit code of a shutdown ended by the watchdog
+FORCED_EXIT_CODE = 3
+
+
+class PhaseResult:
+    """How one phase ended: 'ok', 'failed', 'timeout' (abandoned) or 'skipped' (never started)"""
+
+    __slots__ = ('name', 'outcome', 'duration_ms', 'error')
+
+    def __init__(self, name: str, outcome: str, duration_ms: float = 0.0, error: str = ''):
+        self.name = name
+        self.outcome = outcome
+        self.duration_ms = duration_ms
+        self.error = error
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {'phase': self.name, 'outcome': self.outcome, 'durationMs': round(self.duration_ms, 1)}
+        if self.error:
+            result['error'] = self.error
+        return result
+
+
+class ShutdownPhase:
+    """A named step; action may return an awaitable, which is bounded by timeout_s"""
+
+    __slots__ = ('name', 'action', 'after', 'timeout_s')
+
+    def __init__(self, name: str, action: Callable[[], Any], after: Iterable[str], timeout_s: float):
+        self.name = name
+        self.action = action
+        self.after = tuple(after)
+        self.timeout_s = timeout_s
+
+
+class ShutdownOrchestrator:
+    """Dependency-ordered, deadline-bounded teardown"""
+
+    def __init__(self, config: ShutdownConfig, clock: Clock = SYSTEM_CLOCK):
+        self.config = config
+        self.clock = clock
+        self.phases: Dict[str, ShutdownPhase] = {}
+        self.results: Dict[str, PhaseResult] = {}
+        self.running: Dict[str, float] = {}
+        self.duration_ms = 0.0
+        self._watchdog: Optional[threading.Timer] = None
+
+    def add(self, name: str, action: Callable[[], Any], after: Iterable[str] = (),
+            timeout_s: Optional[float] = None) -> None:
+        """Add a phase that starts once the phases named in after have ended"""
+        after = tuple(after)
+        unknown = [dep for dep in after if dep not in self.phases]
+        if unknown:
+            # Phases are added in dependency order, which also rules out cycles
+            raise ValueError(f'shutdown phase {name} comes after unknown phase(s): {", ".join(unknown)}')
+        if timeout_s is None:
+            timeout_s = self.config["phaseTimeoutMs"] / 1000.0
+        self.phases[name] = ShutdownPhase(name, action, after, timeout_s)
+
+    async def run(self) -> List[PhaseResult]:
+        """Run every phase; returns the results in the order the phases were added"""
+        started = self.clock.monotonic()
+        deadline_s = self.config["deadlineMs"] / 1000.0
+        self._arm_watchdog(deadline_s + self.config["forceExitGraceMs"] / 1000.0)
+        ended = {name: asyncio.Event() for name in self.phases}
+
+        async def run_phase(phase: ShutdownPhase) -> None:
+            try:
+                for dep in phase.after:
+                    await ended[dep].wait()
+                await self._run_phase(phase, started + deadline_s)
+            finally:
+                ended[phase.name].set()
+
+        # Plain tasks: the orchestrator bounds them itself, and a phase cancelling the
+        # kiosk's supervised tasks must not cancel the shutdown
+        tasks = [asyncio.create_task(run_phase(phase), name=f'shutdown/{phase.name}')
+                 for phase in self.phases.values()]
+        _, pending = await asyncio.wait(tasks, timeout=deadline_s)
+        now = self.clock.monotonic()
+        for name, phase_started in self.running.items():
+            self.results[name] = PhaseResult(name, 'timeout', (now - phase_started) * 1000, 'shutdown deadline')
+        for name in self.phases:
+            self.results.setdefault(name, PhaseResult(name, 'skipped'))
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.wait(pending, timeout=0.1)
+
+        self.duration_ms = (now - started) * 1000
+        results = [self.results[name] for name in self.phases]
+        late = [result for result in results if result.outcome != 'ok']
+        print(f'[Shutdown] {len(results) - len(late)}/{len(results)} phases done in {self.duration_ms:.0f}ms')
+        for result in late:
+            print(f'[Shutdown] Phase {result.name}: {result.outcome}'
+                  + (f' after {result.duration_ms:.0f}ms' if result.outcome != 'skipped' else '')
+                  + (f' ({result.error})' if result.error else ''))
+        # Abandoned work (e.g. a thread stuck in a call) could still hold the process open;
+        # then the watchdog stays armed until the process exits
+        if not any(result.outcome in ('timeout', 'skipped') for result in results):
+            self._disarm_watchdog()
+        return results
+
+    async def _run_phase(self, phase: ShutdownPhase, deadline: float) -> None:
+        now = self.clock.monotonic()
+        self.running[phase.name] = now
+        timeout = min(phase.timeout_s, deadline - now)
+        try:
+            if timeout <= 0:
+                raise asyncio.TimeoutError()
+            result = phase.action()
+            if inspect.isawaitable(result):
+                await asyncio.wait_for(result, timeout)
+            outcome, error = 'ok', ''
+        except asyncio.TimeoutError:
+            outcome, error = 'timeout', f'not done within {timeout:.1f}s'
+        except Exception as e:
+            outcome, error = 'failed', f'{type(e).__name__}: {e}'
+        self.running.pop(phase.name, None)
+        # Unless the shutdown deadline already gave up on this phase
+        duration_ms = (self.clock.monotonic() - now) * 1000
+        self.results.setdefault(phase.name, PhaseResult(phase.name, outcome, duration_ms, error))
+
+    def _arm_watchdog(self, after_s: float) -> None:
+        if not self.config["forceExit"] or self._watchdog:
+            return
+        self._watchdog = threading.Timer(after_s, self._force_exit)
+        self._watchdog.daemon = True
+        self._watchdog.start()
+
+    def _disarm_watchdog(self) -> None:
+        if self._watchdog:
+            self._watchdog.cancel()
+            self._watchdog = None
+
+    def _force_exit(self) -> None:
+        stuck = ', '.join(self.running) or 'after the last phase'
+        print(f'[Shutdown] Still not done {self.config["deadlineMs"] + self.config["forceExitGraceMs"]}ms '
+              f'after starting (stuck: {stuck}), exiting now')
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(FORCED_EXIT_CODE)
+
+    def report(self) -> Dict[str, Any]:
+        """Outcome per phase and the overall duration"""
+        return {
+            'durationMs': round(self.duration_ms, 1),
+            'ok': all(result.outcome == 'ok' for result in self.results.values()),
+            'phases': [self.results[name].to_dict() for name in self.phases if name in self.results],
+        }
@@ -0,0 +1,523 @@
+"""
+Zoom Kiosk - Simulated SDK
+
+A stand-in for the zoom_sdk_bindings module with the same surface that
+ZoomService uses, so the full kiosk lifecycle (init, auth, join, share,
+participants, disconnects) can run on any platform without the Windows SDK.
+
+Select it with the environment variable ZOOM_KIOSK_SDK=simulated.
+Timings and the initial participant count can be set with
+ZOOM_KIOSK_SIM='{"authLatencyMs": 200, "participants": 1}'. Failures can be
+injected the same way, e.g. '{"failNext": {"InitSDK": 3}}' makes the next
+three InitSDK calls fail (a count or a list of SDKError names).
+
+Callbacks are delivered on the running asyncio loop, like the real SDK
+delivers them through the Windows message pump. Harnesses drive the
+simulated meeting through the module-level `simulator`.
+"""
+
+import asyncio
+import json
+import os
+from enum import IntEnum
+from typing import Any, Callable, Dict, List, Optional
+
+
+class SDKError(IntEnum):
+    SDKERR_SUCCESS = 0
+    SDKERR_NO_IMPL = 1
+    SDKERR_WRONG_USAGE = 2
+    SDKERR_INVALID_PARAMETER = 3
+    SDKERR_MODULE_LOAD_FAILED = 4
+    SDKERR_MEMORY_FAILED = 5
+    SDKERR_SERVICE_FAILED = 6
+    SDKERR_UNINITIALIZE = 7
+    SDKERR_UNAUTHENTICATION = 8
+    SDKERR_NORECORDINGINPROCESS = 9
+    SDKERR_TRANSCODER_NOFOUND = 10
+    SDKERR_VIDEO_NOTREADY = 11
+    SDKERR_NO_PERMISSION = 12
+    SDKERR_UNKNOWN = 13
+    SDKERR_OTHER_SDK_INSTANCE_RUNNING = 14
+    SDKERR_INTERNAL_ERROR = 15
+    SDKERR_NO_AUDIODEVICE_ISFOUND = 16
+    SDKERR_NO_VIDEODEVICE_ISFOUND = 17
+    SDKERR_TOO_FREQUENT_CALL = 18
+    SDKERR_FAIL_ASSIGN_USER_PRIVILEGE = 19
+    SDKERR_MEETING_DONT_SUPPORT_FEATURE = 20
+    SDKERR_MEETING_NOT_SHARE_SENDER = 21
+    SDKERR_MEETING_YOU_HAVE_NO_SHARE = 22
+    SDKERR_NOT_IN_MEETING = 31
+
+
+class SDK_LANGUAGE_ID(IntEnum):
+    LANGUAGE_Unknown = 0
+    LANGUAGE_English = 1
+
+
+class AuthResult(IntEnum):
+    AUTHRET_SUCCESS = 0
+    AUTHRET_KEYORSECRETWRONG = 1
+    AUTHRET_ACCOUNTNOTSUPPORT = 2
+    AUTHRET_ACCOUNTNOTENABLESDK = 3
+    AUTHRET_UNKNOWN = 4
+    AUTHRET_SERVICE_BUSY = 5
+    AUTHRET_NONE = 6
+    AUTHRET_OVERTIME = 7
+    AUTHRET_NETWORKISSUE = 8
+    AUTHRET_CLIENT_INCOMPATIBLE = 9
+    AUTHRET_JWTTOKENWRONG = 10
+
+
+class MeetingStatus(IntEnum):
+    MEETING_STATUS_IDLE = 0
+    MEETING_STATUS_CONNECTING = 1
+    MEETING_STATUS_WAITINGFORHOST = 2
+    MEETING_STATUS_INMEETING = 3
+    MEETING_STATUS_DISCONNECTING = 4
+    MEETING_STATUS_RECONNECTING = 5
+    MEETING_STATUS_FAILED = 6
+    MEETING_STATUS_ENDED = 7
+    MEETING_STATUS_UNKNOWN = 8
+
+
+class SharingStatus(IntEnum):
+    Sharing_Self_Send_Begin = 0
+    Sharing_Self_Send_End = 1
+    Sharing_Self_Send_Pure_Audio_Begin = 2
+    Sharing_Self_Send_Pure_Audio_End = 3
+    Sharing_Other_Share_Begin = 4
+    Sharing_Other_Share_End = 5
+    Sharing_Other_Share_Pure_Audio_Begin = 6
+    Sharing_Other_Share_Pure_Audio_End = 7
+    Sharing_View_Other_Sharing = 8
+    Sharing_Pause = 9
+    Sharing_Resume = 10
+
+
+class MeetingComponentType(IntEnum):
+    MeetingComponentType_Def = 0
+    MeetingComponentType_AUDIO = 1
+    MeetingComponentType_VIDEO = 2
+    MeetingComponentType_SHARE = 3
+
+
+class ConnectionQuality(IntEnum):
+    Conn_Quality_Unknown = 0
+    Conn_Quality_Very_Bad = 1
+    Conn_Quality_Bad = 2
+    Conn_Quality_Not_Good = 3
+    Conn_Quality_Normal = 4
+    Conn_Quality_Good = 5
+    Conn_Quality_Excellent = 6
+
+
+class StatisticsWarningType(IntEnum):
+    Statistics_Warning_None = 0
+    Statistics_Warning_Network_Quality_Bad = 1
+    Statistics_Warning_Busy_System = 2
+
+
+class AudioShareMode(IntEnum):
+    AudioShareMode_Mono = 0
+    AudioShareMode_Stereo = 1
+
+
+class SDKUserType(IntEnum):
+    SDK_UT_NORMALUSER = 0
+    SDK_UT_WITHOUT_LOGIN = 1
+
+
+class LeaveMeetingCmd(IntEnum):
+    LEAVE_MEETING = 0
+    END_MEETING = 1
+
+
+class InitParam:
+    def __init__(self):
+        self.strWebDomain = ''
+        self.strBrandingName = ''
+        self.strSupportUrl = ''
+        self.emLanguageID = SDK_LANGUAGE_ID.LANGUAGE_Unknown
+        self.enableGenerateDump = False
+        self.enableLogByDefault = False
+        self.uiLogFileSize = 5
+
+
+class AuthContext:
+    def __init__(self):
+        self.jwt_token = ''
+
+
+class JoinParam4WithoutLogin:
+    def __init__(self):
+        self.meetingNumber = 0
+        self.userName = ''
+        self.psw = ''
+        self.isVideoOff = False
+        self.isAudioOff = False
+        self.isDirectShareDesktop = False
+
+
+class JoinParam:
+    def __init__(self):
+        self.userType = SDKUserType.SDK_UT_WITHOUT_LOGIN
+        self.withoutloginuserJoin = JoinParam4WithoutLogin()
+
+
+class ZoomSDKSharingSourceInfo:
+    def __init__(self, userid: int = 0, status: SharingStatus = SharingStatus.Sharing_Self_Send_End):
+        self.userid = userid
+        self.status = status
+
+
+class AuthServiceEventCallbacks:
+    def __init__(self):
+        self.onAuthCallback: Optional[Callable] = None
+        self.onIdentityExpiredCallback: Optional[Callable] = None
+
+
+class MeetingServiceEventCallbacks:
+    def __init__(self):
+        self.onStatusChangedCallback: Optional[Callable] = None
+        self.onStatisticsWarningCallback: Optional[Callable] = None
+        self.onUserNetworkStatusChangedCallback: Optional[Callable] = None
+
+
+class ParticipantsCtrlEventCallbacks:
+    def __init__(self):
+        self.onUserJoinCallback: Optional[Callable] = None
+        self.onUserLeftCallback: Optional[Callable] = None
+
+
+class SharingCtrlEventCallbacks:
+    def __init__(self):
+        self.onSharingStatusChangedCallback: Optional[Callable] = None
+
+
+class Simulator:
+    """State of the simulated SDK and meeting, plus knobs for harnesses"""
+
+    SELF_USER_ID = 16778240
+
+    def __init__(self):
+        settings: Dict[str, Any] = {}
+        try:
+            settings = json.loads(os.environ.get('ZOOM_KIOSK_SIM', '') or '{}')
+        except ValueError:
+            print('[SimulatedSDK] Ignoring invalid ZOOM_KIOSK_SIM')
+        self.auth_latency = settings.get('authLatencyMs', 200) / 1000.0
+        self.join_latency = settings.get('joinLatencyMs', 500) / 1000.0
+        self.share_latency = settings.get('shareLatencyMs', 100) / 1000.0
+        self.initial_participants = settings.get('participants', 1)
+        self.auth_result = AuthResult.AUTHRET_SUCCESS
+        # When True, SDKAuth succeeds but the auth callback never fires
+        self.drop_auth_callback = False
+        # When True, calls still change state but no callbacks are delivered
+        # (a trace replay supplies them instead)
+        self.mute_callbacks = False
+        # Results to return from the next calls, keyed by method name
+        self.fail_next: Dict[str, List[SDKError]] = {}
+        for method, failures in settings.get('failNext', {}).items():
+            if isinstance(failures, int):
+                failures = ['SDKERR_INTERNAL_ERROR'] * failures
+            self.fail_next[method] = [SDKError[name] for name in failures]
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all services and meeting state (CleanUPSDK)"""
+        self.initialized = False
+        self.auth_service: Optional['AuthService'] = None
+        self.meeting_service: Optional['MeetingService'] = None
+        self.status = MeetingStatus.MEETING_STATUS_IDLE
+        self.participants: List[int] = []
+        self.next_user_id = self.SELF_USER_ID + 1
+        self.is_sharing = False
+        self.share_monitor_id: Optional[str] = None
+        # Share settings as last set through the share controller
+        self.share_computer_sound = False
+        self.audio_share_mode = AudioShareMode.AudioShareMode_Mono
+        self.optimize_for_video = False
+        self.share_setting_calls = 0
+
+    def take_failure(self, method: str) -> Optional[SDKError]:
+        """Pop an injected failure for a method, if any"""
+        queued = self.fail_next.get(method)
+        return queued.pop(0) if queued else None
+
+    def call_later(self, delay: float, callback: Callable, *args: Any) -> None:
+        if not self.mute_callbacks:
+            asyncio.get_running_loop().call_later(delay, callback, *args)
+
+    # Harness controls
+
+    def add_participant(self) -> int:
+        """Another participant joins the meeting"""
+        user_id = self.next_user_id
+        self.next_user_id += 1
+        self.participants.append(user_id)
+        if self.meeting_service:
+            self.meeting_service.participants_ctrl.fire_join([user_id])
+        return user_id
+
+    def remove_participant(self, user_id: Optional[int] = None) -> None:
+        """A participant leaves the meeting"""
+        if not self.participants:
+            return
+        user_id = user_id if user_id in self.participants else self.participants[-1]
+        self.participants.remove(user_id)
+        if self.meeting_service:
+            self.meeting_service.participants_ctrl.fire_left([user_id])
+
+    def end_meeting(self, failed: bool = True) -> None:
+        """The meeting drops (network loss) or is ended by the host"""
+        if self.meeting_service:
+            self.meeting_service.set_status(
+                MeetingStatus.MEETING_STATUS_FAILED if failed else MeetingStatus.MEETING_STATUS_ENDED)
+
+    def stop_share(self) -> None:
+        """Our share is stopped from outside (e.g. another user takes over)"""
+        if self.meeting_service and self.is_sharing:
+            self.meeting_service.share_ctrl.set_sharing(False)
+
+    def network_status(self, component: MeetingComponentType, level: ConnectionQuality,
+                       uplink: bool = True, user_id: Optional[int] = None) -> None:
+        """The SDK reports a participant's (by default our own) connection quality"""
+        if self.meeting_service:
+            self.meeting_service.fire_network_status(
+                component, level, self.SELF_USER_ID if user_id is None else user_id, uplink)
+
+    def statistics_warning(self, warning: StatisticsWarningType) -> None:
+        """The SDK warns about bad network quality or a busy system"""
+        if self.meeting_service:
+            self.meeting_service.fire_statistics_warning(warning)
+
+
+simulator = Simulator()
+
+
+class AuthService:
+    def __init__(self):
+        self.event: Optional[AuthServiceEventCallbacks] = None
+
+    def SetEvent(self, event: AuthServiceEventCallbacks) -> SDKError:
+        self.event = event
+        return SDKError.SDKERR_SUCCESS
+
+    def SDKAuth(self, context: AuthContext) -> SDKError:
+        failure = simulator.take_failure('SDKAuth')
+        if failure is not None:
+            return failure
+        if not simulator.drop_auth_callback:
+            simulator.call_later(simulator.auth_latency, self._fire_auth, simulator.auth_result)
+        return SDKError.SDKERR_SUCCESS
+
+    def _fire_auth(self, result: AuthResult) -> None:
+        # Callbacks of a cleaned-up SDK instance never arrive
+        if simulator.auth_service is self and self.event and self.event.onAuthCallback:
+            self.event.onAuthCallback(result)
+
+
+class UserInfo:
+    def __init__(self, user_id: int):
+        self.user_id = user_id
+
+    def GetUserID(self) -> int:
+        return self.user_id
+
+    def IsMySelf(self) -> bool:
+        return self.user_id == Simulator.SELF_USER_ID
+
+
+class ParticipantsController:
+    def __init__(self, service: 'MeetingService'):
+        self.service = service
+        self.event: Optional[ParticipantsCtrlEventCallbacks] = None
+
+    def SetEvent(self, event: ParticipantsCtrlEventCallbacks) -> SDKError:
+        self.event = event
+        return SDKError.SDKERR_SUCCESS
+
+    def GetParticipantsList(self) -> List[int]:
+        if simulator.status != MeetingStatus.MEETING_STATUS_INMEETING:
+            return []
+        return [Simulator.SELF_USER_ID] + list(simulator.participants)
+
+    def GetMySelfUser(self) -> Optional[UserInfo]:
+        return UserInfo(Simulator.SELF_USER_ID)
+
+    def GetUserByUserID(self, user_id: int) -> Optional[UserInfo]:
+        if user_id == Simulator.SELF_USER_ID or user_id in simulator.participants:
+            return UserInfo(user_id)
+        return None
+
+    def fire_join(self, ids: List[int]) -> None:
+        if self.service.is_current() and self.event and self.event.onUserJoinCallback:
+            self.event.onUserJoinCallback(ids, None)
+
+    def fire_left(self, ids: List[int]) -> None:
+        if self.service.is_current() and self.event and self.event.onUserLeftCallback:
+            self.event.onUserLeftCallback(ids, None)
+
+
+class ShareController:
+    def __init__(self, service: 'MeetingService'):
+        self.service = service
+        self.event: Optional[SharingCtrlEventCallbacks] = None
+
+    def SetEvent(self, event: SharingCtrlEventCallbacks) -> SDKError:
+        self.event = event
+        return SDKError.SDKERR_SUCCESS
+
+    def StartMonitorShare(self, monitor_id: Optional[str] = None) -> SDKError:
+        failure = simulator.take_failure('StartMonitorShare')
+        if failure is not None:
+            return failure
+        if simulator.status != MeetingStatus.MEETING_STATUS_INMEETING:
+            return SDKError.SDKERR_NOT_IN_MEETING
+        simulator.share_monitor_id = monitor_id
+        simulator.call_later(simulator.share_latency, self.set_sharing, True)
+        return SDKError.SDKERR_SUCCESS
+
+    def StopShare(self) -> SDKError:
+        if simulator.is_sharing:
+            simulator.call_later(0, self.set_sharing, False)
+        return SDKError.SDKERR_SUCCESS
+
+    def EnableShareComputerSound(self, enable: bool) -> SDKError:
+        simulator.share_setting_calls += 1
+        simulator.share_computer_sound = enable
+        return SDKError.SDKERR_SUCCESS
+
+    def EnableShareComputerSoundWhenSharing(self, enable: bool) -> SDKError:
+        if not simulator.is_sharing:
+            return SDKError.SDKERR_WRONG_USAGE
+        return self.EnableShareComputerSound(enable)
+
+    def SetAudioShareMode(self, mode: AudioShareMode) -> SDKError:
+        simulator.share_setting_calls += 1
+        simulator.audio_share_mode = mode
+        return SDKError.SDKERR_SUCCESS
+
+    def EnableOptimizeForFullScreenVideoClip(self, enable: bool) -> SDKError:
+        simulator.share_setting_calls += 1
+        simulator.optimize_for_video = enable
+        return SDKError.SDKERR_SUCCESS
+
+    def set_sharing(self, sharing: bool) -> None:
+        if simulator.is_sharing == sharing or not self.service.is_current():
+            return
+        if sharing and simulator.status != MeetingStatus.MEETING_STATUS_INMEETING:
+            return
+        simulator.is_sharing = sharing
+        status = SharingStatus.Sharing_Self_Send_Begin if sharing else SharingStatus.Sharing_Self_Send_End
+        if self.event and self.event.onSharingStatusChangedCallback:
+            self.event.onSharingStatusChangedCallback(ZoomSDKSharingSourceInfo(Simulator.SELF_USER_ID, status))
+
+
+class MeetingConfiguration:
+    """Accepts every configuration call and reports success"""
+
+    def __getattr__(self, name: str) -> Callable[..., SDKError]:
+        return lambda *args, **kwargs: SDKError.SDKERR_SUCCESS
+
+
+class MeetingService:
+    def __init__(self):
+        self.event: Optional[MeetingServiceEventCallbacks] = None
+        self.participants_ctrl = ParticipantsController(self)
+        self.share_ctrl = ShareController(self)
+        self.meeting_config = MeetingConfiguration()
+
+    def is_current(self) -> bool:
+        return simulator.meeting_service is self
+
+    def SetEvent(self, event: MeetingServiceEventCallbacks) -> SDKError:
+        self.event = event
+        return SDKError.SDKERR_SUCCESS
+
+    def Join(self, param: JoinParam) -> SDKError:
+        failure = simulator.take_failure('Join')
+        if failure is not None:
+            return failure
+        self.set_status(MeetingStatus.MEETING_STATUS_CONNECTING)
+        simulator.call_later(simulator.join_latency, self._finish_join)
+        return SDKError.SDKERR_SUCCESS
+
+    def _finish_join(self) -> None:
+        if simulator.status != MeetingStatus.MEETING_STATUS_CONNECTING:
+            return
+        simulator.participants = []
+        for _ in range(simulator.initial_participants):
+            simulator.participants.append(simulator.next_user_id)
+            simulator.next_user_id += 1
+        self.set_status(MeetingStatus.MEETING_STATUS_INMEETING)
+
+    def Leave(self, cmd: LeaveMeetingCmd) -> SDKError:
+        # Leaving is silent in the simulator: no status callbacks are fired
+        simulator.status = MeetingStatus.MEETING_STATUS_IDLE
+        simulator.is_sharing = False
+        simulator.participants = []
+        return SDKError.SDKERR_SUCCESS
+
+    def GetMeetingStatus(self) -> MeetingStatus:
+        return simulator.status
+
+    def GetMeetingParticipantsController(self) -> ParticipantsController:
+        return self.participants_ctrl
+
+    def GetMeetingShareController(self) -> ShareController:
+        return self.share_ctrl
+
+    def GetMeetingConfiguration(self) -> MeetingConfiguration:
+        return self.meeting_config
+
+    def set_status(self, status: MeetingStatus, result: int = 0) -> None:
+        if not self.is_current():
+            return
+        simulator.status = status
+        if status in (MeetingStatus.MEETING_STATUS_FAILED, MeetingStatus.MEETING_STATUS_ENDED):
+            simulator.is_sharing = False
+            simulator.participants = []
+        if self.event and self.event.onStatusChangedCallback and not simulator.mute_callbacks:
+            self.event.onStatusChangedCallback(status, result)
+
+    def fire_network_status(self, component: MeetingComponentType, level: ConnectionQuality,
+                            user_id: int, uplink: bool) -> None:
+        if not self.is_current() or simulator.status != MeetingStatus.MEETING_STATUS_INMEETING:
+            return
+        if self.event and self.event.onUserNetworkStatusChangedCallback and not simulator.mute_callbacks:
+            self.event.onUserNetworkStatusChangedCallback(component, level, user_id, uplink)
+
+    def fire_statistics_warning(self, warning: StatisticsWarningType) -> None:
+        if not self.is_current() or simulator.status != MeetingStatus.MEETING_STATUS_INMEETING:
+            return
+        if self.event and self.event.onStatisticsWarningCallback and not simulator.mute_callbacks:
+            self.event.onStatisticsWarningCallback(warning)
+
+
+def InitSDK(init_param: InitParam) -> SDKError:
+    failure = simulator.take_failure('InitSDK')
+    if failure is not None:
+        return failure
+    simulator.initialized = True
+    return SDKError.SDKERR_SUCCESS
+
+
+def CleanUPSDK() -> SDKError:
+    simulator.reset()
+    return SDKError.SDKERR_SUCCESS
+
+
+def CreateAuthService() -> AuthService:
+    simulator.auth_service = AuthService()
+    return simulator.auth_service
+
+
+def CreateMeetingService() -> MeetingService:
+    simulator.meeting_service = MeetingService()
+    return simulator.meeting_service
+
+
+def GetSDKVersion() -> str:
+    return 'simulated'
@@ -0,0 +1,250 @@
+"""
+Zoom Kiosk - Soak Test
+
+Runs a whole kiosk (KioskApp on the simulated SDK) through thousands of
+cycles in virtual time: every few cycles the meeting drops and the kiosk
+has to reconnect with a fresh ZoomService, in between a participant
+leaves, another joins and the share is restarted. Kiosks run for weeks,
+so what matters is what every cycle leaves behind.
+
+After a warm-up the soak takes a baseline, then snapshots every few
+hundred cycles: traced Python memory (tracemalloc), live objects by
+module and type (containers tracked by the garbage collector), asyncio
+and supervised tasks, and live ZoomService instances. At the end the
+growth since the baseline is checked against budgets and the top growing
+allocation sites and object types are reported; exit code 1 if a budget
+was exceeded.
+
+    python -m src.soak --cycles 2000 --reconnect-every 4 --max-memory-kb 256
+"""
+
+import asyncio
+import contextlib
+import gc
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from .clock import run_virtual, SYSTEM_CLOCK, wait_until
+from .config import KioskConfig, default_config
+from .outage_sim import run_scenario, simulation_config
+
+# Growth allowed between the baseline and the final snapshot
+DEFAULT_BUDGETS = {
+    'memoryKb': 512,
+    'objects': 2000,
+    'tasks': 0,
+    'services': 0,
+    'failedCycles': 0,
+}
+# How long one cycle may take (virtual time) to be sharing again
+CYCLE_LIMIT_S = 600
+
+
+def _object_counts() -> Counter:
+    """Live objects tracked by the garbage collector, by module.type"""
+    counts: Counter = Counter()
+    for obj in gc.get_objects():
+        kind = type(obj)
+        counts[f'{kind.__module__}.{kind.__qualname__}'] += 1
+    return counts
+
+
+def _measure(app: Any, cycle: int) -> Dict[str, Any]:
+    """One point of the timeline"""
+    from .zoom_service import ZoomService
+    gc.collect()
+    services = sum(1 for obj in gc.get_objects() if isinstance(obj, ZoomService))
+    current, _ = tracemalloc.get_traced_memory()
+    return {
+        'cycle': cycle,
+        'atS': round(SYSTEM_CLOCK.monotonic()),
+        'memoryKb': round(current / 1024, 1),
+        'objects': len(gc.get_objects()),
+        'tasks': len(asyncio.all_tasks()),
+        'supervisedTasks': len(app.tasks.tasks),
+        'services': services,
+        'callbacks': sum(len(callbacks) for callbacks in app.zoom_service._callbacks.values())
+        if app.zoom_service else 0,
+    }
+
+
+def _kiosk_traces(snapshot: tracemalloc.Snapshot) -> tracemalloc.Snapshot:
+    """Without the allocations of tracemalloc and of the soak's own bookkeeping"""
+    return snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__),
+                                   tracemalloc.Filter(False, __file__),
+                                   tracemalloc.Filter(False, '<frozen *>')])
+
+
+def _top_sites(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot, key: str,
+               top_n: int) -> List[Dict[str, Any]]:
+    """Allocation sites (key 'lineno') or files (key 'filename') that grew the most"""
+    stats = after.compare_to(before, key)
+    sites = []
+    for stat in stats:
+        if stat.size_diff <= 0:
+            continue
+        frame = stat.traceback[0]
+        sites.append({
+            'site': f'{frame.filename}:{frame.lineno}' if key == 'lineno' else frame.filename,
+            'growthKb': round(stat.size_diff / 1024, 1),
+            'blocks': stat.count_diff,
+        })
+        if len(sites) >= top_n:
+            break
+    return sites
+
+
+async def soak(config: KioskConfig, cycles: int, reconnect_every: int, warmup: int,
+               snapshot_every: int, top_n: int) -> Dict[str, Any]:
+    """Drive the cycles and return the timeline, growth and top growing sites"""
+    from . import simulated_sdk
+    from .main import KioskApp
+
+    simulated_sdk.simulator = simulator = simulated_sdk.Simulator()
+    with tempfile.TemporaryDirectory() as state_dir:
+        app = KioskApp(config, enable_shortcuts=False, replay_plan=[], state_dir=Path(state_dir))
+
+        def sharing() -> bool:
+            return bool(app.zoom_service and app.zoom_service.is_sharing and not app.zoom_service.use_mock_mode)
+
+        async def cycle(index: int) -> bool:
+            if index % reconnect_every == 0:
+                # Meeting drops: recovery reconnects with a new ZoomService
+                simulator.end_meeting(failed=True)
+            else:
+                # Participants come and go; the share is taken away and restarted
+                simulator.remove_participant()
+                await SYSTEM_CLOCK.sleep(random.uniform(1, 30))
+                simulator.add_participant()
+                await SYSTEM_CLOCK.sleep(1)
+                simulator.stop_share()
+            await SYSTEM_CLOCK.sleep(1)
+            recovered = await wait_until(sharing, CYCLE_LIMIT_S)
+            await SYSTEM_CLOCK.sleep(random.uniform(10, 120))
+            return recovered
+
+        async def scenario() -> Dict[str, Any]:
+            if not await wait_until(sharing, 120):
+                raise RuntimeError('never started sharing')
+            failed = 0
+            timeline = []
+            baseline: Optional[Dict[str, Any]] = None
+            for index in range(1, cycles + 1):
+                if not await cycle(index):
+                    failed += 1
+                if index == warmup:
+                    baseline = _measure(app, index)
+                    baseline_objects = _object_counts()
+                    baseline_snapshot = _kiosk_traces(tracemalloc.take_snapshot())
+                    timeline.append(baseline)
+                elif index > warmup and (index - warmup) % snapshot_every == 0:
+                    timeline.append(_measure(app, index))
+            final = _measure(app, cycles)
+            if timeline[-1]['cycle'] != cycles:
+                timeline.append(final)
+            objects = _object_counts()
+            snapshot = _kiosk_traces(tracemalloc.take_snapshot())
+            object_growth = objects - baseline_objects
+            return {
+                'cycles': cycles,
+                'virtualHours': round(SYSTEM_CLOCK.monotonic() / 3600, 1),
+                'reconnects': cycles // reconnect_every,
+                'failedCycles': failed,
+                'timeline': timeline,
+                'growth': {
+                    'memoryKb': round(sum(stat.size_diff for stat in
+                                          snapshot.compare_to(baseline_snapshot, 'filename')) / 1024, 1),
+                    'objects': final['objects'] - baseline['objects'],
+                    'tasks': final['tasks'] - baseline['tasks'],
+                    'services': final['services'] - baseline['services'],
+                    'failedCycles': failed,
+                },
+                'topSites': _top_sites(baseline_snapshot, snapshot, 'lineno', top_n),
+                'topModules': _top_sites(baseline_snapshot, snapshot, 'filename', top_n),
+                'topTypes': [{'type': name, 'growth': count} for name, count in object_growth.most_common(top_n)],
+            }
+
+        return await run_scenario(app, scenario())
+
+
+def check_budgets(growth: Dict[str, Any], budgets: Dict[str, float]) -> List[str]:
+    """The budgets the growth exceeds, as messages"""
+    return [f'{name} grew by {growth[name]} (budget {budget})'
+            for name, budget in budgets.items() if growth[name] > budget]
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+    import sys
+    parser = argparse.ArgumentParser(description='Soak a simulated kiosk through reconnect and join/leave cycles')
+    parser.add_argument('--cycles', type=int, default=2000)
+    parser.add_argument('--reconnect-every', type=int, default=4, help='every Nth cycle drops the meeting')
+    parser.add_argument('--warmup', type=int, default=100, help='cycles before the baseline snapshot')
+    parser.add_argument('--snapshot-every', type=int, default=250)
+    parser.add_argument('--frames', type=int, default=1, help='traceback depth of allocation sites')
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-memory-kb', type=float, default=DEFAULT_BUDGETS['memoryKb'])
+    parser.add_argument('--max-objects', type=int, default=DEFAULT_BUDGETS['objects'])
+    parser.add_argument('--max-tasks', type=int, default=DEFAULT_BUDGETS['tasks'])
+    parser.add_argument('--max-services', type=int, default=DEFAULT_BUDGETS['services'])
+    parser.add_argument('--max-failed-cycles', type=int, default=DEFAULT_BUDGETS['failedCycles'])
+    parser.add_argument('--verbose', action='store_true', help='show the kiosk log')
+    parser.add_argument('--json', action='store_true', help='print the result as JSON')
+    args = parser.parse_args()
+    if args.warmup >= args.cycles:
+        parser.error('--warmup must be less than --cycles')
+
+    # Must be chosen before the Zoom service is imported
+    os.environ['ZOOM_KIOSK_SDK'] = 'simulated'
+    random.seed(args.seed)
+    budgets = {
+        'memoryKb': args.max_memory_kb,
+        'objects': args.max_objects,
+        'tasks': args.max_tasks,
+        'services': args.max_services,
+        'failedCycles': args.max_failed_cycles,
+    }
+
+    started = time.monotonic()
+    tracemalloc.start(args.frames)
+    # The kiosk log would itself grow memory if it were captured
+    with open(os.devnull, 'w') as devnull:
+        output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(devnull)
+        with output:
+            result = run_virtual(soak(simulation_config(default_config['recovery']), args.cycles,
+                                      args.reconnect_every, args.warmup, args.snapshot_every, args.top))
+    tracemalloc.stop()
+    exceeded = check_budgets(result['growth'], budgets)
+
+    if args.json:
+        print(json.dumps({**result, 'budgets': budgets, 'exceeded': exceeded}))
+    else:
+        print(f'{result["cycles"]} cycles ({result["reconnects"]} reconnects) over '
+              f'{result["virtualHours"]} virtual hours, {result["failedCycles"]} failed')
+        print(f'{"cycle":>7} {"memory KB":>10} {"objects":>8} {"tasks":>6} {"supervised":>10} '
+              f'{"services":>8} {"callbacks":>9}')
+        for point in result['timeline']:
+            print(f'{point["cycle"]:>7} {point["memoryKb"]:>10} {point["objects"]:>8} {point["tasks"]:>6} '
+                  f'{point["supervisedTasks"]:>10} {point["services"]:>8} {point["callbacks"]:>9}')
+        print('\nGrowth since the baseline: ' + ', '.join(f'{k} {v}' for k, v in result['growth'].items()))
+        print('\nTop growing allocation sites:')
+        for site in result['topSites']:
+            print(f'  {site["growthKb"]:>8} KB {site["blocks"]:>7} blocks  {site["site"]}')
+        print('\nTop growing modules:')
+        for site in result['topModules']:
+            print(f'  {site["growthKb"]:>8} KB {site["blocks"]:>7} blocks  {site["site"]}')
+        print('\nTop growing object types:')
+        for kind in result['topTypes']:
+            print(f'  {kind["growth"]:>8}  {kind["type"]}')
+        print()
+        for message in exceeded:
+            print(f'[Soak] Budget exceeded: {message}')
+    print(f'[Soak] Done in {time.monotonic() - started:.1f}s', file=sys.stderr)
+    sys.exit(1 if exceeded else 0)
@@ -0,0 +1,157 @@
+"""
+Zoom Kiosk - Hot-Standby Supervisor
+
+Runs the kiosk as two processes: an active one that is in the meeting and
+a standby that is already initialized and authenticated but not joined.
+The supervisor watches heartbeats from both; when the active kiosk dies,
+hangs or gives up recovering, the standby is promoted (join + share right
+away) and a fresh standby is started behind it.
+
+Each of the two processes keeps its state (status block, learned
+timeouts, perf history) in its own slot directory under standby.stateDir.
+A promoted standby keeps its slot; the replacement standby takes the
+slot the failed kiosk left. The standby does not serve the control
+plane until it is promoted, so the two never compete for the port.
+
+Run with:  python -m src.standby [--sdk simulated]
+
+Note: with the real Windows SDK this requires that two SDK instances may
+run side by side on the machine.
+"""
+
+import os
+import time
+from multiprocessing.connection import wait
+from pathlib import Path
+from typing import Optional, List
+from .config import load_config, StandbyConfig
+from .kiosk_process import KioskProcess, Role
+
+
+# State directories under standby.stateDir, one per running kiosk process
+SLOTS = ('a', 'b')
+
+
+class StandbySupervisor:
+    """Keeps one active and one pre-authenticated standby kiosk running"""
+
+    def __init__(self, config: StandbyConfig):
+        self.config = config
+        self.heartbeat_interval = config["heartbeatIntervalMs"] / 1000.0
+        self.state_dir = Path(config["stateDir"]).resolve()
+        self.active: Optional[KioskProcess] = None
+        self.standby: Optional[KioskProcess] = None
+        self.running = False
+        self.failover_count = 0
+        self.last_failover_ms = 0.0
+
+    def _free_slot(self) -> str:
+        """The state directory not used by the other kiosk"""
+        used = {k.options['stateDir'] for k in (self.active, self.standby) if k}
+        return next(str(self.state_dir / slot) for slot in SLOTS if str(self.state_dir / slot) not in used)
+
+    def _spawn(self, role: str) -> KioskProcess:
+        state_dir = self._free_slot()
+        Path(state_dir).mkdir(parents=True, exist_ok=True)
+        kiosk = KioskProcess({
+            'kioskId': 'kiosk',
+            'role': role,
+            'heartbeatIntervalMs': self.config["heartbeatIntervalMs"],
+            'enableShortcuts': True,
+            'stateDir': state_dir,
+        })
+        print(f'[Supervisor] Started {role} kiosk (pid {kiosk.process.pid}, state in {state_dir})')
+        return kiosk
+
+    def _failure_reason(self, kiosk: KioskProcess) -> Optional[str]:
+        """Why a kiosk should be considered failed, or None if it is healthy"""
+        return kiosk.failure_reason(self.config["heartbeatTimeoutMs"],
+                                    self.config["failoverAfterRecoveringMs"])
+
+    def _failover(self, reason: str) -> None:
+        """Replace the failed active kiosk with the standby"""
+        started = time.monotonic()
+        print(f'[Supervisor] Active kiosk failed: {reason}')
+
+        failed = self.active
+        self.active = None
+        if failed:
+            # Terminate first so the failed instance cannot fight the new one for the meeting
+            failed.stop(grace=0.5)
+
+        if self.standby and self.standby.process.is_alive():
+            ready = self.standby.status.get('ready', False)
+            print(f'[Supervisor] Promoting standby (pid {self.standby.process.pid}, ready={ready})')
+            self.active = self.standby
+            self.active.role = Role.ACTIVE
+            self.active.recovering_since = None
+            self.active.send('promote')
+            self.standby = None
+        else:
+            print('[Supervisor] No standby available, starting a new active kiosk')
+            self.active = self._spawn(Role.ACTIVE)
+
+        self.failover_count += 1
+        self.last_failover_ms = (time.monotonic() - started) * 1000
+        print(f'[Supervisor] Failover #{self.failover_count} handed over in {self.last_failover_ms:.0f}ms')
+
+    def _poll(self) -> None:
+        """Collect heartbeats for up to one heartbeat interval"""
+        kiosks: List[KioskProcess] = [k for k in (self.active, self.standby) if k]
+        by_conn = {k.conn: k for k in kiosks}
+        for conn in wait(list(by_conn), timeout=self.heartbeat_interval):
+            by_conn[conn].drain()
+
+    def run(self) -> None:
+        """Run until interrupted"""
+        self.running = True
+        self.active = self._spawn(Role.ACTIVE)
+        self.standby = self._spawn(Role.STANDBY)
+        respawn_at = 0.0
+
+        try:
+            while self.running:
+                self._poll()
+
+                if self.active:
+                    reason = self._failure_reason(self.active)
+                    if reason:
+                        self._failover(reason)
+
+                if self.standby:
+                    reason = self._failure_reason(self.standby)
+                    if reason:
+                        print(f'[Supervisor] Standby kiosk failed: {reason}')
+                        self.standby.stop(grace=0.5)
+                        self.standby = None
+                        respawn_at = time.monotonic() + self.config["respawnBackoffMs"] / 1000.0
+
+                if not self.standby and time.monotonic() >= respawn_at:
+                    self.standby = self._spawn(Role.STANDBY)
+        except KeyboardInterrupt:
+            print('\n[Supervisor] Interrupted')
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        """Stop both kiosks"""
+        self.running = False
+        for kiosk in (self.standby, self.active):
+            if kiosk:
+                kiosk.stop()
+        self.active = None
+        self.standby = None
+        print('[Supervisor] Stopped')
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Run an active kiosk with a hot standby')
+    parser.add_argument('--sdk', choices=['real', 'simulated'], default='real',
+                        help="SDK to use in the kiosk processes ('simulated' runs anywhere)")
+    args = parser.parse_args()
+    if args.sdk == 'simulated':
+        # Inherited by the spawned kiosk processes
+        os.environ['ZOOM_KIOSK_SDK'] = 'simulated'
+
+    StandbySupervisor(load_config()['standby']).run()
@@ -0,0 +1,252 @@
+"""
+Zoom Kiosk - Status Block
+
+Publishes kiosk liveness and state in a small fixed-layout memory-mapped
+file so monitoring agents can read it without any IPC round-trip. The
+writer updates the block at a fixed rate from the event loop, so a hung
+loop shows up as a stale updatedAt within a couple of update intervals.
+
+Writes use a sequence counter (odd while a write is in progress); readers
+retry until they see the same even value before and after reading.
+
+A block still being updated by another process is left alone: two kiosks
+sharing one path (neither with a state directory) would otherwise take
+turns writing it, and the first to stop would mark the other stopped.
+
+Read with:  python -m src.status_block [path] [--watch] [--stale-ms 2000]
+"""
+
+import asyncio
+import mmap
+import os
+import struct
+import time
+from pathlib import Path
+from typing import Callable, Dict, Any, Optional
+from .config import StatusBlockConfig
+from .task_supervisor import TaskSupervisor
+
+MAGIC = b'ZKST'
+VERSION = 1
+
+# magic, version, seq | pid, heartbeat, updatedAt, loopLagMs, maxLoopLagMs,
+# recoveryState, flags, participantCount, retryCount, lastErrorCode, kioskId
+HEADER = struct.Struct('<4sHI')
+BODY = struct.Struct('<IQdffBBHHi32s')
+BLOCK_SIZE = HEADER.size + BODY.size
+
+RECOVERY_STATES = ['idle', 'monitoring', 'recovering', 'failed']
+
+FLAG_READY = 0x01
+FLAG_IN_MEETING = 0x02
+FLAG_SHARING = 0x04
+FLAG_MOCK_MODE = 0x08
+# Set on clean shutdown so monitors can tell an exit from a hang
+FLAG_STOPPED = 0x10
+
+# A block updated by another process within this many intervals is in use
+OWNER_STALE_INTERVALS = 3
+
+FLAGS = {
+    'ready': FLAG_READY,
+    'inMeeting': FLAG_IN_MEETING,
+    'sharing': FLAG_SHARING,
+    'mockMode': FLAG_MOCK_MODE,
+}
+
+
+class StatusBlockWriter:
+    """Periodically writes kiosk status into a memory-mapped file"""
+
+    def __init__(self, config: StatusBlockConfig, collect: Callable[[], Dict[str, Any]],
+                 path: Optional[Path] = None, tasks: Optional[TaskSupervisor] = None):
+        self.config = config
+        self.collect = collect
+        self.tasks = tasks or TaskSupervisor()
+        self.path = path or (Path(config["path"]) if config["path"] else Path.cwd() / 'kiosk-status.bin')
+        self.interval = config["updateIntervalMs"] / 1000.0
+        self.heartbeat = 0
+        self.seq = 0
+        self.loop_lag_ms = 0.0
+        self.max_loop_lag_ms = 0.0
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Create the block and start updating it"""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Reuse an existing block in place: monitors may still have it mapped
+            self._file = open(self.path, 'r+b' if self.path.exists() else 'w+b')
+            if os.fstat(self._file.fileno()).st_size != BLOCK_SIZE:
+                self._file.truncate(BLOCK_SIZE)
+            self._map = mmap.mmap(self._file.fileno(), BLOCK_SIZE)
+        except Exception as e:
+            print(f'[StatusBlock] Could not create {self.path}: {e}')
+            self._close()
+            return
+        owner = self._live_owner()
+        if owner is not None:
+            print(f'[StatusBlock] {self.path} is in use by pid {owner}, not publishing status '
+                  f'(set statusBlock.path or a state directory per kiosk)')
+            self._close()
+            return
+        self.write()
+        self._task = self.tasks.spawn(self._run(), 'update', 'statusBlock')
+        print(f'[StatusBlock] Publishing status to {self.path}')
+
+    def stop(self) -> None:
+        """Stop updating and mark the block as cleanly stopped"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+        self._task = None
+        if self._map:
+            self.write(stopped=True)
+        self._close()
+
+    def _live_owner(self) -> Optional[int]:
+        """Pid of another process still updating the block, if any"""
+        status = read_status(self._map)
+        if (status is None or status['stopped'] or status['pid'] == os.getpid()
+                or status['ageMs'] > OWNER_STALE_INTERVALS * self.config["updateIntervalMs"]):
+            return None
+        return status['pid']
+
+    def _close(self) -> None:
+        if self._map:
+            self._map.close()
+            self._map = None
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    async def _run(self) -> None:
+        """Update loop; the lateness of each wake-up is the loop lag"""
+        expected = time.monotonic() + self.interval
+        while True:
+            await asyncio.sleep(max(0.0, expected - time.monotonic()))
+            now = time.monotonic()
+            self.loop_lag_ms = max(0.0, (now - expected) * 1000)
+            self.max_loop_lag_ms = max(self.max_loop_lag_ms, self.loop_lag_ms)
+            # Schedule from now so one long stall is not followed by a burst of writes
+            expected = now + self.interval
+            try:
+                self.write()
+            except Exception as e:
+                print(f'[StatusBlock] Update failed: {e}')
+
+    def write(self, stopped: bool = False) -> None:
+        """Write one status snapshot"""
+        status = self.collect()
+        self.heartbeat += 1
+
+        flags = FLAG_STOPPED if stopped else 0
+        for key, bit in FLAGS.items():
+            if status.get(key):
+                flags |= bit
+        state = status.get('recoveryState')
+        state_code = RECOVERY_STATES.index(state) if state in RECOVERY_STATES else 255
+
+        body = BODY.pack(
+            os.getpid(),
+            self.heartbeat,
+            time.time(),
+            self.loop_lag_ms,
+            self.max_loop_lag_ms,
+            state_code,
+            flags,
+            min(status.get('participantCount', 0), 0xFFFF),
+            min(status.get('retryCount', 0), 0xFFFF),
+            status.get('lastErrorCode', 0),
+            str(status.get('kioskId', '')).encode('utf-8')[:32],
+        )
+        # Odd sequence while the body is being written
+        self.seq = (self.seq + 1) & 0xFFFFFFFF
+        self._map[0:HEADER.size] = HEADER.pack(MAGIC, VERSION, self.seq)
+        self._map[HEADER.size:BLOCK_SIZE] = body
+        self.seq = (self.seq + 1) & 0xFFFFFFFF
+        self._map[0:HEADER.size] = HEADER.pack(MAGIC, VERSION, self.seq)
+
+
+def read_status(block: Any, retries: int = 100) -> Optional[Dict[str, Any]]:
+    """Decode a status block (mmap or bytes). Returns None if it is not valid."""
+    for _ in range(retries):
+        magic, version, seq = HEADER.unpack_from(block, 0)
+        if magic != MAGIC or version != VERSION:
+            return None
+        if seq % 2:
+            continue
+        body = BODY.unpack_from(block, HEADER.size)
+        if HEADER.unpack_from(block, 0)[2] != seq:
+            continue
+
+        (pid, heartbeat, updated_at, loop_lag_ms, max_loop_lag_ms, state_code,
+         flags, participant_count, retry_count, last_error_code, kiosk_id) = body
+        status = {
+            'kioskId': kiosk_id.rstrip(b'\0').decode('utf-8', 'replace'),
+            'pid': pid,
+            'heartbeat': heartbeat,
+            'updatedAt': updated_at,
+            'ageMs': round((time.time() - updated_at) * 1000, 1),
+            'loopLagMs': round(loop_lag_ms, 1),
+            'maxLoopLagMs': round(max_loop_lag_ms, 1),
+            'recoveryState': RECOVERY_STATES[state_code] if state_code < len(RECOVERY_STATES) else 'unknown',
+            'participantCount': participant_count,
+            'retryCount': retry_count,
+            'lastErrorCode': last_error_code,
+            'stopped': bool(flags & FLAG_STOPPED),
+        }
+        for key, bit in FLAGS.items():
+            status[key] = bool(flags & bit)
+        return status
+    return None
+
+
+def _health(status: Optional[Dict[str, Any]], stale_ms: float) -> str:
+    if status is None:
+        return 'invalid'
+    if status['stopped']:
+        return 'stopped'
+    if status['ageMs'] > stale_ms:
+        return 'stale'
+    return 'ok'
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+    import sys
+    parser = argparse.ArgumentParser(description='Read a kiosk status block')
+    parser.add_argument('path', nargs='?', default='kiosk-status.bin', help='status block file')
+    parser.add_argument('--stale-ms', type=float, default=2000,
+                        help='report the kiosk as hung if not updated for this long')
+    parser.add_argument('--watch', action='store_true', help='print status every second')
+    parser.add_argument('--json', action='store_true', help='print the full status as JSON')
+    args = parser.parse_args()
+
+    try:
+        with open(args.path, 'rb') as f:
+            block = mmap.mmap(f.fileno(), BLOCK_SIZE, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as e:
+        print(f'{args.path}: {e}')
+        sys.exit(2)
+
+    # Exit code: 0 ok, 1 stale (hung) or stopped, 2 missing or invalid
+    while True:
+        status = read_status(block)
+        health = _health(status, args.stale_ms)
+        if args.json:
+            print(json.dumps({'health': health, **(status or {})}))
+        elif status:
+            print(f'{status["kioskId"] or "kiosk"} [{health}] pid {status["pid"]} '
+                  f'heartbeat {status["heartbeat"]} age {status["ageMs"]:.0f}ms '
+                  f'lag {status["loopLagMs"]:.0f}ms (max {status["maxLoopLagMs"]:.0f}ms) '
+                  f'recovery {status["recoveryState"]} meeting={status["inMeeting"]} '
+                  f'sharing={status["sharing"]} participants {status["participantCount"]} '
+                  f'error {status["lastErrorCode"]}')
+        else:
+            print(f'{args.path}: not a valid status block')
+        if not args.watch:
+            sys.exit({'ok': 0, 'stale': 1, 'stopped': 1}.get(health, 2))
+        time.sleep(1)
@@ -0,0 +1,128 @@
+"""
+Zoom Kiosk - Task Supervisor
+
+Owns the kiosk's background coroutines. Every task is spawned with a name,
+the component that owns it ('zoomService', 'recovery', ...) and a scope:
+the object whose lifetime bounds the task, such as one ZoomService
+instance. When that object is replaced or stops, cancel_scope() cancels
+exactly its tasks, so a delayed share start or retry of the previous
+ZoomService cannot keep running after a reconnect.
+
+Finished tasks are forgotten at once; failures are logged with the task's
+name instead of surfacing, if ever, when the task is garbage collected.
+"""
+
+import asyncio
+import traceback
+from typing import Any, Coroutine, Dict, List
+from .clock import Clock, SYSTEM_CLOCK
+
+# Longest-running tasks listed in the status
+STATUS_OLDEST = 5
+
+
+class TaskRecord:
+    """One supervised task"""
+
+    __slots__ = ('name', 'owner', 'scope', 'started', 'task')
+
+    def __init__(self, name: str, owner: str, scope: Any, started: float, task: asyncio.Task):
+        self.name = name
+        self.owner = owner
+        self.scope = scope
+        self.started = started
+        self.task = task
+
+    @property
+    def label(self) -> str:
+        return f'{self.owner}/{self.name}'
+
+
+class TaskSupervisor:
+    """Registry of running background tasks, cancellable by scope"""
+
+    def __init__(self, clock: Clock = SYSTEM_CLOCK):
+        self.clock = clock
+        self.tasks: Dict[asyncio.Task, TaskRecord] = {}
+        self.spawned = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        # Tasks cancelled because their scope ended (e.g. orphans of a replaced ZoomService)
+        self.scope_cancels = 0
+
+    def spawn(self, coro: Coroutine, name: str, owner: str, scope: Any = None) -> asyncio.Task:
+        """Run coro as a task owned by owner; scope (default: none) bounds its lifetime"""
+        task = asyncio.get_running_loop().create_task(coro, name=f'{owner}/{name}')
+        self.tasks[task] = TaskRecord(name, owner, scope, self.clock.monotonic(), task)
+        self.spawned += 1
+        task.add_done_callback(self._on_done)
+        return task
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        record = self.tasks.pop(task, None)
+        if task.cancelled():
+            self.cancelled += 1
+            return
+        exc = task.exception()
+        if exc is None:
+            self.completed += 1
+            return
+        self.failed += 1
+        label = record.label if record else task.get_name()
+        print(f'[Tasks] {label} failed: {type(exc).__name__}: {exc}')
+        traceback.print_exception(type(exc), exc, exc.__traceback__)
+
+    def _cancel(self, records: List[TaskRecord]) -> int:
+        current = asyncio.current_task()
+        count = 0
+        for record in records:
+            # A task may end its own scope (e.g. a reconnect replacing the service); it finishes normally
+            if record.task is not current and not record.task.done():
+                record.task.cancel()
+                count += 1
+        return count
+
+    def cancel_scope(self, scope: Any) -> int:
+        """Cancel the tasks bounded by scope; returns how many were cancelled"""
+        count = self._cancel([record for record in self.tasks.values() if record.scope is scope])
+        if count:
+            self.scope_cancels += count
+            print(f'[Tasks] Cancelled {count} task(s) of {type(scope).__name__}')
+        return count
+
+    def cancel_owner(self, owner: str) -> int:
+        """Cancel every task of a component; returns how many were cancelled"""
+        return self._cancel([record for record in self.tasks.values() if record.owner == owner])
+
+    async def cancel_all(self, timeout: float) -> List[str]:
+        """Cancel every task and wait up to timeout; returns the labels of tasks still running"""
+        records = list(self.tasks.values())
+        if not self._cancel(records):
+            return []
+        current = asyncio.current_task()
+        tasks = [record.task for record in records if record.task is not current]
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        return [self.tasks[task].label for task in pending if task in self.tasks]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Live task counts per owner and the longest-running tasks"""
+        now = self.clock.monotonic()
+        by_owner: Dict[str, Dict[str, Any]] = {}
+        for record in self.tasks.values():
+            age_ms = round((now - record.started) * 1000)
+            owner = by_owner.setdefault(record.owner, {'running': 0, 'oldestMs': 0})
+            owner['running'] += 1
+            owner['oldestMs'] = max(owner['oldestMs'], age_ms)
+        oldest = sorted(self.tasks.values(), key=lambda record: record.started)[:STATUS_OLDEST]
+        return {
+            'running': len(self.tasks),
+            'spawned': self.spawned,
+            'completed': self.completed,
+            'failed': self.failed,
+            'cancelled': self.cancelled,
+            'scopeCancels': self.scope_cancels,
+            'byOwner': by_owner,
+            'oldest': [{'task': record.label, 'ageMs': round((now - record.started) * 1000)}
+                       for record in oldest],
+        }
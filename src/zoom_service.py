@@ -10,6 +10,8 @@ Handles:
 """
 
 import asyncio
+import importlib
+import random
 import time
 import base64
 import hmac
@@ -21,6 +23,11 @@ from pathlib import Path
 from typing import Optional, Callable, List, Dict, Any
 import jwt
 from .config import KioskConfig
+from .adaptive_timeouts import AdaptiveTimeouts, Phase
+from .clock import Clock, SYSTEM_CLOCK
+from .callback_trace import CallbackTraceRecorder
+from .display_topology import DisplayTopology
+from .task_supervisor import TaskSupervisor
 
 # Setup SDK paths before importing bindings
 def _setup_sdk_paths() -> None:
@@ -59,25 +66,62 @@ def _setup_sdk_paths() -> None:
 _setup_sdk_paths()
 
 # Import SDK bindings (will be available after building)
-try:
-    import zoom_sdk_bindings as sdk
-    print('[ZoomService] SDK bindings imported successfully')
-except ImportError as e:
-    print(f'[ZoomService] Warning: SDK bindings not available: {e}')
-    print('[ZoomService] Install with: pip install -e bindings/')
-    sdk = None
+if os.environ.get('ZOOM_KIOSK_SDK') == 'simulated':
+    from . import simulated_sdk as sdk
+    print('[ZoomService] Using simulated SDK')
+else:
+    try:
+        import zoom_sdk_bindings as sdk
+        print('[ZoomService] SDK bindings imported successfully')
+    except ImportError as e:
+        print(f'[ZoomService] Warning: SDK bindings not available: {e}')
+        print('[ZoomService] Install with: pip install -e bindings/')
+        sdk = None
+
+
+def _load_sdk() -> bool:
+    """Import the SDK bindings if they were not available at startup (e.g. installed or repaired since)"""
+    global sdk
+    if sdk is None:
+        try:
+            importlib.invalidate_caches()
+            sdk = importlib.import_module('zoom_sdk_bindings')
+            print('[ZoomService] SDK bindings imported successfully')
+        except ImportError:
+            pass
+    return sdk is not None
+
+
+def get_sdk() -> Optional[Any]:
+    """Get the SDK module in use (None while unavailable)"""
+    return sdk
 
 
 class ZoomService:
     """Zoom SDK service wrapper"""
 
-    def __init__(self, config: KioskConfig):
+    def __init__(self, config: KioskConfig, timeouts: Optional[AdaptiveTimeouts] = None,
+                 clock: Clock = SYSTEM_CLOCK, trace: Optional[CallbackTraceRecorder] = None,
+                 topology: Optional[DisplayTopology] = None, tasks: Optional[TaskSupervisor] = None):
         self.config = config
+        # Background tasks of this instance are scoped to it and cancelled when it is replaced
+        self.tasks = tasks or TaskSupervisor(clock)
+        # Monitor layout for sharing screen.monitorIndex (primary monitor when not provided)
+        self.topology = topology
+        # Learned per-phase timeouts (fixed defaults when not provided)
+        self.timeouts = timeouts
+        self.clock = clock
         self.is_initialized = False
         self.is_authenticated = False
+        # InitSDK succeeded and CleanUPSDK is still owed
+        self.sdk_initialized = False
         self.is_in_meeting = False
         self.is_sharing = False
         self.current_status = 'Not initialized'
+        # Other participants in the meeting, refreshed on join/leave callbacks
+        self.participant_count = 0
+        # Last non-success SDK error/result code (0 = none)
+        self.last_error_code = 0
         # Mock mode: no real Zoom connection; simulates join/meeting for testing when SDK/auth unavailable
         self.use_mock_mode = False
 
@@ -98,21 +142,53 @@ class ZoomService:
             'sharingStarted': [],
             'sharingStopped': [],
             'otherParticipantPresent': [],
+            'networkQuality': [],
+            'statisticsWarning': [],
+            'phase': [],
             'error': []
         }
 
+        # Share settings applied to every share; the share policy adjusts them at runtime
+        self.share_settings: Dict[str, bool] = {
+            'shareComputerSound': config['screen']['shareComputerSound'],
+            'stereoAudio': config['screen']['stereoAudio'],
+            'optimizeForVideo': config['screen']['optimizeForVideo'],
+        }
+
         # Callback wrappers
         self.auth_event_callbacks: Optional[Any] = None
         self.meeting_event_callbacks: Optional[Any] = None
         self.participants_event_callbacks: Optional[Any] = None
         self.sharing_event_callbacks: Optional[Any] = None
 
+        # Start times of the lifecycle phases in progress (see 'phase' event)
+        self._phase_started: Dict[str, float] = {}
+
         # Timeout tracking
         self.auth_timeout_task: Optional[asyncio.Task] = None
         # Auth retry (rejoin real meeting instead of mock)
         self.auth_retry_count: int = 0
         self.max_auth_retries: int = 5
 
+        # Background upgrade from mock mode to the real SDK
+        self.upgrade_task: Optional[asyncio.Task] = None
+        self.upgrade_result: Optional[asyncio.Future] = None
+        self.upgrade_attempts = 0
+        self.upgrade_count = 0
+        # Time spent degraded (in mock mode)
+        self.degraded_since: Optional[float] = None
+        self.degraded_total_ms = 0.0
+        self.degraded_episodes = 0
+
+        # Optional recorder of every SDK callback that reaches this service
+        self.trace = trace
+        if trace:
+            trace.attach(self)
+
+    def _spawn(self, coro: Any, name: str) -> asyncio.Task:
+        """Run a background task for as long as this instance is in use"""
+        return self.tasks.spawn(coro, name, 'zoomService', self)
+
     def on(self, event: str, callback: Callable) -> None:
         """Register event callback"""
         if event in self._callbacks:
@@ -144,115 +220,260 @@ class ZoomService:
         """Initialize SDK. If force_reload and SDK was already in use, clean up and re-init for real-meeting retry."""
         if sdk is None:
             print('[ZoomService] SDK not available, using mock mode')
-            self.use_mock_mode = True
-            await self._initialize_mock()
+            await self._enter_mock_mode()
             return
 
         try:
             # Retry path: clean up and re-init so we can rejoin the real meeting
             if force_reload and (self.auth_service or self.meeting_service):
-                if self.auth_timeout_task and not self.auth_timeout_task.done():
-                    self.auth_timeout_task.cancel()
-                    self.auth_timeout_task = None
                 print('[ZoomService] Cleaning up SDK for retry...')
-                sdk.CleanUPSDK()
-                self.auth_service = None
-                self.meeting_service = None
-                self.participants_ctrl = None
-                self.share_ctrl = None
-                self.meeting_config = None
-                self.auth_event_callbacks = None
-                self.meeting_event_callbacks = None
-                self.participants_event_callbacks = None
-                self.sharing_event_callbacks = None
+                self._release_sdk()
                 self.is_initialized = False
                 self.is_authenticated = False
                 self.is_in_meeting = False
                 self.is_sharing = False
-                await asyncio.sleep(1.0)
+                self.participant_count = 0
+                await self.clock.sleep(1.0)
                 print('[ZoomService] Retrying SDK init and auth...')
 
-            # Initialize SDK
-            init_param = sdk.InitParam()
-            init_param.strWebDomain = 'https://www.zoom.us'
-            init_param.emLanguageID = sdk.SDK_LANGUAGE_ID.LANGUAGE_English
-            init_param.enableLogByDefault = True
-
+            await self._initialize_real()
 
-            result = sdk.InitSDK(init_param)
-            if result != sdk.SDKError.SDKERR_SUCCESS:
-                raise Exception(f'SDK initialization failed: {result}')
-
-            print('[ZoomService] SDK initialized')
+        except Exception as e:
+            # Cancel timeout if initialization failed
+            if self.auth_timeout_task:
+                self.auth_timeout_task.cancel()
+                self.auth_timeout_task = None
+            print(f'[ZoomService] Initialization error: {e}')
+            print('[ZoomService] Falling back to mock mode')
+            await self._enter_mock_mode()
 
-            # Wait a bit after InitSDK to ensure SDK is fully ready
-            await asyncio.sleep(0.5)
+    def _release_sdk(self) -> None:
+        """Clean up the SDK and drop all service references"""
+        if self.auth_timeout_task and not self.auth_timeout_task.done():
+            self.auth_timeout_task.cancel()
+        self.auth_timeout_task = None
+        if self.sdk_initialized:
+            sdk.CleanUPSDK()
+            self.sdk_initialized = False
+        self.auth_service = None
+        self.meeting_service = None
+        self.participants_ctrl = None
+        self.share_ctrl = None
+        self.meeting_config = None
+        self.auth_event_callbacks = None
+        self.meeting_event_callbacks = None
+        self.participants_event_callbacks = None
+        self.sharing_event_callbacks = None
+
+    async def _initialize_real(self) -> None:
+        """Initialize the SDK and start authentication. Raises on failure."""
+        # Initialize SDK
+        init_param = sdk.InitParam()
+        init_param.strWebDomain = 'https://www.zoom.us'
+        init_param.emLanguageID = sdk.SDK_LANGUAGE_ID.LANGUAGE_English
+        init_param.enableLogByDefault = True
+
+
+        # Timed for the 'phase' event only: there is no timeout to learn for InitSDK
+        self._phase_started[Phase.INIT] = self.clock.monotonic()
+        result = sdk.InitSDK(init_param)
+        if result != sdk.SDKError.SDKERR_SUCCESS:
+            self.last_error_code = int(result)
+            self._phase_end(Phase.INIT, 'failed')
+            raise Exception(f'SDK initialization failed: {result}')
+        self.sdk_initialized = True
+        self._phase_end(Phase.INIT, 'ok')
 
-            # Create services
-            self.auth_service = sdk.CreateAuthService()
-            self.meeting_service = sdk.CreateMeetingService()
+        print('[ZoomService] SDK initialized')
 
-            if not self.auth_service or not self.meeting_service:
-                raise Exception('Failed to create SDK services')
+        # Wait a bit after InitSDK to ensure SDK is fully ready
+        await self.clock.sleep(0.5)
 
-            # Set up auth callbacks
-            self.auth_event_callbacks = sdk.AuthServiceEventCallbacks()
-            self.auth_event_callbacks.onAuthCallback = self._on_auth_result
-            self.auth_event_callbacks.onIdentityExpiredCallback = self._on_identity_expired
-            self.auth_service.SetEvent(self.auth_event_callbacks)
+        # Create services
+        self.auth_service = sdk.CreateAuthService()
+        self.meeting_service = sdk.CreateMeetingService()
 
-            # Set up timeout for auth callback (in case it doesn't fire)
-            self.auth_timeout_task = asyncio.create_task(self._auth_timeout_handler())
+        if not self.auth_service or not self.meeting_service:
+            raise Exception('Failed to create SDK services')
 
-            # Authenticate with JWT
-            jwt_token = self._generate_jwt()
-            auth_context = sdk.AuthContext()
-            auth_context.jwt_token = jwt_token
+        # Set up auth callbacks
+        self.auth_event_callbacks = sdk.AuthServiceEventCallbacks()
+        self.auth_event_callbacks.onAuthCallback = self._on_auth_result
+        self.auth_event_callbacks.onIdentityExpiredCallback = self._on_identity_expired
+        self.auth_service.SetEvent(self.auth_event_callbacks)
 
-            print('[ZoomService] Calling SDKAuth...')
-            result = self.auth_service.SDKAuth(auth_context)
-            if result != sdk.SDKError.SDKERR_SUCCESS:
-                # Cancel timeout if auth call failed
-                if self.auth_timeout_task:
-                    self.auth_timeout_task.cancel()
-                    self.auth_timeout_task = None
-                raise Exception(f'SDK authentication failed: {result}')
+        # Set up timeout for auth callback (in case it doesn't fire)
+        self.auth_timeout_task = self._spawn(self._auth_timeout_handler(), 'authTimeout')
 
-            self.current_status = 'Authenticating...'
-            print('[ZoomService] SDKAuth called successfully, waiting for callback...')
+        # Authenticate with JWT
+        jwt_token = self._generate_jwt()
+        auth_context = sdk.AuthContext()
+        auth_context.jwt_token = jwt_token
 
-        except Exception as e:
-            # Cancel timeout if initialization failed
+        print('[ZoomService] Calling SDKAuth...')
+        self._phase_start(Phase.AUTH)
+        result = self.auth_service.SDKAuth(auth_context)
+        if result != sdk.SDKError.SDKERR_SUCCESS:
+            # Cancel timeout if auth call failed
             if self.auth_timeout_task:
                 self.auth_timeout_task.cancel()
                 self.auth_timeout_task = None
-            print(f'[ZoomService] Initialization error: {e}')
-            print('[ZoomService] Falling back to mock mode')
-            self.use_mock_mode = True
-            await self._initialize_mock()
+            self._phase_end(Phase.AUTH, 'failed')
+            raise Exception(f'SDK authentication failed: {result}')
+
+        self.current_status = 'Authenticating...'
+        print('[ZoomService] SDKAuth called successfully, waiting for callback...')
+
+    async def _enter_mock_mode(self) -> None:
+        """Run degraded in mock mode and keep trying to get the real SDK up in the background"""
+        self.use_mock_mode = True
+        if self.degraded_since is None:
+            self.degraded_since = self.clock.monotonic()
+            self.degraded_episodes += 1
+        await self._initialize_mock()
+        upgrade = self.config['mockUpgrade']
+        if upgrade['enabled'] and (self.upgrade_task is None or self.upgrade_task.done()):
+            self.upgrade_task = self._spawn(self._upgrade_loop(), 'mockUpgrade')
+
+    async def _upgrade_loop(self) -> None:
+        """Retry real SDK init/auth with backoff until it works or mock mode ends"""
+        upgrade = self.config['mockUpgrade']
+        backoff_ms = upgrade['initialBackoffMs']
+        while self.use_mock_mode:
+            # Jittered so a site full of degraded kiosks does not retry in lockstep
+            delay_ms = random.uniform(backoff_ms / 2, backoff_ms)
+            await self.clock.sleep(delay_ms / 1000.0)
+            backoff_ms = min(backoff_ms * 2, upgrade['maxBackoffMs'])
+            if not self.use_mock_mode:
+                break
+            if not _load_sdk():
+                continue
+
+            self.upgrade_attempts += 1
+            print(f'[ZoomService] Trying to upgrade from mock mode to the real SDK (attempt {self.upgrade_attempts})')
+            self.upgrade_result = asyncio.get_running_loop().create_future()
+            upgraded = False
+            try:
+                # Clean up whatever a previous failed attempt left initialized
+                self._release_sdk()
+                # Mock mode counts as authenticated; the auth timeout needs the real state
+                self.is_authenticated = False
+                await self._initialize_real()
+                # Resolved by the auth callback (which also sets is_authenticated) or the auth timeout
+                upgraded = await self.upgrade_result
+            except asyncio.CancelledError:
+                # Service is being replaced or shut down; leave its state alone
+                raise
+            except Exception as e:
+                print(f'[ZoomService] Real SDK still unavailable: {e}')
+            finally:
+                self.upgrade_result = None
+            if upgraded:
+                break
+            # Still in mock mode, which counts as authenticated
+            self.is_authenticated = True
+
+    def _resolve_upgrade(self, succeeded: bool) -> bool:
+        """Report an auth outcome to a pending upgrade attempt. Returns True if one was pending."""
+        if self.upgrade_result is None or self.upgrade_result.done():
+            return False
+        self.upgrade_result.set_result(succeeded)
+        return True
+
+    def _leave_mock_mode(self) -> None:
+        """Switch from the simulated meeting to the real SDK path"""
+        self.use_mock_mode = False
+        self.is_in_meeting = False
+        self.is_sharing = False
+        self.participant_count = 0
+        if self.degraded_since is not None:
+            degraded_ms = (self.clock.monotonic() - self.degraded_since) * 1000
+            self.degraded_total_ms += degraded_ms
+            self.degraded_since = None
+            self.upgrade_count += 1
+            print(f'[ZoomService] Upgraded from mock mode to the real SDK after {degraded_ms / 1000.0:.1f}s degraded')
+
+    def stop_upgrade(self) -> None:
+        """Stop the background upgrade (service is being replaced or shut down)"""
+        if self.upgrade_task and not self.upgrade_task.done():
+            self.upgrade_task.cancel()
+        self.upgrade_task = None
+
+    def get_degraded_metrics(self) -> Dict[str, Any]:
+        """Get time spent in mock mode and upgrade attempts"""
+        current_ms = (self.clock.monotonic() - self.degraded_since) * 1000 if self.degraded_since is not None else 0.0
+        return {
+            'degraded': self.degraded_since is not None,
+            'degradedForMs': round(current_ms, 1),
+            'degradedTotalMs': round(self.degraded_total_ms + current_ms, 1),
+            'degradedEpisodes': self.degraded_episodes,
+            'upgradeAttempts': self.upgrade_attempts,
+            'upgrades': self.upgrade_count,
+        }
+
+    def _phase_start(self, phase: str) -> None:
+        """Start timing a lifecycle phase"""
+        self._phase_started[phase] = self.clock.monotonic()
+        if self.timeouts:
+            self.timeouts.start(phase)
+
+    def _phase_finish(self, phase: str) -> None:
+        """Record the latency of a completed lifecycle phase"""
+        if self.timeouts:
+            duration_ms = self.timeouts.finish(phase)
+            if duration_ms is not None:
+                print(f'[ZoomService] Phase {phase} took {duration_ms:.0f}ms')
+        self._phase_end(phase, 'ok')
+
+    def _phase_end(self, phase: str, outcome: str) -> None:
+        """Emit 'phase' (phase, duration_ms, outcome) if the phase was being timed"""
+        started = self._phase_started.pop(phase, None)
+        if started is not None:
+            self.emit('phase', phase, (self.clock.monotonic() - started) * 1000, outcome)
+
+    def _get_timeout(self, phase: str) -> float:
+        """Get the timeout for a phase in seconds"""
+        if self.timeouts:
+            return self.timeouts.get_timeout(phase)
+        return 10.0
+
+    def _get_retry_delay(self) -> float:
+        """Get the delay in seconds before retrying SDK init and auth"""
+        if self.timeouts:
+            return self.timeouts.get_retry_delay(Phase.AUTH)
+        return 5.0
 
     async def _auth_timeout_handler(self) -> None:
         """Handle auth callback timeout; retry real-meeting join instead of mock."""
-        await asyncio.sleep(10.0)  # Wait 10 seconds
+        timeout = self._get_timeout(Phase.AUTH)
+        await self.clock.sleep(timeout)
         if not self.is_authenticated:
             self.auth_timeout_task = None
-            print('[ZoomService] Auth callback timeout - auth callback did not fire within 10 seconds')
+            print(f'[ZoomService] Auth callback timeout - auth callback did not fire within {timeout:.1f} seconds')
+            if self.timeouts:
+                self.timeouts.record_timeout(Phase.AUTH)
+            self._phase_end(Phase.AUTH, 'timeout')
+            if self._resolve_upgrade(False):
+                print('[ZoomService] Upgrade attempt timed out waiting for auth, staying in mock mode')
+                return
             self.emit('error', 'Authentication timeout - SDK may not be ready for reconnection')
             self.auth_retry_count += 1
             if self.auth_retry_count <= self.max_auth_retries:
-                delay = 5
-                print(f'[ZoomService] Will retry real-meeting join in {delay}s (attempt {self.auth_retry_count}/{self.max_auth_retries})')
+                delay = self._get_retry_delay()
+                print(f'[ZoomService] Will retry real-meeting join in {delay:.1f}s (attempt {self.auth_retry_count}/{self.max_auth_retries})')
                 await self._retry_initialize_after_delay(delay)
             else:
                 print(f'[ZoomService] Max auth retries ({self.max_auth_retries}) reached. Check config and SDK.')
 
     async def _retry_initialize_after_delay(self, seconds: float) -> None:
         """Wait then re-initialize SDK and auth so the app retries joining the real meeting."""
-        await asyncio.sleep(seconds)
+        await self.clock.sleep(seconds)
         await self.initialize(force_reload=True)
 
     def _on_auth_result(self, result: int) -> None:
         """Handle authentication result"""
+        if self.trace:
+            self.trace.record('auth', result)
         # Cancel timeout if auth callback fired
         if self.auth_timeout_task:
             self.auth_timeout_task.cancel()
@@ -261,6 +482,10 @@ class ZoomService:
         print(f'[ZoomService] Auth result: {result}')
 
         if result == sdk.AuthResult.AUTHRET_SUCCESS:
+            self._phase_finish(Phase.AUTH)
+            if self.use_mock_mode:
+                self._leave_mock_mode()
+            self._resolve_upgrade(True)
             self.is_authenticated = True
             self.is_initialized = True
             self.current_status = 'Authenticated'
@@ -268,6 +493,10 @@ class ZoomService:
             # Set up meeting callbacks
             self.meeting_event_callbacks = sdk.MeetingServiceEventCallbacks()
             self.meeting_event_callbacks.onStatusChangedCallback = lambda status, result: self._on_meeting_status_changed(status, result)
+            # Bindings built before the network callbacks were forwarded do not have them
+            if hasattr(self.meeting_event_callbacks, 'onUserNetworkStatusChangedCallback'):
+                self.meeting_event_callbacks.onUserNetworkStatusChangedCallback = lambda component, level, user_id, uplink: self._on_network_status_changed(component, level, user_id, uplink)
+                self.meeting_event_callbacks.onStatisticsWarningCallback = lambda warning: self._on_statistics_warning(warning)
             self.meeting_service.SetEvent(self.meeting_event_callbacks)
 
             # Get controllers
@@ -322,15 +551,24 @@ class ZoomService:
             self.auth_retry_count = 0  # reset on success
             self.emit('initialized')
         else:
+            if self.timeouts:
+                self.timeouts.cancel(Phase.AUTH)
+            self._phase_end(Phase.AUTH, 'failed')
             self.current_status = f'Authentication failed: {result}'
+            self.last_error_code = int(result)
+            if self._resolve_upgrade(False):
+                # The upgrade loop retries with its own backoff
+                print(f'[ZoomService] Upgrade attempt failed to authenticate ({result}), staying in mock mode')
+                return
             self.emit('error', f'Authentication failed with code: {result}')
             self.auth_retry_count += 1
             if self.auth_retry_count <= self.max_auth_retries:
-                delay = 5
-                print(f'[ZoomService] Will retry real-meeting join in {delay}s (attempt {self.auth_retry_count}/{self.max_auth_retries})')
+                delay = self._get_retry_delay()
+                print(f'[ZoomService] Will retry real-meeting join in {delay:.1f}s (attempt {self.auth_retry_count}/{self.max_auth_retries})')
                 try:
                     loop = asyncio.get_event_loop()
-                    asyncio.run_coroutine_threadsafe(self._retry_initialize_after_delay(delay), loop)
+                    loop.call_soon_threadsafe(
+                        lambda: self._spawn(self._retry_initialize_after_delay(delay), 'authRetry'))
                 except Exception as e:
                     print(f'[ZoomService] Could not schedule retry: {e}')
             else:
@@ -343,12 +581,15 @@ class ZoomService:
 
     def _on_meeting_status_changed(self, status: int, result: int) -> None:
         """Handle meeting status changes"""
+        if self.trace:
+            self.trace.record('status', status, result)
         try:
             print(f'[ZoomService] Meeting status: {status}, result: {result}')
             if status == sdk.MeetingStatus.MEETING_STATUS_CONNECTING:
                 print('[Diagnostic] Status CONNECTING - waiting for INMEETING or next status')
 
             if status == sdk.MeetingStatus.MEETING_STATUS_INMEETING:
+                self._phase_finish(Phase.JOIN)
                 self.is_in_meeting = True
                 self.current_status = 'In meeting'
 
@@ -366,16 +607,16 @@ class ZoomService:
                 # Hide Zoom meeting window using SDK API (more precise)
                 self._hide_zoom_meeting_window()
                 # Also hide window after a delay in case it appears later
-                asyncio.create_task(self._hide_zoom_meeting_window_delayed())
+                self._spawn(self._hide_zoom_meeting_window_delayed(), 'hideMeetingWindow')
 
                 self.emit('meetingJoined')
 
                 # Check for other participants
-                other_count = self.get_other_participant_count()
+                other_count = self._refresh_participant_count()
                 if other_count > 0:
                     print(f'[ZoomService] Other participants already in meeting (count={other_count}), starting screen share...')
                     self.emit('otherParticipantPresent')
-                    asyncio.create_task(self._start_screen_share_delayed())
+                    self._spawn(self._start_screen_share_delayed(), 'startShareDelayed')
 
             elif status == sdk.MeetingStatus.MEETING_STATUS_DISCONNECTING:
                 self.current_status = 'Disconnecting...'
@@ -387,6 +628,12 @@ class ZoomService:
                 if self.is_in_meeting:
                     self.is_in_meeting = False
                     self.is_sharing = False
+                self.participant_count = 0
+                if status == sdk.MeetingStatus.MEETING_STATUS_FAILED:
+                    self.last_error_code = int(result)
+                # A join or share still in progress ends with the meeting
+                self._phase_end(Phase.JOIN, 'failed')
+                self._phase_end(Phase.SHARE, 'failed')
                 self.current_status = 'Disconnected'
                 status_name = 'ended' if status == sdk.MeetingStatus.MEETING_STATUS_ENDED else 'failed'
                 print(f'[ZoomService] Meeting {status_name} - emitting disconnected event')
@@ -397,11 +644,27 @@ class ZoomService:
             traceback.print_exc()
             raise
 
+    def _on_network_status_changed(self, component: int, level: int, user_id: int, uplink: bool) -> None:
+        """Handle a participant's network quality change"""
+        if self.trace:
+            self.trace.record('network', component, level, user_id, uplink)
+        self.emit('networkQuality', int(component), int(level), int(user_id), bool(uplink),
+                  not self._is_other_participant(int(user_id)))
+
+    def _on_statistics_warning(self, warning: int) -> None:
+        """Handle an SDK statistics warning (bad network, busy system)"""
+        if self.trace:
+            self.trace.record('statsWarning', warning)
+        self.emit('statisticsWarning', int(warning))
+
     def _on_user_join(self, lst_user_id: Any, str_user_list: Optional[str] = None) -> None:
         """Handle user join callback"""
+        if self.trace:
+            self.trace.record('userJoin', lst_user_id, str_user_list)
         try:
             ids = self._to_participant_ids(lst_user_id)
             print(f'[ZoomService] meetinguserjoincb lstUserID={lst_user_id}, parsed ids={ids}')
+            self._refresh_participant_count()
 
             if self.is_in_meeting and ids:
                 others = [id for id in ids if self._is_other_participant(id)]
@@ -413,7 +676,7 @@ class ZoomService:
                     self.emit('otherParticipantPresent')
                     if not self.is_sharing:
                         print('[ZoomService] Participant detected, starting screen share...')
-                        asyncio.create_task(self.start_screen_share())
+                        self._spawn(self.start_screen_share(), 'startShare')
         except Exception as e:
             print(f'[Diagnostic] Exception in user join callback: {type(e).__name__}: {e}')
             import traceback
@@ -422,31 +685,39 @@ class ZoomService:
 
     def _on_user_left(self, lst_user_id: Any, str_user_list: Optional[str] = None) -> None:
         """Handle user left callback"""
+        if self.trace:
+            self.trace.record('userLeft', lst_user_id, str_user_list)
         print(f'[ZoomService] Participant left: {str_user_list}')
+        self._refresh_participant_count()
 
     def _on_participant_join(self, user_id: int) -> None:
         """Handle participant join callback"""
+        self._refresh_participant_count()
         if self._is_other_participant(user_id):
             self.emit('otherParticipantPresent')
             if not self.is_sharing:
-                asyncio.create_task(self.start_screen_share())
+                self._spawn(self.start_screen_share(), 'startShare')
 
     def _on_participant_left(self, user_id: int) -> None:
         """Handle participant left callback"""
         print(f'[ZoomService] Participant {user_id} left')
+        self._refresh_participant_count()
 
     def _on_sharing_status_changed(self, share_info: Any) -> None:
         """Handle sharing status changes"""
+        if self.trace:
+            self.trace.record('share', share_info)
         try:
             status = share_info.status if hasattr(share_info, 'status') else 0
             user_id = share_info.userid if hasattr(share_info, 'userid') else 0
             print(f'[ZoomService] Share status: {status}, userId: {user_id}')
 
             if status == sdk.SharingStatus.Sharing_Self_Send_Begin:
+                self._phase_finish(Phase.SHARE)
                 self.is_sharing = True
                 self.current_status = 'Screen sharing active'
                 self.emit('sharingStarted')
-            elif status in (sdk.SharingStatus.Sharing_Self_Send_End, sdk.SharingStatus.Sharing_None):
+            elif status == sdk.SharingStatus.Sharing_Self_Send_End:
                 if self.is_sharing and self.is_in_meeting:
                     self.emit('sharingStopped')
                 self.is_sharing = False
@@ -522,6 +793,11 @@ class ZoomService:
             print(f'[ZoomService] Error getting participant count: {e}')
             return 0
 
+    def _refresh_participant_count(self) -> int:
+        """Recount other participants and cache the result for status reporting"""
+        self.participant_count = self.get_other_participant_count()
+        return self.participant_count
+
     def _generate_jwt(self) -> str:
         """Generate JWT for SDK authentication"""
         sdk_key = self.config['zoom']['sdkKey']
@@ -576,26 +852,84 @@ class ZoomService:
         # Enable direct desktop sharing (similar to isdirectsharedesktop in TypeScript SDK)
         without_login.isDirectShareDesktop = True
 
+        self._phase_start(Phase.JOIN)
         result = self.meeting_service.Join(join_param)
         if result != sdk.SDKError.SDKERR_SUCCESS:
+            if self.timeouts:
+                self.timeouts.cancel(Phase.JOIN)
+            self._phase_end(Phase.JOIN, 'failed')
+            self.last_error_code = int(result)
             raise Exception(f'Failed to join meeting: {result}')
 
         print('[ZoomService] Meeting join initiated')
 
-    async def start_screen_share(self) -> None:
-        """Start screen sharing"""
+    async def start_screen_share(self) -> Optional[Any]:
+        """Start screen sharing. Returns the SDK result, or None if no share call was made."""
         if not self.is_in_meeting or not self.share_ctrl:
-            return
+            return None
 
         if self.is_sharing:
-            return
+            return None
+
+        self._apply_share_settings()
 
-        # Start sharing primary monitor (pass None/nullptr for primary)
-        result = self.share_ctrl.StartMonitorShare(None)
+        # Share the configured monitor (None/nullptr shares the primary one)
+        monitor_id = self.topology.share_id(self.config['screen']['monitorIndex']) if self.topology else None
+        self._phase_start(Phase.SHARE)
+        result = self.share_ctrl.StartMonitorShare(monitor_id)
         if result != sdk.SDKError.SDKERR_SUCCESS:
+            if self.timeouts:
+                self.timeouts.cancel(Phase.SHARE)
+            self._phase_end(Phase.SHARE, 'failed')
+            self.last_error_code = int(result)
             print(f'[ZoomService] Failed to start screen share: {result}')
         else:
             print('[ZoomService] Screen share started')
+        return result
+
+    def stop_screen_share(self) -> Optional[Any]:
+        """Stop our screen share. Returns the SDK result, or None if not sharing."""
+        if not self.is_sharing or not self.share_ctrl:
+            return None
+
+        result = self.share_ctrl.StopShare()
+        if result != sdk.SDKError.SDKERR_SUCCESS:
+            self.last_error_code = int(result)
+            print(f'[ZoomService] Failed to stop screen share: {result}')
+        return result
+
+    def set_share_settings(self, **settings: bool) -> None:
+        """Change share settings; applied to the running share at once, else to the next one"""
+        self.share_settings.update(settings)
+        if self.share_ctrl and self.is_sharing:
+            self._apply_share_settings()
+
+    def _apply_share_settings(self) -> None:
+        """Push share_settings to the share controller"""
+        ctrl = self.share_ctrl
+        # Bindings built before these were exposed leave the SDK defaults in place
+        if not ctrl or not hasattr(ctrl, 'EnableShareComputerSound'):
+            return
+        settings = self.share_settings
+        calls = [
+            ('EnableShareComputerSound', ctrl.EnableShareComputerSound, settings['shareComputerSound']),
+            ('SetAudioShareMode', ctrl.SetAudioShareMode,
+             sdk.AudioShareMode.AudioShareMode_Stereo if settings['stereoAudio']
+             else sdk.AudioShareMode.AudioShareMode_Mono),
+            ('EnableOptimizeForFullScreenVideoClip', ctrl.EnableOptimizeForFullScreenVideoClip,
+             settings['optimizeForVideo']),
+        ]
+        if self.is_sharing:
+            # The plain setting only takes effect with the next share
+            calls.append(('EnableShareComputerSoundWhenSharing', ctrl.EnableShareComputerSoundWhenSharing,
+                          settings['shareComputerSound']))
+        for name, call, value in calls:
+            try:
+                result = call(value)
+                if result != sdk.SDKError.SDKERR_SUCCESS:
+                    print(f'[ZoomService] {name}({value}) failed: {result}')
+            except Exception as e:
+                print(f'[ZoomService] {name} failed: {e}')
 
     def _hide_zoom_meeting_window(self) -> None:
         """Hide Zoom meeting window using SDK API if it appears"""
@@ -632,12 +966,12 @@ class ZoomService:
         # Try a couple times as window might appear with delay
         # But DisableShowJoinMeetingWnd should prevent it from appearing
         for delay in [0.5, 1.0]:
-            await asyncio.sleep(delay)
+            await self.clock.sleep(delay)
             self._hide_zoom_meeting_window()
 
     async def _start_screen_share_delayed(self) -> None:
         """Start screen share with delay"""
-        await asyncio.sleep(1.0)
+        await self.clock.sleep(1.0)
         if not self.is_sharing:
             await self.start_screen_share()
 
@@ -649,6 +983,7 @@ class ZoomService:
         self.meeting_service.Leave(sdk.LeaveMeetingCmd.LEAVE_MEETING)
         self.is_in_meeting = False
         self.is_sharing = False
+        self.participant_count = 0
 
     async def _initialize_mock(self) -> None:
         """Initialize mock mode"""
@@ -659,7 +994,7 @@ class ZoomService:
 
     async def _start_meeting_mock(self) -> None:
         """Start meeting in mock mode"""
-        await asyncio.sleep(1)
+        await self.clock.sleep(1)
         self.is_in_meeting = True
         self.current_status = 'In meeting (mock)'
         self.emit('meetingJoined')
@@ -0,0 +1,4 @@
+import os
+
+# The Zoom service picks its SDK when first imported
+os.environ['ZOOM_KIOSK_SDK'] = 'simulated'
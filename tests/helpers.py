@@ -0,0 +1,47 @@
+"""Running a simulated kiosk in virtual time"""
+
+import asyncio
+import copy
+import tempfile
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+from src import simulated_sdk
+from src.clock import run_virtual, wait_until
+from src.config import KioskConfig, default_config
+from src.outage_sim import simulation_config
+
+
+def kiosk_config(**sections: Dict[str, Any]) -> KioskConfig:
+    """Simulation config with some sections updated"""
+    config = simulation_config(copy.deepcopy(default_config['recovery']))
+    for section, values in sections.items():
+        config[section].update(values)
+    return config
+
+
+def run_kiosk(scenario: Callable[[Any, simulated_sdk.Simulator], Awaitable[Any]],
+              config: Optional[KioskConfig] = None) -> Any:
+    """Run a KioskApp on a fresh simulator until scenario(app, simulator) returns; returns its result"""
+    from src.main import KioskApp
+
+    async def main() -> Any:
+        simulated_sdk.simulator = simulator = simulated_sdk.Simulator()
+        with tempfile.TemporaryDirectory() as state_dir:
+            app = KioskApp(config or kiosk_config(), enable_shortcuts=False, replay_plan=[],
+                           state_dir=Path(state_dir))
+
+            async def drive() -> Any:
+                try:
+                    return await scenario(app, simulator)
+                finally:
+                    app.stopping = True
+
+            task = asyncio.create_task(drive())
+            await app.run()
+            return await task
+
+    return run_virtual(main())
+
+
+def sharing(app: Any) -> bool:
+    return bool(app.zoom_service and app.zoom_service.is_sharing and not app.zoom_service.use_mock_mode)
@@ -0,0 +1,37 @@
+import asyncio
+from src.action_player import assumed_primary, compile_plan, dry_run
+from src.config import default_config
+from src.display_topology import DisplayTopology
+
+RECORDING = [
+    {'type': 'click', 'x': 100, 'y': 50, 'time': 900, 'button': 'left', 'monitor': 1},
+    {'type': 'move', 'x': 5, 'y': 5, 'time': 100},
+    {'type': 'click', 'x': 300, 'y': 200, 'time': 500, 'button': 'left', 'monitor': 0},
+]
+
+
+def two_monitors():
+    return [{'id': 'A', 'left': 0, 'top': 0, 'width': 1920, 'height': 1080, 'primary': True},
+            {'id': 'B', 'left': 1920, 'top': 0, 'width': 1280, 'height': 1024, 'primary': False}]
+
+
+def test_plan_is_translated_with_a_topology():
+    plan = compile_plan(RECORDING, DisplayTopology(two_monitors))
+    assert [(a['x'], a['y']) for a in plan] == [(300, 200), (2020, 50)]
+    assert not any('monitor' in a for a in plan)
+    assert assumed_primary(plan) == []
+
+
+def test_plan_without_a_topology_is_placed_on_the_primary_monitor():
+    plan = compile_plan(RECORDING)
+    assert [(a['x'], a['y']) for a in plan] == [(300, 200), (100, 50)]
+    assert assumed_primary(plan) == [(1, 100, 50)]
+    # Still translatable later, e.g. by a fleet's kiosks
+    assert [(a['x'], a['y']) for a in compile_plan(plan, DisplayTopology(two_monitors))] == [(300, 200), (2020, 50)]
+
+
+def test_dry_run_reports_targets_placed_on_the_primary_monitor():
+    report = asyncio.run(dry_run(RECORDING, dict(default_config['replay']), (1920, 1080)))
+    assert report['actions'] == 2
+    assert report['assumedPrimary'] == 1
+    assert report['assumedPrimaryTargets'] == [(1, 100, 50)]
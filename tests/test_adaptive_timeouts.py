@@ -0,0 +1,46 @@
+import copy
+import json
+from src import adaptive_timeouts
+from src.adaptive_timeouts import AdaptiveTimeouts, Phase
+from src.clock import run_virtual, SYSTEM_CLOCK
+from src.config import default_config, validate_config
+
+
+def timeouts_config(**values):
+    return {**default_config['timeouts'], **values}
+
+
+def test_samples_are_written_later_off_the_loop(tmp_path):
+    store = tmp_path / 'phase-timings.json'
+    timeouts = AdaptiveTimeouts(timeouts_config(), store)
+
+    async def main():
+        timeouts.record(Phase.JOIN, 1200)
+        timeouts.record(Phase.JOIN, 1300)
+        # Nothing written on the loop thread while samples arrive
+        assert timeouts.dirty and not store.exists()
+        await SYSTEM_CLOCK.sleep(adaptive_timeouts.SAVE_DELAY_S + 1)
+        await timeouts.pending_write
+
+    run_virtual(main())
+    assert not timeouts.dirty
+    assert json.loads(store.read_text())['phases'][Phase.JOIN] == [1200.0, 1300.0]
+
+
+def test_flush_writes_pending_samples(tmp_path):
+    store = tmp_path / 'phase-timings.json'
+    timeouts = AdaptiveTimeouts(timeouts_config(), store)
+
+    async def main():
+        timeouts.record(Phase.AUTH, 800)
+        timeouts.flush()
+
+    run_virtual(main())
+    assert AdaptiveTimeouts(timeouts_config(), store).samples[Phase.AUTH] == [800.0]
+
+
+def test_invalid_margin_is_reset():
+    config = copy.deepcopy(default_config)
+    config['timeouts']['margin'] = 0
+    validate_config(config)
+    assert config['timeouts']['margin'] == 1.5
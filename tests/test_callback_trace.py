@@ -0,0 +1,86 @@
+from src import simulated_sdk
+from src.callback_trace import CallbackTraceRecorder, load_trace, replay_trace
+from src.clock import run_virtual, SYSTEM_CLOCK
+from src.config import default_config
+from tests.helpers import kiosk_config, run_kiosk, sharing, wait_until
+
+
+def trace_config(path):
+    return {**default_config['callbackTrace'], 'enabled': True, 'path': str(path)}
+
+
+def test_recorded_trace_replays_to_the_same_state(tmp_path):
+    path = tmp_path / 'trace.jsonl'
+    config = kiosk_config(callbackTrace=trace_config(path))
+
+    async def scenario(app, simulator):
+        assert await wait_until(lambda: sharing(app), 60)
+        simulator.add_participant()
+        await SYSTEM_CLOCK.sleep(5)
+        return app.zoom_service.participant_count
+
+    participants = run_kiosk(scenario, config)
+    events = load_trace(path)
+    names = [name for _, name, _ in events]
+    assert names[0] == 'service' and 'self' in names and 'auth' in names
+
+    report = run_virtual(replay_trace(events, kiosk_config()))
+    assert report['handled'] == len([name for name in names if name not in ('service', 'self', 'participants')])
+    assert report['final']['inMeeting'] and report['final']['sharing']
+    assert report['final']['participants'] == participants
+
+
+def test_rotated_trace_replays_on_its_own(tmp_path):
+    path = tmp_path / 'trace.jsonl'
+    config = kiosk_config(callbackTrace={**trace_config(path), 'maxBytes': 400})
+
+    async def scenario(app, simulator):
+        assert await wait_until(lambda: sharing(app), 60)
+        simulator.add_participant()
+        for level in [2, 5] * 10:
+            simulator.network_status(simulated_sdk.MeetingComponentType.MeetingComponentType_AUDIO,
+                                     simulated_sdk.ConnectionQuality(level))
+            await SYSTEM_CLOCK.sleep(1)
+
+    run_kiosk(scenario, config)
+    assert path.with_suffix('.jsonl.1').exists()
+    events = load_trace(path)
+    names = [name for _, name, _ in events]
+    assert names[:3] == ['service', 'self', 'participants']
+    assert 'network' in names and 'auth' not in names
+
+    report = run_virtual(replay_trace(events, kiosk_config()))
+    # Nothing skipped for want of a service line
+    assert report['callbacks']['network'] == names.count('network')
+
+
+def test_previous_trace_is_kept(tmp_path):
+    path = tmp_path / 'trace.jsonl'
+    first = CallbackTraceRecorder(trace_config(path))
+    first.record('auth', 0)
+    first.close()
+
+    CallbackTraceRecorder(trace_config(path)).close()
+    assert load_trace(path) == []
+    assert load_trace(path.with_suffix('.jsonl.1'))[0][1:] == ['auth', [0]]
+
+
+class BrokenParticipants:
+    def GetMySelfUser(self):
+        raise RuntimeError('not in a meeting yet')
+
+    def GetParticipantsList(self):
+        raise RuntimeError('not in a meeting yet')
+
+
+class Service:
+    participants_ctrl = BrokenParticipants()
+
+
+def test_local_user_lookup_failure_still_records_the_callback(tmp_path):
+    path = tmp_path / 'trace.jsonl'
+    recorder = CallbackTraceRecorder(trace_config(path))
+    recorder.attach(Service())
+    recorder.record('status', 3, 0)
+    recorder.close()
+    assert [event[1:] for event in load_trace(path)] == [['service', []], ['status', [3, 0]]]
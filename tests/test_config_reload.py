@@ -0,0 +1,36 @@
+import copy
+from tests.helpers import run_kiosk, sharing, wait_until
+
+
+def test_screen_changes_reach_the_running_share():
+    async def scenario(app, simulator):
+        assert await wait_until(lambda: sharing(app), 120)
+        enabled = simulator.share_computer_sound
+        config = copy.deepcopy(app.config)
+        config['screen']['shareComputerSound'] = not enabled
+        app.apply_config(config)
+        return enabled, simulator.share_computer_sound, app.zoom_service.share_settings['shareComputerSound']
+
+    before, now, service = run_kiosk(scenario)
+    assert now == service == (not before)
+
+
+def test_capture_settings_rebuild_the_recorder():
+    async def scenario(app, simulator):
+        recorder = app.action_recorder
+        config = copy.deepcopy(app.config)
+        config['replay']['signatureSize'] = recorder.signature_size + 8
+        app.apply_config(config)
+        assert app.action_recorder is not recorder and app.action_recorder.backend is recorder.backend
+
+        # Not swapped out under a running capture
+        recorder = app.action_recorder
+        recorder.is_recording = True
+        config = copy.deepcopy(app.config)
+        config['replay']['monitorRelative'] = not config['replay']['monitorRelative']
+        app.apply_config(config)
+        return recorder, app
+
+    recorder, app = run_kiosk(scenario)
+    assert app.action_recorder is recorder and app.recorder_outdated
+    assert recorder.signature_size == app.config['replay']['signatureSize']
@@ -0,0 +1,70 @@
+import asyncio
+import pytest
+from src.config import default_config
+from src.control_plane import ControlPlane
+
+
+async def request(port, method, path, headers):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    extra = ''.join(f'{name}: {value}\r\n' for name, value in headers.items())
+    writer.write(f'{method} {path} HTTP/1.1\r\n{extra}Content-Length: 0\r\n\r\n'.encode())
+    status_line = await reader.readline()
+    writer.close()
+    return int(status_line.split(b' ')[1])
+
+
+def exchange(method, path, headers, **config):
+    stops = []
+
+    async def stop():
+        stops.append(True)
+
+    async def main():
+        plane = ControlPlane({**default_config['controlPlane'], 'port': 0, **config}, lambda: {}, {'stop': stop})
+        await plane.start()
+        port = plane.server.sockets[0].getsockname()[1]
+        try:
+            status = await request(port, method, path, headers)
+            await asyncio.sleep(0)
+        finally:
+            await plane.stop()
+        return status
+
+    return asyncio.run(main()), stops
+
+
+@pytest.mark.parametrize('host', ['127.0.0.1:8765', 'localhost', '[::1]:8765'])
+def test_local_command_is_accepted(host):
+    status, stops = exchange('POST', '/stop', {'Host': host})
+    assert status == 202
+    assert stops == [True]
+
+
+@pytest.mark.parametrize('host', ['evil.example', 'evil.example:8765', None])
+def test_requests_not_addressed_to_localhost_are_refused(host):
+    # What a page rebound to 127.0.0.1 sends
+    status, stops = exchange('POST', '/stop', {'Host': host} if host else {})
+    assert status == 403
+    assert not stops
+    assert exchange('GET', '/status', {'Host': host} if host else {})[0] == 403
+
+
+def test_commands_from_web_pages_are_refused():
+    status, stops = exchange('POST', '/stop', {'Host': 'localhost:8765', 'Origin': 'http://evil.example'})
+    assert status == 403
+    assert not stops
+    # Dashboards can still read
+    assert exchange('GET', '/status', {'Host': 'localhost:8765', 'Origin': 'http://localhost'})[0] == 200
+
+
+EVENTS = {'Host': 'localhost:8765', 'Upgrade': 'websocket', 'Connection': 'Upgrade',
+          'Sec-WebSocket-Key': 'dGhlIHNhbXBsZSBub25jZQ==', 'Sec-WebSocket-Version': '13'}
+
+
+def test_event_stream_only_accepts_allowed_web_pages():
+    # Command line clients send no Origin
+    assert exchange('GET', '/events', EVENTS)[0] == 101
+    assert exchange('GET', '/events', {**EVENTS, 'Origin': 'http://evil.example'})[0] == 403
+    dashboard = {**EVENTS, 'Origin': 'http://dashboard.local'}
+    assert exchange('GET', '/events', dashboard)[0] == 403
+    assert exchange('GET', '/events', dashboard, allowedOrigins=['http://dashboard.local'])[0] == 101
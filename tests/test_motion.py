@@ -0,0 +1,57 @@
+import math
+import random
+import pytest
+from src.motion import (MOTION_MODELS, MotionModel, create_motion_model, fitts_duration_ms, minimum_jerk,
+                        step_count)
+
+START = (100.0, 200.0)
+END = (900.0, 650.0)
+
+
+def test_motion_model_is_abstract():
+    with pytest.raises(TypeError):
+        MotionModel()
+
+
+@pytest.mark.parametrize('name', sorted(MOTION_MODELS))
+def test_paths_end_exactly_at_the_target(name):
+    points = create_motion_model(name).path(START, END, 40)
+    assert len(points) == 40
+    assert points[-1] == pytest.approx(END)
+
+
+@pytest.mark.parametrize('name', sorted(MOTION_MODELS))
+def test_paths_are_deterministic_under_a_fixed_seed(name):
+    model = create_motion_model(name)
+    first = model.path(START, END, 40, random.Random(7))
+    assert model.path(START, END, 40, random.Random(7)) == first
+
+
+def test_fitts_duration_grows_with_the_index_of_difficulty():
+    # a + b * log2(D / W + 1): D = 3 W is two bits, D = 7 W three
+    assert fitts_duration_ms(90, 30, 100, 150, 2000) == pytest.approx(100 + 150 * 2)
+    assert fitts_duration_ms(210, 30, 100, 150, 2000) == pytest.approx(100 + 150 * 3)
+    # Doubling distance and width is the same move
+    assert fitts_duration_ms(420, 60, 100, 150, 2000) == pytest.approx(fitts_duration_ms(210, 30, 100, 150, 2000))
+
+
+def test_fitts_duration_limits():
+    assert fitts_duration_ms(0, 30, 100, 150, 2000) == 0.0
+    assert fitts_duration_ms(10 ** 9, 30, 100, 150, 2000) == 2000
+    # Targets narrower than a pixel count as one pixel wide
+    assert fitts_duration_ms(7, 0, 0, 100, 2000) == pytest.approx(300)
+
+
+def test_step_count_follows_the_sample_rate():
+    assert step_count(500, 60) == 30
+    assert step_count(1, 60) == 1
+    assert step_count(0, 60) == 1
+
+
+def test_minimum_jerk_profile():
+    assert minimum_jerk(0) == 0 and minimum_jerk(1) == 1
+    assert minimum_jerk(0.5) == pytest.approx(0.5)
+    # Slow at both ends
+    assert minimum_jerk(0.1) < 0.1 and minimum_jerk(0.9) > 0.9
+    assert all(minimum_jerk(i / 10) <= minimum_jerk((i + 1) / 10) for i in range(10))
+    assert math.isclose(minimum_jerk(0.25) + minimum_jerk(0.75), 1.0)
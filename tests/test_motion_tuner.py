@@ -0,0 +1,15 @@
+import random
+from src.config import default_config
+from src.motion_tuner import evaluate
+
+MOVES = [((960.0, 540.0), (200.0, 100.0)), ((200.0, 100.0), (1500.0, 900.0))]
+PARAMS = {'gravity': 9.0, 'wind': 3.0, 'max_step': 15.0, 'damped_distance': 12.0}
+
+
+def test_evaluate_is_reproducible_and_leaves_the_global_random_alone():
+    random.seed(3)
+    state = random.getstate()
+    first = evaluate(PARAMS, MOVES, default_config['replay'], 2, seed=11)
+    assert random.getstate() == state
+    assert evaluate(PARAMS, MOVES, default_config['replay'], 2, seed=11) == first
+    assert evaluate(PARAMS, MOVES, default_config['replay'], 2, seed=12) != first
@@ -0,0 +1,61 @@
+import pytest
+from src.clock import run_virtual, SYSTEM_CLOCK
+from src.config import default_config
+from src.network_quality import NetworkQualityMonitor, RingBuffer, time_weighted_mean
+
+SHARE = 3
+
+
+class Service:
+    """Just the event registration of a ZoomService"""
+
+    def on(self, event, callback):
+        pass
+
+    def off(self, event, callback):
+        pass
+
+
+def test_time_weighted_mean_holds_each_level_until_the_next():
+    samples = [(0.0, 6), (10.0, 5), (20.0, 1)]
+    # 6 for 10s, 5 for 10s, 1 for 40s
+    assert time_weighted_mean(samples, 0.0, 60.0) == (pytest.approx(150 / 60), 60.0)
+    # The level in effect at the cutoff counts from the cutoff
+    assert time_weighted_mean(samples, 15.0, 60.0) == (pytest.approx((5 * 5 + 40) / 45), 45.0)
+    assert time_weighted_mean([], 0.0, 60.0) == (None, 0.0)
+
+
+def test_window_keeps_the_level_in_effect_at_the_cutoff():
+    buffer = RingBuffer(4)
+    for at, value in ((1.0, 6), (2.0, 5), (8.0, 2)):
+        buffer.append(at, value)
+    assert buffer.window(5.0) == [(2.0, 5), (8.0, 2)]
+    assert buffer.window(9.0) == [(8.0, 2)]
+
+
+def test_sustained_drop_reported_once_becomes_degraded_and_recovers():
+    monitor = NetworkQualityMonitor(default_config['networkQuality'])
+    events = []
+    monitor.on('degraded', lambda component, metrics: events.append(('degraded', SYSTEM_CLOCK.monotonic())))
+    monitor.on('recovered', lambda component, metrics: events.append(('recovered', SYSTEM_CLOCK.monotonic())))
+
+    async def main():
+        monitor.attach(Service())
+        started = SYSTEM_CLOCK.monotonic()
+        # The SDK reports changes only: 6, then 5, then 1 which simply stays
+        for level in (6, 5, 1):
+            monitor.on_network_quality(SHARE, level, 1, True, True)
+            await SYSTEM_CLOCK.sleep(10)
+        await SYSTEM_CLOCK.sleep(60)
+        assert monitor.degraded['share']
+        # Level recovers, again reported once
+        monitor.on_network_quality(SHARE, 6, 1, True, True)
+        await SYSTEM_CLOCK.sleep(90)
+        monitor.detach()
+        return started
+
+    started = run_virtual(main())
+    assert [name for name, _ in events] == ['degraded', 'recovered']
+    # 6 for 10s, 5 for 10s, then 1: the mean is below 3 after 45s, noticed by the next recheck
+    degraded_after = events[0][1] - started
+    assert 45 <= degraded_after <= 45 + default_config['networkQuality']['recheckMs'] / 1000
@@ -0,0 +1,46 @@
+import random
+import tempfile
+from pathlib import Path
+import pytest
+from src import simulated_sdk
+from src.clock import run_virtual, SYSTEM_CLOCK
+from src.outage_sim import run_policy, run_scenario
+from tests.helpers import kiosk_config, sharing, wait_until
+
+
+def scenario_result(scenario):
+    from src.main import KioskApp
+
+    async def main():
+        simulated_sdk.simulator = simulated_sdk.Simulator()
+        with tempfile.TemporaryDirectory() as state_dir:
+            app = KioskApp(kiosk_config(), enable_shortcuts=False, replay_plan=[], state_dir=Path(state_dir))
+            return await run_scenario(app, scenario(app))
+
+    return run_virtual(main())
+
+
+def test_scenario_result_is_returned_once_it_finishes():
+    async def scenario(app):
+        return await wait_until(lambda: sharing(app), 120)
+
+    assert scenario_result(scenario) is True
+
+
+def test_kiosk_stopping_first_is_reported():
+    async def scenario(app):
+        app.stopping = True
+        await SYSTEM_CLOCK.sleep(10 ** 6)
+
+    with pytest.raises(RuntimeError, match='kiosk stopped before the scenario finished'):
+        scenario_result(scenario)
+
+
+def test_policy_runs_are_reproducible_and_leave_the_global_generator_alone():
+    recovery = {'maxRetries': 10, 'initialBackoffMs': 1000, 'maxBackoffMs': 30000}
+    random.seed(1)
+    expected = random.random()
+    random.seed(1)
+    first = run_policy(recovery, 60, 600, [3, 4])
+    assert random.random() == expected
+    assert run_policy(recovery, 60, 600, [3, 4]) == first
@@ -0,0 +1,68 @@
+import os
+import subprocess
+import sys
+import pytest
+from src.perf_history import (DAY_S, INSERT_TIMING, START_SESSION, close_unclean, compact, connect,
+                              query_percentiles, recent_sessions)
+
+# Midday, so "10 days ago" and "yesterday" are whole UTC days on either side of a 7 day retention
+NOW = 20000 * DAY_S + DAY_S / 2
+
+
+def start(conn, session_id, pid, started_at=NOW - 30 * DAY_S):
+    with conn:
+        conn.execute(START_SESSION, {'id': session_id, 'kiosk': 'kiosk', 'pid': pid, 'sdk_version': '6.0',
+                                     'started_at': started_at})
+
+
+def outcomes(conn):
+    return dict(conn.execute('SELECT id, outcome FROM sessions'))
+
+
+def test_only_sessions_of_exited_processes_are_closed(tmp_path):
+    exited = subprocess.Popen([sys.executable, '-c', 'pass'])
+    exited.wait()
+    conn = connect(tmp_path / 'history.sqlite3')
+    start(conn, 'crashed', exited.pid)
+    # The hot standby: same kiosk id, still running
+    start(conn, 'standby', os.getpid())
+    start(conn, 'new', os.getpid())
+
+    assert close_unclean(conn, 'kiosk', 'new') == 1
+    assert outcomes(conn) == {'crashed': 'unclean', 'standby': None, 'new': None}
+
+
+def test_percentiles_span_compacted_and_raw_timings(tmp_path):
+    conn = connect(tmp_path / 'history.sqlite3')
+    start(conn, 'session', os.getpid())
+    old = [100.0 * i for i in range(1, 11)]
+    recent = [50.0 * i for i in range(1, 11)]
+    with conn:
+        conn.executemany(INSERT_TIMING, [('session', NOW - 10 * DAY_S, 'join', ms, 'ok', 0) for ms in old]
+                         + [('session', NOW - DAY_S, 'join', ms, 'ok', 0) for ms in recent]
+                         + [('session', NOW - 10 * DAY_S, 'join', 5000.0, 'timeout', 0)])
+
+    exact = {r['group']: r for r in query_percentiles(conn, 30 * DAY_S, 'day', now=NOW)}
+    assert compact(conn, 7, 365, now=NOW) == 11
+    assert conn.execute('SELECT COUNT(*) FROM timings').fetchone()[0] == 10
+
+    by_day = {r['group']: r for r in query_percentiles(conn, 30 * DAY_S, 'day', now=NOW)}
+    assert by_day.keys() == exact.keys()
+    for day, before in exact.items():
+        after = by_day[day]
+        assert (after['count'], after['okCount'], after['failedPct']) == \
+               (before['count'], before['okCount'], before['failedPct'])
+        assert after['p50Ms'] == pytest.approx(before['p50Ms'], abs=0.1)
+        assert after['maxMs'] == before['maxMs']
+    # Only the compacted day is approximate
+    assert sorted(r['approximate'] for r in by_day.values()) == [False, True]
+
+    (combined,) = query_percentiles(conn, 30 * DAY_S, 'all', now=NOW)
+    assert combined['count'] == 21 and combined['okCount'] == 20 and combined['approximate']
+    old_day, recent_day = sorted(exact.values(), key=lambda r: r['group'])
+    assert combined['p50Ms'] == pytest.approx((old_day['p50Ms'] + recent_day['p50Ms']) / 2, abs=0.1)
+    assert combined['maxMs'] == 1000.0
+
+    # The running session still counts the timings that were compacted away
+    (session,) = recent_sessions(conn, 1)
+    assert session['timings'] == 21 and session['outcome'] == 'running'
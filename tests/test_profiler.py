@@ -0,0 +1,25 @@
+import threading
+from tests.helpers import run_kiosk, wait_until
+
+
+def test_f11_writes_the_profile_off_the_loop():
+    async def scenario(app, simulator):
+        loop_thread = threading.get_ident()
+        stopped_on = []
+        stop = app.profiler.stop
+
+        def recording_stop():
+            stopped_on.append(threading.get_ident())
+            return stop()
+
+        app.profiler.stop = recording_stop
+        app.toggle_profiler()
+        assert app.profiler.is_running
+        app.toggle_profiler()
+        # Handed to a worker thread, not written before toggle_profiler returns
+        assert not stopped_on
+        assert await wait_until(lambda: not app.profiler.is_running, 5)
+        return loop_thread, stopped_on
+
+    loop_thread, stopped_on = run_kiosk(scenario)
+    assert len(stopped_on) == 1 and stopped_on[0] != loop_thread
@@ -0,0 +1,137 @@
+import pytest
+from src.clock import run_virtual, SYSTEM_CLOCK
+from src.config import default_config
+from src.reachability import ReachabilityProber
+from src.reconnect_limiter import ReconnectLimiter
+from src.recovery import RecoveryState, RecoveryWatchdog
+from tests.helpers import wait_until
+
+RECOVERY = {'maxRetries': 3, 'initialBackoffMs': 1000, 'maxBackoffMs': 10000}
+
+
+class FakeLimiter(ReconnectLimiter):
+    """One token; acquire fails at once while it is held elsewhere"""
+
+    def __init__(self):
+        self.held = False
+        self.busy = False
+        self.acquired = 0
+
+    async def acquire(self, timeout: float) -> bool:
+        if self.held or self.busy:
+            return False
+        self.held = True
+        self.acquired += 1
+        return True
+
+    async def release(self) -> None:
+        self.held = False
+
+
+def test_limiter_is_abstract():
+    with pytest.raises(TypeError):
+        ReconnectLimiter()
+
+
+def test_token_is_held_until_connected():
+    limiter = FakeLimiter()
+    reconnects = []
+
+    async def reconnect():
+        reconnects.append(SYSTEM_CLOCK.monotonic())
+
+    async def main():
+        watchdog = RecoveryWatchdog(RECOVERY, reconnect, limiter=limiter)
+        watchdog.start()
+        watchdog.on_disconnected()
+        assert await wait_until(lambda: reconnects, 30)
+        await SYSTEM_CLOCK.sleep(5)
+        # Reconnect returned, but the kiosk has not joined yet
+        assert limiter.held
+        watchdog.on_connected()
+        await SYSTEM_CLOCK.sleep(0)
+        assert not limiter.held
+
+    run_virtual(main())
+
+
+def test_token_is_returned_when_the_attempt_fails():
+    limiter = FakeLimiter()
+
+    async def reconnect():
+        raise RuntimeError('auth failed')
+
+    async def main():
+        watchdog = RecoveryWatchdog(RECOVERY, reconnect, limiter=limiter)
+        watchdog.start()
+        watchdog.on_disconnected()
+        assert await wait_until(lambda: watchdog.state == RecoveryState.FAILED, 300)
+        await SYSTEM_CLOCK.sleep(0)
+        return watchdog
+
+    watchdog = run_virtual(main())
+    assert limiter.acquired == 3
+    assert not limiter.held and not watchdog.token_held
+
+
+def test_no_token_backs_off_without_using_up_retries():
+    limiter = FakeLimiter()
+    limiter.busy = True
+    reconnects = []
+
+    async def reconnect():
+        reconnects.append(SYSTEM_CLOCK.monotonic())
+
+    async def main():
+        watchdog = RecoveryWatchdog(RECOVERY, reconnect, limiter=limiter)
+        watchdog.start()
+        watchdog.on_disconnected()
+        await SYSTEM_CLOCK.sleep(120)
+        # Never reconnected without a token, and still recovering
+        assert not reconnects
+        assert watchdog.retry_count == 0
+        assert watchdog.state == RecoveryState.RECOVERING
+
+        limiter.busy = False
+        assert await wait_until(lambda: reconnects, 30)
+        assert watchdog.retry_count == 1
+
+    run_virtual(main())
+
+
+class DownProber(ReachabilityProber):
+    """Probe targets never answer"""
+
+    def __init__(self, wait: bool = True):
+        super().__init__({**default_config['reachability'], 'targets': [], 'waitForConnectivity': wait})
+        self.probes = 0
+
+    async def is_reachable(self) -> bool:
+        self.probes += 1
+        return False
+
+
+@pytest.mark.parametrize('wait', [True, False])
+def test_unreachable_network_delays_the_attempt_at_most_the_longest_backoff(wait):
+    prober = DownProber(wait)
+    reconnects = []
+
+    async def reconnect():
+        reconnects.append(SYSTEM_CLOCK.monotonic())
+
+    async def main():
+        watchdog = RecoveryWatchdog(RECOVERY, reconnect, prober=prober)
+        watchdog.start()
+        started = SYSTEM_CLOCK.monotonic()
+        watchdog.on_disconnected()
+        assert await wait_until(lambda: reconnects, 60)
+        return reconnects[0] - started
+
+    waited = run_virtual(main())
+    if wait:
+        assert RECOVERY['maxBackoffMs'] / 1000 <= waited < RECOVERY['maxBackoffMs'] / 1000 + 1
+        assert prober.probes > 1
+    else:
+        # Just the backoff
+        assert waited < RECOVERY['maxBackoffMs'] / 1000
+        assert prober.probes == 0
@@ -0,0 +1,70 @@
+import asyncio
+import threading
+import pytest
+from src.action_recorder import ActionRecorder
+from src.screen_backend import (DryRunBackend, FakeScreenBackend, ScreenBackend, compute_signature,
+                                signatures_match)
+
+WHITE = (255, 255, 255)
+
+
+def test_backend_is_abstract():
+    with pytest.raises(TypeError):
+        ScreenBackend()
+
+
+def test_signature_matches_once_the_target_is_painted():
+    screen = FakeScreenBackend(200, 100)
+    screen.fill(40, 40, 12, 12, WHITE)
+    expected = screen.signature_at(50, 50, 24)
+    assert expected['size'] == 24
+
+    blank = FakeScreenBackend(200, 100)
+    assert not signatures_match(expected, blank.signature_at(50, 50, 24), 4)
+    blank.fill(40, 40, 12, 12, WHITE)
+    assert signatures_match(expected, blank.signature_at(50, 50, 24), 4)
+
+
+def test_signature_is_clipped_to_the_screen():
+    screen = FakeScreenBackend(100, 100)
+    screen.fill(90, 90, 10, 10, WHITE)
+    signature = screen.signature_at(99, 99, 24)
+    # Only the on-screen part of the region is captured
+    assert signature == {**compute_signature(screen.grab(87, 87, 13, 13), 13, 13), 'size': 24}
+
+
+def test_dry_run_captures_a_blank_frame():
+    screen = DryRunBackend(320, 200)
+    pixels = screen.grab(0, 0, 10, 4)
+    assert pixels == bytes(10 * 4 * 3)
+    assert compute_signature(pixels, 10, 4) == {'hash': '0' * 16, 'mean': 0}
+
+
+class ThreadRecordingBackend(FakeScreenBackend):
+    def __init__(self):
+        super().__init__(200, 100)
+        self.grab_threads = []
+
+    def grab(self, left, top, width, height):
+        self.grab_threads.append(threading.get_ident())
+        return super().grab(left, top, width, height)
+
+
+def test_clicks_from_the_listener_are_captured_on_the_loop():
+    backend = ThreadRecordingBackend()
+    recorder = ActionRecorder(24, backend)
+
+    async def main():
+        recorder.loop = asyncio.get_running_loop()
+        recorder.is_recording = True
+        listener = threading.Thread(target=recorder.on_listener_click, args=(30, 40, 'left'))
+        listener.start()
+        listener.join()
+        # Not captured on the listener thread
+        assert not recorder.recording
+        await asyncio.sleep(0)
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(main())
+    assert backend.grab_threads == [loop_thread]
+    assert recorder.recording[0]['x'] == 30 and recorder.recording[0]['signature']
@@ -0,0 +1,33 @@
+from src.clock import SYSTEM_CLOCK
+from tests.helpers import run_kiosk, sharing, wait_until
+
+
+def test_stopped_share_is_restarted():
+    async def scenario(app, simulator):
+        assert await wait_until(lambda: sharing(app), 60)
+        stopped = []
+        app.zoom_service.on('sharingStopped', lambda: stopped.append(True))
+
+        simulator.stop_share()
+        await SYSTEM_CLOCK.sleep(0)
+        assert stopped
+        assert app.share_health_monitor.loss_count == 1
+
+        assert await wait_until(lambda: sharing(app), 30)
+        return app.share_health_monitor
+
+    monitor = run_kiosk(scenario)
+    assert monitor.restored_count == 1
+    assert monitor.escalation_count == 0
+
+
+def test_share_end_with_nobody_watching_is_not_restarted():
+    async def scenario(app, simulator):
+        assert await wait_until(lambda: sharing(app), 60)
+        simulator.remove_participant()
+        simulator.stop_share()
+        await SYSTEM_CLOCK.sleep(30)
+        return app
+
+    app = run_kiosk(scenario)
+    assert app.share_health_monitor.restart_attempts == 0
@@ -0,0 +1,55 @@
+from src import simulated_sdk
+from src.clock import run_virtual, SYSTEM_CLOCK
+from src.share_policy import simulate_policy
+from tests.helpers import kiosk_config, run_kiosk, sharing, wait_until
+
+INTERVAL_S = 10
+
+
+def policies(levels, **share_policy):
+    timeline = run_virtual(simulate_policy(kiosk_config(sharePolicy=share_policy), levels, INTERVAL_S))
+    return [entry['policy'] for entry in timeline], timeline
+
+
+def test_sustained_drop_reduces_the_share():
+    # Reported twice: the drop to 1 is the last callback
+    result, timeline = policies([6, 5] + [1] * 6)
+    assert result[:3] == ['full'] * 3
+    assert result[-1] == 'reduced'
+    assert not timeline[-1]['computerSound'] and not timeline[-1]['stereo']
+
+
+def test_level_between_thresholds_keeps_the_current_policy():
+    result, _ = policies([6] * 3 + [3] * 10)
+    assert result == ['full'] * 13
+
+    result, _ = policies([6] + [1] * 8 + [3] * 10)
+    assert result[-10:] == ['reduced'] * 10
+
+
+def test_recovery_is_held_then_applied_without_new_reports():
+    result, timeline = policies([6] + [1] * 6 + [6] * 20, holdMs=120000)
+    reduced = result.index('reduced')
+    restored = result.index('full', reduced)
+    assert (restored - reduced) * INTERVAL_S >= 120
+    assert timeline[-1]['computerSound'] and timeline[-1]['stereo']
+
+
+def test_warning_without_quality_levels_is_restored_after_the_hold_time():
+    warning = simulated_sdk.StatisticsWarningType.Statistics_Warning_Network_Quality_Bad
+
+    async def scenario(app, simulator):
+        assert await wait_until(lambda: sharing(app), 120)
+        policy = app.share_policy
+        hold_s = policy.config['holdMs'] / 1000
+        simulator.statistics_warning(warning)
+        assert policy.level == 'reduced' and policy.uplink_quality() is None
+        # Repeated warnings keep it reduced
+        await SYSTEM_CLOCK.sleep(hold_s * 0.75)
+        simulator.statistics_warning(warning)
+        await SYSTEM_CLOCK.sleep(hold_s * 0.75)
+        assert policy.level == 'reduced'
+        assert await wait_until(lambda: policy.level == 'full', hold_s)
+        return simulator.share_computer_sound == app.config['screen']['shareComputerSound']
+
+    assert run_kiosk(scenario)
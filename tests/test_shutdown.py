@@ -0,0 +1,71 @@
+import pytest
+from src.clock import run_virtual, SYSTEM_CLOCK
+from src.config import default_config
+from src.shutdown import ShutdownOrchestrator
+
+CONFIG = {**default_config['shutdown'], 'phaseTimeoutMs': 1000, 'deadlineMs': 2500, 'forceExit': False}
+
+
+def shutdown_with(*phases):
+    """Run phases (name, seconds to take or None to hang, after, timeout_s); returns the report and start times"""
+    started = {}
+
+    def action(name, seconds):
+        async def run():
+            started[name] = SYSTEM_CLOCK.monotonic() - begin
+            if seconds is None:
+                await SYSTEM_CLOCK.sleep(3600)
+            elif seconds < 0:
+                raise RuntimeError('device gone')
+            await SYSTEM_CLOCK.sleep(seconds)
+        return run
+
+    async def main():
+        nonlocal begin
+        shutdown = ShutdownOrchestrator(CONFIG)
+        for name, seconds, after, timeout_s in phases:
+            shutdown.add(name, action(name, seconds), after, timeout_s)
+        begin = SYSTEM_CLOCK.monotonic()
+        await shutdown.run()
+        return shutdown.report()
+
+    begin = 0.0
+    report = run_virtual(main())
+    return {phase['phase']: phase for phase in report['phases']}, report, started
+
+
+def test_phases_start_once_their_dependencies_end():
+    phases, report, started = shutdown_with(('monitors', 0.2, (), None), ('leave', 0.3, ('monitors',), None),
+                                            ('profiler', 0.1, (), None), ('status', 0, ('leave', 'profiler'), None))
+    assert report['ok']
+    # Independent phases run in parallel
+    assert started['monitors'] == started['profiler'] == 0
+    assert started['leave'] == pytest.approx(0.2)
+    assert started['status'] == pytest.approx(0.5)
+    assert report['durationMs'] == pytest.approx(500, abs=1)
+
+
+def test_hung_phases_are_abandoned_and_reported():
+    phases, report, started = shutdown_with(
+        ('leave', None, (), None),
+        # Goes ahead once leave is abandoned
+        ('checkpoint', 0.1, ('leave',), None),
+        ('trace', -1, ('leave',), None),
+        ('tasks', None, ('checkpoint',), 10.0),
+        ('status', 0, ('tasks',), None))
+
+    assert phases['leave']['outcome'] == 'timeout' and phases['leave']['durationMs'] == pytest.approx(1000, abs=1)
+    assert started['checkpoint'] == pytest.approx(1.0)
+    assert phases['checkpoint']['outcome'] == 'ok'
+    assert phases['trace']['outcome'] == 'failed' and 'device gone' in phases['trace']['error']
+    # Its own timeout is longer than what is left: the shutdown deadline ends it
+    assert phases['tasks'] == {'phase': 'tasks', 'outcome': 'timeout', 'durationMs': pytest.approx(1400, abs=1),
+                               'error': 'shutdown deadline'}
+    assert phases['status']['outcome'] == 'skipped' and 'status' not in started
+    assert not report['ok'] and report['durationMs'] == pytest.approx(2500, abs=1)
+
+
+def test_unknown_dependency_is_rejected():
+    shutdown = ShutdownOrchestrator(CONFIG)
+    with pytest.raises(ValueError):
+        shutdown.add('leave', lambda: None, after=('monitors',))
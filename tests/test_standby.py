@@ -0,0 +1,50 @@
+import asyncio
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+from src import simulated_sdk
+from src.clock import run_virtual
+from src.config import default_config
+from src.standby import StandbySupervisor
+from tests.helpers import kiosk_config, sharing, wait_until
+
+
+def kiosk_in(state_dir):
+    return SimpleNamespace(options={'stateDir': state_dir})
+
+
+def test_kiosks_get_separate_state_directories(tmp_path):
+    supervisor = StandbySupervisor({**default_config['standby'], 'stateDir': str(tmp_path)})
+    first = supervisor._free_slot()
+    supervisor.active = kiosk_in(first)
+    second = supervisor._free_slot()
+    assert second != first
+    # After a failover the promoted standby keeps its slot, the new standby takes the freed one
+    supervisor.active, supervisor.standby = kiosk_in(second), None
+    assert supervisor._free_slot() == first
+
+
+def test_standby_serves_the_control_plane_once_promoted():
+    from src.main import KioskApp
+
+    async def main():
+        simulated_sdk.simulator = simulated_sdk.Simulator()
+        with tempfile.TemporaryDirectory() as state_dir:
+            app = KioskApp(kiosk_config(controlPlane={'enabled': True, 'port': 0}), auto_join=False,
+                           enable_shortcuts=False, replay_plan=[], state_dir=Path(state_dir))
+
+            async def scenario():
+                try:
+                    assert await wait_until(lambda: app.zoom_service and app.zoom_service.is_initialized, 60)
+                    assert app.control_plane.server is None
+                    await app.promote()
+                    assert app.control_plane.server is not None
+                    assert await wait_until(lambda: sharing(app), 120)
+                finally:
+                    app.stopping = True
+
+            task = asyncio.create_task(scenario())
+            await app.run()
+            await task
+
+    run_virtual(main())
@@ -0,0 +1,61 @@
+import asyncio
+import os
+import time
+import pytest
+from src.config import default_config
+from src.config_watcher import ConfigWatcher
+from src.status_block import BODY, FLAG_STOPPED, HEADER, MAGIC, VERSION, StatusBlockWriter, read_status
+from src.task_supervisor import TaskSupervisor
+
+
+def other_kiosk_block(path, age_s=0.0, flags=0):
+    body = BODY.pack(os.getpid() + 1, 7, time.time() - age_s, 0.0, 0.0, 1, flags, 0, 0, 0, b'other')
+    path.write_bytes(HEADER.pack(MAGIC, VERSION, 2) + body)
+
+
+def start_writer(path):
+    writer = StatusBlockWriter(default_config['statusBlock'], lambda: {'kioskId': 'kiosk'}, path)
+
+    async def main():
+        writer.start()
+        started = writer._map is not None
+        writer.stop()
+        return started
+
+    return asyncio.run(main())
+
+
+def test_block_updated_by_another_kiosk_is_left_alone(tmp_path):
+    path = tmp_path / 'kiosk-status.bin'
+    other_kiosk_block(path)
+    assert not start_writer(path)
+    status = read_status(path.read_bytes())
+    assert status['kioskId'] == 'other' and not status['stopped']
+
+
+@pytest.mark.parametrize('age_s, flags', [(60.0, 0), (0.0, FLAG_STOPPED)])
+def test_stale_or_stopped_block_is_taken_over(tmp_path, age_s, flags):
+    path = tmp_path / 'kiosk-status.bin'
+    other_kiosk_block(path, age_s, flags)
+    assert start_writer(path)
+    status = read_status(path.read_bytes())
+    assert status['pid'] == os.getpid() and status['stopped']
+
+
+def test_background_loops_are_owned_by_the_kiosk_supervisor(tmp_path):
+    config_path = tmp_path / 'config.json'
+    config_path.write_text('{}')
+    tasks = TaskSupervisor()
+    writer = StatusBlockWriter(default_config['statusBlock'], lambda: {}, tmp_path / 'kiosk-status.bin', tasks)
+    watcher = ConfigWatcher(default_config['configReload'], config_path, lambda config: None, tasks)
+
+    async def main():
+        writer.start()
+        watcher.start()
+        owners = set(tasks.get_stats()['byOwner'])
+        assert not await tasks.cancel_all(1.0)
+        writer.stop()
+        watcher.stop()
+        return owners
+
+    assert asyncio.run(main()) == {'statusBlock', 'configWatcher'}
@@ -0,0 +1,83 @@
+import asyncio
+from src import simulated_sdk, zoom_service
+from src.clock import run_virtual, SYSTEM_CLOCK
+from src.zoom_service import ZoomService
+from tests.helpers import kiosk_config, wait_until
+
+
+def degraded_service(monkeypatch):
+    """A service whose first InitSDK failed, with CleanUPSDK calls counted"""
+    simulated_sdk.simulator = simulator = simulated_sdk.Simulator()
+    simulator.fail_next['InitSDK'] = [simulated_sdk.SDKError.SDKERR_INTERNAL_ERROR]
+    cleanups = []
+
+    def cleanup():
+        cleanups.append(simulator.initialized)
+        return simulated_sdk.SDKError.SDKERR_SUCCESS
+
+    monkeypatch.setattr(zoom_service.sdk, 'CleanUPSDK', cleanup)
+    return ZoomService(kiosk_config(mockUpgrade={'initialBackoffMs': 1000, 'maxBackoffMs': 1000})), simulator, cleanups
+
+
+def test_upgrade_only_cleans_up_an_initialized_sdk(monkeypatch):
+    service, simulator, cleanups = degraded_service(monkeypatch)
+    simulator.auth_result = simulated_sdk.AuthResult.AUTHRET_JWTTOKENWRONG
+
+    async def main():
+        await service.initialize()
+        assert service.use_mock_mode
+        # First attempt: nothing initialized to clean up; its auth fails
+        assert await wait_until(lambda: service.upgrade_attempts == 2, 30)
+        await SYSTEM_CLOCK.sleep(0)
+        service.stop_upgrade()
+
+    run_virtual(main())
+    # Only the SDK initialized by the first attempt was cleaned up
+    assert cleanups == [True]
+
+
+def test_failed_upgrade_stays_mock_authenticated(monkeypatch):
+    service, simulator, _ = degraded_service(monkeypatch)
+    simulator.auth_result = simulated_sdk.AuthResult.AUTHRET_JWTTOKENWRONG
+
+    async def main():
+        await service.initialize()
+        assert await wait_until(lambda: service.upgrade_attempts == 1 and service.upgrade_result is None, 30)
+        service.stop_upgrade()
+
+    run_virtual(main())
+    assert service.use_mock_mode
+    assert service.is_authenticated
+
+
+def test_cancelled_upgrade_does_not_claim_authentication(monkeypatch):
+    service, simulator, _ = degraded_service(monkeypatch)
+    # Auth never answers, so the attempt is still waiting when the service is replaced
+    simulator.drop_auth_callback = True
+
+    async def main():
+        await service.initialize()
+        assert await wait_until(lambda: service.upgrade_result is not None, 30)
+        task = service.upgrade_task
+        service.stop_upgrade()
+        await asyncio.wait([task])
+        return task
+
+    task = run_virtual(main())
+    assert task.cancelled()
+    assert not service.is_authenticated
+
+
+def test_upgrade_to_the_real_sdk(monkeypatch):
+    service, _, _ = degraded_service(monkeypatch)
+
+    async def main():
+        await service.initialize()
+        assert await wait_until(lambda: not service.use_mock_mode, 30)
+        await SYSTEM_CLOCK.sleep(0)
+        return service.upgrade_task
+
+    task = run_virtual(main())
+    assert task.done() and not task.cancelled()
+    assert service.is_authenticated
+    assert service.upgrade_count == 1